@@ -0,0 +1,306 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+"""
+Bulk alert scenarios on top of the Alert Simulation API.
+
+A scenario is a list of steps (alert type, target, raise / resolve / cycle, count, rate).
+Faults on different targets or of different alert types are injected concurrently under a
+global rate cap, while the raise and resolve of one alert type on one target stay in order.
+Every injected fault is correlated with the first alert line matching its expected strings
+read by an AlertWatcher, giving end to end alert latency percentiles.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+from commons.alerts_simulator.constants import RESOLVE_ALERTS
+from commons.helpers.parallel_exec import DEFAULT_CONCURRENCY
+from commons.helpers.parallel_exec import map_parallel
+from commons.histogram import LatencyHistogram
+
+LOGGER = logging.getLogger(__name__)
+
+ACTIONS = ("raise", "resolve", "cycle")
+ALERT_TIMEOUT = 240
+PERCENTILES = (50, 90, 99)
+
+
+class AlertStep(NamedTuple):
+    """
+    One scenario entry, cycle raises then resolves the fault count times.
+    expect and expect_resolved are strings all found in the alert line of the raised
+    and resolved fault, e.g. ["enclosure:fru:psu", "fault"]; no correlation without them.
+    """
+
+    alert_type: str
+    target: str
+    action: str = "raise"
+    count: int = 1
+    rate: Optional[float] = None
+    input_parameters: Optional[dict] = None
+    expect: Optional[List[str]] = None
+    expect_resolved: Optional[List[str]] = None
+
+
+class Injection(NamedTuple):
+    """One injected fault and the alert observed for it."""
+
+    step: int
+    seq: int
+    alert_type: str
+    target: str
+    action: str
+    ok: bool
+    response: Any
+    inject_secs: float
+    latency: Optional[float] = None
+    alert: Optional[str] = None
+
+
+def load_scenario(entries: Iterable[dict]) -> List[AlertStep]:
+    """
+    Scenario steps from dicts, e.g. read from yaml.
+    :raises ValueError: for unknown actions, counts below one or faults without resolve type
+    """
+    steps = []
+    for number, entry in enumerate(entries):
+        step = AlertStep(**entry)
+        if step.action not in ACTIONS:
+            raise ValueError(f"Step {number}: action {step.action} not in {ACTIONS}")
+        if step.count < 1:
+            raise ValueError(f"Step {number}: count must be at least 1")
+        if step.rate is not None and step.rate <= 0:
+            raise ValueError(f"Step {number}: rate must be positive")
+        if step.action != "raise" and step.alert_type not in RESOLVE_ALERTS:
+            raise ValueError(f"Step {number}: no resolve alert type for {step.alert_type}")
+        steps.append(step)
+    return steps
+
+
+def node_targets(nodes: List[dict], enclosure: dict = None) -> Dict[str, dict]:
+    """Targets named after node hostnames from CMN_CFG["nodes"] and CMN_CFG["enclosure"]."""
+    targets = {}
+    for node in nodes:
+        details = {"host_details": {"host": node["hostname"], "host_user": node["username"],
+                                    "host_password": node["password"]}}
+        if enclosure:
+            details["enclosure_details"] = {
+                "enclosure_ip": enclosure["primary_enclosure_ip"],
+                "enclosure_user": enclosure["enclosure_user"],
+                "enclosure_pwd": enclosure["enclosure_pwd"]}
+        targets[node["hostname"]] = details
+    return targets
+
+
+def generate_alert_executor(alert_type: str, target: str, details: dict,
+                            input_parameters: dict = None) -> Any:
+    """Inject a fault with GenerateAlertLib."""
+    # pylint: disable=import-outside-toplevel
+    # Importing the wrappers loads the cluster config and RAS libs, not needed for dry runs
+    from commons.alerts_simulator.generate_alert_lib import AlertType
+    from commons.alerts_simulator.generate_alert_lib import GenerateAlertLib
+    LOGGER.debug("Injecting %s on %s", alert_type, target)
+    return GenerateAlertLib.generate_alert(
+        AlertType[alert_type], host_details=details.get("host_details"),
+        enclosure_details=details.get("enclosure_details"),
+        input_parameters=input_parameters)
+
+
+class RecordingExecutor:
+    """Executor recording injections instead of touching hardware, for dry runs and tests."""
+
+    def __init__(self, response: Any = (True, "recorded"),
+                 on_inject: Callable[[str, str], None] = None) -> None:
+        """
+        :param response: Returned for every injection
+        :param on_inject: Called with (alert_type, target), e.g. to emit a fake alert
+        """
+        self.response = response
+        self.on_inject = on_inject
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, alert_type: str, target: str, details: dict,
+                 input_parameters: dict = None) -> Any:
+        with self._lock:
+            self.calls.append((alert_type, target, input_parameters, time.monotonic()))
+        if self.on_inject is not None:
+            self.on_inject(alert_type, target)
+        return self.response
+
+
+class RateLimiter:
+    """Spaces acquisitions at least 1/rate seconds apart, shared by threads."""
+
+    def __init__(self, rate: Optional[float], clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        self.interval = 1.0 / rate if rate else 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until the next slot."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            self.sleep(slot - now)
+
+
+class BulkReport:
+    """Injections of a scenario run and their latency percentiles."""
+
+    def __init__(self, injections: List[Injection], wall_secs: float) -> None:
+        self.injections = sorted(injections, key=lambda inj: (inj.step, inj.seq, inj.action))
+        self.wall_secs = wall_secs
+
+    @property
+    def ok(self) -> bool:
+        """Every fault was injected and every expected alert observed."""
+        summary = self.summary()
+        return not summary["failed"] and not summary["missed"]
+
+    def summary(self, percentiles: Iterable[float] = PERCENTILES) -> dict:
+        """Counts, injection and end to end alert latency percentiles, also per alert type."""
+        inject, latency = LatencyHistogram(), LatencyHistogram()
+        per_alert = OrderedDict()
+        counts = dict(injections=len(self.injections), failed=0, observed=0, missed=0)
+        for inj in self.injections:
+            inject.record(inj.inject_secs)
+            if not inj.ok:
+                counts["failed"] += 1
+            elif inj.latency is not None:
+                counts["observed"] += 1
+                latency.record(inj.latency)
+                per_alert.setdefault(inj.alert_type, LatencyHistogram()).record(inj.latency)
+            elif inj.alert is not None:
+                counts["missed"] += 1
+        return dict(counts, wall_secs=round(self.wall_secs, 3),
+                    inject=inject.summary(percentiles),
+                    latency=latency.summary(percentiles),
+                    per_alert={name: hist.summary(percentiles)
+                               for name, hist in per_alert.items()})
+
+
+class BulkAlertEngine:
+    """
+    Run alert scenarios concurrently under a rate cap.
+    Usage:
+    engine = BulkAlertEngine(node_targets(CMN_CFG["nodes"], CMN_CFG["enclosure"]),
+                             watcher=ras_obj.alert_watcher().start(), max_rate=0.5)
+    report = engine.run(load_scenario(scenario))
+    LOGGER.info(report.summary())
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, targets: Dict[str, dict], executor: Callable = generate_alert_executor,
+                 watcher: Any = None, max_rate: float = 1.0,
+                 concurrency: int = DEFAULT_CONCURRENCY, alert_timeout: float = ALERT_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param targets: Target name to host_details / enclosure_details of the alert API
+        :param executor: Injects a fault, executor(alert_type, target, details, parameters)
+        :param watcher: Started libs.ras.alert_watcher.AlertWatcher using the same clock
+        :param max_rate: Injections per second over all targets, None for no cap
+        :param concurrency: Targets and alert types injected at the same time
+        :param alert_timeout: Seconds to wait for the alert of an injected fault
+        :param clock: Time source, latencies are measured from the injection start
+        """
+        self.targets = targets
+        self.executor = executor
+        self.watcher = watcher
+        self.limiter = RateLimiter(max_rate, clock)
+        self.concurrency = concurrency
+        self.alert_timeout = alert_timeout
+        self.clock = clock
+
+    @staticmethod
+    def lanes(steps: List[AlertStep]) -> List[list]:
+        """
+        Injections grouped by (target, alert type), in scenario order within a group.
+        Each item is (step number, seq, action, alert type, expected strings).
+        """
+        lanes = OrderedDict()
+        for number, step in enumerate(steps):
+            resolved = RESOLVE_ALERTS.get(step.alert_type)
+            lane = lanes.setdefault((step.target, step.alert_type), [])
+            for seq in range(step.count):
+                if step.action in ("raise", "cycle"):
+                    lane.append((number, seq, "raise", step.alert_type, step.expect))
+                if step.action in ("resolve", "cycle"):
+                    lane.append((number, seq, "resolve", resolved, step.expect_resolved))
+        return list(lanes.values())
+
+    def _inject(self, step: AlertStep, item: tuple, step_limiter: RateLimiter) -> Injection:
+        number, seq, action, alert_type, expect = item
+        self.limiter.acquire()
+        step_limiter.acquire()
+        fired_at = self.clock()
+        try:
+            response = self.executor(alert_type, step.target, self.targets.get(step.target, {}),
+                                     step.input_parameters)
+            ok = bool(response[0]) if isinstance(response, tuple) else bool(response)
+        except Exception as error:  # pylint: disable=broad-except
+            response, ok = str(error), False
+        injection = Injection(number, seq, alert_type, step.target, action, ok, response,
+                              self.clock() - fired_at)
+        if not ok:
+            LOGGER.error("Injecting %s on %s failed: %s", alert_type, step.target, response)
+            return injection
+        if not expect or self.watcher is None:
+            return injection
+        match = self.watcher.claim(expect, self.alert_timeout, since=fired_at)
+        if match is None:
+            LOGGER.error("No alert %s within %s s of %s on %s", expect, self.alert_timeout,
+                         alert_type, step.target)
+            return injection._replace(alert="")
+        return injection._replace(latency=match.latency, alert=match.line)
+
+    def run(self, steps: List[AlertStep]) -> BulkReport:
+        """Inject all faults of the scenario and correlate them with observed alerts."""
+        unknown = {step.target for step in steps} - set(self.targets)
+        if unknown:
+            raise ValueError(f"Unknown targets {sorted(unknown)}")
+        limiters = [RateLimiter(step.rate, self.clock) for step in steps]
+
+        def run_lane(lane):
+            return [self._inject(steps[item[0]], item, limiters[item[0]]) for item in lane]
+
+        began = self.clock()
+        injections = [injection for lane_result in
+                      map_parallel(run_lane, self.lanes(steps), self.concurrency)
+                      for injection in lane_result]
+        report = BulkReport(injections, self.clock() - began)
+        LOGGER.info("Bulk alerts: %s", report.summary())
+        return report
@@ -110,3 +110,22 @@ FAN_ALERT_RESOLVED = {
         "unr"],
     "deassert": True
 }
+
+# Alert type resolving each fault alert type, used for bulk raise/resolve cycles
+RESOLVE_ALERTS = {
+    "CONTROLLER_FAULT": "CONTROLLER_FAULT_RESOLVED",
+    "CONTROLLER_A_FAULT": "CONTROLLER_A_FAULT_RESOLVED",
+    "CONTROLLER_B_FAULT": "CONTROLLER_B_FAULT_RESOLVED",
+    "PSU_FAULT": "PSU_FAULT_RESOLVED",
+    "DISK_DISABLE": "DISK_ENABLE",
+    "DISK_FAULT_ALERT": "DISK_FAULT_RESOLVED_ALERT",
+    "CPU_USAGE_ALERT": "CPU_USAGE_RESOLVED_ALERT",
+    "MEM_USAGE_ALERT": "MEM_USAGE_RESOLVED_ALERT",
+    "NW_PORT_FAULT": "NW_PORT_FAULT_RESOLVED",
+    "DG_FAULT": "DG_FAULT_RESOLVED",
+    "NW_CABLE_FAULT": "NW_CABLE_FAULT_RESOLVED",
+    "OS_DISK_DISABLE": "OS_DISK_ENABLE",
+    "SERVER_PSU_FAULT": "SERVER_PSU_FAULT_RESOLVED",
+    "BMC_CHANGE_FAULT": "BMC_CHANGE_FAULT_RESOLVE",
+    "RAID_INTEGRITY_FAULT": "RAID_INTEGRITY_RESOLVED",
+    "FAN_ALERT": "FAN_ALERT_RESOLVED"}
@@ -128,6 +128,8 @@ SIMULATE_FAULT_CTRL_CMD = "simulatefrufault -enclId {} -pos {} -fruIndex " \
 COPY_LOGS_BACKUP = "cat {} >> {}"
 EMPTY_FILE_CMD = "truncate -s 0 {}"
 EXTRACT_LOG_CMD = "cat {} | grep '{}' > '/root/extracted_alert.log'"
+# timeout secs, lines of existing content ("+1" for all), file
+TAIL_FOLLOW_CMD = "timeout {} tail -n {} -F {}"
 SEL_INFO_CMD = "ipmitool sel info"
 SEL_LIST_CMD = "ipmitool sel list"
 IEM_LOGGER_CMD = "logger -i -p local3.err {}"
@@ -582,6 +584,8 @@ KUBECTL_DESCRIBE_POD_CMD = "kubectl describe pod {}"
 KUBECTL_GET_STATEFULSET = "kubectl get sts | grep '{}'"
 KUBECTL_CREATE_STATEFULSET_REPLICA = "kubectl scale statefulset {} --replicas {}"
 KUBECTL_GET_POD_PORTS = "kubectl get pods {} -o jsonpath='{{.spec.containers[*].ports}}'"
+KUBECTL_GET_TOPOLOGY = "kubectl get pods,nodes,deploy,rs,sts -o json"
+KUBECTL_WATCH_PODS = "kubectl get pods --watch --output-watch-events -o json"
 
 # Fetch logs of a pod/service in a namespace.
 FETCH_LOGS = ""
@@ -663,3 +667,5 @@ PROC_CMD = "pid=$(echo $(pgrep m0d; pgrep radosgw; pgrep hax) | sed -z 's/ /,/g'
 
 # stat collection through kubectl top
 CMD_PGREP_TOP = 'pgrep "/bin/sh ./{} {}" -fx'
+CMD_START_TOP = "chmod +x {0} && (nohup ./{0} {1} > /dev/null 2>&1 & echo $!)"
+CMD_TAR_DIR = "tar -czf {} -C {} {}"
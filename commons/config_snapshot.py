@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Precompiled config snapshots.
+
+Building the config sections parses the yaml files, decrypts their passwords and reads
+setups.json. A snapshot stores the built sections, each pickled on its own, in a file
+named by a content hash of every input. Later processes (pytest workers, xdist nodes,
+multiprocessing children, runner processes) unpickle a section only when it is first used.
+Password fields are stored encrypted again and decrypted when a section is loaded, the
+files are written readable by the owner only.
+Usage:
+python -m commons.config_snapshot --target <target> --workers 32
+"""
+import argparse
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import pickle
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable
+from typing import Iterable
+
+from commons import pswdmanager
+
+LOG = logging.getLogger(__name__)
+
+VERSION = 2
+MAGIC = b"CFTCFG%d\n" % VERSION
+#: Set to 0 to always build config from the yaml files.
+ENABLE_ENV = "CONFIG_SNAPSHOT"
+DIR_ENV = "CONFIG_SNAPSHOT_DIR"
+SNAPSHOT_DIR = os.path.join(tempfile.gettempdir(), f"cft_config_snapshot_{os.getuid()}")
+#: Setup details read from the DB are not part of the hash, such snapshots expire.
+DB_TTL_SECS = 300
+#: Unused snapshots are removed when a new one is written.
+PRUNE_SECS = 7 * 24 * 3600
+
+
+def enabled() -> bool:
+    """False when disabled with CONFIG_SNAPSHOT=0."""
+    return os.environ.get(ENABLE_ENV, "1").lower() not in ("0", "false", "no")
+
+
+def snapshot_key(name: str, files: Iterable[str], extra: dict = None) -> str:
+    """
+    Content hash of the inputs of a snapshot.
+
+    :param name: Snapshot name, e.g. package building it
+    :param files: Input files, missing files are hashed as missing
+    :param extra: Other inputs, e.g. target and command line flags
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([VERSION, name, sys.version, extra or {}], sort_keys=True,
+                             default=str).encode())
+    for fpath in files:
+        digest.update(fpath.encode() + b"\0")
+        try:
+            with open(fpath, "rb") as fin:
+                digest.update(hashlib.sha256(fin.read()).digest())
+        except OSError:
+            digest.update(b"missing")
+    return digest.hexdigest()
+
+
+def secret_hash() -> str:
+    """Hash of the password decryption key, snapshots hold passwords decrypted with it."""
+    try:
+        key = pswdmanager.get_secrets(secret_ids=["KEY"])["KEY"]
+    except (OSError, KeyError, ValueError):
+        key = ""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _convert_passwords(value, convert: Callable[[str], str], key: str = "",
+                       memo: dict = None):
+    """
+    Copy of value with convert applied to the strings under password keys.
+
+    Objects shared inside value stay shared in the copy.
+    :param convert: pswdmanager.encrypt or pswdmanager.decrypt
+    """
+    memo = {} if memo is None else memo
+    if id(value) in memo:
+        return memo[id(value)]
+    if isinstance(value, dict):
+        result = memo[id(value)] = type(value)()
+        for name, item in value.items():
+            result[name] = _convert_passwords(item, convert, str(name).lower(), memo)
+        return result
+    if isinstance(value, list):
+        result = memo[id(value)] = []
+        result.extend(_convert_passwords(item, convert, key, memo) for item in value)
+        return result
+    if isinstance(value, str) and key in pswdmanager.PASSWORD_KEYS:
+        return convert(value)
+    return value
+
+
+class Snapshot:
+    """Sections of a snapshot file, unpickled on first use."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as fin:
+            blob = fin.read()
+        if not blob.startswith(MAGIC):
+            raise ValueError(f"Not a config snapshot: {path}")
+        start = len(MAGIC) + 4
+        size, = struct.unpack("<I", blob[len(MAGIC):start])
+        self.meta = pickle.loads(blob[start:start + size])
+        self.path = path
+        self._blob = memoryview(blob)[start + size:]
+        self._groups = {}
+
+    @property
+    def names(self) -> list:
+        """Section names."""
+        return list(self.meta["sections"])
+
+    def expired(self) -> bool:
+        expires = self.meta.get("expires")
+        return expires is not None and expires < time.time()
+
+    def section(self, name: str):
+        """Value of section name, sections built as one group share their objects."""
+        group = self.meta["sections"][name]
+        if group not in self._groups:
+            offset, size = self.meta["groups"][group]
+            self._groups[group] = _convert_passwords(
+                pickle.loads(self._blob[offset:offset + size]), pswdmanager.decrypt)
+        return self._groups[group][name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.meta["sections"]
+
+
+def write_snapshot(path: str, sections: dict, groups: Iterable[Iterable[str]] = (),
+                   meta: dict = None) -> None:
+    """
+    Write sections to path, atomically and readable by the owner only.
+
+    Password fields are written encrypted, see Snapshot.section.
+    :param groups: Names pickled together, keeping objects they share shared
+    """
+    grouped = {}
+    for group in groups:
+        group = tuple(name for name in group if name in sections)
+        for name in group:
+            grouped[name] = group[0]
+    index, offsets, blobs, offset = {}, {}, [], 0
+    for name in sections:
+        group = grouped.get(name, name)
+        index[name] = group
+        if group in offsets:
+            continue
+        blob = pickle.dumps(_convert_passwords({member: sections[member] for member in sections
+                                                if grouped.get(member, member) == group},
+                                               pswdmanager.encrypt),
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        offsets[group] = (offset, len(blob))
+        blobs.append(blob)
+        offset += len(blob)
+    header = pickle.dumps(dict(meta or {}, sections=index, groups=offsets),
+                          protocol=pickle.HIGHEST_PROTOCOL)
+    temp = f"{path}.{os.getpid()}.tmp"
+    fdesc = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fdesc, "wb") as fout:
+        fout.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for blob in blobs:
+            fout.write(blob)
+    os.replace(temp, path)
+
+
+def _snapshot_dir() -> str:
+    """Snapshot directory, which must only be writable by the current user."""
+    directory = os.environ.get(DIR_ENV, SNAPSHOT_DIR)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & 0o022:
+        raise OSError(f"{directory} is not private to user {os.getuid()}")
+    return directory
+
+
+def _prune(directory: str, keep: str) -> None:
+    """Remove unused snapshots and the ones of older versions."""
+    now = time.time()
+    for entry in os.scandir(directory):
+        if entry.path == keep or not entry.name.endswith(".snapshot"):
+            continue
+        try:
+            if now - entry.stat().st_atime <= PRUNE_SECS:
+                with open(entry.path, "rb") as fin:
+                    if fin.read(len(MAGIC)) == MAGIC:
+                        continue
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+# pylint: disable=too-many-arguments
+def load_or_compile(name: str, build: Callable[[], dict], files: Iterable[str],
+                    extra: dict = None, groups: Iterable[Iterable[str]] = (),
+                    ttl: float = None):
+    """
+    Snapshot of the sections returned by build, compiled when inputs changed.
+
+    Concurrent processes compile once: the first takes a file lock and the others load
+    its snapshot. Falls back to the sections of build when snapshots are disabled or
+    the snapshot directory is not usable.
+    :param name: Snapshot name
+    :param build: Function returning {section name: value}
+    :param files: Every file build reads
+    :param extra: Other inputs changing the result of build
+    :param groups: Sections to keep in one pickle, see write_snapshot
+    :param ttl: Seconds the snapshot stays valid, for inputs that cannot be hashed, or a
+        function returning them called after build
+    :return: Snapshot or dict of sections
+    """
+    if not enabled():
+        return build()
+    begin = time.perf_counter()
+    try:
+        directory = _snapshot_dir()
+    except OSError as error:
+        LOG.warning("Config snapshot directory not usable: %s", error)
+        return build()
+    path = os.path.join(directory, f"{name}-{snapshot_key(name, files, extra)[:32]}.snapshot")
+    snapshot = _load(path)
+    if snapshot is None:
+        with open(os.path.join(directory, f"{name}.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            snapshot = _load(path)
+            if snapshot is None:
+                return _compile(path, build, groups, ttl)
+    elapsed = time.perf_counter() - begin
+    compile_secs = snapshot.meta["compile_secs"]
+    LOG.debug("Config snapshot %s loaded in %.1f ms, building it took %.1f ms, saved %.1f ms",
+              path, elapsed * 1000, compile_secs * 1000, (compile_secs - elapsed) * 1000)
+    return snapshot
+
+
+def _load(path: str):
+    try:
+        snapshot = Snapshot(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError, struct.error) as error:
+        LOG.warning("Ignoring broken config snapshot %s: %s", path, error)
+        return None
+    return None if snapshot.expired() else snapshot
+
+
+def _compile(path: str, build: Callable[[], dict], groups, ttl):
+    begin = time.perf_counter()
+    sections = build()
+    compile_secs = time.perf_counter() - begin
+    if callable(ttl):
+        ttl = ttl()
+    try:
+        write_snapshot(path, sections, groups,
+                       {"created": time.time(), "compile_secs": compile_secs,
+                        "expires": time.time() + ttl if ttl else None})
+        _prune(os.path.dirname(path), path)
+    except (OSError, KeyError, ValueError) as error:
+        LOG.warning("Config snapshot %s not written: %s", path, error)
+        return sections
+    LOG.debug("Config snapshot %s compiled in %.1f ms", path, compile_secs * 1000)
+    return Snapshot(path)
+
+
+def install(module: str, sections, derived: dict = None) -> None:
+    """
+    Publish sections as attributes of module.
+
+    Sections of a Snapshot are unpickled on first attribute access through a module
+    __getattr__ (PEP 562), a dict of sections is published as it is.
+    :param module: Module name, e.g. __name__ of the config package
+    :param sections: Result of load_or_compile
+    :param derived: {name: (section name, function)} attributes computed from a section
+    """
+    namespace = sys.modules[module].__dict__
+    derived = derived or {}
+    if not isinstance(sections, Snapshot):
+        namespace.update(sections)
+        for name, (source, func) in derived.items():
+            namespace[name] = func(namespace[source])
+        return
+
+    def __getattr__(name):
+        if name in derived:
+            source, func = derived[name]
+            value = func(getattr(sys.modules[module], source))
+        elif name in sections:
+            value = sections.section(name)
+        else:
+            raise AttributeError(f"module {module!r} has no attribute {name!r}")
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(sections.names) | set(derived))
+
+    namespace["__getattr__"] = __getattr__
+    namespace["__dir__"] = __dir__
+
+
+def _import_secs(workers: int, env: dict, module: str) -> list:
+    """Wall time of workers parallel processes importing module."""
+    code = ("import time; begin = time.perf_counter(); import {0}; "
+            "print(time.perf_counter() - begin)").format(module)
+    procs = [subprocess.Popen([sys.executable, "-c", code], env=env, stdout=subprocess.PIPE,
+                              universal_newlines=True) for _ in range(workers)]
+    return [float(proc.communicate()[0].split()[-1]) for proc in procs]
+
+
+def main(argv=None) -> int:
+    """Compile the config snapshot and report the import time saved by workers."""
+    parser = argparse.ArgumentParser(description="Precompile config snapshot.")
+    parser.add_argument("--target", help="setup name, as passed to pytest/testrunner")
+    parser.add_argument("--workers", type=int, default=32,
+                        help="parallel worker imports to time, 0 to only compile")
+    parser.add_argument("--module", default="config.s3", help="config module to import")
+    args = parser.parse_args(argv)
+    env = dict(os.environ)
+    if args.target:
+        env["TARGET"] = args.target
+    env[ENABLE_ENV] = "1"
+    _import_secs(1, env, args.module)
+    if not args.workers:
+        return 0
+    result = {}
+    for mode, flag in (("yaml", "0"), ("snapshot", "1")):
+        env[ENABLE_ENV] = flag
+        secs = _import_secs(args.workers, env, args.module)
+        result[mode] = {"mean_ms": round(sum(secs) / len(secs) * 1000, 1),
+                        "max_ms": round(max(secs) * 1000, 1)}
+    result["saved_ms_per_worker"] = round(result["yaml"]["mean_ms"] -
+                                          result["snapshot"]["mean_ms"], 1)
+    result["saved_ms_total"] = round(result["saved_ms_per_worker"] * args.workers, 1)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
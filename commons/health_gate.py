@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Pre-test cluster health gate.
+
+Probes run on all nodes in parallel and a healthy verdict is reused for ttl seconds, so
+consecutive tests do not each pay a full round of SSH health checks. Test outcomes that
+may have hurt the cluster (failures, destructive tests) invalidate the verdict. Probe
+timings are kept in latency histograms to report health check overhead of a run.
+"""
+
+import logging
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+from commons.helpers.parallel_exec import DEFAULT_CONCURRENCY
+from commons.helpers.parallel_exec import map_parallel
+from commons.histogram import LatencyHistogram
+
+LOGGER = logging.getLogger(__name__)
+
+#: Seconds a healthy verdict is reused, 0 checks before every test.
+HEALTH_TTL = 300
+
+
+class Probe(NamedTuple):
+    """Check run on every node, func(node) returns (ok, detail)."""
+
+    name: str
+    func: Callable[[Any], tuple]
+    fatal: bool = True
+
+
+class ProbeResult(NamedTuple):
+    """Outcome of one probe on one node."""
+
+    node: str
+    probe: str
+    ok: bool
+    detail: Any
+    duration: float
+    fatal: bool = True
+    error: Optional[BaseException] = None
+
+
+class Verdict(NamedTuple):
+    """Cluster health decided from the probe results of all nodes."""
+
+    healthy: bool
+    reason: str
+    checked_at: float
+    results: List[ProbeResult]
+    cached: bool = False
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        """First exception raised by a fatal probe, the probe itself could not run."""
+        for result in self.results:
+            if result.fatal and result.error is not None:
+                return result.error
+        return None
+
+
+class HealthGate:
+    """
+    TTL cached health verdict of a cluster.
+    Usage:
+    gate = HealthGate(get_nodes, [Probe("node_health", lambda node: node.check_node_health())])
+    verdict = gate.check()
+    gate.invalidate("test failed")
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, nodes: Callable[[], list], probes: List[Probe], ttl: float = HEALTH_TTL,
+                 concurrency: int = DEFAULT_CONCURRENCY, cleanup: Callable[[Any], None] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param nodes: Function returning the node objects to probe
+        :param probes: Probes run one after the other on each node
+        :param ttl: Seconds a healthy verdict is reused
+        :param concurrency: Nodes probed at the same time
+        :param cleanup: Called with every node after probing, e.g. to disconnect
+        :param clock: Time source
+        """
+        self.nodes = nodes
+        self.probes = probes
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self.cleanup = cleanup
+        self.clock = clock
+        self.verdict = None
+        self.timings = {probe.name: LatencyHistogram() for probe in probes}
+        self.gate_timing = LatencyHistogram()
+        self.counters = {"checks": 0, "probe_rounds": 0, "cache_hits": 0, "invalidations": 0}
+        self.started = clock()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _name(node: Any) -> str:
+        return getattr(node, "hostname", None) or str(node)
+
+    def _probe_node(self, node: Any) -> List[ProbeResult]:
+        results = []
+        try:
+            for probe in self.probes:
+                begin = time.perf_counter()
+                try:
+                    ok, detail = probe.func(node)
+                    error = None
+                except Exception as fault:  # pylint: disable=broad-except
+                    ok, detail, error = False, str(fault), fault
+                duration = time.perf_counter() - begin
+                self.timings[probe.name].record(duration)
+                results.append(ProbeResult(self._name(node), probe.name, bool(ok), detail,
+                                           duration, probe.fatal, error))
+        finally:
+            if self.cleanup is not None:
+                self.cleanup(node)
+        return results
+
+    def _probe(self) -> Verdict:
+        nodes = self.nodes()
+        results = [result for node_results in
+                   map_parallel(self._probe_node, nodes, self.concurrency)
+                   for result in node_results]
+        reason = ""
+        for result in results:
+            if result.ok:
+                continue
+            if result.fatal:
+                reason = reason or f"{result.probe} failed on {result.node}: {result.detail}"
+            else:
+                LOGGER.warning("Health probe %s failed on %s: %s", result.probe, result.node,
+                               result.detail)
+        return Verdict(not reason, reason, self.clock(), results)
+
+    def check(self, force: bool = False) -> Verdict:
+        """
+        Health verdict of the cluster, probed when no fresh healthy verdict is cached.
+        :param force: Probe even when a fresh verdict is cached
+        """
+        begin = time.perf_counter()
+        with self._lock:
+            self.counters["checks"] += 1
+            verdict = self.verdict
+            if not force and verdict is not None and \
+                    self.clock() - verdict.checked_at < self.ttl:
+                self.counters["cache_hits"] += 1
+                verdict = verdict._replace(cached=True)
+            else:
+                self.counters["probe_rounds"] += 1
+                verdict = self._probe()
+                # Unhealthy verdicts are probed again on the next check
+                self.verdict = verdict if verdict.healthy else None
+        self.gate_timing.record(time.perf_counter() - begin)
+        return verdict
+
+    def invalidate(self, reason: str = "") -> None:
+        """Drop the cached verdict, the next check probes the cluster."""
+        with self._lock:
+            if self.verdict is not None:
+                LOGGER.debug("Health verdict invalidated: %s", reason)
+                self.counters["invalidations"] += 1
+            self.verdict = None
+
+    def summary(self) -> dict:
+        """Counters, time spent in checks and share of the time since the gate started."""
+        elapsed = self.clock() - self.started
+        spent = self.gate_timing.total
+        return dict(self.counters, ttl=self.ttl, gate_secs=round(spent, 3),
+                    share_of_run=round(spent / elapsed, 4) if elapsed > 0 else 0.0,
+                    probes={name: hist.summary() for name, hist in self.timings.items()
+                            if hist.count})
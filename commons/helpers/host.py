@@ -37,6 +37,7 @@ import pysftp
 from paramiko.ssh_exception import SSHException
 
 from commons import commands, const
+from commons.helpers.ssh_pool import SSHConnectionManager
 
 LOGGER = logging.getLogger(__name__)
 
@@ -52,6 +53,7 @@ class AbsHost:
         self.host_obj = None
         self.shell_obj = None
         self.pysftp_obj = None
+        self.shared_conn = False
 
     def connect(
             self,
@@ -61,6 +63,8 @@ class AbsHost:
             **kwargs) -> None:
         """
         Connect to remote host using hostname, username and password attribute.
+        Without shell the authenticated transport shared by all hosts objects of the
+        process for (hostname, username, port) is reused, see SSHConnectionManager.
         ref: http://docs.paramiko.org/en/stable/api/client.html#paramiko.client.SSHClient.connect
         :param shell: In case required shell invocation.
         :param timeout: timeout in seconds.
@@ -68,6 +72,12 @@ class AbsHost:
         :param kwargs: Optional keyword arguments for SSHClient.connect func call.
         """
         try:
+            if not shell:
+                self.host_obj = SSHConnectionManager.get_instance().get_client(
+                    self.hostname, self.username, self.password, timeout=timeout, **kwargs)
+                self.shared_conn = True
+                return
+            self.shared_conn = False
             self.host_obj = paramiko.SSHClient()
             self.host_obj.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             LOGGER.debug("Connecting to host: %s", str(self.hostname))
@@ -103,7 +113,7 @@ class AbsHost:
             LOGGER.error(
                 "Exception while connecting to server: Error: %s",
                 str(error))
-            if self.host_obj:
+            if self.host_obj and not self.shared_conn:
                 self.host_obj.close()
             if shell and self.shell_obj:
                 self.shell_obj.close()
@@ -132,9 +142,9 @@ class AbsHost:
 
     def disconnect(self) -> None:
         """
-        Disconnects the host obj.
+        Disconnects the host obj, a shared connection stays open for other users.
         """
-        if self.host_obj:
+        if self.host_obj and not self.shared_conn:
             self.host_obj.close()
         if self.shell_obj:
             self.shell_obj.close()
@@ -201,8 +211,24 @@ class Host(AbsHost):
         if 'exc' in kwargs.keys():
             kwargs.pop('exc')
         LOGGER.debug("Executing %s", cmd)
+        with SSHConnectionManager.get_instance().slot(self.hostname, self.username,
+                                                      kwargs.get('port', 22)):
+            return self._execute_cmd(cmd, inputs, read_lines, read_nbytes, timer, timeout,
+                                     check_recv_ready, exc, **kwargs)
+
+    # pylint: disable=too-many-arguments
+    def _execute_cmd(self, cmd, inputs, read_lines, read_nbytes, timer, timeout,
+                     check_recv_ready, exc, **kwargs):
+        """Run cmd on a new channel of the shared connection, see execute_cmd."""
         self.connect(**kwargs)  # fn will raise an exception
-        stdin, stdout, stderr = self.host_obj.exec_command(cmd, timeout=timeout)  # nosec
+        try:
+            stdin, stdout, stderr = self.host_obj.exec_command(cmd, timeout=timeout)  # nosec
+        except (SSHException, EOFError, socket.error) as error:
+            LOGGER.debug("Channel open failed on %s: %s, reconnecting", self.hostname, error)
+            SSHConnectionManager.get_instance().invalidate(self.hostname, self.username,
+                                                           kwargs.get('port', 22))
+            self.connect(**kwargs)
+            stdin, stdout, stderr = self.host_obj.exec_command(cmd, timeout=timeout)  # nosec
         # above is non blocking call and timeout is set for SSL handshake and command
         if check_recv_ready:
             while time.time() - timer < timeout and not stdout.channel.exit_status_ready():
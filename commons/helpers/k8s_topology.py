@@ -0,0 +1,261 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+"""In memory Kubernetes topology of a cluster taken from one kubectl json snapshot.
+
+Pods, nodes, deployments, replica sets and stateful sets are fetched with a single
+`kubectl get ... -o json` and all pod lookups of LogicalNode are answered from it until
+the snapshot expires or is invalidated by an operation changing the topology. In watch
+mode a `kubectl get pods --watch` stream keeps pods current, so polling loops waiting for
+pods to come back see changes as they happen.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+log = logging.getLogger(__name__)
+
+TTL_ENV = "K8S_TOPOLOGY_TTL"
+WATCH_ENV = "K8S_TOPOLOGY_WATCH"
+TOPOLOGY_TTL = float(os.environ.get(TTL_ENV, 30))
+# A watch ending sooner than this is not restarted, lookups fall back to ttl refresh
+WATCH_MIN_SECS = 10
+
+
+def iter_json_stream(chunks: Iterable[bytes]) -> Iterator[dict]:
+    """Decode a stream of concatenated, possibly pretty printed json documents."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk.decode("utf8") if isinstance(chunk, bytes) else chunk
+        while True:
+            buffer = buffer.lstrip()
+            if not buffer:
+                break
+            try:
+                doc, end = decoder.raw_decode(buffer)
+            except ValueError:
+                break
+            buffer = buffer[end:]
+            yield doc
+
+
+class TopologySnapshot:
+    """Indexed view of a `kubectl get pods,nodes,deploy,rs,sts -o json` list."""
+
+    def __init__(self, doc: dict, taken_at: float) -> None:
+        self.taken_at = taken_at
+        self.pods = {}
+        self.nodes = {}
+        self.deployments = {}
+        self.sets = {}
+        for item in doc.get("items", []):
+            kind, name = item.get("kind"), item["metadata"]["name"]
+            if kind == "Pod":
+                self.pods[name] = item
+            elif kind == "Node":
+                self.nodes[name] = item
+            elif kind == "Deployment":
+                self.deployments[name] = item
+            elif kind in ("ReplicaSet", "StatefulSet"):
+                self.sets[(kind, name)] = item
+
+    def apply(self, event: dict) -> None:
+        """Apply a pod watch event."""
+        pod = event.get("object") or {}
+        if pod.get("kind", "Pod") != "Pod" or "metadata" not in pod:
+            return
+        name = pod["metadata"]["name"]
+        if event.get("type") == "DELETED":
+            self.pods.pop(name, None)
+        elif event.get("type") in ("ADDED", "MODIFIED"):
+            self.pods[name] = pod
+
+    def pod_names(self, pod_prefix: str = None) -> List[str]:
+        """Names of pods containing pod_prefix, in kubectl (name) order."""
+        return sorted(name for name in self.pods if pod_prefix is None or pod_prefix in name)
+
+    def pod(self, pod_name: str) -> dict:
+        """Pod object, KeyError when the pod does not exist."""
+        try:
+            return self.pods[pod_name]
+        except KeyError:
+            raise KeyError(f"pod {pod_name} not found") from None
+
+    def containers(self, pod_name: str) -> List[str]:
+        """Container names of a pod."""
+        return [cnt["name"] for cnt in self.pod(pod_name)["spec"].get("containers", [])]
+
+    def pod_ip(self, pod_name: str) -> Optional[str]:
+        """IP of a pod, None before it is assigned."""
+        return self.pod(pod_name).get("status", {}).get("podIP")
+
+    def pod_node(self, pod_name: str) -> Optional[str]:
+        """Node the pod is scheduled on."""
+        return self.pod(pod_name)["spec"].get("nodeName")
+
+    def pod_hostname(self, pod_name: str) -> Optional[str]:
+        """Hostname seen inside the pod, None when it uses the host network."""
+        spec = self.pod(pod_name)["spec"]
+        if spec.get("hostNetwork"):
+            return None
+        return spec.get("hostname") or pod_name[:63]
+
+    def pod_uid(self, pod_name: str) -> str:
+        """Uid of a pod, a replaced pod with the same name gets a new one."""
+        return self.pod(pod_name)["metadata"].get("uid", pod_name)
+
+    def owner(self, pod_name: str) -> Tuple[Optional[str], Optional[str]]:
+        """(kind, name) of the controller of a pod, e.g. ("ReplicaSet", "cortx-data-x-5f")."""
+        for ref in self.pod(pod_name)["metadata"].get("ownerReferences", []):
+            if ref.get("controller", True):
+                return ref.get("kind"), ref.get("name")
+        return None, None
+
+    def deployment_names(self, pod_prefix: str = None) -> List[str]:
+        """Deployment names containing pod_prefix."""
+        return sorted(name for name in self.deployments
+                      if pod_prefix is None or pod_prefix in name)
+
+    def recent_pod(self, deployment_name: str = None) -> Optional[str]:
+        """Most recently created pod, of pods labeled app=deployment_name if given."""
+        pods = [pod for pod in self.pods.values() if deployment_name is None or
+                pod["metadata"].get("labels", {}).get("app") == deployment_name]
+        if not pods:
+            return None
+        return max(pods, key=lambda pod: pod["metadata"].get("creationTimestamp", ""))[
+            "metadata"]["name"]
+
+    def container_ports(self, pod_name: str, port_name: str) -> Optional[int]:
+        """Container port named port_name of a pod, last one wins like kubectl jsonpath."""
+        port = None
+        for cnt in self.pod(pod_name)["spec"].get("containers", []):
+            for entry in cnt.get("ports", []):
+                if entry.get("name") == port_name:
+                    port = entry["containerPort"]
+        return port
+
+
+class K8sTopology:
+    """
+    Snapshot of a cluster refreshed after ttl seconds or on invalidate.
+    Usage:
+    topology = K8sTopology(lambda: json.loads(node.execute_cmd(commands.KUBECTL_GET_TOPOLOGY)))
+    topology.snapshot().pod_names("cortx-data")
+    topology.invalidate("pod deleted")
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, fetch: Callable[[], dict], ttl: float = TOPOLOGY_TTL,
+                 watch: Callable[[], Iterable[bytes]] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param fetch: Returns the parsed kubectl json list
+        :param ttl: Seconds a snapshot is used, 0 fetches on every lookup
+        :param watch: Returns the byte chunks of a pod watch stream, enables watch mode
+        :param clock: Time source
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.watch = watch
+        self.clock = clock
+        self.counters = dict(fetches=0, hits=0, invalidations=0, events=0)
+        self._snapshot = None
+        self._memo = {}
+        self._lock = threading.RLock()
+        self._watcher = None
+        self._watching = False
+
+    def _fresh(self) -> bool:
+        if self._snapshot is None:
+            return False
+        if self._watching:
+            return True
+        return self.clock() - self._snapshot.taken_at < self.ttl
+
+    def snapshot(self) -> TopologySnapshot:
+        """Current snapshot, fetched when expired or invalidated."""
+        with self._lock:
+            if self._fresh():
+                self.counters["hits"] += 1
+                return self._snapshot
+            self.counters["fetches"] += 1
+            self._snapshot = TopologySnapshot(self.fetch(), self.clock())
+            if self.watch is not None and self._watcher is None:
+                self._start_watch()
+            return self._snapshot
+
+    def invalidate(self, reason: str = "") -> None:
+        """Drop the snapshot, the next lookup fetches a new one."""
+        with self._lock:
+            if self._snapshot is not None:
+                log.debug("Topology invalidated: %s", reason)
+                self.counters["invalidations"] += 1
+            self._snapshot = None
+
+    def memo(self, pod_name: str, key: str, func: Callable[[], object]) -> object:
+        """
+        Value of func for a pod computed once per pod instance, e.g. its machine id.
+        :param pod_name: Pod the value belongs to
+        :param key: Name of the value
+        :param func: Computes the value
+        """
+        memo_key = (self.snapshot().pod_uid(pod_name), key)
+        with self._lock:
+            if memo_key in self._memo:
+                return self._memo[memo_key]
+        value = func()
+        with self._lock:
+            self._memo[memo_key] = value
+        return value
+
+    def _start_watch(self) -> None:
+        self._watching = True
+        self._watcher = threading.Thread(target=self._run_watch, name="k8s-topology-watch",
+                                         daemon=True)
+        self._watcher.start()
+
+    def _run_watch(self) -> None:
+        """Apply pod events until the stream ends, then fall back to ttl refresh."""
+        started = self.clock()
+        try:
+            for event in iter_json_stream(self.watch()):
+                with self._lock:
+                    if self._snapshot is not None:
+                        self._snapshot.apply(event)
+                    self.counters["events"] += 1
+        except Exception as error:  # pylint: disable=broad-except
+            log.warning("Pod watch stopped: %s", error)
+        finally:
+            with self._lock:
+                if self.clock() - started < WATCH_MIN_SECS:
+                    log.warning("Pod watch ended after start, using ttl refresh")
+                    self.watch = None
+                self._watching = False
+                self._watcher = None
+                # Events may have been missed, take a new snapshot on the next lookup
+                self._snapshot = None
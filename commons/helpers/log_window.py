@@ -0,0 +1,363 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+"""Extract the lines of a time window from large, time ordered log files.
+
+The first and last line of the window are found by binary search on byte offsets of a
+seekable file (local or SFTP), so only a few blocks are read before the matching byte range
+is streamed to the destination. Timestamps seen while searching are kept in a sparse offset
+index per file, later windows of the same file start from narrower bounds. Gzip rotated
+files can not be searched this way: they are streamed until the end of the window and
+whole rotated files outside the window are skipped using the first timestamp of each.
+"""
+
+import gzip
+import logging
+import re
+import time
+from bisect import bisect_left
+from bisect import bisect_right
+from datetime import datetime
+from datetime import timedelta
+from typing import BinaryIO
+from typing import Hashable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from core.object_cache import BoundedCache
+
+log = logging.getLogger(__name__)
+
+BLOCK = 64 * 1024
+COPY_CHUNK = 1024 * 1024
+GZIP_MAGIC = b"\x1f\x8b"
+# Offsets learned per file, beyond that searches still work but add no new points
+INDEX_POINTS = 4096
+INDEX_CACHE = BoundedCache(256)
+
+_MONTHS = {name: num for num, name in enumerate(
+    (b"Jan", b"Feb", b"Mar", b"Apr", b"May", b"Jun",
+     b"Jul", b"Aug", b"Sep", b"Oct", b"Nov", b"Dec"), start=1)}
+_PREFIX = rb"^\[?\s*"
+# "2022-03-04 10:11:12,123", "2022-03-04T10:11:12.123456+00:00"
+_ISO = re.compile(
+    _PREFIX + rb"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:[.,](\d{1,6}))?")
+# "2022/03/04 10:11:12"
+_SLASH = re.compile(
+    _PREFIX + rb"(\d{4})/(\d{2})/(\d{2})[ -](\d{2}):(\d{2}):(\d{2})(?:[.,](\d{1,6}))?")
+# "Mar  4 10:11:12", syslog has no year
+_SYSLOG = re.compile(_PREFIX + rb"([A-Z][a-z]{2}) +(\d{1,2}) (\d{2}):(\d{2}):(\d{2})")
+
+
+class LogTimeParser:
+    """
+    Timestamp at the start of a log line, iso, slash or syslog format.
+    The format found first is tried first on later lines. Syslog timestamps get the year
+    that does not put them more than a day after the reference time, so a window across
+    new year compares correctly. Time zones are ignored, times are compared as written.
+    """
+
+    def __init__(self, reference: datetime = None) -> None:
+        """:param reference: Time near the end of the log, default now."""
+        self.reference = reference or datetime.now()
+        self.formats = [(_ISO, self._full), (_SLASH, self._full), (_SYSLOG, self._syslog)]
+
+    @staticmethod
+    def _full(match) -> datetime:
+        year, month, day, hour, minute, second, fraction = match.groups()
+        micro = int(fraction.ljust(6, b"0")) if fraction else 0
+        return datetime(int(year), int(month), int(day), int(hour), int(minute),
+                        int(second), micro)
+
+    def _syslog(self, match) -> Optional[datetime]:
+        month = _MONTHS.get(match.group(1))
+        if month is None:
+            return None
+        day, hour, minute, second = (int(value) for value in match.groups()[1:])
+        year = self.reference.year
+        for candidate in (year, year - 1, year - 4):
+            try:
+                stamp = datetime(candidate, month, day, hour, minute, second)
+            except ValueError:
+                # Feb 29 of a year that is not a leap year
+                continue
+            if stamp <= self.reference + timedelta(days=1):
+                return stamp
+        return None
+
+    def parse(self, line: bytes) -> Optional[datetime]:
+        """Timestamp of a line, None for lines without one, e.g. stack traces."""
+        for index, (pattern, build) in enumerate(self.formats):
+            match = pattern.match(line)
+            if match is None:
+                continue
+            try:
+                stamp = build(match)
+            except ValueError:
+                stamp = None
+            if stamp is not None and index:
+                self.formats.insert(0, self.formats.pop(index))
+            return stamp
+        return None
+
+
+def parse_time(value: Union[str, datetime], reference: datetime = None) -> datetime:
+    """Window boundary given as datetime or in one of the log timestamp formats."""
+    if isinstance(value, datetime):
+        return value
+    stamp = LogTimeParser(reference).parse(value.strip().encode())
+    if stamp is None:
+        raise ValueError(f"Unsupported timestamp format: {value}")
+    return stamp
+
+
+class SparseIndex:
+    """Sorted (offset, timestamp) points of a file, learned during searches."""
+
+    def __init__(self, size: int, head: bytes) -> None:
+        self.size = size
+        self.head = head
+        self.offsets = []
+        self.times = []
+
+    def valid_for(self, size: int, head: bytes) -> bool:
+        """Same file, possibly appended to, i.e. not rotated or truncated."""
+        return size >= self.size and head == self.head
+
+    def add(self, offset: int, stamp: datetime) -> None:
+        """Remember the timestamp of the line starting at offset."""
+        pos = bisect_left(self.offsets, offset)
+        if pos < len(self.offsets) and self.offsets[pos] == offset:
+            return
+        if len(self.offsets) >= INDEX_POINTS:
+            return
+        self.offsets.insert(pos, offset)
+        self.times.insert(pos, stamp)
+
+    def bounds(self, target: datetime, strict: bool, size: int) -> Tuple[int, int]:
+        """Known offsets around the first line at target, after it if strict."""
+        pos = (bisect_right if strict else bisect_left)(self.times, target)
+        low = self.offsets[pos - 1] if pos else 0
+        high = self.offsets[pos] if pos < len(self.offsets) else size
+        return low, high
+
+
+def get_index(key: Hashable, fileobj: BinaryIO, size: int) -> SparseIndex:
+    """Cached index of the file known as key, a new one when the file was replaced."""
+    fileobj.seek(0)
+    head = fileobj.read(256)
+    index = INDEX_CACHE.get(key)
+    if index is None or not index.valid_for(size, head):
+        index = SparseIndex(size, head)
+    index.size = size
+    INDEX_CACHE.store(key, index)
+    return index
+
+
+def iter_records(fileobj: BinaryIO, pos: int,
+                 parser: LogTimeParser) -> Iterator[Tuple[int, datetime]]:
+    """(offset, timestamp) of the timestamped lines starting at or after pos."""
+    # Start one byte early, a line starting exactly at pos is not skipped as partial
+    base = max(pos - 1, 0)
+    fileobj.seek(base)
+    buffer = b""
+    skip = pos > 0
+    while True:
+        chunk = fileobj.read(BLOCK)
+        data = buffer + chunk
+        start = 0
+        if skip:
+            newline = data.find(b"\n")
+            if newline < 0:
+                if not chunk:
+                    return
+                base += len(data)
+                buffer = b""
+                continue
+            start = newline + 1
+            skip = False
+        while True:
+            newline = data.find(b"\n", start)
+            if newline < 0:
+                break
+            stamp = parser.parse(data[start:newline])
+            if stamp is not None:
+                yield base + start, stamp
+            start = newline + 1
+        if not chunk:
+            if start < len(data):
+                stamp = parser.parse(data[start:])
+                if stamp is not None:
+                    yield base + start, stamp
+            return
+        base += start
+        buffer = data[start:]
+
+
+# pylint: disable=too-many-arguments
+def find_offset(fileobj: BinaryIO, size: int, target: datetime, parser: LogTimeParser,
+                index: SparseIndex = None, strict: bool = False, stats: dict = None) -> int:
+    """
+    Offset of the first line with a timestamp at or after target, after it if strict.
+    Lines without timestamp belong to the line before them. Returns size if there is none.
+    """
+    def before(stamp):
+        return stamp <= target if strict else stamp < target
+
+    low, high = index.bounds(target, strict, size) if index else (0, size)
+    while high - low > BLOCK:
+        mid = (low + high) // 2
+        record = next(iter_records(fileobj, mid, parser), None)
+        if stats is not None:
+            stats["probes"] += 1
+        if record is None:
+            high = mid
+            continue
+        if index is not None:
+            index.add(*record)
+        if before(record[1]):
+            low = record[0]
+        else:
+            # No timestamped line starts between mid and the record
+            high = mid
+    for offset, stamp in iter_records(fileobj, low, parser):
+        if not before(stamp):
+            return offset
+    return size
+
+
+def is_gzip(fileobj: BinaryIO) -> bool:
+    """True for gzip compressed files."""
+    fileobj.seek(0)
+    magic = fileobj.read(2)
+    fileobj.seek(0)
+    return magic == GZIP_MAGIC
+
+
+def first_timestamp(fileobj: BinaryIO, parser: LogTimeParser) -> Optional[datetime]:
+    """Timestamp of the first timestamped line of a plain or gzip file."""
+    stream = gzip.GzipFile(fileobj=fileobj) if is_gzip(fileobj) else fileobj
+    for _, stamp in iter_records(stream, 0, parser):
+        return stamp
+    return None
+
+
+def _copy_range(fileobj: BinaryIO, begin: int, end: int, out: BinaryIO) -> int:
+    fileobj.seek(begin)
+    if hasattr(fileobj, "prefetch") and end > begin:
+        # paramiko SFTPFile, read the range with parallel requests
+        fileobj.prefetch(end)
+    left = end - begin
+    while left > 0:
+        chunk = fileobj.read(min(COPY_CHUNK, left))
+        if not chunk:
+            break
+        out.write(chunk)
+        left -= len(chunk)
+    return end - begin - left
+
+
+def _copy_gzip_window(fileobj: BinaryIO, start: datetime, end: datetime,
+                      out: BinaryIO, parser: LogTimeParser) -> int:
+    written = 0
+    inside = False
+    with gzip.GzipFile(fileobj=fileobj) as stream:
+        for line in stream:
+            stamp = parser.parse(line)
+            if stamp is not None:
+                if stamp > end:
+                    break
+                inside = stamp >= start
+            if inside:
+                out.write(line)
+                written += len(line)
+    return written
+
+
+# pylint: disable=too-many-arguments
+def extract_window(fileobj: BinaryIO, start: Union[str, datetime], end: Union[str, datetime],
+                   out: BinaryIO, key: Hashable = None,
+                   parser: LogTimeParser = None) -> dict:
+    """
+    Write the lines of fileobj timestamped from start to end, both included, to out.
+    :param fileobj: Seekable binary file, e.g. open() or SFTPClient.open()
+    :param out: Writable binary file
+    :param key: Identity of the file, e.g. (host, path), to reuse its offset index
+    :param parser: Timestamp parser, a new one by default
+    :return: Bytes written, binary search probes and seconds taken
+    """
+    began = time.perf_counter()
+    parser = parser or LogTimeParser()
+    start, end = parse_time(start, parser.reference), parse_time(end, parser.reference)
+    stats = dict(bytes=0, probes=0, gzip=is_gzip(fileobj))
+    if stats["gzip"]:
+        stats["bytes"] = _copy_gzip_window(fileobj, start, end, out, parser)
+    elif start <= end:
+        fileobj.seek(0, 2)
+        size = fileobj.tell()
+        index = get_index(key, fileobj, size) if key is not None else None
+        begin = find_offset(fileobj, size, start, parser, index, stats=stats)
+        stop = find_offset(fileobj, size, end, parser, index, strict=True, stats=stats)
+        stats["bytes"] = _copy_range(fileobj, begin, max(begin, stop), out)
+    stats["secs"] = round(time.perf_counter() - began, 3)
+    return stats
+
+
+def rotation_order(base: str, names: Iterable[str]) -> List[str]:
+    """
+    Log file base and its rotated files among names, newest first, e.g.
+    ["motr.log", "motr.log.1", "motr.log.2.gz"] or ["messages", "messages-20220304.gz"].
+    """
+    found = []
+    for name in names:
+        if name == base:
+            found.append(((0, 0), name))
+            continue
+        if not name.startswith((base + ".", base + "-")):
+            continue
+        suffix = name[len(base) + 1:]
+        if suffix.endswith(".gz"):
+            suffix = suffix[:-3]
+        digits = re.sub(r"\D", "", suffix)
+        if not digits or len(digits) != len(suffix.replace("-", "").replace("_", "")):
+            continue
+        # logrotate numbers grow with age, dateext suffixes shrink
+        found.append(((1, int(digits)) if len(digits) < 8 else (2, -int(digits)), name))
+    return [name for _, name in sorted(found)]
+
+
+def select_rotated(firsts: List[Tuple[str, Optional[datetime]]],
+                   start: datetime, end: datetime) -> List[str]:
+    """
+    Files that may hold lines of the window, oldest first.
+    :param firsts: (name, first timestamp) of rotated files, newest first
+    """
+    selected = []
+    newer_first = None
+    for name, first in firsts:
+        if first is None:
+            continue
+        # A file holds the lines from its first timestamp until the next newer file starts
+        if first <= end and (newer_first is None or newer_first >= start):
+            selected.append(name)
+        newer_first = first
+    return selected[::-1]
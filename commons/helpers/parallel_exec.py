@@ -0,0 +1,174 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Parallel fan-out of remote commands over the pooled SSH connections.
+
+A cluster wide check takes as long as the slowest node instead of the sum of all nodes.
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_EXCEPTION
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+from commons.helpers.ssh_pool import SSHConnectionManager
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 16
+
+
+class NodeResult(NamedTuple):
+    """Outcome of one command on one node."""
+
+    hostname: str
+    cmd: str
+    exit_status: Optional[int]
+    stdout: bytes
+    stderr: bytes
+    duration: float
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """Command completed with exit status 0."""
+        return self.error is None and self.exit_status == 0
+
+
+def _node_credentials(node: Any) -> tuple:
+    """(hostname, username, password, port) of a Host object or CMN_CFG style dict."""
+    if isinstance(node, dict):
+        return node["hostname"], node["username"], node["password"], node.get("port", 22)
+    return node.hostname, node.username, node.password, getattr(node, "port", 22)
+
+
+def _shutdown(executor: ThreadPoolExecutor, futures: list, expired: bool = False) -> None:
+    """
+    Cancel queued tasks and wait for the running ones.
+
+    Once the deadline expired running tasks are abandoned instead, their threads finish
+    in the background and their results are dropped. Commands of run_on_nodes are
+    bounded by a channel timeout ending with the deadline, so they do not linger.
+    """
+    for future in futures:
+        future.cancel()
+    executor.shutdown(wait=not expired)
+
+
+def map_parallel(func: Callable, items: Iterable, concurrency: int = DEFAULT_CONCURRENCY,
+                 deadline: float = None) -> list:
+    """
+    Return [func(item) for item in items] computed by up to concurrency threads.
+
+    :param deadline: seconds to wait for all results, TimeoutError when exceeded and
+        calls still running are abandoned.
+    :raises: first exception raised by func, after the calls already running returned.
+    """
+    items = list(items)
+    if not items:
+        return []
+    executor = ThreadPoolExecutor(max_workers=min(concurrency, len(items)))
+    futures = []
+    expired = False
+    try:
+        futures.extend(executor.submit(func, item) for item in items)
+        done, pending = wait(futures, timeout=deadline, return_when=FIRST_EXCEPTION)
+        for future in done:
+            if future.exception() is not None:
+                raise future.exception()
+        if pending:
+            expired = True
+            raise TimeoutError(f"{len(pending)} of {len(items)} tasks not completed "
+                               f"within {deadline} seconds")
+        return [future.result() for future in futures]
+    finally:
+        _shutdown(executor, futures, expired)
+
+
+# pylint: disable=too-many-locals
+def run_on_nodes(nodes: Iterable, cmd: Union[str, List[str], dict],
+                 concurrency: int = DEFAULT_CONCURRENCY, deadline: float = None,
+                 timeout: float = None, read_nbytes: int = -1) -> List[NodeResult]:
+    """
+    Run commands on nodes in parallel over the shared SSH connections.
+
+    :param nodes: Host objects or dicts with hostname, username and password.
+    :param cmd: command for every node, list of commands each node runs, or dict of
+        hostname to a command or list of commands for that node.
+    :param concurrency: maximum commands in flight across all nodes.
+    :param deadline: seconds for the whole call, commands still running get a
+        TimeoutError result and are abandoned.
+    :param timeout: channel timeout of a single command.
+    :return: NodeResult per (node, command) in node and command order, never raises for
+        a failed command.
+    """
+    tasks = []
+    for node in nodes:
+        creds = _node_credentials(node)
+        cmds = cmd.get(creds[0], []) if isinstance(cmd, dict) else cmd
+        for command in [cmds] if isinstance(cmds, str) else cmds:
+            tasks.append((creds, command))
+    if not tasks:
+        return []
+    manager = SSHConnectionManager.get_instance()
+    end = time.monotonic() + deadline if deadline is not None else None
+
+    def run(task):
+        (hostname, username, password, port), command = task
+        start = time.perf_counter()
+        chan_timeout = timeout
+        if end is not None:
+            remaining = max(end - time.monotonic(), 0.001)
+            chan_timeout = min(timeout, remaining) if timeout else remaining
+        try:
+            status, out, err, duration = manager.run(hostname, username, password, command,
+                                                     timeout=chan_timeout,
+                                                     read_nbytes=read_nbytes, port=port)
+            return NodeResult(hostname, command, status, out, err, duration)
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.debug("%s failed on %s: %s", command, hostname, error)
+            return NodeResult(hostname, command, None, b"", b"",
+                              time.perf_counter() - start, error)
+
+    executor = ThreadPoolExecutor(max_workers=min(concurrency, len(tasks)))
+    futures = []
+    expired = False
+    try:
+        futures.extend(executor.submit(run, task) for task in tasks)
+        expired = bool(wait(futures, timeout=deadline).not_done)
+        results = []
+        for future, ((hostname, _, _, _), command) in zip(futures, tasks):
+            if future.done() and not future.cancelled():
+                results.append(future.result())
+            else:
+                results.append(NodeResult(hostname, command, None, b"", b"", deadline,
+                                          TimeoutError(f"not completed in {deadline}s")))
+        failed = [result.hostname for result in results if not result.ok]
+        if failed:
+            LOGGER.debug("Commands failed on %s", failed)
+        return results
+    finally:
+        _shutdown(executor, futures, expired)
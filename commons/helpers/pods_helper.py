@@ -24,6 +24,8 @@ like send_k8s_cmd.
 import logging
 import os
 import random
+import re
+import threading
 import time
 from typing import Tuple
 import json
@@ -31,10 +33,22 @@ import json
 from commons import commands
 from commons import constants as const
 from commons.helpers.host import Host
+from commons.helpers.k8s_topology import K8sTopology
+from commons.helpers.k8s_topology import WATCH_ENV
+from commons.helpers.parallel_exec import run_on_nodes
+from commons.helpers.ssh_pool import SSHConnectionManager
 
 log = logging.getLogger(__name__)
 
 namespace_map = {}
+# hostname -> K8sTopology shared by all LogicalNode objects of a master node
+topology_map = {}
+topology_lock = threading.Lock()
+# Commands after which the cached topology is stale
+TOPOLOGY_CHANGING_CMD = re.compile(
+    r"\bkubectl\s+(delete|scale|apply|create|patch|replace|rollout|drain|cordon|uncordon|"
+    r"taint|label|set)\b|\bhelm\s+(install|uninstall|upgrade|rollback|delete)\b|"
+    r"cortx-cloud\.sh|^\s*(shutdown|reboot)\b")
 
 
 class LogicalNode(Host):
@@ -45,6 +59,41 @@ class LogicalNode(Host):
     kube_commands = ('create', 'apply', 'config', 'get', 'explain',
                      'autoscale', 'patch', 'scale', 'exec')
 
+    def topology(self) -> K8sTopology:
+        """Topology cache of the cluster, shared by all LogicalNode objects of this host.
+        Set K8S_TOPOLOGY_WATCH=1 to keep pods current from a kubectl watch stream."""
+        with topology_lock:
+            topology = topology_map.get(self.hostname)
+            if topology is None:
+                watch = self._watch_pods if os.environ.get(WATCH_ENV) == "1" else None
+                topology = K8sTopology(self._fetch_topology, watch=watch)
+                topology_map[self.hostname] = topology
+            return topology
+
+    def invalidate_topology(self, reason: str = "") -> None:
+        """Make the next pod lookup take a new topology snapshot."""
+        topology = topology_map.get(self.hostname)
+        if topology is not None:
+            topology.invalidate(reason)
+
+    def _fetch_topology(self) -> dict:
+        return json.loads(self.execute_cmd(cmd=commands.KUBECTL_GET_TOPOLOGY))
+
+    def _watch_pods(self):
+        """Byte chunks of a pod watch stream, the first events list all pods."""
+        _, stdout, _ = SSHConnectionManager.get_instance().exec_command(
+            self.hostname, self.username, self.password, commands.KUBECTL_WATCH_PODS)
+        return iter(lambda: stdout.channel.recv(65536), b"")
+
+    def execute_cmd(self, cmd: str, *args, **kwargs):
+        """Execute cmd on the node, see Host.execute_cmd. Commands changing pods,
+        deployments or nodes invalidate the topology cache."""
+        try:
+            return super().execute_cmd(cmd, *args, **kwargs)
+        finally:
+            if TOPOLOGY_CHANGING_CMD.search(cmd):
+                self.invalidate_topology(cmd)
+
     def get_service_logs(self, svc_name: str, namespace: str, options: '') -> Tuple:
         """Get logs of a pod or service."""
         cmd = commands.FETCH_LOGS.format(svc_name, namespace, options)
@@ -89,11 +138,9 @@ class LogicalNode(Host):
 
     def get_pod_name(self, pod_prefix: str = const.POD_NAME_PREFIX):
         """Function to get pod name with given prefix."""
-        output = self.execute_cmd(commands.CMD_POD_STATUS +
-                                  " -o=custom-columns=NAME:.metadata.name", read_lines=True)
-        for lines in output:
-            if pod_prefix in lines:
-                return True, lines.strip()
+        pods = self.topology().snapshot().pod_names(pod_prefix)
+        if pods:
+            return True, pods[0]
         return False, f"pod with prefix \"{pod_prefix}\" not found"
 
     def send_sync_command(self, pod_prefix):
@@ -105,12 +152,16 @@ class LogicalNode(Host):
         log.info("Run sync command on all containers of pods %s", pod_prefix)
         pod_dict = self.get_all_pods_containers(pod_prefix=pod_prefix)
         if pod_dict:
-            for pod, containers in pod_dict.items():
-                for cnt in containers:
-                    res = self.send_k8s_cmd(
-                        operation="exec", pod=pod, namespace=const.NAMESPACE,
-                        command_suffix=f"-c {cnt} -- sync", decode=True)
-                    log.info("Response for pod %s container %s: %s", pod, cnt, res)
+            targets = [(pod, cnt) for pod, containers in pod_dict.items()
+                       for cnt in containers]
+            cmds = [commands.KUBECTL_CMD.format("exec", pod, const.NAMESPACE,
+                                                f"-c {cnt} -- sync") for pod, cnt in targets]
+            results = run_on_nodes([self], cmds)
+            for (pod, cnt), result in zip(targets, results):
+                if not result.ok:
+                    raise IOError(result.error or result.stderr.decode("utf8").strip())
+                log.info("Response for pod %s container %s: %s", pod, cnt,
+                         result.stdout.decode("utf8").strip())
 
         return True
 
@@ -121,22 +172,11 @@ class LogicalNode(Host):
         :param pod_list: List of pods
         :return: Dict
         """
-        pod_containers = {}
+        snapshot = self.topology().snapshot()
         if not pod_list:
             log.info("Get all data pod names of %s", pod_prefix)
-            output = self.execute_cmd(commands.CMD_POD_STATUS +
-                                      " -o=custom-columns=NAME:.metadata.name", read_lines=True)
-            for lines in output:
-                if pod_prefix in lines:
-                    pod_list.append(lines.strip())
-
-        for pod in pod_list:
-            cmd = commands.KUBECTL_GET_POD_CONTAINERS.format(pod)
-            output = self.execute_cmd(cmd=cmd, read_lines=True)
-            output = output[0].split()
-            pod_containers[pod] = output
-
-        return pod_containers
+            pod_list = snapshot.pod_names(pod_prefix)
+        return {pod: snapshot.containers(pod) for pod in pod_list}
 
     def create_pod_replicas(self, num_replica, deploy=None, pod_name=None, set_name=None):
         """
@@ -399,15 +439,8 @@ class LogicalNode(Host):
         :param: pod_prefix: Prefix to define the pod category
         :return: dict
         """
-        pod_dict = {}
-        output = self.execute_cmd(cmd=commands.KUBECTL_GET_POD_IPS, read_lines=True)
-        for lines in output:
-            if pod_prefix in lines:
-                data = lines.strip()
-                pod_name = data.split()[0]
-                pod_ip = data.split()[1].replace("\n", "")
-                pod_dict[pod_name.strip()] = pod_ip.strip()
-        return pod_dict
+        snapshot = self.topology().snapshot()
+        return {pod: snapshot.pod_ip(pod) or "<none>" for pod in snapshot.pod_names(pod_prefix)}
 
     def get_container_of_pod(self, pod_name, container_prefix):
         """
@@ -416,15 +449,8 @@ class LogicalNode(Host):
         :param: container_prefix: Prefix to define container category
         :return: list
         """
-        cmd = commands.KUBECTL_GET_POD_CONTAINERS.format(pod_name)
-        output = self.execute_cmd(cmd=cmd, read_lines=True)
-        output = output[0].split()
-        container_list = []
-        for each in output:
-            if container_prefix in each:
-                container_list.append(each)
-
-        return container_list
+        return [each for each in self.topology().snapshot().containers(pod_name)
+                if container_prefix in each]
 
     def get_recent_pod_name(self, deployment_name=None):
         """
@@ -434,15 +460,9 @@ class LogicalNode(Host):
         """
         if deployment_name:
             log.info("Getting recently created pod by deployment %s", deployment_name)
-            cmd = commands.KUBECTL_GET_RECENT_POD_DEPLOY.format(deployment_name)
-            output = self.execute_cmd(cmd=cmd, read_lines=True)
-            pod_name = output[0].strip()
         else:
             log.info("Getting recently created pod in cluster")
-            cmd = commands.KUBECTL_GET_RECENT_POD
-            output = self.execute_cmd(cmd=cmd, read_lines=True)
-            pod_name = output[0].strip()
-        return pod_name
+        return self.topology().snapshot().recent_pod(deployment_name)
 
     def get_all_pods(self, pod_prefix=None) -> list:
         """
@@ -450,16 +470,7 @@ class LogicalNode(Host):
         :param: pod_prefix: Prefix to define the pod category
         :return: list
         """
-        pods_list = []
-        log.debug("Executing : %s", commands.KUBECTL_GET_POD_NAMES)
-        output = self.execute_cmd(cmd=commands.KUBECTL_GET_POD_NAMES, read_lines=True)
-        pods = [line.strip().replace("\n", "") for line in output]
-        if pod_prefix is not None:
-            for each in pods:
-                if pod_prefix in each:
-                    pods_list.append(each)
-        else:
-            pods_list = pods
+        pods_list = self.topology().snapshot().pod_names(pod_prefix)
         log.debug("Pods list : %s", pods_list)
         return pods_list
 
@@ -487,10 +498,10 @@ class LogicalNode(Host):
         Getting machine id for given pod
         """
         log.info("Getting machine id for pod: %s", pod_name)
-        resp = self.send_k8s_cmd(operation="exec", pod=pod_name, namespace=const.NAMESPACE,
-                                 command_suffix="cat /etc/machine-id",
-                                 decode=True)
-        return resp
+        return self.topology().memo(
+            pod_name, "machine-id",
+            lambda: self.send_k8s_cmd(operation="exec", pod=pod_name, namespace=const.NAMESPACE,
+                                      command_suffix="cat /etc/machine-id", decode=True))
 
     def get_pods_node_fqdn(self, pod_prefix):
         """
@@ -498,15 +509,9 @@ class LogicalNode(Host):
         :param: pod_prefix: Prefix to define the pod category
         :return: dict
         """
-        pod_dict = {}
-        output = self.execute_cmd(cmd=commands.K8S_GET_CUSTOM_MGNT, read_lines=True)
-        for line in output:
-            if pod_prefix in line:
-                data = line.strip()
-                pod_name = data.split()[0]
-                node_fqdn = data.split()[1]
-                pod_dict[pod_name.strip()] = node_fqdn.strip()
-        return pod_dict
+        snapshot = self.topology().snapshot()
+        return {pod: snapshot.pod_node(pod) or "<none>"
+                for pod in snapshot.pod_names(pod_prefix)}
 
     def get_pod_hostname(self, pod_name):
         """
@@ -515,9 +520,11 @@ class LogicalNode(Host):
         :return: str
         """
         log.info("Getting pod hostname for pod %s", pod_name)
-        cmd = commands.KUBECTL_GET_POD_HOSTNAME.format(pod_name)
-        output = self.execute_cmd(cmd=cmd, read_lines=True)
-        hostname = output[0].strip()
+        hostname = self.topology().snapshot().pod_hostname(pod_name)
+        if hostname is None:
+            cmd = commands.KUBECTL_GET_POD_HOSTNAME.format(pod_name)
+            output = self.execute_cmd(cmd=cmd, read_lines=True)
+            hostname = output[0].strip()
         return hostname
 
     def kill_process_in_container(self, pod_name, container_name, process_name):
@@ -560,14 +567,7 @@ class LogicalNode(Host):
         :param pod_prefix: Pod prefix(optional)
         return: list
         """
-        resp_node = self.execute_cmd(cmd=commands.KUBECTL_GET_DEPLOYMENT, read_lines=True,
-                                     exc=False)
-
-        resp = [each.split()[0] for each in resp_node]
-        deploy_list = resp
-        if pod_prefix is not None:
-            deploy_list = [each for each in resp if pod_prefix in each]
-        return deploy_list
+        return self.topology().snapshot().deployment_names(pod_prefix)
 
     def apply_k8s_deployment(self, file_path: str):
         """
@@ -615,10 +615,7 @@ class LogicalNode(Host):
         :param pod_name: Name of the pod
         :return: str, str
         """
-        cmd = commands.KUBECTL_DESCRIBE_POD_CMD.format(pod_name)
-        output = self.execute_cmd(cmd=cmd, read_lines=True)
-        output = ([s for s in output if "Controlled By:" in s][0]).strip()
-        set_type, set_name = ((output.split(":")[-1]).strip()).split("/")
+        set_type, set_name = self.topology().snapshot().owner(pod_name)
         log.debug("Set type is: %s\n Set name is: %s\n", set_type, set_name)
         return set_type, set_name
 
@@ -647,16 +644,10 @@ class LogicalNode(Host):
         :param port_name: Name of the port
         :return: dict
         """
+        snapshot = self.topology().snapshot()
         pod_ip_dict = dict()
         for pod in pod_list:
-            cmd = commands.KUBECTL_GET_POD_PORTS.format(pod)
-            output = self.execute_cmd(cmd=cmd, read_lines=True)
-            log.info("Response: %s", output)
-            output = output[0].split()
-            for out in output:
-                json_obj = json.loads(out)
-                for j_obj in json_obj:
-                    if j_obj["name"] == port_name:
-                        pod_ip_dict[pod] = j_obj["containerPort"]
-
+            port = snapshot.container_ports(pod, port_name)
+            if port is not None:
+                pod_ip_dict[pod] = port
         return pod_ip_dict
@@ -19,15 +19,22 @@
 
 """ This helper file is used to collect logs from Nodes for the given time stamps """
 
+import logging
+import os
 from datetime import datetime
+
 from commons.helpers import host
+from commons.helpers import log_window
 from commons.utils import config_utils
 
+LOGGER = logging.getLogger(__name__)
+
 fileconf_yaml = config_utils.read_yaml("config/serverlogs_helper.yaml")
 fileconf = fileconf_yaml[1]
 
-now = datetime.now()
-current_time = now.strftime('%b  %#d %H:%M:%S')
+# hostname -> (Host, SFTPClient), one session per node and log server for all files
+SFTP_SESSIONS = {}
+
 
 class node_data:
     def __init__(self):
@@ -35,42 +42,46 @@ class node_data:
         self.uname = "root"
         self.passwd = "seagate"
 
+
 def get_node_details(node_name):
-    node_obj = node_data
+    node_obj = node_data()
     node_obj.ip = fileconf["node_ip_dict"][node_name]
     node_obj.uname = fileconf['node_username']
     node_obj.passwd = fileconf['node_password']
     return node_obj
 
-def split_file_for_timestamp(st_time, end_time, filename, filepath, test_id):
-    # split file for give time stamps and create new file with test_id
-    # appended to it
-    path = "{}/{}".format(filepath, filename)
-    logfile = open(path, 'r')
 
-    newname = "{}_{}".format(test_id, filename)
-    newpath = "{}/{}".format(fileconf['log_destination'], newname)
-    newfile = open(newpath, 'w')
+def get_sftp(hostname, username, password):
+    """SFTP session to hostname, opened once and reused until its channel closes."""
+    session = SFTP_SESSIONS.get(hostname)
+    if session is not None and not session[1].get_channel().closed:
+        return session[1]
+    hostobj = host.Host(hostname=hostname, username=username, password=password)
+    hostobj.connect()
+    sftp = hostobj.host_obj.open_sftp()
+    SFTP_SESSIONS[hostname] = (hostobj, sftp)
+    return sftp
 
-    # timestamp format ('%b %#d %H:%M:%S') -> "Dec 12 16:06:01"
-    st_t = st_time.split()
-    en_t = end_time.split()
-    start_time = "{} {} {}".format(st_t[0], st_t[1], st_t[2])
-    end_time = "{} {} {}".format(en_t[0], en_t[1], en_t[2])
 
-    for line in logfile:
-        ls = line.split(' ')
-        # PLEASE CHECK TIMESTAMP IN LOG FILES FIRST, For every file it might be
-        # different
-        timestamp = "{} {} {}".format(ls[0], ls[1], ls[2])
-        if timestamp >= start_time and timestamp <= end_time:
-            newfile.write(line)
+def close_sessions():
+    """Close all SFTP sessions opened by get_sftp."""
+    while SFTP_SESSIONS:
+        _, (_, sftp) = SFTP_SESSIONS.popitem()
+        sftp.close()
 
-    newfile.close()  # close it if done writing into it
-    logfile.close()
 
+def split_file_for_timestamp(st_time, end_time, filename, filepath, test_id):
+    # Extract given time stamps window of a local file into a new file with test_id
+    # appended to it
+    path = "{}/{}".format(filepath, filename)
+    newname = "{}_{}".format(test_id, filename)
+    newpath = "{}/{}".format(fileconf['log_destination'], newname)
+    with open(path, 'rb') as logfile, open(newpath, 'wb') as newfile:
+        log_window.extract_window(logfile, st_time, end_time, newfile,
+                                  key=os.path.abspath(path))
     return newpath
 
+
 def process_and_copy_file(
         st_time,
         end_time,
@@ -78,96 +89,78 @@ def process_and_copy_file(
         file_path,
         localpath,
         test_id,
-        sftp):
-    # Copy file from node to test client
-    nodepath = "{}/{}".format(file_path, file_name)
-    dest_path = "{}/{}".format(fileconf['log_destination'], file_name)
-    # @TODO - check sftp.get(), this call might be wrong
-    sftp.get(remotepath=nodepath, localpath=dest_path)
-
-    # 1. Fetch give file from node and Split file for given time stamp
-    newfilepath = split_file_for_timestamp(
-        st_time,
-        end_time,
-        file_name,
-        fileconf['log_destination'],
-        test_id)
-
-    # 2. Copy file from node to remote server <<< @TODO need new connection
-    # here !! MISSING !!!
-    logserver = fileconf['logserver']
-    lg_uname = fileconf['logserver_username']
-    lg_passwd = fileconf['logserver_password']
-    remote_path = fileconf['logserver_path']
+        sftp,
+        node=None):
+    # Stream the time window of file_name and its rotated files from the node to the
+    # log server, only the matching byte ranges are transferred
+    parser = log_window.LogTimeParser()
+    start = log_window.parse_time(st_time, parser.reference)
+    end = log_window.parse_time(end_time, parser.reference)
+    firsts = []
+    for name in log_window.rotation_order(file_name, sftp.listdir(file_path)):
+        with sftp.open("{}/{}".format(file_path, name), 'rb') as logfile:
+            firsts.append((name, log_window.first_timestamp(logfile, parser)))
+    selected = log_window.select_rotated(firsts, start, end)
+
     filename = "{}_{}".format(test_id, file_name)
-    rm_path = "{}/{}".format(remote_path, filename)
+    if fileconf.get('logserver'):
+        dest_sftp = get_sftp(fileconf['logserver'], fileconf['logserver_username'],
+                             fileconf['logserver_password'])
+        rm_path = "{}/{}".format(fileconf['logserver_path'], filename)
+        dest = dest_sftp.open(rm_path, 'wb')
+        dest.set_pipelined(True)
+    else:
+        rm_path = "{}/{}".format(localpath, filename)
+        os.makedirs(localpath, exist_ok=True)
+        dest = open(rm_path, 'wb')
+    with dest:
+        for name in selected:
+            nodepath = "{}/{}".format(file_path, name)
+            with sftp.open(nodepath, 'rb') as logfile:
+                stats = log_window.extract_window(logfile, start, end, dest,
+                                                  key=(node, nodepath), parser=parser)
+            LOGGER.info("Copied %s of %s to %s: %s", name, node, rm_path, stats)
+    return rm_path
 
-    hostobj = host.Host(
-        hostname=logserver,
-        username=lg_uname,
-        password=lg_passwd)
-    hostobj.connect()
-    sftp = hostobj.host_obj.open_sftp()
-    sftp.put(localpath=newfilepath, remotepath=rm_path)
 
 def collect_logs(st_time, end_time, file, node, test_id):
     # error = False #@ TODO - error handling to be done, connection retry
-    # 1. Connect to node
+    # 1. Connect to node, the session is reused for all files
     node_det = get_node_details(node)
-    hostobj = host.Host(
-        hostname=node_det.ip,
-        username=node_det.uname,
-        password=node_det.passwd)
-    hostobj.connect()
-    sftp = hostobj.host_obj.open_sftp()
+    sftp = get_sftp(node_det.ip, node_det.uname, node_det.passwd)
     localpath = "{}_{}".format(fileconf['log_destination'], test_id)
 
-    if file is "all":
-        for fname in fileconf['file_list']:
-            file_name = "{}{}".format(file, fileconf['file_exention'])
-            file_path = fileconf['file_path_dict'][fname]
-            process_and_copy_file(
-                st_time,
-                end_time,
-                file_name,
-                file_path,
-                localpath,
-                test_id,
-                sftp)
-    else:
-        file_name = "{}{}".format(file, fileconf['file_exention'])
-        file_path = fileconf['file_path_dict'][file]
-        process_and_copy_file(
+    file_list = fileconf['file_list'] if file == "all" else [file]
+    paths = []
+    for fname in file_list:
+        file_name = "{}{}".format(fname, fileconf['file_exention'])
+        file_path = fileconf['file_path_dict'][fname]
+        paths.append(process_and_copy_file(
             st_time,
             end_time,
             file_name,
             file_path,
             localpath,
             test_id,
-            sftp)
-
-    # Close connection once all file transfers are done
-    sftp.close
+            sftp,
+            node=node))
+    return paths
 
-    # @TODO Error handling
 
 def collect_logs_fromserver(
         st_time,
         test_suffix,
-        end_time=current_time,
+        end_time=None,
         file_type='all',
         node='all'):
-    # Collect logs for all nodes
-
-    if node is 'all':
-        for node_name in fileconf['node_list']:
-            response = collect_logs(
-                st_time, end_time, file_type, node, test_suffix)
-    # collect from one node only
-    else:
-        response = collect_logs(
-            st_time,
-            end_time,
-            file_type,
-            node,
-            test_suffix)
+    # Collect logs for all nodes, until now if no end time is given
+    end_time = end_time or datetime.now()
+    nodes = fileconf['node_list'] if node == 'all' else [node]
+    response = []
+    try:
+        for node_name in nodes:
+            response.extend(collect_logs(
+                st_time, end_time, file_type, node_name, test_suffix))
+    finally:
+        close_sessions()
+    return response
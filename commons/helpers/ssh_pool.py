@@ -0,0 +1,220 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Process wide pool of authenticated SSH transports.
+
+One paramiko SSHClient is kept per (hostname, username, port) and every command opens a
+new channel on its transport, so key exchange and authentication happen once per host
+instead of once per command. Dead transports are reconnected on next use, idle ones get
+keepalive packets and the number of concurrent channels per host is capped below the
+sshd MaxSessions default. The pool is re-created after fork.
+"""
+
+import os
+import socket
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Tuple
+
+import paramiko
+from paramiko.ssh_exception import SSHException
+
+from commons.histogram import LatencyHistogram
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_CHANNELS = 8
+KEEPALIVE_SECS = 30
+CONNECT_TIMEOUT = 400
+CONNECT_RETRIES = 3
+
+
+class SSHConnectionManager:
+    """Thread safe cache of SSH clients keyed by (hostname, username, port).
+    Usage:
+    manager = SSHConnectionManager.get_instance()
+    with manager.channel(hostname, username, password) as client:
+        _, stdout, _ = client.exec_command("hostname")
+    status, out, err, duration = manager.run(hostname, username, password, "hostname")
+    print(manager.stats())
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_channels: int = MAX_CHANNELS,
+                 keepalive: int = KEEPALIVE_SECS) -> None:
+        self.max_channels = max_channels
+        self.keepalive = keepalive
+        self.pid = os.getpid()
+        self.entries = dict()
+        self.lock = threading.Lock()
+        self.counters = dict(hits=0, connects=0, reconnects=0, failures=0, commands=0)
+        self.connect_time = LatencyHistogram()
+        self.exec_time = LatencyHistogram()
+
+    @classmethod
+    def get_instance(cls, **kwargs) -> 'SSHConnectionManager':
+        """Return manager of the calling process, creating it on first use or after fork."""
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance.pid != os.getpid():
+                cls._instance = cls(**kwargs)
+            return cls._instance
+
+    @staticmethod
+    def _alive(client: paramiko.SSHClient) -> bool:
+        transport = client.get_transport() if client else None
+        return transport is not None and transport.is_active()
+
+    def _entry(self, hostname: str, username: str, port: int) -> dict:
+        key = (hostname, username, port)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = dict(client=None, password=None, connections=0, lock=threading.Lock(),
+                             slots=threading.BoundedSemaphore(self.max_channels))
+                self.entries[key] = entry
+            return entry
+
+    def _connect(self, hostname: str, username: str, password: str, port: int,
+                 timeout: int, **kwargs) -> paramiko.SSHClient:
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        kwargs.setdefault('allow_agent', False)
+        kwargs.setdefault('look_for_keys', False)
+        start = time.perf_counter()
+        for attempt in range(1, CONNECT_RETRIES + 1):
+            try:
+                client.connect(hostname=hostname, username=username, password=password,
+                               port=port, timeout=timeout, **kwargs)
+                break
+            except SSHException as error:
+                LOGGER.exception("Exception in connecting %s", error)
+                if attempt == CONNECT_RETRIES:
+                    client.close()
+                    raise
+                LOGGER.debug("Retrying to connect the host")
+        if self.keepalive:
+            client.get_transport().set_keepalive(self.keepalive)
+        self.connect_time.record(time.perf_counter() - start)
+        return client
+
+    def get_client(self, hostname: str, username: str, password: str, port: int = 22,
+                   timeout: int = CONNECT_TIMEOUT, **kwargs) -> paramiko.SSHClient:
+        """Return the shared client of a host, (re)connecting when its transport is down.
+        Callers must not close it, see invalidate()."""
+        entry = self._entry(hostname, username, port)
+        with entry['lock']:
+            client = entry['client']
+            if self._alive(client) and entry['password'] == password:
+                with self.lock:
+                    self.counters['hits'] += 1
+                return client
+            if client is not None:
+                client.close()
+            try:
+                client = self._connect(hostname, username, password, port, timeout, **kwargs)
+            except (SSHException, socket.error, EOFError):
+                with self.lock:
+                    self.counters['failures'] += 1
+                raise
+            with self.lock:
+                self.counters['reconnects' if entry['connections'] else 'connects'] += 1
+            entry['connections'] += 1
+            entry['client'] = client
+            entry['password'] = password
+            LOGGER.debug("SSH connection established to %s@%s", username, hostname)
+            return client
+
+    def invalidate(self, hostname: str, username: str, port: int = 22) -> None:
+        """Close the cached connection of a host, next use reconnects."""
+        entry = self._entry(hostname, username, port)
+        with entry['lock']:
+            if entry['client'] is not None:
+                entry['client'].close()
+                entry['client'] = None
+
+    @contextmanager
+    def slot(self, hostname: str, username: str, port: int = 22):
+        """Hold one of max_channels channel slots of the host, the block is timed as
+        one command."""
+        entry = self._entry(hostname, username, port)
+        with entry['slots']:
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.exec_time.record(time.perf_counter() - start)
+                with self.lock:
+                    self.counters['commands'] += 1
+
+    @contextmanager
+    def channel(self, hostname: str, username: str, password: str, port: int = 22,
+                **kwargs):
+        """Client with a channel slot of the host held for the block."""
+        with self.slot(hostname, username, port):
+            yield self.get_client(hostname, username, password, port, **kwargs)
+
+    # pylint: disable=too-many-arguments
+    def exec_command(self, hostname: str, username: str, password: str, cmd: str,
+                     timeout: int = None, port: int = 22,
+                     connect_timeout: int = CONNECT_TIMEOUT, **kwargs):
+        """exec_command on the shared transport, reconnecting once if it went away.
+        Returns (stdin, stdout, stderr) like paramiko."""
+        client = self.get_client(hostname, username, password, port, connect_timeout,
+                                 **kwargs)
+        try:
+            return client.exec_command(cmd, timeout=timeout)  # nosec
+        except (SSHException, EOFError, socket.error) as error:
+            LOGGER.debug("Channel open failed on %s: %s, reconnecting", hostname, error)
+            self.invalidate(hostname, username, port)
+            client = self.get_client(hostname, username, password, port, connect_timeout,
+                                     **kwargs)
+            return client.exec_command(cmd, timeout=timeout)  # nosec
+
+    def run(self, hostname: str, username: str, password: str, cmd: str,
+            timeout: int = None, read_nbytes: int = -1,
+            **kwargs) -> Tuple[int, bytes, bytes, float]:
+        """Run cmd to completion and return (exit status, stdout, stderr, seconds)."""
+        port = kwargs.pop('port', 22)
+        start = time.perf_counter()
+        with self.slot(hostname, username, port):
+            _, stdout, stderr = self.exec_command(hostname, username, password, cmd,
+                                                  timeout=timeout, port=port, **kwargs)
+            output = stdout.read(read_nbytes)
+            error = stderr.read()
+            exit_status = stdout.channel.recv_exit_status()
+        return exit_status, output, error, time.perf_counter() - start
+
+    def stats(self) -> dict:
+        """Counters with connect and command latency summaries in seconds."""
+        with self.lock:
+            counters = dict(self.counters, hosts=len(self.entries))
+        return dict(counters, connect=self.connect_time.summary(),
+                    exec=self.exec_time.summary())
+
+    def close_all(self) -> None:
+        """Close every cached connection."""
+        with self.lock:
+            entries = list(self.entries.values())
+            self.entries.clear()
+        for entry in entries:
+            if entry['client'] is not None:
+                entry['client'].close()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Fixed memory, log bucketed latency histogram in the spirit of HdrHistogram."""
+import math
+import threading
+from typing import Iterable
+
+#: Sub buckets per power of two, 16 gives ~4.4% worst case relative error.
+SUB_BUCKETS = 16
+#: Smallest tracked value in seconds, anything lower lands in bucket zero.
+RESOLUTION = 1e-6
+
+
+class LatencyHistogram:
+    """Thread safe latency histogram with log2 buckets split in linear sub buckets.
+    Usage:
+    hist = LatencyHistogram()
+    hist.record(0.0123)
+    hist.percentile(99)
+    hist.summary()
+    """
+
+    def __init__(self, sub_buckets: int = SUB_BUCKETS, resolution: float = RESOLUTION) -> None:
+        self.sub_buckets = sub_buckets
+        self.resolution = resolution
+        self.counts = dict()
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.lock = threading.Lock()
+
+    def _index(self, value: float) -> int:
+        units = value / self.resolution
+        if units < 1:
+            return 0
+        exp = int(math.log2(units))
+        sub = int((units / (1 << exp) - 1) * self.sub_buckets)
+        return 1 + exp * self.sub_buckets + min(sub, self.sub_buckets - 1)
+
+    def _value(self, index: int) -> float:
+        """Upper edge of bucket index in seconds."""
+        if index == 0:
+            return self.resolution
+        exp, sub = divmod(index - 1, self.sub_buckets)
+        return (1 << exp) * (1 + (sub + 1) / self.sub_buckets) * self.resolution
+
+    def record(self, value: float, count: int = 1) -> None:
+        """Record value (seconds) count times."""
+        index = self._index(value)
+        with self.lock:
+            self.counts[index] = self.counts.get(index, 0) + count
+            self.count += count
+            self.total += value * count
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """Add counts of other histogram with the same layout into this one."""
+        with other.lock:
+            counts = dict(other.counts)
+            count, total, vmin, vmax = other.count, other.total, other.min, other.max
+        with self.lock:
+            for index, value in counts.items():
+                self.counts[index] = self.counts.get(index, 0) + value
+            self.count += count
+            self.total += total
+            if vmin is not None:
+                self.min = vmin if self.min is None else min(self.min, vmin)
+                self.max = vmax if self.max is None else max(self.max, vmax)
+        return self
+
+    def percentile(self, pct: float) -> float:
+        """Value at percentile pct (0-100), clamped to the observed max."""
+        with self.lock:
+            if not self.count:
+                return 0.0
+            target = max(math.ceil(self.count * pct / 100.0), 1)
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= target:
+                    return min(self._value(index), self.max)
+            return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self, percentiles: Iterable[float] = (50, 90, 99, 99.9)) -> dict:
+        """Count, min, mean, max and requested percentiles in seconds."""
+        result = dict(count=self.count, min=self.min or 0.0, mean=self.mean(),
+                      max=self.max or 0.0)
+        for pct in percentiles:
+            result[f'p{pct:g}'] = self.percentile(pct)
+        return result
@@ -67,6 +67,9 @@ JIRA_TEST_META_JSON = 'test_meta_data.json'
 JIRA_TEST_COLLECTION = 'test_collection.csv'
 JIRA_SELECTED_TESTS = 'selected_test_lists.csv'
 JIRA_DIST_TEST_LIST = 'dist_test_lists.csv'
+# Created by the runner when its target lease is lost, pytest stops before the next test.
+LEASE_LOST_FILE = 'lease_lost'
+LEASE_LOST_ENV = 'LEASE_LOST_FILE'
 
 # Kafka Config Params
 # Schema Registry (http(s)://host[:port]
@@ -108,6 +111,7 @@ NGREENLETS = 32
 NUSERS = 10
 DATAGEN_HOME = '/var/log/datagen/'
 META_DATA_HOME = os.path.join(LOG_DIR, 'meta_data')
+META_DATA_STORE = os.path.join(META_DATA_HOME, 'objects.db')
 S3_ENDPOINT = "https://s3.seagate.com"
 DATASET_FILES = "/var/log/datagen/createdfile.txt"
 USER_JSON = '_usersdata'
@@ -130,6 +134,10 @@ DT_PATTERN_PREFIX = '%Y%m%d-%H%M%S'
 PROV_SKIP_TEST_FILES_HEALTH_CHECK_PREFIX = ['test_prov', 'test_failure_domain',
                                             'test_multiple_config_deploy', 'test_cont_deployment',
                                             "test_di_deployment", 'test_namespace_deployment']
+# Tests with these markers invalidate the cached cluster health verdict
+HEALTH_DESTRUCTIVE_MARKERS = ['destructive', 'ha', 'comp_ha', 'dtm', 'data_durability',
+                              'cluster_management_ops', 'cluster_deployment', 'cortx_upgrade',
+                              's3_faulttolerance', 'hw_alert']
 
 # Ceph s3-tests Runner Params
 S3TESTS_DIR = "s3-tests"
@@ -27,6 +27,24 @@ from Crypto.Cipher import AES
 from Crypto.Hash import SHA256
 from Crypto import Random as CryptoRandom
 
+#: Config keys holding encrypted passwords
+PASSWORD_KEYS = (
+    "password",
+    'new_password',
+    'current_password',
+    'list_of_passwords',
+    'list_special_invalid_char',
+    'special_char_pwd',
+    'list_special_char_pwd',
+    'invalid_password',
+    'user_password', 'account_password',
+    'root_pwd', 'new_pwd',
+    'test_s3account_password',
+    'test_csmuser_password',
+    's3_acc_passwd',
+    'passwd'
+)
+
 
 def encrypt(secret: str) -> str:
     """
@@ -68,27 +86,11 @@ def decrypt_all_passwd(data: dict) -> dict:
     :param data: dictionary of configuration which contains encrypted passwords
     :return [type]: return the decrypted passwords
     """
-    decrypt_list = [
-        "password",
-        'new_password',
-        'current_password',
-        'list_of_passwords',
-        'list_special_invalid_char',
-        'special_char_pwd',
-        'list_special_char_pwd',
-        'invalid_password',
-        'user_password', 'account_password',
-        'root_pwd', 'new_pwd',
-        'test_s3account_password',
-        'test_csmuser_password',
-        's3_acc_passwd',
-        'passwd'
-    ]
     for key, value in data.items():
         if isinstance(value, dict):
             decrypt_all_passwd(value)
         else:
-            if key.lower() in decrypt_list:
+            if key.lower() in PASSWORD_KEYS:
                 if isinstance(value, list):
                     new_val = []
                     for element in value:
@@ -18,13 +18,14 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 """ Report Server client to update test results to Mongo DB"""
+import os
 import threading
 import requests
 from commons import errorcodes
 from commons.exceptions import CTException
 from commons.utils import web_utils
 
-REPORT_SRV = "http://cftic2.pun.seagate.com:5000/"  # todo discover report server
+REPORT_SRV = os.environ.get("REPORT_SRV", "http://cftic2.pun.seagate.com:5000/")
 REPORT_SRV_CREATE = REPORT_SRV + "reportsdb/create"
 REPORT_SRV_UPDATE = REPORT_SRV + "reportsdb/update"
 
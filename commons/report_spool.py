@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Durable background spool for Jira and reports DB updates of pytest hooks.
+
+Hooks enqueue updates into a SQLite file and return; a worker thread delivers them in
+batches. Updates with the same (kind, key) are coalesced by merging their payloads, so a
+test moving from Executing to PASS before delivery costs one Jira request. Failed batches
+are retried with exponential backoff, updates that can never succeed are kept as dead
+rows for inspection. Undelivered updates survive a crash and are sent by the next session
+using the same spool file.
+"""
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter
+from collections import defaultdict
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+
+from commons.histogram import LatencyHistogram
+
+LOGGER = logging.getLogger(__name__)
+
+JIRA_STATUS = "jira_status"
+JIRA_COMMENT = "jira_comment"
+REPORT_DB = "report_db"
+
+BATCH_SIZE = 50
+FLUSH_INTERVAL = 2.0
+FLUSH_TIMEOUT = 120.0
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+BUSY_TIMEOUT_MS = 30 * 1000
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_try REAL NOT NULL DEFAULT 0,
+    dead INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (kind, key)
+)
+"""
+
+
+class PermanentError(Exception):
+    """Update rejected by the endpoint, retrying will not help."""
+
+
+class PartialDelivery(Exception):
+    """Only the payloads of a batch at indexes failed were not sent, fault is the cause."""
+
+    def __init__(self, failed: Iterable[int], fault: Exception) -> None:
+        super().__init__(str(fault))
+        self.failed = set(failed)
+        self.fault = fault
+
+
+def check_status(status_code: int, what: str) -> None:
+    """Raise PermanentError for client errors and RuntimeError for retryable ones."""
+    if status_code < 400:
+        return
+    if status_code in (408, 429) or status_code >= 500:
+        raise RuntimeError(f"{what} failed with HTTP {status_code}")
+    raise PermanentError(f"{what} rejected with HTTP {status_code}")
+
+
+class ReportSpool:
+    """
+    Batching, coalescing and retrying delivery of report updates.
+    Usage:
+    spool = ReportSpool("log/report_spool.db", {REPORT_DB: send_db_entries}).start()
+    spool.enqueue(REPORT_DB, "TEST-1:2022-01-01", payload)
+    spool.close()
+    Senders get the list of payloads of one kind, return on success and raise on failure.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, path: str, senders: Dict[str, Callable[[List[dict]], None]],
+                 batch_size: int = BATCH_SIZE, interval: float = FLUSH_INTERVAL,
+                 max_attempts: int = MAX_ATTEMPTS, backoff: float = BACKOFF_BASE,
+                 backoff_max: float = BACKOFF_MAX) -> None:
+        """
+        :param path: SQLite spool file
+        :param senders: Delivery function of every update kind
+        :param batch_size: Updates handed to a sender at once
+        :param interval: Seconds updates wait for more of a batch to arrive
+        :param max_attempts: Deliveries tried before an update is kept as dead
+        :param backoff: First retry delay in seconds, doubled per attempt up to backoff_max
+        """
+        self.path = path
+        self.senders = senders
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.local = threading.local()
+        self.counters = Counter()
+        self.send_latency = defaultdict(LatencyHistogram)
+        self.delivery_latency = LatencyHistogram()
+        self.flush_secs = None
+        self.last_error = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        p_home = os.path.dirname(path)
+        if p_home:
+            os.makedirs(p_home, exist_ok=True)
+        self._conn().execute(SCHEMA)
+        os.chmod(path, 0o600)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Connection owned by calling thread."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000,
+                                   isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    def start(self) -> 'ReportSpool':
+        """Start the delivery thread, updates left by a previous session are due at once."""
+        if self._thread is None:
+            conn = self._conn()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.execute('UPDATE spool SET next_try=0 WHERE dead=0')
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="report-spool", daemon=True)
+            self._thread.start()
+        return self
+
+    def enqueue(self, kind: str, key: str, payload: dict) -> None:
+        """
+        Store an update for delivery, merged into a pending update of the same kind and key.
+        :param kind: Update kind, selects the sender
+        :param key: Identity of the updated record
+        :param payload: JSON serializable update
+        """
+        if kind not in self.senders:
+            raise ValueError(f"No sender for report kind {kind}")
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT id, payload FROM spool WHERE kind=? AND key=? AND dead=0',
+                               (kind, key)).fetchone()
+            if row is None:
+                conn.execute('INSERT OR REPLACE INTO spool (kind, key, payload, created) '
+                             'VALUES (?, ?, ?, ?)', (kind, key, json.dumps(payload), time.time()))
+                self.counters["enqueued"] += 1
+            else:
+                merged = dict(json.loads(row[1]), **payload)
+                conn.execute('UPDATE spool SET payload=?, version=version+1 WHERE id=?',
+                             (json.dumps(merged), row[0]))
+                self.counters["coalesced"] += 1
+            pending = conn.execute('SELECT COUNT(*) FROM spool WHERE dead=0').fetchone()[0]
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def backlog(self) -> int:
+        """Updates waiting for delivery."""
+        return self._conn().execute('SELECT COUNT(*) FROM spool WHERE dead=0').fetchone()[0]
+
+    def _retry_delay(self, attempts: int) -> float:
+        delay = min(self.backoff * 2 ** (attempts - 1), self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _fail(self, rows: list, fault: Exception) -> None:
+        """Schedule a retry of rows or keep them as dead."""
+        self.last_error = f"{type(fault).__name__}: {fault}"
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for row_id, attempts in rows:
+                attempts += 1
+                dead = isinstance(fault, PermanentError) or attempts >= self.max_attempts
+                conn.execute('UPDATE spool SET attempts=?, next_try=?, dead=?, error=? '
+                             'WHERE id=?', (attempts, now + self._retry_delay(attempts),
+                                            int(dead), self.last_error, row_id))
+                self.counters["dead" if dead else "retries"] += 1
+
+    def _delivered(self, rows: list) -> None:
+        """Drop delivered rows, rows merged with a newer update meanwhile are sent again."""
+        if not rows:
+            return
+        done = time.time()
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('DELETE FROM spool WHERE id=? AND version=?',
+                             [(row[0], row[5]) for row in rows])
+        for row in rows:
+            self.delivery_latency.record(max(done - row[3], 0.0))
+        self.counters["delivered"] += len(rows)
+        self.counters["batches"] += 1
+
+    def deliver_due(self) -> float:
+        """
+        Send all updates due for delivery.
+        :return: Seconds until the next retry is due, None when nothing is pending
+        """
+        conn = self._conn()
+        now = time.time()
+        rows = conn.execute('SELECT id, kind, payload, created, attempts, version FROM spool '
+                            'WHERE dead=0 AND next_try<=? ORDER BY id', (now,)).fetchall()
+        by_kind = defaultdict(list)
+        for row in rows:
+            by_kind[row[1]].append(row)
+        for kind, kind_rows in by_kind.items():
+            for index in range(0, len(kind_rows), self.batch_size):
+                batch = kind_rows[index:index + self.batch_size]
+                begin = time.perf_counter()
+                fault, failed = None, set()
+                try:
+                    self.senders[kind]([json.loads(row[2]) for row in batch])
+                except Exception as error:  # pylint: disable=broad-except
+                    failed = getattr(error, "failed", set(range(len(batch))))
+                    fault = getattr(error, "fault", error)
+                    LOGGER.warning("Delivery of %s %s updates failed: %s",
+                                   len(failed), kind, fault)
+                self.send_latency[kind].record(time.perf_counter() - begin)
+                self._delivered([row for index, row in enumerate(batch) if index not in failed])
+                if fault is not None:
+                    self._fail([(row[0], row[4]) for index, row in enumerate(batch)
+                                if index in failed], fault)
+        upcoming = conn.execute('SELECT MIN(next_try) FROM spool WHERE dead=0').fetchone()[0]
+        return None if upcoming is None else max(upcoming - time.time(), 0.0)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            try:
+                delay = self.deliver_due()
+            except sqlite3.Error as fault:
+                LOGGER.error("Report spool %s failed: %s", self.path, fault)
+                delay = None
+            wait = self.interval if delay is None else min(max(delay, 0.01), self.interval)
+            self._wakeup.wait(wait)
+
+    def flush(self, timeout: float = FLUSH_TIMEOUT) -> bool:
+        """
+        Wait until all pending updates are delivered or dead.
+        :param timeout: Seconds to wait, retries keep their backoff meanwhile
+        :return: True when the backlog is empty
+        """
+        begin = time.monotonic()
+        while self.backlog():
+            if time.monotonic() - begin >= timeout:
+                break
+            if self._thread is None:
+                delay = self.deliver_due()
+                if delay:
+                    time.sleep(min(delay, timeout - (time.monotonic() - begin), 0.5))
+            else:
+                self._wakeup.set()
+                time.sleep(0.05)
+        self.flush_secs = time.monotonic() - begin
+        return not self.backlog()
+
+    def close(self, timeout: float = FLUSH_TIMEOUT) -> dict:
+        """Flush, stop the delivery thread and return the status."""
+        self.flush(timeout)
+        if self._thread is not None:
+            self._stop.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        return self.status()
+
+    def status(self) -> dict:
+        """Backlog, dead updates, counters and latencies of the spool."""
+        dead = self._conn().execute('SELECT COUNT(*) FROM spool WHERE dead=1').fetchone()[0]
+        return dict(self.counters, backlog=self.backlog(), dead_total=dead,
+                    last_error=self.last_error,
+                    flush_secs=None if self.flush_secs is None else round(self.flush_secs, 3),
+                    delivery_latency=self.delivery_latency.summary((50, 99)),
+                    send_latency={kind: hist.summary((50, 99))
+                                  for kind, hist in self.send_latency.items()})
+
+
+def jira_status_sender(task) -> Callable[[List[dict]], None]:
+    """Sender importing test statuses, payloads are Xray test entries with a te key.
+    One import is sent per test execution, only entries of failed imports are retried."""
+    def send(payloads: List[dict]) -> None:
+        by_te = defaultdict(list)
+        for index, payload in enumerate(payloads):
+            test = dict(payload)
+            by_te[test.pop("te")].append((index, test))
+        failed, fault = [], None
+        for te_id, entries in by_te.items():
+            try:
+                response = task.import_execution_status(te_id, [test for _, test in entries])
+                check_status(response.status_code, f"Jira status update of {te_id}")
+            except Exception as error:  # pylint: disable=broad-except
+                failed.extend(index for index, _ in entries)
+                # Entries are only kept as dead when every failure was permanent.
+                if fault is None or isinstance(fault, PermanentError):
+                    fault = error
+        if fault is not None:
+            raise PartialDelivery(failed, fault)
+    return send
+
+
+def _send_each(payloads: List[dict], func: Callable[[dict], None]) -> None:
+    """Send payloads one by one, a failure reports it and the payloads after it as failed."""
+    for index, payload in enumerate(payloads):
+        try:
+            func(payload)
+        except Exception as fault:
+            raise PartialDelivery(range(index, len(payloads)), fault) from fault
+
+
+def jira_comment_sender(task) -> Callable[[List[dict]], None]:
+    """Sender adding log path comments to test runs."""
+    def comment(payload: dict) -> None:
+        if not task.update_execution_details(**payload):
+            raise RuntimeError(f"Comment of test run {payload['test_run_id']} failed")
+    return lambda payloads: _send_each(payloads, comment)
+
+
+def report_db_sender(client, credentials: Callable[[], tuple]) -> Callable[[List[dict]], None]:
+    """Sender creating reports DB entries, credentials are added at send time."""
+    def send(payloads: List[dict]) -> None:
+        db_user, db_pass = credentials()
+
+        def create(payload: dict) -> None:
+            check_status(client.create_db_entry(db_username=db_user, db_password=db_pass,
+                                                **payload),
+                         f"Reports DB entry of {payload.get('test_id')}")
+        _send_each(payloads, create)
+    return send
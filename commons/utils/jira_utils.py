@@ -19,6 +19,7 @@
 JIRA Access Utility Class
 """
 import json
+import os
 import sys
 import traceback
 import requests
@@ -54,7 +55,7 @@ class JiraTask:
         self.http = requests.Session()
         self.http.mount("https://", self.adapter)
         self.http.mount("http://", self.adapter)
-        self.jira_url = "https://jts.seagate.com/"
+        self.jira_url = os.environ.get("JIRA_URL", "https://jts.seagate.com/")
 
     def get_test_ids_from_te(self, test_exe_id, status=None):
         """
@@ -258,30 +259,39 @@ class JiraTask:
                 if retry > 3:
                     return None
 
-    def update_test_jira_status(self, test_exe_id, test_id, test_status, log_path=''):
+    @staticmethod
+    def test_status_entry(test_id, test_status, log_path=''):
         """
-        Update test jira status in xray jira.
+        Xray import entry of a test status, start or finish time is set to now.
         """
-        state = {}
-        status = {}
-        state["testExecutionKey"] = test_exe_id
-        status["testKey"] = test_id
+        status = {"testKey": test_id}
         if test_status == 'Executing':
             status["start"] = datetime.datetime.now().astimezone().isoformat(timespec='seconds')
         else:
             status["finish"] = datetime.datetime.now().astimezone().isoformat(timespec='seconds')
             status["comment"] = log_path
         status["status"] = test_status
-        state["tests"] = []
-        state['tests'].append(status)
-        data = json.dumps(state)
-        jira_url = self.jira_url + "/rest/raven/1.0/import/execution"
+        return status
+
+    def import_execution_status(self, test_exe_id, tests):
+        """
+        Update status of many tests of a test execution in one xray import request.
+        """
+        data = json.dumps({"testExecutionKey": test_exe_id, "tests": list(tests)})
+        jira_url = self.jira_url.rstrip("/") + "/rest/raven/1.0/import/execution"
         response = requests.request("POST", jira_url, data=data,
                                     auth=(self.jira_id, self.jira_password),
                                     headers=self.headers,
                                     params=None)
         return response
 
+    def update_test_jira_status(self, test_exe_id, test_id, test_status, log_path=''):
+        """
+        Update test jira status in xray jira.
+        """
+        return self.import_execution_status(
+            test_exe_id, [self.test_status_entry(test_id, test_status, log_path)])
+
     def get_test_details(self, test_exe_id: str) -> list:
         """
         Get details of the test cases in a test execution ticket.
@@ -332,7 +342,7 @@ class JiraTask:
         Add comment to the mentioned jira id.
         """
         try:
-            url = f"https://jts.seagate.com/rest/raven/1.0/api/testrun/{test_run_id}/comment"
+            url = f"{self.jira_url.rstrip('/')}/rest/raven/1.0/api/testrun/{test_run_id}/comment"
 
             response = requests.request("PUT", url, data=comment,
                                         auth=(self.jira_id, self.jira_password),
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Per run time series store of resource stats from kubectl top and procpath.
+
+Samples of all sources are kept in one SQLite table keyed by (run, node, pod, process, ts).
+The table is clustered on that key, so one series or one run is a contiguous range read.
+CPU is stored in cores and memory as RSS bytes. Downsampling, percentile summaries,
+CPU / RSS peak detection and comparison of two runs are computed from the store.
+Usage:
+store = ResourceStatsStore("log/latest/resource_stats.db")
+store.import_top_dir("TEST-40039", "log/latest/top_stats", pod_nodes)
+store.import_procpath("TEST-40039", "ssc-vm-1", "log/latest/dst/ssc-vm-1.sqlite")
+store.summary("TEST-40039")
+python -m commons.utils.resource_stats log/latest/resource_stats.db TEST-40039 --base RUN
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+from collections import OrderedDict
+from datetime import datetime
+from itertools import groupby
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+RESOURCE_STATS_DB = "resource_stats.db"
+TOP_PODS_FILE = "top_stats_log"
+TOP_NODES_FILE = "top_nodes_stats_log"
+TOP_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+PERCENTILES = (50, 90, 99)
+METRICS = ("cpu", "rss")
+# procpath records utime/stime in clock ticks and rss in pages
+CLOCK_TICKS = 100
+PAGE_SIZE = 4096
+PEAK_FACTOR = 2.0
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    run TEXT NOT NULL,
+    node TEXT NOT NULL,
+    pod TEXT NOT NULL,
+    process TEXT NOT NULL,
+    ts REAL NOT NULL,
+    cpu REAL,
+    rss INTEGER,
+    PRIMARY KEY (run, node, pod, process, ts)
+) WITHOUT ROWID
+"""
+UNITS = {"": 1, "k": 1000, "M": 1000 ** 2, "G": 1000 ** 3, "T": 1000 ** 4,
+         "Ki": 1024, "Mi": 1024 ** 2, "Gi": 1024 ** 3, "Ti": 1024 ** 4}
+
+
+class Sample(NamedTuple):
+    """One measurement of a process, container (pod, process) or node (node only)."""
+
+    node: str
+    pod: str
+    process: str
+    ts: float
+    cpu: Optional[float]
+    rss: Optional[int]
+
+
+class Peak(NamedTuple):
+    """Consecutive samples of a series above the peak threshold."""
+
+    key: Tuple[str, str, str]
+    metric: str
+    start: float
+    end: float
+    value: float
+    threshold: float
+
+
+def parse_cpu(text: str) -> float:
+    """kubectl cpu quantity in cores, e.g. 250m -> 0.25."""
+    if text.endswith("n"):
+        return float(text[:-1]) / 1e9
+    if text.endswith("m"):
+        return float(text[:-1]) / 1000
+    return float(text)
+
+
+def parse_memory(text: str) -> int:
+    """kubectl memory quantity in bytes, e.g. 512Mi."""
+    number = text.rstrip("KkMGTi")
+    return int(float(number) * UNITS[text[len(number):]])
+
+
+def _top_time(line: str) -> Optional[float]:
+    """Timestamp of a ===== marker line of collect-k8s-stats.sh."""
+    stamp = line.strip().strip("=")
+    try:
+        return datetime.strptime(stamp, TOP_TIME_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_top_pods(lines: Iterable[str], pod_nodes: Dict[str, str] = None) -> Iterator[Sample]:
+    """
+    Samples of `kubectl top pods [--containers] --all-namespaces` output between time markers.
+    :param lines: Lines of top_stats_log
+    :param pod_nodes: Node of each pod, e.g. from the topology snapshot
+    """
+    pod_nodes = pod_nodes or {}
+    stamp = None
+    for line in lines:
+        if line.startswith("====="):
+            stamp = _top_time(line)
+            continue
+        fields = line.split()
+        if stamp is None or len(fields) not in (4, 5) or fields[0] == "NAMESPACE":
+            continue
+        pod, process = fields[1], fields[2] if len(fields) == 5 else ""
+        try:
+            yield Sample(pod_nodes.get(pod, ""), pod, process, stamp, parse_cpu(fields[-2]),
+                         parse_memory(fields[-1]))
+        except (ValueError, KeyError):
+            LOGGER.debug("Skipping top line %s", line.rstrip())
+
+
+def parse_top_nodes(lines: Iterable[str]) -> Iterator[Sample]:
+    """Samples of `kubectl top nodes` output between time markers."""
+    stamp = None
+    for line in lines:
+        if line.startswith("====="):
+            stamp = _top_time(line)
+            continue
+        fields = line.split()
+        if stamp is None or len(fields) != 5 or fields[0] == "NAME":
+            continue
+        try:
+            yield Sample(fields[0], "", "", stamp, parse_cpu(fields[1]),
+                         parse_memory(fields[3]))
+        except (ValueError, KeyError):
+            LOGGER.debug("Skipping top line %s", line.rstrip())
+
+
+def read_procpath(db_path: str, node: str, clock_ticks: int = CLOCK_TICKS,
+                  page_size: int = PAGE_SIZE) -> Iterator[Sample]:
+    """
+    Samples of a procpath record database, process named comm:pid.
+    CPU is the utime + stime delta over the interval, None for the first record of a pid.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT stat_pid, stat_comm, ts, stat_utime + stat_stime, "
+                            "stat_rss FROM record ORDER BY stat_pid, ts")
+        for (pid, comm), records in groupby(rows, key=lambda row: (row[0], row[1])):
+            last = None
+            for _, _, stamp, ticks, rss in records:
+                cpu = None
+                if last is not None and stamp > last[0]:
+                    cpu = (ticks - last[1]) / clock_ticks / (stamp - last[0])
+                last = (stamp, ticks)
+                yield Sample(node, "", f"{comm}:{pid}", stamp, cpu, rss * page_size)
+    finally:
+        conn.close()
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest rank percentile of sorted values."""
+    if not values:
+        return None
+    rank = max(1, int(-(-pct * len(values) // 100)))
+    return values[min(rank, len(values)) - 1]
+
+
+def describe(values: List[float], percentiles: Iterable[float] = PERCENTILES) -> dict:
+    """count, mean, max and percentiles of values."""
+    values = sorted(value for value in values if value is not None)
+    if not values:
+        return {"count": 0}
+    result = {"count": len(values), "mean": sum(values) / len(values), "max": values[-1]}
+    for pct in percentiles:
+        result[f"p{pct:g}"] = percentile(values, pct)
+    return result
+
+
+def find_peaks(key: tuple, metric: str, points: List[Tuple[float, Optional[float]]],
+               factor: float = PEAK_FACTOR, floor: float = 0.0) -> List[Peak]:
+    """
+    Ranges of consecutive points above max(factor * median, floor).
+    :param points: (ts, value) sorted by ts
+    """
+    values = sorted(value for _, value in points if value is not None)
+    if not values:
+        return []
+    threshold = max(factor * percentile(values, 50), floor)
+    peaks, current = [], None
+    for stamp, value in points:
+        if value is not None and value > threshold:
+            if current is None:
+                current = [stamp, stamp, value]
+            current[1], current[2] = stamp, max(current[2], value)
+        elif current is not None:
+            peaks.append(Peak(key, metric, current[0], current[1], current[2], threshold))
+            current = None
+    if current is not None:
+        peaks.append(Peak(key, metric, current[0], current[1], current[2], threshold))
+    return peaks
+
+
+class ResourceStatsStore:
+    """Resource stats samples of test runs in one SQLite file."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """:param path: SQLite file, created when missing"""
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database."""
+        self.conn.close()
+
+    def add(self, run: str, samples: Iterable[Sample]) -> int:
+        """Store samples of run in one transaction, a repeated key replaces the sample."""
+        with self.conn:
+            cursor = self.conn.executemany(
+                "INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((run,) + tuple(sample) for sample in samples))
+        return cursor.rowcount
+
+    def import_top_dir(self, run: str, dir_path: str, pod_nodes: Dict[str, str] = None) -> int:
+        """Store the top_stats_log and top_nodes_stats_log files of collect-k8s-stats.sh."""
+        count = 0
+        for name, parse in ((TOP_PODS_FILE, lambda lines: parse_top_pods(lines, pod_nodes)),
+                            (TOP_NODES_FILE, parse_top_nodes)):
+            file_path = os.path.join(dir_path, name)
+            if not os.path.exists(file_path):
+                LOGGER.warning("Top stats file %s is missing", file_path)
+                continue
+            with open(file_path, errors="replace") as fobj:
+                count += self.add(run, parse(fobj))
+        LOGGER.info("Stored %s top samples of run %s", count, run)
+        return count
+
+    def import_procpath(self, run: str, node: str, db_path: str) -> int:
+        """Store the samples of a procpath record database collected on node."""
+        count = self.add(run, read_procpath(db_path, node))
+        LOGGER.info("Stored %s procpath samples of %s for run %s", count, node, run)
+        return count
+
+    def runs(self) -> List[str]:
+        """Stored runs."""
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT run FROM samples")]
+
+    def keys(self, run: str) -> List[Tuple[str, str, str]]:
+        """(node, pod, process) of every series of run."""
+        return [tuple(row) for row in self.conn.execute(
+            "SELECT DISTINCT node, pod, process FROM samples WHERE run = ?", (run,))]
+
+    def series(self, run: str, key: Tuple[str, str, str]) -> List[Tuple[float, float, int]]:
+        """(ts, cpu, rss) samples of one series in time order."""
+        return [tuple(row) for row in self.conn.execute(
+            "SELECT ts, cpu, rss FROM samples WHERE run = ? AND node = ? AND pod = ? "
+            "AND process = ? ORDER BY ts", (run,) + tuple(key))]
+
+    def _grouped(self, run: str) -> Iterator[Tuple[tuple, list]]:
+        rows = self.conn.execute(
+            "SELECT node, pod, process, ts, cpu, rss FROM samples WHERE run = ? "
+            "ORDER BY node, pod, process, ts", (run,))
+        for key, group in groupby(rows, key=lambda row: row[:3]):
+            yield key, [row[3:] for row in group]
+
+    def downsample(self, run: str, interval: float) -> List[tuple]:
+        """
+        (node, pod, process, bucket start, mean cpu, max cpu, max rss) per interval
+        seconds of every series, for plotting long runs.
+        """
+        return [tuple(row) for row in self.conn.execute(
+            "SELECT node, pod, process, CAST(ts / ? AS INTEGER) * ? AS bucket, AVG(cpu), "
+            "MAX(cpu), MAX(rss) FROM samples WHERE run = ? "
+            "GROUP BY node, pod, process, bucket ORDER BY node, pod, process, bucket",
+            (interval, interval, run))]
+
+    def summary(self, run: str, percentiles: Iterable[float] = PERCENTILES) -> OrderedDict:
+        """cpu and rss count, mean, max and percentiles of every series of run."""
+        percentiles = tuple(percentiles)
+        result = OrderedDict()
+        for key, rows in self._grouped(run):
+            result[key] = {metric: describe([row[pos] for row in rows], percentiles)
+                           for pos, metric in enumerate(METRICS, start=1)}
+        return result
+
+    def peaks(self, run: str, metrics: Iterable[str] = METRICS, factor: float = PEAK_FACTOR,
+              floors: Dict[str, float] = None) -> List[Peak]:
+        """
+        Peaks of every series, ranges above factor times the series median, largest first.
+        :param floors: Smallest value per metric reported as peak, e.g. {"cpu": 0.5}
+        """
+        floors = floors or {}
+        found = []
+        for key, rows in self._grouped(run):
+            for metric in metrics:
+                pos = METRICS.index(metric) + 1
+                found.extend(find_peaks(key, metric, [(row[0], row[pos]) for row in rows],
+                                        factor, floors.get(metric, 0.0)))
+        return sorted(found, key=lambda peak: peak.value / peak.threshold
+                      if peak.threshold else float("inf"), reverse=True)
+
+    def compare(self, base_run: str, run: str, stat: str = "p99") -> List[dict]:
+        """
+        stat of cpu and rss of every series in base_run and run, largest change first.
+        Series of only one run have None for the other.
+        """
+        base, other = self.summary(base_run), self.summary(run)
+        rows = []
+        for key in list(base) + [key for key in other if key not in base]:
+            for metric in METRICS:
+                before = base.get(key, {}).get(metric, {}).get(stat)
+                after = other.get(key, {}).get(metric, {}).get(stat)
+                change = None
+                if before and after is not None:
+                    change = (after - before) / before * 100
+                rows.append({"node": key[0], "pod": key[1], "process": key[2],
+                             "metric": metric, "base": before, "run": after,
+                             "change_pct": change})
+        return sorted(rows, key=lambda row: -1 if row["change_pct"] is None
+                      else abs(row["change_pct"]), reverse=True)
+
+    def report(self, run: str, path: str) -> dict:
+        """Write summary and peaks of run as json to path."""
+        result = {"run": run,
+                  "summary": [dict(node=key[0], pod=key[1], process=key[2], **stats)
+                              for key, stats in self.summary(run).items()],
+                  "peaks": [dict(peak._asdict(), key="/".join(peak.key))
+                            for peak in self.peaks(run)]}
+        with open(path, "w") as fobj:
+            json.dump(result, fobj, indent=1)
+        return result
+
+
+def main(argv=None) -> int:
+    """Print the summary of a run or its comparison with a base run."""
+    parser = argparse.ArgumentParser(description="Summarize stored resource stats.")
+    parser.add_argument("db", help="resource stats SQLite file")
+    parser.add_argument("run", help="run to summarize")
+    parser.add_argument("--base", help="compare run with this run")
+    parser.add_argument("--stat", default="p99", help="statistic compared, e.g. p50 or max")
+    args = parser.parse_args(argv)
+    store = ResourceStatsStore(args.db)
+    if args.base:
+        result = store.compare(args.base, args.run, args.stat)
+    else:
+        result = [dict(key="/".join(key), **stats)
+                  for key, stats in store.summary(args.run).items()]
+    store.close()
+    print(json.dumps(result, indent=1))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -36,9 +36,9 @@ from subprocess import Popen, PIPE
 from hashlib import md5
 from pathlib import Path
 from botocore.response import StreamingBody
-from paramiko import SSHClient, AutoAddPolicy
 from commons import commands
 from commons import params
+from commons.helpers.ssh_pool import SSHConnectionManager
 from commons.constants import AWS_CLI_ERROR
 
 if sys.platform == 'win32':
@@ -67,34 +67,35 @@ def run_remote_cmd(cmd: str, hostname: str, username: str, password: str,
     read_lines = kwargs.get("read_lines", False)
     read_nbytes = kwargs.get("read_nbytes", -1)
     timeout_sec = kwargs.get("timeout_sec", 30)
-    client = SSHClient()
-    client.set_missing_host_key_policy(AutoAddPolicy())
+    manager = SSHConnectionManager.get_instance()
     LOGGER.debug("Command: %s", str(cmd))
-    client.connect(hostname, username=username, password=password, timeout=timeout_sec)
-    _, stdout, stderr = client.exec_command(cmd)
-    exit_status = stdout.channel.recv_exit_status()
-    if read_lines:
-        output = stdout.readlines()
-        output = [r.strip().strip("\n").strip() for r in output]
-        if output and "hctl status" not in cmd and "pcs status" not in cmd:
-            LOGGER.debug("Result: %s", str(output))
-        error = stderr.readlines()
-        error = [r.strip().strip("\n").strip() for r in error]
-        if error:
-            LOGGER.debug("Error: %s", str(error))
-    else:
-        output = stdout.read(read_nbytes)
-        if output and "hctl status" not in cmd and "pcs status" not in cmd:
-            LOGGER.debug("Result: %s", str(output))
-        error = stderr.read()
-        if error:
-            LOGGER.debug("Error: %s", str(error))
+    with manager.slot(hostname, username):
+        _, stdout, stderr = manager.exec_command(hostname, username, password, cmd,
+                                                 connect_timeout=timeout_sec)
+        exit_status = stdout.channel.recv_exit_status()
+        if read_lines:
+            output = stdout.readlines()
+            output = [r.strip().strip("\n").strip() for r in output]
+            if output and "hctl status" not in cmd and "pcs status" not in cmd:
+                LOGGER.debug("Result: %s", str(output))
+            error = stderr.readlines()
+            error = [r.strip().strip("\n").strip() for r in error]
+            if error:
+                LOGGER.debug("Error: %s", str(error))
+        else:
+            output = stdout.read(read_nbytes)
+            if output and "hctl status" not in cmd and "pcs status" not in cmd:
+                LOGGER.debug("Result: %s", str(output))
+            error = stderr.read()
+            if error:
+                LOGGER.debug("Error: %s", str(error))
+        # Output is read and the channel closed while holding the channel slot
+        stdout.channel.close()
     LOGGER.debug(exit_status)
     if exit_status != 0:
         if error:
             return False, error
         return False, output
-    client.close()
     if error:
         return False, error
 
@@ -112,29 +113,30 @@ def run_remote_cmd_wo_decision(cmd: str, hostname: str, username: str, password:
     read_lines = kwargs.get("read_lines", False)
     read_nbytes = kwargs.get("read_nbytes", -1)
     timeout_sec = kwargs.get("timeout_sec", 30)
-    client = SSHClient()
-    client.set_missing_host_key_policy(AutoAddPolicy())
+    manager = SSHConnectionManager.get_instance()
     LOGGER.debug("Command: %s", str(cmd))
-    client.connect(hostname, username=username, password=password, timeout=timeout_sec)
-    _, stdout, stderr = client.exec_command(cmd)
-    exit_status = stdout.channel.recv_exit_status()
-    if read_lines:
-        output = stdout.readlines()
-        output = [r.strip().strip("\n").strip() for r in output]
-        if output and "hctl status" not in cmd and "pcs status" not in cmd:
-            LOGGER.debug("Result: %s", str(output))
-        error = stderr.readlines()
-        error = [r.strip().strip("\n").strip() for r in error]
-        if error:
-            LOGGER.debug("Error: %s", str(error))
-    else:
-        output = stdout.read(read_nbytes)
-        if output and "hctl status" not in cmd and "pcs status" not in cmd:
-            LOGGER.debug("Result: %s", str(output))
-        error = stderr.read()
-        if error:
-            LOGGER.debug("Error: %s", str(error))
-    client.close()
+    with manager.slot(hostname, username):
+        _, stdout, stderr = manager.exec_command(hostname, username, password, cmd,
+                                                 connect_timeout=timeout_sec)
+        exit_status = stdout.channel.recv_exit_status()
+        if read_lines:
+            output = stdout.readlines()
+            output = [r.strip().strip("\n").strip() for r in output]
+            if output and "hctl status" not in cmd and "pcs status" not in cmd:
+                LOGGER.debug("Result: %s", str(output))
+            error = stderr.readlines()
+            error = [r.strip().strip("\n").strip() for r in error]
+            if error:
+                LOGGER.debug("Error: %s", str(error))
+        else:
+            output = stdout.read(read_nbytes)
+            if output and "hctl status" not in cmd and "pcs status" not in cmd:
+                LOGGER.debug("Result: %s", str(output))
+            error = stderr.read()
+            if error:
+                LOGGER.debug("Error: %s", str(error))
+        # Output is read and the channel closed while holding the channel slot
+        stdout.channel.close()
     return output, error, exit_status
 
 
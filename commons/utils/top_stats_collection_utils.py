@@ -21,15 +21,20 @@
 
 import logging
 import os.path
-from multiprocessing import Process
+import posixpath
+import tarfile
 
 from commons.commands import CMD_PGREP_TOP
+from commons.commands import CMD_REMOVE_DIR
+from commons.commands import CMD_START_TOP
+from commons.commands import CMD_TAR_DIR
 from commons.commands import KILL_CMD
 from commons.constants import COLLECTION_FILE
 from commons.constants import COLLECTION_SCRIPT_PATH
 from commons.constants import PROFILE_FILE
 from commons.constants import PROFILE_FILE_PATH
 from commons.helpers.pods_helper import LogicalNode
+from commons.utils.resource_stats import ResourceStatsStore
 
 # check and set pytest logging level as Globals.LOG_LEVEL
 LOGGER = logging.getLogger(__name__)
@@ -47,6 +52,7 @@ class TopStatsCollection:
         self.cmn_cfg = cmn_cfg
         self.nodes = cmn_cfg["nodes"]
         self.master_node_list = list()
+        self.pids = list()
         for node in self.nodes:
             if node["node_type"].lower() == "master":
                 node_obj = LogicalNode(hostname=node["hostname"],
@@ -63,6 +69,13 @@ class TopStatsCollection:
         LOGGER.debug("executing top cmd for stat collection")
         node.execute_cmd(cmd=cmd)
 
+    @staticmethod
+    def _parse_pids(output) -> list:
+        """Process ids in command output."""
+        if isinstance(output, bytes):
+            output = output.decode("utf-8", "replace")
+        return [pid for pid in str(output).split() if pid.isdigit()]
+
     def collect_stats(self, dir_path):
         """
         function to collect top command stats
@@ -78,52 +91,71 @@ class TopStatsCollection:
         self.master_node_list[0].apply_k8s_deployment(PROFILE_FILE)
         if not resp[0]:
             return resp[0]
-        cmd = f"chmod +x {COLLECTION_FILE} && ./{COLLECTION_FILE} {dir_path}"
-        proc = Process(target=self.exe_cmd, args=(self.master_node_list[0], cmd))
-        proc.start()
-        cmd = CMD_PGREP_TOP.format(COLLECTION_FILE, dir_path)
-        pids = str(self.master_node_list[0].execute_cmd(f"echo $({cmd})"))
-        LOGGER.debug("pids of processes %s", pids)
-        list_pids = pids.split()
-        res = []
-        for pid in list_pids:
-            res.append(''.join(filter(lambda j: j.isdigit(), pid)))
-        LOGGER.debug("list of pids %s", res)
-        if not res:
-            LOGGER.info("Process IDs of cmd %s is empty", cmd)
+        # The script runs detached, its pid is printed by the starting shell
+        self.pids = self._parse_pids(self.master_node_list[0].execute_cmd(
+            CMD_START_TOP.format(COLLECTION_FILE, dir_path)))
+        LOGGER.debug("list of pids %s", self.pids)
+        if not self.pids:
+            LOGGER.info("Process ID of %s is empty", COLLECTION_FILE)
             return False
         return True
 
     def stop_collection(self, dir_path):
         """function to get pid and kill it on server"""
-
-        cmd = CMD_PGREP_TOP.format(COLLECTION_FILE, dir_path)
-        pids = str(self.master_node_list[0].execute_cmd(f"echo $({cmd})"))
-        LOGGER.debug("pids of processes %s", pids)
-        list_pids = pids.split()
-        res = []
-        for pid in list_pids:
-            res.append(''.join(filter(lambda j: j.isdigit(), pid)))
+        res = self.pids
+        if not res:
+            cmd = CMD_PGREP_TOP.format(COLLECTION_FILE, dir_path)
+            res = self._parse_pids(self.master_node_list[0].execute_cmd(f"echo $({cmd})"))
         LOGGER.debug("list of pids %s", res)
         if not res:
-            LOGGER.info("Process IDs of cmd %s is empty", cmd)
+            LOGGER.info("Process IDs of %s is empty", COLLECTION_FILE)
             return False
         for pid in res:
             self.master_node_list[0].execute_cmd(cmd=KILL_CMD.format(pid))
+        self.pids = list()
         return True
 
     def copy_remove_files_from_remote(self, dir_path, local_path):
         """
         function to copy files from dir and remove dir from remote
+        The dir is archived on the remote and copied in one transfer.
         """
-        ls_dir = self.master_node_list[0].list_dir(remote_path=dir_path)
-        LOGGER.debug("ls of remote dir %s", ls_dir)
-        for file in ls_dir:
-            resp = self.master_node_list[0].copy_file_to_local(os.path.join(dir_path, file),
-                                                               os.path.join(local_path, file))
-            if not resp:
-                LOGGER.info("copy of file %s failed", file)
-                return resp
+        node = self.master_node_list[0]
+        dir_path = dir_path.rstrip("/")
+        archive = f"{dir_path}.tar.gz"
+        node.execute_cmd(CMD_TAR_DIR.format(archive, posixpath.dirname(dir_path) or ".",
+                                            posixpath.basename(dir_path)))
+        local_archive = os.path.join(local_path, os.path.basename(archive))
+        resp = node.copy_file_to_local(archive, local_archive)
+        if not resp[0]:
+            LOGGER.info("copy of archive %s failed", archive)
+            return False
+        with tarfile.open(local_archive) as tar:
+            for member in tar.getmembers():
+                if member.isfile():
+                    # Files land in local_path directly like before
+                    member.name = os.path.basename(member.name)
+                    tar.extract(member, local_path)
+        os.remove(local_archive)
         LOGGER.debug("removing dir from path of remote %s", dir_path)
-        resp = self.master_node_list[0].delete_dir_sftp(dpath=dir_path)
-        return resp
+        node.execute_cmd(CMD_REMOVE_DIR.format(f"{dir_path} {archive}"))
+        return not node.path_exists(dir_path)
+
+    def pod_nodes(self) -> dict:
+        """Node of every pod from the cached topology, empty when it can not be read."""
+        try:
+            snapshot = self.master_node_list[0].topology().snapshot()
+            return {name: snapshot.pod_node(name) or "" for name in snapshot.pod_names()}
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.warning("Pod placement not available: %s", error)
+            return {}
+
+    def load_stats(self, store: ResourceStatsStore, run: str, local_path: str) -> int:
+        """
+        Store the copied top stats of run, pod samples get the node of the pod.
+        :param store: Resource stats store
+        :param run: Run name, e.g. the test id
+        :param local_path: Directory the stats files were copied to
+        :return: Number of samples stored
+        """
+        return store.import_top_dir(run, local_path, self.pod_nodes())
@@ -18,69 +18,192 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 """Worker pool to perform similar tasks"""
+import inspect
 import logging
-import queue
 import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from typing import Any
-from threading import Thread
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
 from commons.constants import NWORKERS
+from commons.histogram import LatencyHistogram
 
 logger = logging.getLogger(__name__)
 
 
-class WorkQ(queue.Queue):
-    def __init__(self, func: Any, maxsize: int) -> None:
-        self.lock_req = maxsize != 0
-        self.func = func
-        self.semaphore = threading.Semaphore(maxsize)
-        queue.Queue.__init__(self, maxsize)
-
-    def put(self, item):
-        if self.lock_req:
-            self.semaphore.acquire()
-        queue.Queue.put(self, item)
-
-    def task_done(self):
-        if self.lock_req:
-            self.semaphore.release()
-        queue.Queue.task_done(self)
+def _timed_call(fn: Callable, args: tuple, kwargs: dict) -> tuple:
+    """Run fn in a worker, return (seconds it ran, ok, result or raised exception).
+    Module level so process pools can pickle it."""
+    start = time.perf_counter()
+    try:
+        result, ok = fn(*args, **kwargs), True
+    except Exception as error:  # pylint: disable=broad-except
+        result, ok = error, False
+    return time.perf_counter() - start, ok, result
 
 
 class Workers(object):
-    """ A fixed size thread pool for I/O bound tasks """
+    """ A fixed size pool of threads for I/O bound tasks or processes for CPU bound ones.
+
+    Tasks are submitted with submit() which returns a Future. At most max_inflight tasks
+    are queued or running, further submits block until one completes which keeps memory
+    bounded. Per task latency, counted from when a worker starts the task, and the time
+    tasks wait in the queue are collected in histograms. When stop_event is set new tasks
+    are refused and pending ones are cancelled while running ones drain. Process mode can
+    only send picklable module level functions, bound methods and local functions are
+    rejected with TypeError.
+    Usage:
+    workers = Workers(nworkers=16, max_inflight=64)
+    workers.start_workers()
+    future = workers.submit(func, arg)
+    for result in workers.map_unordered(func, items):
+        print(result)
+    workers.end_workers()
+    print(workers.stats())
+    """
 
-    def __init__(self):
-        self.w_workers = []
-        self.w_workq = None
+    def __init__(self,
+                 nworkers: int = NWORKERS,
+                 max_inflight: int = None,
+                 use_processes: bool = False,
+                 stop_event: Any = None) -> None:
+        self.nworkers = nworkers
+        self.max_inflight = max_inflight
+        self.use_processes = use_processes
+        self.stop_event = stop_event
+        self.w_executor = None
+        self.w_inflight = None
+        self.w_pending = set()
+        self.w_lock = threading.Lock()
+        self.latency = LatencyHistogram()
+        self.queue_wait = LatencyHistogram()
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
 
     def start_workers(self,
-                      nworkers: int = NWORKERS,
+                      nworkers: int = None,
                       func: Any = None) -> None:
-        self.w_workq = WorkQ(func, nworkers)
-        for i in range(nworkers):
-            w = Thread(target=self.worker)
-            w.start()
-            self.w_workers.append(w)
-
-    def worker(self):
-        while True:
-            wq = self.w_workq.get()
-            if wq is None:
-                self.w_workq.task_done()
+        """Start the pool, func is accepted for compatibility and not used."""
+        self.nworkers = nworkers if nworkers else self.nworkers
+        max_inflight = self.max_inflight if self.max_inflight else 2 * self.nworkers
+        self.w_inflight = threading.BoundedSemaphore(max_inflight)
+        if self.use_processes:
+            self.w_executor = ProcessPoolExecutor(max_workers=self.nworkers)
+        else:
+            self.w_executor = ThreadPoolExecutor(max_workers=self.nworkers,
+                                                 thread_name_prefix='worker')
+
+    def _stopped(self) -> bool:
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def _done(self, task: Future, future: Future, submitted: float) -> None:
+        """Account a finished task, release its in-flight slot and resolve its future."""
+        error = result = None
+        if not task.cancelled():
+            error = task.exception()
+            if error is None:
+                run_secs, ok, result = task.result()
+                self.latency.record(run_secs)
+                self.queue_wait.record(max(0.0, time.perf_counter() - submitted - run_secs))
+                if not ok:
+                    error, result = result, None
+            if error is not None:
+                logger.error('Task failed with %s', error)
+        with self.w_lock:
+            self.w_pending.discard(task)
+            if task.cancelled():
+                self.cancelled += 1
+            elif error is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+        self.w_inflight.release()
+        if task.cancelled():
+            future.cancel()
+        elif future.set_running_or_notify_cancel():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _check_picklable(self, fn: Callable) -> None:
+        """Process pools pickle the callable, reject the ones that can not be pickled."""
+        if not self.use_processes:
+            return
+        name = getattr(fn, '__qualname__', repr(fn))
+        if (inspect.ismethod(fn) and not inspect.isclass(fn.__self__)) or '<' in name:
+            raise TypeError(f'{name} can not be sent to worker processes, pass a module '
+                            'level function or use thread workers')
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Submit fn(*args, **kwargs), blocks while max_inflight tasks are outstanding.
+
+        :return: Future of the task or None when stop event is set.
+        """
+        self._check_picklable(fn)
+        if self.w_executor is None:
+            self.start_workers()
+        while not self.w_inflight.acquire(timeout=1):
+            if self._stopped():
+                break
+        else:
+            if not self._stopped():
+                submitted = time.perf_counter()
+                task = self.w_executor.submit(_timed_call, fn, args, kwargs)
+                future = Future()
+                future.add_done_callback(lambda done: done.cancelled() and task.cancel())
+                with self.w_lock:
+                    self.w_pending.add(task)
+                task.add_done_callback(lambda done: self._done(done, future, submitted))
+                return future
+            self.w_inflight.release()
+        logger.debug('Stop event is set, task %s not submitted', fn)
+        return None
+
+    def map_unordered(self, fn: Callable, iterable: Iterable) -> Iterator[Any]:
+        """Apply fn to each item and yield results as tasks complete.
+        Items are consumed lazily so at most max_inflight results are outstanding."""
+        window = set()
+        limit = self.max_inflight if self.max_inflight else 2 * self.nworkers
+        for item in iterable:
+            future = self.submit(fn, item)
+            if future is None:
                 break
-            wi = wq.get()
-            wq.func(wi)
-            wq.task_done()
-            self.w_workq.task_done()
-
-    def wenque(self, item):
-        self.w_workq.put(item)
-
-    def end_workers(self):
-        for i in range(len(self.w_workers)):
-            self.w_workq.put(None)
-        self.w_workq.join()
-        logger.info('shutdown all workers')
-        logger.info('Joining all threads to main thread')
-        for i in range(len(self.w_workers)):
-            self.w_workers[i].join()
+            window.add(future)
+            if len(window) >= limit:
+                done = next(as_completed(window))
+                window.discard(done)
+                yield done.result()
+        for future in as_completed(window):
+            yield future.result()
+
+    def end_workers(self, drain: bool = True) -> None:
+        """Wait for submitted tasks and stop the pool.
+        Pending tasks are cancelled when drain is False or stop event is set."""
+        if self.w_executor is None:
+            return
+        if not drain or self._stopped():
+            with self.w_lock:
+                pending = list(self.w_pending)
+            for future in pending:
+                future.cancel()
+        self.w_executor.shutdown(wait=True)
+        self.w_executor = None
+        logger.info('shutdown all workers %s', self.stats())
+
+    def stats(self) -> dict:
+        """Completed, failed and cancelled counts with task latency and queue wait
+        percentiles."""
+        with self.w_lock:
+            counts = dict(completed=self.completed, failed=self.failed,
+                          cancelled=self.cancelled, inflight=len(self.w_pending))
+        counts['latency'] = self.latency.summary()
+        counts['queue_wait'] = self.queue_wait.summary()
+        return counts
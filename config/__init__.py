@@ -24,7 +24,9 @@ import ast
 import re
 import munch
 from typing import List
+from commons import config_snapshot
 from commons import configmanager
+from commons.utils import config_utils
 from commons.params import S3_CONFIG
 from commons.params import DURABILITY_CFG_PATH
 from commons.params import COMMON_CONFIG
@@ -42,6 +44,8 @@ from commons.constants import PROD_FAMILY_LC
 from commons.constants import S3_ENGINE_RGW
 from commons.params import DTM_CFG_PATH
 from commons.params import DTM_TEST_CFG_PATH
+from commons.params import SETUPS_FPATH
+from commons.params import SETUP_DEFAULTS
 
 
 def split_args(sys_cmd: List):
@@ -129,44 +133,81 @@ def build_s3_endpoints() -> dict:
     return s3_conf
 
 
-if target:
-    S3_CFG = build_s3_endpoints()  # Importing S3cfg from config init can be dangerous.Use s3 init.
-else:
-    S3_CFG = configmanager.get_config_wrapper(fpath=S3_CONFIG)
-
-CMN_CFG = configmanager.get_config_wrapper(fpath=COMMON_CONFIG, target=target)
-if S3_ENGINE_RGW == CMN_CFG["s3_engine"]:
-    S3_CFG["region"] = "default"
-CMN_CFG.update(S3_CFG)
-JMETER_CFG = configmanager.get_config_wrapper(
-    fpath=CSM_CONFIG, config_key="JMeterConfig", target=target, target_key="csm")
-
-if PROD_FAMILY_LC == CMN_CFG["product_family"]:
-    CSM_REST_CFG = configmanager.get_config_wrapper(
-        fpath=CSM_CONFIG, config_key="Restcall_LC", target=target, target_key="csm")
-else:
-    CSM_REST_CFG = configmanager.get_config_wrapper(
-        fpath=CSM_CONFIG, config_key="Restcall", target=target, target_key="csm")
-
-CSM_CFG = configmanager.get_config_wrapper(fpath=CSM_CONFIG)
-if CSM_CHECKS:
-    CSM_REST_CFG["msg_check"] = "enable"
-    CSM_CFG["Restcall"]["msg_check"] = "enable"
-RAS_VAL = configmanager.get_config_wrapper(
-    fpath=RAS_CONFIG_PATH, target=target, target_key="csm")
-CMN_DESTRUCTIVE_CFG = configmanager.get_config_wrapper(fpath=COMMON_DESTRUCTIVE_CONFIG_PATH)
-RAS_TEST_CFG = configmanager.get_config_wrapper(fpath=SSPL_TEST_CONFIG_PATH)
-PROV_CFG = configmanager.get_config_wrapper(fpath=PROV_TEST_CONFIG_PATH)
-HA_CFG = configmanager.get_config_wrapper(fpath=HA_TEST_CONFIG_PATH)
-PROV_TEST_CFG = configmanager.get_config_wrapper(fpath=PROV_CONFIG_PATH)
-DTM_CFG = configmanager.get_config_wrapper(fpath=DTM_CFG_PATH)
-DTM_TEST_CFG = configmanager.get_config_wrapper(fpath=DTM_TEST_CFG_PATH)
-DEPLOY_CFG = configmanager.get_config_wrapper(fpath=DEPLOY_TEST_CONFIG_PATH)
-
-DI_CFG = configmanager.get_config_wrapper(fpath=DI_CONFIG_PATH)
-DATA_PATH_CFG = configmanager.get_config_wrapper(fpath=DATA_PATH_CONFIG_PATH, target=target)
-DURABILITY_CFG = configmanager.get_config_wrapper(fpath=DURABILITY_CFG_PATH)
-# Munched configs. These can be used by dot "." operator.
+def _build_sections() -> dict:
+    """Build config sections from the yaml files and setup details of target."""
+    # Importing S3cfg from config init can be dangerous.Use s3 init.
+    if target:
+        s3_cfg = build_s3_endpoints()
+    else:
+        s3_cfg = configmanager.get_config_wrapper(fpath=S3_CONFIG)
+
+    cmn_cfg = configmanager.get_config_wrapper(fpath=COMMON_CONFIG, target=target)
+    if S3_ENGINE_RGW == cmn_cfg["s3_engine"]:
+        s3_cfg["region"] = "default"
+    cmn_cfg.update(s3_cfg)
+    jmeter_cfg = configmanager.get_config_wrapper(
+        fpath=CSM_CONFIG, config_key="JMeterConfig", target=target, target_key="csm")
+
+    if PROD_FAMILY_LC == cmn_cfg["product_family"]:
+        csm_rest_cfg = configmanager.get_config_wrapper(
+            fpath=CSM_CONFIG, config_key="Restcall_LC", target=target, target_key="csm")
+    else:
+        csm_rest_cfg = configmanager.get_config_wrapper(
+            fpath=CSM_CONFIG, config_key="Restcall", target=target, target_key="csm")
+
+    csm_cfg = configmanager.get_config_wrapper(fpath=CSM_CONFIG)
+    if CSM_CHECKS:
+        csm_rest_cfg["msg_check"] = "enable"
+        csm_cfg["Restcall"]["msg_check"] = "enable"
+    return {
+        "S3_CFG": s3_cfg,
+        "CMN_CFG": cmn_cfg,
+        "JMETER_CFG": jmeter_cfg,
+        "CSM_REST_CFG": csm_rest_cfg,
+        "CSM_CFG": csm_cfg,
+        "RAS_VAL": configmanager.get_config_wrapper(
+            fpath=RAS_CONFIG_PATH, target=target, target_key="csm"),
+        "CMN_DESTRUCTIVE_CFG": configmanager.get_config_wrapper(
+            fpath=COMMON_DESTRUCTIVE_CONFIG_PATH),
+        "RAS_TEST_CFG": configmanager.get_config_wrapper(fpath=SSPL_TEST_CONFIG_PATH),
+        "PROV_CFG": configmanager.get_config_wrapper(fpath=PROV_TEST_CONFIG_PATH),
+        "HA_CFG": configmanager.get_config_wrapper(fpath=HA_TEST_CONFIG_PATH),
+        "PROV_TEST_CFG": configmanager.get_config_wrapper(fpath=PROV_CONFIG_PATH),
+        "DTM_CFG": configmanager.get_config_wrapper(fpath=DTM_CFG_PATH),
+        "DTM_TEST_CFG": configmanager.get_config_wrapper(fpath=DTM_TEST_CFG_PATH),
+        "DEPLOY_CFG": configmanager.get_config_wrapper(fpath=DEPLOY_TEST_CONFIG_PATH),
+        "DI_CFG": configmanager.get_config_wrapper(fpath=DI_CONFIG_PATH),
+        "DATA_PATH_CFG": configmanager.get_config_wrapper(fpath=DATA_PATH_CONFIG_PATH,
+                                                          target=target),
+        "DURABILITY_CFG": configmanager.get_config_wrapper(fpath=DURABILITY_CFG_PATH),
+    }
+
 
-di_cfg = munch.munchify(DI_CFG)
-cmn_cfg = munch.munchify(CMN_CFG)
+def _snapshot_ttl():
+    """Setup details not found in setups.json come from the DB and are not hashed."""
+    if not target:
+        return None
+    try:
+        if target in config_utils.read_content_json(SETUPS_FPATH, mode='rb'):
+            return None
+    except (OSError, ValueError):
+        pass
+    return config_snapshot.DB_TTL_SECS
+
+
+# Sections are loaded from a snapshot compiled once per change of their inputs and
+# unpickled on first use, CONFIG_SNAPSHOT=0 builds them at import.
+_SECTIONS = config_snapshot.load_or_compile(
+    __name__, _build_sections,
+    files=[__file__, configmanager.__file__, S3_CONFIG, COMMON_CONFIG, CSM_CONFIG,
+           RAS_CONFIG_PATH, COMMON_DESTRUCTIVE_CONFIG_PATH, SSPL_TEST_CONFIG_PATH,
+           PROV_TEST_CONFIG_PATH, HA_TEST_CONFIG_PATH, PROV_CONFIG_PATH, DTM_CFG_PATH,
+           DTM_TEST_CFG_PATH, DEPLOY_TEST_CONFIG_PATH, DI_CONFIG_PATH, DATA_PATH_CONFIG_PATH,
+           DURABILITY_CFG_PATH, SETUPS_FPATH, SETUP_DEFAULTS],
+    extra={"target": target, "csm_checks": CSM_CHECKS, "secret": config_snapshot.secret_hash(),
+           "use_ssl": os.environ.get("USE_SSL"),
+           "validate_certs": os.environ.get("VALIDATE_CERTS")},
+    groups=[("S3_CFG", "CMN_CFG")], ttl=_snapshot_ttl)
+# Munched configs. These can be used by dot "." operator.
+config_snapshot.install(__name__, _SECTIONS, derived={"di_cfg": ("DI_CFG", munch.munchify),
+                                                      "cmn_cfg": ("CMN_CFG", munch.munchify)})
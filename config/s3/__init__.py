@@ -20,6 +20,7 @@
 
 """S3 configs are initialized here."""
 
+from commons import config_snapshot
 from commons import configmanager
 from commons.params import S3_OBJ_TEST_CONFIG
 from commons.params import S3_BKT_TEST_CONFIG
@@ -34,13 +35,29 @@ from commons.params import S3_LDAP_TEST_CONFIG
 from config import S3_CFG as s3_config
 
 S3_CFG = s3_config
-DEL_CFG = configmanager.get_config_wrapper(fpath=DEL_CFG_PATH)
-S3_OBJ_TST = configmanager.get_config_wrapper(fpath=S3_OBJ_TEST_CONFIG)
-S3_BKT_TST = configmanager.get_config_wrapper(fpath=S3_BKT_TEST_CONFIG)
-S3CMD_CNF = configmanager.get_config_wrapper(fpath=S3CMD_TEST_CONFIG)
-S3_USER_ACC_MGMT_CONFIG = configmanager.get_config_wrapper(fpath=S3_USER_ACC_MGMT_CONFIG_PATH)
-S3_BLKBOX_CFG = configmanager.get_config_wrapper(fpath=S3_BLACK_BOX_CONFIG_PATH)
-S3_TMP_CRED_CFG = configmanager.get_config_wrapper(fpath=S3_TEMP_CRED_CONFIG_PATH)
-MPART_CFG = configmanager.get_config_wrapper(fpath=S3_MPART_CFG_PATH)
-S3_LDAP_TST_CFG = configmanager.get_config_wrapper(fpath=S3_LDAP_TEST_CONFIG)
-IAM_POLICY_CFG = configmanager.get_config_wrapper(fpath=IAM_POLICY_CFG_PATH)
+
+
+def _build_sections() -> dict:
+    """Build S3 test config sections from the yaml files."""
+    return {
+        "DEL_CFG": configmanager.get_config_wrapper(fpath=DEL_CFG_PATH),
+        "S3_OBJ_TST": configmanager.get_config_wrapper(fpath=S3_OBJ_TEST_CONFIG),
+        "S3_BKT_TST": configmanager.get_config_wrapper(fpath=S3_BKT_TEST_CONFIG),
+        "S3CMD_CNF": configmanager.get_config_wrapper(fpath=S3CMD_TEST_CONFIG),
+        "S3_USER_ACC_MGMT_CONFIG": configmanager.get_config_wrapper(
+            fpath=S3_USER_ACC_MGMT_CONFIG_PATH),
+        "S3_BLKBOX_CFG": configmanager.get_config_wrapper(fpath=S3_BLACK_BOX_CONFIG_PATH),
+        "S3_TMP_CRED_CFG": configmanager.get_config_wrapper(fpath=S3_TEMP_CRED_CONFIG_PATH),
+        "MPART_CFG": configmanager.get_config_wrapper(fpath=S3_MPART_CFG_PATH),
+        "S3_LDAP_TST_CFG": configmanager.get_config_wrapper(fpath=S3_LDAP_TEST_CONFIG),
+        "IAM_POLICY_CFG": configmanager.get_config_wrapper(fpath=IAM_POLICY_CFG_PATH),
+    }
+
+
+config_snapshot.install(__name__, config_snapshot.load_or_compile(
+    __name__, _build_sections,
+    files=[__file__, configmanager.__file__, DEL_CFG_PATH, S3_OBJ_TEST_CONFIG,
+           S3_BKT_TEST_CONFIG, S3CMD_TEST_CONFIG, S3_USER_ACC_MGMT_CONFIG_PATH,
+           S3_BLACK_BOX_CONFIG_PATH, S3_TEMP_CRED_CONFIG_PATH, S3_MPART_CFG_PATH,
+           S3_LDAP_TEST_CONFIG, IAM_POLICY_CFG_PATH],
+    extra={"secret": config_snapshot.secret_hash()}))
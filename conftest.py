@@ -37,7 +37,6 @@ from threading import Thread
 from typing import List
 
 import pytest
-import requests
 from _pytest.main import Session
 from filelock import FileLock
 from strip_ansi import strip_ansi
@@ -46,9 +45,12 @@ from commons import Globals
 from commons import cortxlogging
 from commons import params
 from commons import report_client
+from commons import report_spool
 from commons import constants as const
+from commons.health_gate import HEALTH_TTL
+from commons.health_gate import HealthGate
+from commons.health_gate import Probe
 from commons.helpers.health_helper import Health
-from commons.utils import assert_utils
 from commons.utils import config_utils
 from commons.utils import jira_utils
 from commons.utils import system_utils
@@ -65,6 +67,8 @@ LOG_DIR = 'log'
 CACHE = LRUCache(1024 * 10)
 CACHE_JSON = 'nodes-cache.yaml'
 REPORT_CLIENT = None
+REPORT_SPOOL = None
+HEALTH_GATE = None
 DT_PATTERN = '%Y-%m-%d_%H:%M:%S'
 
 LOGGER = logging.getLogger(__name__)
@@ -235,6 +239,10 @@ def pytest_addoption(parser):
         "--health_check", action="store", default=True,
         help="Decide whether to do health check in local mode."
     )
+    parser.addoption(
+        "--health_check_ttl", action="store", default=HEALTH_TTL, type=float,
+        help="Seconds a healthy cluster verdict is reused, 0 to check before every test."
+    )
     parser.addoption(
         "--product_family", action="store", default='LC',
         help="Product Type LR or LC."
@@ -287,6 +295,8 @@ def read_dist_test_list_csv() -> List:
 def pytest_sessionfinish(session, exitstatus):
     """Remove handlers from all loggers."""
     # todo add html hook file = session.config._htmlfile
+    write_health_summary(session)
+    stop_report_spool()
     loggers = [logging.getLogger()] + list(logging.Logger.manager.loggerDict.values())
     for _logger in loggers:
         handlers = getattr(_logger, 'handlers', [])
@@ -457,6 +467,39 @@ def pytest_sessionstart(session: Session) -> None:
     report_client.ReportClient.init_instance()
     REPORT_CLIENT = report_client.ReportClient.get_instance()
     reset_imported_module_log_level(session)
+    start_report_spool(session.config)
+
+
+def start_report_spool(config) -> None:
+    """Start background delivery of Jira and reports DB updates of this process."""
+    global REPORT_SPOOL
+    if ast.literal_eval(str(config.option.local)):
+        return
+    senders = dict()
+    if ast.literal_eval(str(config.option.jira_update)):
+        task = jira_utils.JiraTask(*get_jira_credential())
+        senders[report_spool.JIRA_STATUS] = report_spool.jira_status_sender(task)
+        senders[report_spool.JIRA_COMMENT] = report_spool.jira_comment_sender(task)
+    if ast.literal_eval(str(config.option.db_update)):
+        senders[report_spool.REPORT_DB] = report_spool.report_db_sender(REPORT_CLIENT,
+                                                                        get_db_credential)
+    worker = getattr(config, "workerinput", {}).get("workerid", "main")
+    path = os.path.join(os.getcwd(), LOG_DIR, f'report_spool_{worker}.db')
+    REPORT_SPOOL = report_spool.ReportSpool(path, senders).start()
+
+
+def stop_report_spool() -> None:
+    """Deliver pending updates and log the delivery status."""
+    if REPORT_SPOOL is None:
+        return
+    status = REPORT_SPOOL.close()
+    LOGGER.info("Report spool: %s delivered in %s batches, backlog %s, dead %s, "
+                "flush %s secs, delivery p99 %.2f secs", status.get("delivered", 0),
+                status.get("batches", 0), status["backlog"], status["dead_total"],
+                status["flush_secs"], status["delivery_latency"]["p99"])
+    if status["backlog"] or status["dead_total"]:
+        LOGGER.error("Report updates left in %s, last error: %s", REPORT_SPOOL.path,
+                     status["last_error"])
 
 
 def reset_imported_module_log_level(session):
@@ -490,8 +533,11 @@ def pytest_collection(session):
     is_parallel = ast.literal_eval(str(config.option.is_parallel))
     health_check = ast.literal_eval(str(config.option.health_check))
     required_tests = list()
-    global CACHE
+    global CACHE, HEALTH_GATE
     CACHE = LRUCache(1024 * 10)
+    HEALTH_GATE = HealthGate(_health_check_nodes, HEALTH_PROBES,
+                             ttl=config.option.health_check_ttl,
+                             cleanup=lambda health: health.disconnect())
     Globals.LOCAL_RUN = _local
     Globals.HEALTH_CHK = health_check
     Globals.TP_TKT = config.option.tp_ticket
@@ -585,19 +631,44 @@ def pytest_collection(session):
     return items
 
 
-# pylint: disable=too-many-arguments
-def db_and_jira_update(task, test_id, item, call, status, db_user, db_pass):
+def queue_report(kind, key, payload):
+    """Queue a report update, local runs have no spool and send it right away."""
+    if REPORT_SPOOL is not None:
+        REPORT_SPOOL.enqueue(kind, key, payload)
+        return
+    if kind == report_spool.REPORT_DB:
+        send = report_spool.report_db_sender(REPORT_CLIENT, get_db_credential)
+    else:
+        task = jira_utils.JiraTask(*get_jira_credential())
+        send = report_spool.jira_status_sender(task) if kind == report_spool.JIRA_STATUS \
+            else report_spool.jira_comment_sender(task)
+    send([payload])
+
+
+def queue_jira_status(test_exe_id, test_id, status):
+    """Queue a test status update of a test execution, see start_report_spool."""
+    entry = jira_utils.JiraTask.test_status_entry(test_id, status)
+    queue_report(report_spool.JIRA_STATUS, f"{test_exe_id}:{test_id}",
+                 dict(entry, te=test_exe_id))
+
+
+def queue_test_result(test_id, item, call, status):
+    """Queue Jira status and reports DB entry of a finished test."""
     try:
         jira_update = ast.literal_eval(str(item.config.option.jira_update))
         db_update = ast.literal_eval(str(item.config.option.db_update))
         if jira_update:
-            task.update_test_jira_status(item.config.option.te_tkt, test_id, status)
+            queue_jira_status(item.config.option.te_tkt, test_id, status)
         if db_update:
-            payload = create_report_payload(item, call, status, db_user, db_pass)
-            REPORT_CLIENT.create_db_entry(**payload)
-    except (requests.exceptions.RequestException, Exception) as fault:
+            # Credentials are added by the sender and not stored in the spool
+            payload = create_report_payload(item, call, status, None, None)
+            del payload['db_username'], payload['db_password']
+            queue_report(report_spool.REPORT_DB,
+                         f"{payload['test_exec_id']}:{test_id}:{payload['start_time']}",
+                         payload)
+    except Exception as fault:
         LOGGER.exception(str(fault))
-        LOGGER.error("Failed to execute DB update for %s", test_id)
+        LOGGER.error("Failed to queue DB update for %s", test_id)
 
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
@@ -617,6 +688,7 @@ def pytest_runtest_makereport(item, call):
     report = outcome.get_result()
     Globals.ALL_RESULT = report
     setattr(item, "rep_" + report.when, report)
+    invalidate_health(item, report)
     try:
         attr = getattr(item, 'call_duration')
         LOGGER.info('Setting attribute call_duration')
@@ -632,7 +704,6 @@ def pytest_runtest_makereport(item, call):
     pass_file = 'passed_tests.log'
     current_file = 'other_test_calls.log'
     jira_update = ast.literal_eval(str(item.config.option.jira_update))
-    db_update = ast.literal_eval(str(item.config.option.db_update))
     test_id = CACHE.lookup(report.nodeid)
     if report.when == 'setup':
         Globals.CSM_LOGS = f"{LOG_DIR}/latest/{test_id}_Gui_Logs/"
@@ -645,12 +716,10 @@ def pytest_runtest_makereport(item, call):
             # The status is again anyhow updated in teardown as it was earlier.
             try:
                 if jira_update:
-                    jira_id, jira_pwd = get_jira_credential()
-                    task = jira_utils.JiraTask(jira_id, jira_pwd)
-                    task.update_test_jira_status(item.config.option.te_tkt, test_id, 'FAIL')
-            except (requests.exceptions.RequestException, Exception) as fault:
+                    queue_jira_status(item.config.option.te_tkt, test_id, 'FAIL')
+            except Exception as fault:
                 LOGGER.exception(str(fault))
-                LOGGER.error("Failed to execute Jira update for %s", test_id)
+                LOGGER.error("Failed to queue Jira update for %s", test_id)
         elif report.when == 'teardown':
             try:
                 remote_path = os.path.join(params.NFS_BASE_DIR,
@@ -661,55 +730,17 @@ def pytest_runtest_makereport(item, call):
                                            )
                 setattr(report, "logpath", remote_path)
                 setattr(item, "logpath", remote_path)
-                if jira_update:
-                    db_user, db_pass = get_db_credential()
-                    jira_id, jira_pwd = get_jira_credential()
-                    task = jira_utils.JiraTask(jira_id, jira_pwd)
-
                 if item.rep_setup.failed or item.rep_teardown.failed:
-                    try:
-                        if jira_update:
-                            task.update_test_jira_status(item.config.option.te_tkt, test_id, 'FAIL')
-                        if db_update:
-                            # capture exec info
-                            payload = create_report_payload(item, call, 'FAIL', db_user, db_pass)
-                            REPORT_CLIENT.create_db_entry(**payload)
-                    except (requests.exceptions.RequestException, Exception) as fault:
-                        LOGGER.exception(str(fault))
-                        LOGGER.error("Failed to execute DB update for %s", test_id)
+                    queue_test_result(test_id, item, call, 'FAIL')
                 elif item.rep_setup.passed and (item.rep_call.failed or item.rep_teardown.failed):
-                    try:
-                        if jira_update:
-                            task.update_test_jira_status(item.config.option.te_tkt, test_id, 'FAIL')
-                        if db_update:
-                            payload = create_report_payload(item, call, 'FAIL', db_user, db_pass)
-                            REPORT_CLIENT.create_db_entry(**payload)
-                    except (requests.exceptions.RequestException, Exception) as fault:
-                        LOGGER.exception(str(fault))
-                        LOGGER.error("Failed to execute DB update for %s", test_id)
+                    queue_test_result(test_id, item, call, 'FAIL')
                 elif item.rep_setup.passed and item.rep_call.passed and item.rep_teardown.passed:
-                    try:
-                        if jira_update:
-                            task.update_test_jira_status(item.config.option.te_tkt, test_id, 'PASS')
-                        if db_update:
-                            payload = create_report_payload(item, call, 'PASS', db_user, db_pass)
-                            REPORT_CLIENT.create_db_entry(**payload)
-                    except (requests.exceptions.RequestException, Exception) as fault:
-                        LOGGER.exception(str(fault))
-                        LOGGER.error("Failed to execute DB update for %s", test_id)
+                    queue_test_result(test_id, item, call, 'PASS')
                 elif item.rep_setup.skipped and \
                         (item.rep_teardown.skipped or item.rep_teardown.passed):
                     # Jira reporting of skipped cases does not contain skipped option
                     # Reporting it blocked and updating db.
-                    try:
-                        if jira_update:
-                            task.update_test_jira_status(item.config.option.te_tkt, test_id, 'BLOCKED')
-                        if db_update:
-                            payload = create_report_payload(item, call, 'BLOCKED', db_user, db_pass)
-                            REPORT_CLIENT.create_db_entry(**payload)
-                    except (requests.exceptions.RequestException, Exception) as fault:
-                        LOGGER.exception(str(fault))
-                        LOGGER.error("Failed to execute DB update for %s", test_id)
+                    queue_test_result(test_id, item, call, 'BLOCKED')
 
             except Exception as exception:
                 LOGGER.error("Exception %s occurred in reporting for test %s.",
@@ -771,41 +802,42 @@ def upload_supporting_logs(test_id: str, remote_path: str, log: str):
             LOGGER.error("Failed to supporting log file at location %s", resp[1])
 
 
-def check_cortx_cluster_health():
-    """Check the cluster health before each test is picked up for run."""
-    LOGGER.info("Check cluster status for all nodes.")
+def _health_check_nodes() -> List[Health]:
+    """Health objects of nodes to be checked, only master nodes for LC."""
     nodes = CMN_CFG["nodes"]
-    for node in nodes:
-        if CMN_CFG.get("product_family") == const.PROD_FAMILY_LC:
-            if node["node_type"].lower() != "master":
-                continue
-        hostname = node['hostname']
-        health = Health(hostname=hostname,
-                        username=node['username'],
-                        password=node['password'])
-        result = health.check_node_health()
-        assert_utils.assert_true(result[0],
-                                 f'Cluster Node {hostname} failed in health check. Reason: {result}')
-        health.disconnect()
-    LOGGER.info("Cluster status is healthy.")
-
-
-def check_cluster_storage():
-    """Checks nodes storage and accepts till 98 % occupancy."""
-    LOGGER.info("Check cluster storage for all nodes.")
-    nodes = CMN_CFG["nodes"]
-    for node in nodes:
-        if CMN_CFG.get("product_family") == const.PROD_FAMILY_LC:
-            if node["node_type"].lower() != "master":
-                continue
-        hostname = node['hostname']
-        health = Health(hostname=hostname,
-                        username=node['username'],
-                        password=node['password'])
-        ha_total, ha_avail, ha_used = health.get_sys_capacity()
-        ha_used_percent = round((ha_used / ha_total) * 100, 1)
-        assert ha_used_percent < 98.0, f'Cluster Node {hostname} failed space check.'
-        health.disconnect()
+    if CMN_CFG.get("product_family") == const.PROD_FAMILY_LC:
+        nodes = [node for node in nodes if node["node_type"].lower() == "master"]
+    return [Health(hostname=node['hostname'], username=node['username'],
+                   password=node['password']) for node in nodes]
+
+
+def _node_health_probe(health: Health) -> tuple:
+    """Cluster services of the node are up."""
+    result = health.check_node_health()
+    return result[0], result
+
+
+def _node_storage_probe(health: Health) -> tuple:
+    """Storage of the node is below 98 % occupancy."""
+    ha_total, _, ha_used = health.get_sys_capacity()
+    ha_used_percent = round((ha_used / ha_total) * 100, 1)
+    return ha_used_percent < 98.0, f"{ha_used_percent}% used"
+
+
+HEALTH_PROBES = [Probe("node_health", _node_health_probe),
+                 Probe("node_storage", _node_storage_probe, fatal=False)]
+
+
+def pytest_runtest_teardown(item, nextitem):
+    """
+    Stop the session before the next test once the runner lost its lease on the target.
+    :param item: Test which finished.
+    :param nextitem: Next scheduled test, None for the last one.
+    """
+    lost_file = os.environ.get(params.LEASE_LOST_ENV)
+    if nextitem is not None and lost_file and os.path.exists(lost_file):
+        LOGGER.error("Lease on target lost, aborting tests after %s", item.nodeid)
+        item.session.shouldstop = "Lease on target lost"
 
 
 def pytest_runtest_logstart(nodeid, location):
@@ -853,19 +885,51 @@ def pytest_runtest_logstart(nodeid, location):
 
 
 def check_health(target):
+    """Exit the run when the cluster is unhealthy, a healthy verdict is reused for its ttl."""
     try:
-        check_cortx_cluster_health()
-        try:
-            check_cluster_storage()
-        except (AssertionError, Exception) as fault:
-            LOGGER.error(f"Cluster Storage {fault}")
-    except AssertionError as fault:
-        LOGGER.error(f"Health check failed for setup with exception {fault}")
-        pytest.exit(f'Health check failed for cluster {target}', 3)
+        verdict = HEALTH_GATE.check()
     except Exception as fault:
-        # This could be permission issues as exception of anytype is handled.
         LOGGER.error(f"Health check script failed with exception {fault}")
         pytest.exit(f'Cannot continue as Health check script failed for {target}', 4)
+    if verdict.cached:
+        LOGGER.debug("Cluster status is healthy (cached).")
+    elif verdict.healthy:
+        LOGGER.info("Cluster status is healthy.")
+    elif verdict.error is not None:
+        # This could be permission issues as exception of anytype is handled.
+        LOGGER.error(f"Health check script failed with exception {verdict.error}")
+        pytest.exit(f'Cannot continue as Health check script failed for {target}', 4)
+    else:
+        LOGGER.error(f"Health check failed for setup with exception {verdict.reason}")
+        pytest.exit(f'Health check failed for cluster {target}', 3)
+
+
+def invalidate_health(item, report) -> None:
+    """Probe the cluster again before the next test after failures and destructive tests."""
+    if HEALTH_GATE is None:
+        return
+    if report.failed:
+        HEALTH_GATE.invalidate(f"{report.nodeid} failed in {report.when}")
+    elif report.when == 'teardown' and any(
+            item.get_closest_marker(name) for name in params.HEALTH_DESTRUCTIVE_MARKERS):
+        HEALTH_GATE.invalidate(f"{report.nodeid} is destructive")
+
+
+def write_health_summary(session) -> None:
+    """Log health check overhead of the run and save it next to the test logs."""
+    if HEALTH_GATE is None or not HEALTH_GATE.counters["checks"]:
+        return
+    summary = HEALTH_GATE.summary()
+    LOGGER.info("Health gate: %s checks, %s probe rounds, %s secs, %.1f%% of the run",
+                summary["checks"], summary["probe_rounds"], summary["gate_secs"],
+                summary["share_of_run"] * 100)
+    worker = getattr(session.config, "workerinput", {}).get("workerid", "main")
+    path = os.path.join(LOG_DIR, 'latest', f'health_gate_{worker}.json')
+    try:
+        with open(path, 'w') as fout:
+            json.dump(summary, fout, indent=2)
+    except OSError as fault:
+        LOGGER.warning("Could not write %s: %s", path, fault)
 
 
 def pytest_runtest_logreport(report: "TestReport") -> None:
@@ -894,9 +958,7 @@ def pytest_runtest_logreport(report: "TestReport") -> None:
     if report.when == 'setup' and report.outcome == 'passed':
         # If you reach here and when you know setup passed.
         if Globals.JIRA_UPDATE:
-            jira_id, jira_pwd = get_jira_credential()
-            task = jira_utils.JiraTask(jira_id, jira_pwd)
-            task.update_test_jira_status(Globals.TE_TKT, test_id, 'Executing')
+            queue_jira_status(Globals.TE_TKT, test_id, 'Executing')
     elif report.when == 'call':
         pass
     elif report.when == 'teardown':
@@ -927,21 +989,15 @@ def pytest_runtest_logreport(report: "TestReport") -> None:
         LOGGER.info("Adding log file path to %s", test_id)
         comment = "Log file path: {}".format(os.path.join(resp[1], name))
         if Globals.JIRA_UPDATE:
-            jira_id, jira_pwd = get_jira_credential()
-            task = jira_utils.JiraTask(jira_id, jira_pwd)
             try:
                 if Globals.tp_meta['te_meta']['te_id'] == Globals.TE_TKT:
                     test_run_id = next(d['test_run_id'] for i, d in enumerate(
                         Globals.tp_meta['test_meta']) if d['test_id'] ==
                                        test_id)
-                    resp = task.update_execution_details(
-                        test_run_id=test_run_id, test_id=test_id,
-                        comment=comment)
-                    if resp:
-                        LOGGER.info("Added execution details comment in: %s",
-                                    test_id)
-                    else:
-                        LOGGER.error("Failed to comment to %s", test_id)
+                    queue_report(report_spool.JIRA_COMMENT, str(test_run_id),
+                                 dict(test_run_id=test_run_id, test_id=test_id,
+                                      comment=comment))
+                    LOGGER.info("Queued execution details comment of: %s", test_id)
                 else:
                     LOGGER.error("Failed to get correct TE id. \nExpected: "
                                  "%s\nActual: %s", Globals.TE_TKT,
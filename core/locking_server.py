@@ -19,289 +19,106 @@ Utility Class for target locking using DB
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 # -*- coding: utf-8 -*-
-import os
-import json
-from http import HTTPStatus
-import requests
 import logging
+import os
+import threading
+from typing import Optional
+from urllib.parse import quote_plus
+from pymongo import MongoClient
 from core import runner
+from core.target_lock import Lease
+from core.target_lock import LeaseKeeper
+from core.target_lock import TargetLockService
 from commons import params
-from commons import constants as common_cnst
 
 LOGGER = logging.getLogger(__name__)
 
+# One MongoClient per process, runner processes are forked and must not reuse the parent's
+_MONGO_CLIENTS = {}
+_MONGO_LOCK = threading.Lock()
+
+
+def _mongo_client() -> MongoClient:
+    """Shared MongoClient of the current process."""
+    with _MONGO_LOCK:
+        client = _MONGO_CLIENTS.get(os.getpid())
+        if client is None:
+            db_username, db_password = runner.get_db_credential()
+            uri = "mongodb://{0}:{1}@{2}".format(quote_plus(db_username),
+                                                 quote_plus(db_password), params.DB_HOSTNAME)
+            client = _MONGO_CLIENTS[os.getpid()] = MongoClient(uri)
+        return client
+
 
 class LockingServer:
     """
     Locking Task for System managements.
-    Its DB based locking mechanism
+    Its DB based locking mechanism, every lock change is a single atomic update
+    of the target entry in systems collection, see core.target_lock.
     """
 
-    def __init__(self):
-        self.db_username, self.db_password = runner.get_db_credential()
-        self.host = params.REPORT_SRV
-        self.db_collection = "systemdb/"
-        self.headers = {
-            'content-type': "application/json",
-        }
+    def __init__(self, collection=None):
+        if collection is None:
+            collection = _mongo_client()[params.DB_NAME][params.SYS_INFO_COLLECTION]
+        self.service = TargetLockService(collection)
 
-    def lock_target(self, target_name, client, lock_type, convert_to_shared=False):
+    # pylint: disable=unused-argument
+    def lock_target(self, target_name, client, lock_type,
+                    convert_to_shared=False) -> Optional[Lease]:
         """
            Take lock on given target
+           Shared lock joins existing shared lock or locks free target, so
+           convert_to_shared is implied and kept for compatibility.
+           Returns the Lease, or None, renew it with keep_alive until released.
        """
-        lock_acquired = False
-        if lock_type == common_cnst.SHARED_LOCK:
-            if convert_to_shared:
-                payload = {
-                    "query": {"is_setup_free": {"$eq": True},
-                              "setupname": target_name,
-                              "in_use_for_parallel": {"$eq": False}
-                              }
-                }
-            else:
-                payload = {
-                    "query": {"is_setup_free": {"$eq": False},
-                              "setupname": target_name,
-                              "in_use_for_parallel": {"$eq": True}
-                              }
-                }
-            payload.update(
-                {"projection": {"setupname": True, "setup_in_useby": True,
-                                "parallel_client_cnt": True}})
-
-        else:
-            payload = {
-                "query": {"is_setup_free": {"$eq": True},
-                          "setupname": target_name,
-                          "setup_in_useby": ""
-                          },
-                "projection": {"setupname": True, "setup_in_useby": True}
-            }
-        payload.update(
-            {"db_username": self.db_username,
-             "db_password": self.db_password})
-        is_ok_response = False
-        try:
-            response = requests.request("GET", self.host + self.db_collection + "search",
-                                        headers=self.headers, data=json.dumps(payload))
-            if response.status_code == HTTPStatus.OK:
-                is_ok_response = True
-        except requests.exceptions.RequestException as fault:
-            LOGGER.exception(str(fault))
-            LOGGER.error("Failed to do get request on db")
-        if is_ok_response:
-            if lock_type == common_cnst.SHARED_LOCK:
-                if convert_to_shared:
-                    payload = {
-                        "filter": {"setupname": target_name},
-                        "update": {"$set": {"is_setup_free": False, "setup_in_useby": client,
-                                            "parallel_client_cnt": 1, "in_use_for_parallel": True}}
-                    }
-                else:
-                    json_response = json.loads(response.text)
-                    if len(json_response["result"]) > 0:
-                        existing_clients = json_response["result"][0]["setup_in_useby"]
-                        parallel_cnt = json_response["result"][0]["parallel_client_cnt"]
-                        client_cnts = parallel_cnt + 1
-                        clients = existing_clients + " " + client
+        lease = self.service.acquire(target_name, client, lock_type)
+        if lease is not None:
+            LOGGER.info("%s lock acquired on %s", lock_type, target_name)
+        return lease
 
-                        payload = {
-                            "filter": {"setupname": target_name},
-                            "update": {"$set": {"is_setup_free": False, "setup_in_useby": clients,
-                                                "parallel_client_cnt": client_cnts}}
-                        }
-            else:
-                payload = {
-                    "filter": {"setupname": target_name},
-                    "update": {"$set": {"is_setup_free": False, "setup_in_useby": client}}
-                }
-            payload.update(
-                {"db_username": self.db_username,
-                 "db_password": self.db_password})
-            try:
-                response = requests.request("PATCH", self.host + self.db_collection + "update",
-                                            headers=self.headers, data=json.dumps(payload))
-                if response.status_code == HTTPStatus.OK:
-                    lock_acquired = True
-            except requests.exceptions.RequestException as fault:
-                LOGGER.exception(str(fault))
-                LOGGER.error("Failed to do patch request on db")
+    def acquire_free_target(self, target_list, client, lock_type) -> Optional[Lease]:
+        """
+            Lock any free healthy target from target list
+        """
+        lease = self.service.acquire_any(target_list, client, lock_type)
+        if lease is not None:
+            LOGGER.info("%s lock acquired on %s", lock_type, lease.target)
+        return lease
 
-        return lock_acquired
+    def keep_alive(self, lease, interval=None, on_lost=None) -> LeaseKeeper:
+        """
+            Heartbeat renewing the lease until stopped, use as context manager
+            on_lost is called once the lease is lost
+        """
+        return LeaseKeeper(self.service, lease, interval, on_lost)
 
     def is_target_locked(self, target_name, client, lock_type):
         """
             Confirm lock on given target
         """
-        lock_confirmed = False
-        if lock_type == common_cnst.SHARED_LOCK:
-            payload = {
-                "query": {"is_setup_free": {"$eq": False},
-                          "setupname": target_name,
-                          "in_use_for_parallel": {"$eq": True},
-                          },
-                "projection": {"setupname": True, "setup_in_useby": True,
-                               "in_use_for_parallel": True,
-                               "parallel_client_cnt": True}
-            }
-        else:
-            payload = {
-                "query": {"is_setup_free": {"$eq": False},
-                          "setupname": target_name,
-                          "setup_in_useby": client
-                          },
-                "projection": {"setupname": True, "setup_in_useby": True}
-            }
-        payload.update(
-            {"db_username": self.db_username,
-             "db_password": self.db_password})
-        is_ok_response = False
-        try:
-            response = requests.request("GET", self.host + self.db_collection + "search",
-                                        headers=self.headers, data=json.dumps(payload))
-            if response.status_code == HTTPStatus.OK:
-                is_ok_response = True
-        except requests.exceptions.RequestException as fault:
-            LOGGER.exception(str(fault))
-            LOGGER.error("Failed to do get request on db")
-        if is_ok_response:
-            if lock_type == common_cnst.SHARED_LOCK:
-                # Check if client entry is present in setup_in_useby
-                # check if parallel_client_cnt > 0
-                # If yes then lock confirmed to True
-                json_response = json.loads(response.text)
-                if len(json_response["result"]) > 0:
-                    clients = json_response["result"][0]["setup_in_useby"]
-                    parallel_cnt = json_response["result"][0]["parallel_client_cnt"]
-                    if (client in clients) and (parallel_cnt > 0):
-                        lock_confirmed = True
-            else:
-                lock_confirmed = True
-        return lock_confirmed
+        return self.service.holds(target_name, client, lock_type)
 
     def find_free_target(self, target_list, lock_type):
         """
             Get free target from provided target list
         """
-        available_target = ""
-        for target_name in target_list:
-            target_found = self.is_target_present_in_db(target_name)
-            if target_found:
-                if lock_type == common_cnst.SHARED_LOCK:
-                    payload = {
-                        "query": {"is_setup_free": {"$eq": False},
-                                  "is_setup_healthy": {"$eq": True},
-                                  "setupname": target_name,
-                                  "in_use_for_parallel": {"$eq": True}}
-                    }
-                else:
-                    payload = {
-                        "query": {"is_setup_free": {"$eq": True},
-                                  "is_setup_healthy": {"$eq": True},
-                                  "setupname": target_name}
-                    }
-                payload.update(
-                    {"projection": {"setupname": True, "setup_in_useby": True},
-                     "db_username": self.db_username,
-                     "db_password": self.db_password})
-                try:
-                    response = requests.request("GET", self.host + self.db_collection + "search",
-                                                headers=self.headers, data=json.dumps(payload))
-                    if response.status_code == HTTPStatus.OK:
-                        LOGGER.info("available target found")
-                        available_target = target_name
-                        break
-                except requests.exceptions.RequestException as fault:
-                    LOGGER.exception(str(fault))
-                    LOGGER.error("Failed to do get request on db")
-            else:
-                LOGGER.error("target {} is not present in db".format(target_name))
-
-        return available_target
+        available_target = self.service.free_target(target_list, lock_type)
+        if available_target:
+            LOGGER.info("available target found")
+        return available_target or ""
 
     def is_target_present_in_db(self, target_name):
         """
             Check if given target is already present in db or not
         """
-        target_found = False
-        payload = {
-            "query": {"setupname": target_name},
-            "projection": {"setupname": True, "is_setup_free": True},
-            "db_username": self.db_username,
-            "db_password": self.db_password
-        }
-        try:
-            response = requests.request("GET", self.host + self.db_collection + "search",
-                                        headers=self.headers, data=json.dumps(payload))
-            if response.status_code == HTTPStatus.OK:
-                target_found = True
-        except requests.exceptions.RequestException as fault:
-            LOGGER.exception(str(fault))
-            LOGGER.error("Failed to do get request on db")
-        return target_found
+        return self.service.collection.count_documents({"setupname": target_name},
+                                                       limit=1) > 0
 
     def unlock_target(self, target_name, client):
         """
             Release lock on given target
         """
-        lock_released = False
-        payload = {
-            "query": {"is_setup_free": {"$eq": False},
-                      "setupname": target_name,
-                      },
-            "projection": {"setupname": True, "setup_in_useby": True,
-                           "in_use_for_parallel": True, "parallel_client_cnt": True},
-            "db_username": self.db_username,
-            "db_password": self.db_password
-        }
-        is_ok_response = False
-        try:
-            response = requests.request("GET", self.host + self.db_collection + "search",
-                                        headers=self.headers, data=json.dumps(payload))
-            if response.status_code == HTTPStatus.OK:
-                is_ok_response = True
-        except requests.exceptions.RequestException as fault:
-            LOGGER.exception(str(fault))
-            LOGGER.error("Failed to do get request on db")
-
-        if is_ok_response:
-            json_response = json.loads(response.text)
-            if len(json_response["result"]) > 0:
-                shared_lock = json_response["result"][0]["in_use_for_parallel"]
-                if shared_lock:
-                    parallel_cnt = json_response["result"][0]["parallel_client_cnt"]
-                    if parallel_cnt == 1:
-                        payload = {
-                            "filter": {"setupname": target_name},
-                            "update": {"$set": {"is_setup_free": True, "setup_in_useby": "",
-                                                "in_use_for_parallel": False,
-                                                "parallel_client_cnt": 0}}
-                        }
-                    else:
-                        clients = json_response["result"][0]["setup_in_useby"]
-                        new_clients = clients.replace(client, "")
-                        new_clients = new_clients.strip()
-                        new_parallel_cnt = parallel_cnt - 1
-                        payload = {
-                            "filter": {"setupname": target_name},
-                            "update": {"$set": {"setup_in_useby": new_clients,
-                                                "parallel_client_cnt": new_parallel_cnt}}
-                        }
-                else:
-                    payload = {
-                        "filter": {"setupname": target_name, "setup_in_useby": client},
-                        "update": {"$set": {"is_setup_free": True, "setup_in_useby": ""}}
-                    }
-            payload.update(
-                {"db_username": self.db_username,
-                 "db_password": self.db_password})
-            try:
-                response = requests.request("PATCH", self.host + self.db_collection
-                                            + "update", headers=self.headers,
-                                            data=json.dumps(payload))
-                if response.status_code == HTTPStatus.OK:
-                    lock_released = True
-            except requests.exceptions.RequestException as fault:
-                LOGGER.exception(str(fault))
-                LOGGER.error("Failed to do patch request on db")
-            return lock_released
+        lock_released = self.service.release_client(target_name, client)
+        if not lock_released:
+            LOGGER.error("%s does not hold lock on %s", client, target_name)
+        return lock_released
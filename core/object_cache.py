@@ -0,0 +1,250 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Bounded in memory object caches with LRU and TTL eviction and random sampling.
+
+Every operation is O(1): entries live in an OrderedDict kept in recency order, keys are
+also kept in a dense list with a position map so a uniformly random entry can be picked
+and removed by swapping it with the last key, and expiry times are kept in store order.
+"""
+
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+from typing import Hashable
+from typing import Optional
+from typing import Tuple
+
+MISSING = object()
+
+
+class BoundedCache:
+    """
+    Thread safe cache of at most size entries, least recently used evicted first.
+    Usage:
+    cache = BoundedCache(1024 * 1024, ttl=3600)
+    cache.store("bucket/object", checksum)
+    cache.lookup("bucket/object")
+    key, value = cache.pop_random()
+    """
+
+    def __init__(self, size: int, ttl: float = None,
+                 clock: Callable[[], float] = time.monotonic, seed: int = None) -> None:
+        """
+        :param size: Maximum number of entries
+        :param ttl: Seconds an entry lives after it was stored, None for no expiry
+        :param clock: Time source for ttl
+        :param seed: Seed of the sampling random generator
+        """
+        self.maxsize = size
+        self.ttl = ttl
+        self.clock = clock
+        # key -> value, least recently used first
+        self.table = OrderedDict()
+        self._keys = []
+        self._index = dict()
+        # key -> expiry time, oldest store first
+        self._expiry = OrderedDict()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, MISSING) is not MISSING
+
+    def _remove(self, key: Hashable) -> Any:
+        """Drop key from all structures, return its value."""
+        value = self.table.pop(key)
+        index = self._index.pop(key)
+        last = self._keys.pop()
+        if index < len(self._keys):
+            self._keys[index] = last
+            self._index[last] = index
+        self._expiry.pop(key, None)
+        return value
+
+    def _expire(self) -> None:
+        """Remove expired entries, amortized O(1) as they expire in store order."""
+        if self.ttl is None:
+            return
+        now = self.clock()
+        while self._expiry:
+            key, expires = next(iter(self._expiry.items()))
+            if expires > now:
+                return
+            self._remove(key)
+
+    def store(self, key: Hashable, value: Any) -> None:
+        """
+        Store value of key, evicting the least recently used entry when full.
+        :param key: Entry key
+        :param value: Entry value
+        """
+        with self._lock:
+            self._expire()
+            if key in self.table:
+                self.table.move_to_end(key)
+            else:
+                self._index[key] = len(self._keys)
+                self._keys.append(key)
+            self.table[key] = value
+            if self.ttl is not None:
+                self._expiry.pop(key, None)
+                self._expiry[key] = self.clock() + self.ttl
+            while len(self.table) > self.maxsize:
+                self._remove(next(iter(self.table)))
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Value of key marked as recently used, default when missing or expired."""
+        with self._lock:
+            self._expire()
+            value = self.table.get(key, MISSING)
+            if value is MISSING:
+                return default
+            self.table.move_to_end(key)
+            return value
+
+    def lookup(self, key: Hashable) -> Any:
+        """
+        Lookup cache for key.
+        :param key: Entry key
+        :return: val of entry, KeyError when missing or expired
+        """
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            raise KeyError(key)
+        return value
+
+    def delete(self, key: Hashable) -> None:
+        """Remove entry of key if present."""
+        with self._lock:
+            if key in self.table:
+                self._remove(key)
+
+    def sample(self) -> Optional[Tuple[Hashable, Any]]:
+        """Uniformly random (key, value) left in the cache, None when empty."""
+        with self._lock:
+            self._expire()
+            if not self._keys:
+                return None
+            key = self._keys[self._random.randrange(len(self._keys))]
+            return key, self.table[key]
+
+    def pop_random(self) -> Optional[Tuple[Hashable, Any]]:
+        """Remove and return a uniformly random (key, value), None when empty."""
+        with self._lock:
+            self._expire()
+            if not self._keys:
+                return None
+            key = self._keys[self._random.randrange(len(self._keys))]
+            return key, self._remove(key)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self.table.clear()
+            self._keys.clear()
+            self._index.clear()
+            self._expiry.clear()
+
+
+class ShardedCache:
+    """
+    BoundedCache split in shards by key hash, each with its own lock.
+
+    LRU eviction and the size bound apply per shard, size / shards entries each.
+    pop_random stays uniform over all entries by picking a shard weighted by its size.
+    Usage:
+    cache = ShardedCache(1024 * 1024, shards=16)
+    """
+
+    def __init__(self, size: int, shards: int = 16, ttl: float = None,
+                 clock: Callable[[], float] = time.monotonic, seed: int = None) -> None:
+        per_shard = -(-size // shards)
+        self.maxsize = per_shard * shards
+        self.shards = [BoundedCache(per_shard, ttl, clock, None if seed is None else seed + i)
+                       for i in range(shards)]
+        self._random = random.Random(seed)
+
+    def _shard(self, key: Hashable) -> BoundedCache:
+        return self.shards[hash(key) % len(self.shards)]
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._shard(key)
+
+    def store(self, key: Hashable, value: Any) -> None:
+        """Store value of key in its shard."""
+        self._shard(key).store(key, value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Value of key, default when missing or expired."""
+        return self._shard(key).get(key, default)
+
+    def lookup(self, key: Hashable) -> Any:
+        """Value of key, KeyError when missing or expired."""
+        return self._shard(key).lookup(key)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove entry of key if present."""
+        self._shard(key).delete(key)
+
+    def _weighted_shard(self) -> Optional[BoundedCache]:
+        sizes = [len(shard) for shard in self.shards]
+        total = sum(sizes)
+        if not total:
+            return None
+        pick = self._random.randrange(total)
+        for shard, size in zip(self.shards, sizes):
+            if pick < size:
+                return shard
+            pick -= size
+        return self.shards[-1]
+
+    def sample(self) -> Optional[Tuple[Hashable, Any]]:
+        """Uniformly random (key, value), None when empty."""
+        for _ in range(len(self.shards)):
+            shard = self._weighted_shard()
+            entry = shard.sample() if shard else None
+            if entry is not None or shard is None:
+                return entry
+        return None
+
+    def pop_random(self) -> Optional[Tuple[Hashable, Any]]:
+        """Remove and return a uniformly random (key, value), None when empty."""
+        # A shard emptied by another thread after weighting is retried
+        for _ in range(len(self.shards)):
+            shard = self._weighted_shard()
+            entry = shard.pop_random() if shard else None
+            if entry is not None or shard is None:
+                return entry
+        return None
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        for shard in self.shards:
+            shard.clear()
@@ -23,16 +23,15 @@ import getpass
 import json
 import os
 import pathlib
-import secrets
 import threading
 import random
 import uuid
 import logging
-from collections import deque
 from typing import Tuple
 from typing import Optional
 from typing import Any
 from config import CMN_CFG
+from core.object_cache import BoundedCache
 from libs.di.di_run_man import RunDataCheckManager
 from libs.di.di_mgmt_ops import ManagementOPs
 
@@ -182,65 +181,13 @@ def stop_parallel_io(io_thread, stop):
     io_thread.join()
 
 
-class LRUCache:
+class LRUCache(BoundedCache):
     """
     In memory cache for storing test id and test node information
-    """
-
-    def __init__(self, size: int) -> None:
-        self.maxsize = size
-        self.fifo = deque()
-        self.table = dict()
-        self._lock = threading.Lock()
-
-    def store(self, key: str, value: str) -> None:
-        """
-        Stores the key and value and evicts left most old entry.
-        :param key:
-        :param value:
-        """
-        self._lock.acquire()
-        if key not in self.table:
-            self.fifo.append(key)
-        self.table[key] = value
-
-        if len(self.fifo) > self.maxsize:
-            del_key = self.fifo.popleft()
-            try:
-                del self.table[del_key]
-            except KeyError as ke:
-                pass
-        self._lock.release()
-
-    def lookup(self, key: str) -> str:
-        """
-        Lookup cache for key.
-        :param key:
-        :return: val of entry
-        """
-        self._lock.acquire()
-        try:
-            val = self.table[key]
-        finally:
-            self._lock.release()
-        return val
 
-    def delete(self, key: str) -> None:
-        """
-        Removes the table entry. The fifo list entry is removed whenever we
-        cache is full.
-        """
-        self._lock.acquire()
-        try:
-            del self.table[key]
-        except KeyError as ke:
-            pass
-        try:
-            self.fifo.remove(key)
-        except ValueError as ve:
-            pass
-        finally:
-            self._lock.release()
+    Evicts the least recently used entry once size entries are stored, table maps keys
+    to values in recency order.
+    """
 
 
 class InMemoryDB(LRUCache):
@@ -250,14 +197,7 @@ class InMemoryDB(LRUCache):
         """
         Pop one table entry randomly.
         """
-        self._lock.acquire()
-        keys = list(self.table.keys())
-        if len(keys) == 0:
-            self._lock.release()
+        entry = self.pop_random()
+        if entry is None:
             return False, False
-        key = secrets.choice(keys)
-        try:
-            val = self.table.pop(key)
-        finally:
-            self._lock.release()
-        return key, val
+        return entry
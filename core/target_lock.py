@@ -0,0 +1,292 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Target locks with leases and fencing tokens on the systems collection.
+
+Every state change is one conditional find_one_and_update, so two runners can never
+both win a target. A lock is held by a list of (client, expires) holders and is free
+once lock_expires has passed, which recovers targets of crashed runners without manual
+cleanup. lock_fence is incremented on every new lock and returned as fencing token;
+renew and release only match the token they were granted. The legacy fields
+is_setup_free, setup_in_useby, in_use_for_parallel and parallel_client_cnt are kept in
+step for existing readers of the collection, setup_in_useby names the first holder of a
+shared lock.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from datetime import timedelta
+from typing import Callable
+from typing import Iterable
+from typing import NamedTuple
+from typing import Optional
+
+from pymongo import ReturnDocument
+
+from commons import constants as common_cnst
+
+LOGGER = logging.getLogger(__name__)
+
+LEASE_SECS = 600
+HEARTBEAT_SECS = LEASE_SECS / 3
+
+
+class Lease(NamedTuple):
+    """Lock granted to a client."""
+
+    target: str
+    client: str
+    mode: str
+    token: int
+    expires: datetime
+
+
+class TargetLockService:
+    """
+    Exclusive and shared leases on targets of a pymongo (or mongomock) collection.
+    Usage:
+    service = TargetLockService(collection)
+    lease = service.acquire_any(["target1", "target2"], client, EXCLUSIVE_LOCK)
+    service.renew(lease)
+    service.release(lease)
+    """
+
+    def __init__(self, collection, lease_secs: float = LEASE_SECS,
+                 clock: Callable[[], datetime] = datetime.utcnow) -> None:
+        self.collection = collection
+        self.lease_secs = lease_secs
+        self.clock = clock
+
+    def _expiry(self, now: datetime, lease_secs: float = None) -> datetime:
+        return now + timedelta(seconds=lease_secs or self.lease_secs)
+
+    @staticmethod
+    def _free(now: datetime) -> dict:
+        """Filter of targets without a live lock, legacy locks without lease count as held."""
+        return {"$or": [{"lock_expires": {"$lt": now}},
+                        {"lock_expires": None, "is_setup_free": True}]}
+
+    @staticmethod
+    def _live_shared(now: datetime) -> dict:
+        return {"lock_mode": common_cnst.SHARED_LOCK, "lock_expires": {"$gte": now}}
+
+    @staticmethod
+    def _lease(doc: Optional[dict], client: str) -> Optional[Lease]:
+        if doc is None:
+            return None
+        expires = [holder["expires"] for holder in doc["lock_holders"]
+                   if holder["client"] == client]
+        return Lease(doc["setupname"], client, doc["lock_mode"], doc["lock_fence"],
+                     max(expires))
+
+    def _new_lock(self, query: dict, client: str, mode: str, now: datetime,
+                  sort: list = None) -> Optional[Lease]:
+        """Take a lock with a new fencing token on the first document matching query."""
+        expires = self._expiry(now)
+        shared = mode == common_cnst.SHARED_LOCK
+        doc = self.collection.find_one_and_update(
+            query,
+            {"$set": {"lock_mode": mode, "lock_holders": [{"client": client,
+                                                           "expires": expires}],
+                      "lock_expires": expires, "is_setup_free": False,
+                      "setup_in_useby": client,
+                      "in_use_for_parallel": shared, "parallel_client_cnt": int(shared)},
+             "$inc": {"lock_fence": 1}},
+            sort=sort, return_document=ReturnDocument.AFTER)
+        return self._lease(doc, client)
+
+    def _join_shared(self, query: dict, client: str, now: datetime,
+                     sort: list = None) -> Optional[Lease]:
+        """Add client to a live shared lock matching query."""
+        expires = self._expiry(now)
+        doc = self.collection.find_one_and_update(
+            dict(query, **self._live_shared(now), **{"lock_holders.client": {"$ne": client}}),
+            {"$push": {"lock_holders": {"client": client, "expires": expires}},
+             "$max": {"lock_expires": expires},
+             "$inc": {"parallel_client_cnt": 1}},
+            sort=sort, return_document=ReturnDocument.AFTER)
+        return self._lease(doc, client)
+
+    def acquire(self, target: str, client: str,
+                mode: str = common_cnst.EXCLUSIVE_LOCK) -> Optional[Lease]:
+        """
+        Lock target for client.
+
+        :param mode: EXCLUSIVE_LOCK or SHARED_LOCK, a shared request joins a live shared
+            lock or takes a free target.
+        :return: Lease or None when target is held in a conflicting mode.
+        """
+        now = self.clock()
+        query = {"setupname": target}
+        if mode == common_cnst.SHARED_LOCK:
+            lease = self._join_shared(query, client, now)
+            if lease is not None:
+                return lease
+        return self._new_lock(dict(query, **self._free(now)), client, mode, now)
+
+    def acquire_any(self, targets: Iterable[str], client: str,
+                    mode: str = common_cnst.EXCLUSIVE_LOCK,
+                    healthy_only: bool = True) -> Optional[Lease]:
+        """
+        Lock any free target of targets in one round trip.
+
+        Shared requests first try to join a target already shared, which costs a second
+        round trip when none is.
+        :return: Lease or None when every target is busy.
+        """
+        now = self.clock()
+        query = {"setupname": {"$in": list(targets)}}
+        if healthy_only:
+            query["is_setup_healthy"] = True
+        sort = [("setupname", 1)]
+        if mode == common_cnst.SHARED_LOCK:
+            lease = self._join_shared(query, client, now, sort)
+            if lease is not None:
+                return lease
+        return self._new_lock(dict(query, **self._free(now)), client, mode, now, sort)
+
+    def upgrade(self, lease: Lease) -> Optional[Lease]:
+        """Turn a shared lease into an exclusive one when no other live holder remains."""
+        now = self.clock()
+        query = {"setupname": lease.target, "lock_fence": lease.token,
+                 "lock_holders.client": lease.client,
+                 "lock_holders": {"$not": {"$elemMatch": {"client": {"$ne": lease.client},
+                                                          "expires": {"$gte": now}}}},
+                 **self._live_shared(now)}
+        return self._new_lock(query, lease.client, common_cnst.EXCLUSIVE_LOCK, now)
+
+    def renew(self, lease: Lease, lease_secs: float = None) -> Optional[Lease]:
+        """Extend lease, None when it was lost (expired and taken over or released)."""
+        now = self.clock()
+        expires = self._expiry(now, lease_secs)
+        doc = self.collection.find_one_and_update(
+            {"setupname": lease.target, "lock_fence": lease.token,
+             "lock_holders": {"$elemMatch": {"client": lease.client,
+                                             "expires": {"$gte": now}}}},
+            {"$set": {"lock_holders.$.expires": expires}, "$max": {"lock_expires": expires}},
+            return_document=ReturnDocument.AFTER)
+        return self._lease(doc, lease.client)
+
+    def release(self, lease: Lease) -> bool:
+        """Drop client from the lock, the target is freed with its last holder."""
+        return self.release_client(lease.target, lease.client, lease.token)
+
+    def release_client(self, target: str, client: str, token: int = None) -> bool:
+        """Release by client name, token restricts it to one lock generation."""
+        query = {"setupname": target, "lock_holders.client": client}
+        if token is not None:
+            query["lock_fence"] = token
+        doc = self.collection.find_one_and_update(
+            query, {"$pull": {"lock_holders": {"client": client}},
+                    "$inc": {"parallel_client_cnt": -1}},
+            return_document=ReturnDocument.AFTER)
+        if doc is None:
+            return False
+        if doc["lock_holders"]:
+            self.collection.update_one(
+                {"setupname": target, "lock_fence": doc["lock_fence"], "setup_in_useby": client},
+                {"$set": {"setup_in_useby": doc["lock_holders"][0]["client"]}})
+            return True
+        self.collection.update_one(
+            {"setupname": target, "lock_fence": doc["lock_fence"], "lock_holders": []},
+            {"$set": {"lock_mode": None, "lock_expires": None, "is_setup_free": True,
+                      "setup_in_useby": "", "in_use_for_parallel": False,
+                      "parallel_client_cnt": 0}})
+        return True
+
+    def holds(self, target: str, client: str, mode: str = None) -> bool:
+        """True when client holds a live lock on target, of mode when given."""
+        query = {"setupname": target,
+                 "lock_holders": {"$elemMatch": {"client": client,
+                                                 "expires": {"$gte": self.clock()}}}}
+        if mode is not None:
+            query["lock_mode"] = mode
+        return self.collection.count_documents(query, limit=1) > 0
+
+    def free_target(self, targets: Iterable[str], mode: str = common_cnst.EXCLUSIVE_LOCK,
+                    healthy_only: bool = True) -> Optional[str]:
+        """Name of a target a request of mode could lock now, without locking it."""
+        now = self.clock()
+        query = {"setupname": {"$in": list(targets)}}
+        if healthy_only:
+            query["is_setup_healthy"] = True
+        query.update(self._live_shared(now) if mode == common_cnst.SHARED_LOCK
+                     else self._free(now))
+        doc = self.collection.find_one(query, {"setupname": True},
+                                       sort=[("setupname", 1)])
+        return doc["setupname"] if doc else None
+
+
+class LeaseKeeper:
+    """
+    Heartbeat thread renewing a lease until stopped.
+
+    on_lost is called from the heartbeat thread once the lease is lost, e.g. to tell a
+    running test session to stop.
+    Usage:
+    with LeaseKeeper(service, lease) as keeper:
+        for test in tests:
+            if keeper.lost.is_set():
+                break
+            run_test(test)
+    """
+
+    def __init__(self, service: TargetLockService, lease: Lease,
+                 interval: float = None, on_lost: Callable[[], None] = None) -> None:
+        self.service = service
+        self.lease = lease
+        self.interval = interval or service.lease_secs / 3
+        self.on_lost = on_lost
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                lease = self.service.renew(self.lease)
+            except Exception as error:  # pylint: disable=broad-except
+                LOGGER.warning("Lease renewal of %s failed: %s", self.lease.target, error)
+                continue
+            if lease is None:
+                LOGGER.error("Lease on %s lost by %s", self.lease.target, self.lease.client)
+                self.lost.set()
+                if self.on_lost is not None:
+                    self.on_lost()
+                return
+            self.lease = lease
+
+    def start(self) -> 'LeaseKeeper':
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name=f"lease-{self.lease.target}")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'LeaseKeeper':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
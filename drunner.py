@@ -51,7 +51,6 @@ from core import producer
 from commons.utils import system_utils
 from commons.utils import jira_utils
 from commons.utils import config_utils
-from commons import worker
 from commons import params
 from commons import cortxlogging
 
@@ -196,7 +195,7 @@ def run(opts: dict) -> None:
     # Ensure that only 1 execution is run with multiple targets. This will be enhanced
     # when we start running multiple distributed executions for multiple targets.
     create_topic(kafka_client)
-    work_queue = worker.WorkQ(producer.produce, 1024)
+    work_queue = Queue(1024)
     finish = False  # Use finish to exit loop
     # start kafka producer
     _producer = Thread(target=producer.server,
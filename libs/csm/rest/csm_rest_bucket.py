@@ -82,6 +82,20 @@ class RestS3Bucket(RestTestLib):
                 err.CSM_REST_AUTHENTICATION_ERROR,
                 error) from error
 
+    def create_s3_buckets(self, bucket_names: list, login_as="s3account_user"):
+        """
+        Creates s3 buckets concurrently.
+        :param bucket_names: list of bucket names
+        :param login_as: user type to authenticate as
+        :return: list of responses in bucket name order
+        """
+        self.log.info("Creating %s s3 buckets....", len(bucket_names))
+        endpoint = self.config["s3_bucket_endpoint"]
+        return self.async_rest_calls(
+            [dict(request_type="post", endpoint=endpoint, headers=self.config["Login_headers"],
+                  data=json.dumps({"bucket_name": name})) for name in bucket_names],
+            login_as=login_as)
+
     @RestTestLib.authenticate_and_login
     def list_all_created_buckets(self):
         """
@@ -136,6 +150,19 @@ class RestS3Bucket(RestTestLib):
                 err.CSM_REST_AUTHENTICATION_ERROR,
                 error) from error
 
+    def delete_s3_buckets(self, bucket_names: list, login_as="s3account_user"):
+        """
+        Deletes s3 buckets concurrently.
+        :param bucket_names: list of bucket names
+        :param login_as: user type to authenticate as
+        :return: list of responses in bucket name order
+        """
+        self.log.info("Deleting %s s3 buckets....", len(bucket_names))
+        return self.async_rest_calls(
+            [dict(request_type="delete",
+                  endpoint="{}/{}".format(self.config["s3_bucket_endpoint"], name))
+             for name in bucket_names], login_as=login_as)
+
     def create_and_verify_new_bucket(
             self,
             expect_status_code,
@@ -17,21 +17,87 @@
 # For any questions about this software or licensing,
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
-""" This is the core module for REST API. """
+""" This is the core module for REST API.
 
+Requests of a process go through one pooled requests.Session per CSM endpoint so TCP and
+TLS connections are reused, bearer tokens are shared through TokenCache and
+AsyncRestClient issues many calls concurrently from an asyncio loop.
+"""
+
+import asyncio
 import json
 import logging
+import os
+import threading
+import time
+from http import HTTPStatus
+
 import requests
+from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
 from commons import constants
 from commons.constants import Rest as const
 from config import CMN_CFG
 
+try:
+    import aiohttp
+except ModuleNotFoundError as error:
+    logging.error(error)
+    aiohttp = None
+
+POOL_MAXSIZE = 64
+TOKEN_TTL = 15 * 60
+ASYNC_CONCURRENCY = 100
+
+
+class TokenCache:
+    """Thread safe cache of bearer tokens keyed by (endpoint, username, password)."""
+
+    def __init__(self, ttl: float = TOKEN_TTL) -> None:
+        self.ttl = ttl
+        self.tokens = dict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Cached token of key, None when missing or expired."""
+        with self.lock:
+            entry = self.tokens.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self.tokens[key]
+                return None
+            return entry[0]
+
+    def put(self, key, token, ttl: float = None) -> None:
+        """Cache token of key for ttl seconds."""
+        with self.lock:
+            self.tokens[key] = (token, time.monotonic() + (ttl or self.ttl))
+
+    def invalidate(self, key=None, token=None) -> None:
+        """Drop a key or every key holding token."""
+        with self.lock:
+            if key is not None:
+                self.tokens.pop(key, None)
+            if token is not None:
+                for cached_key in [k for k, v in self.tokens.items() if v[0] == token]:
+                    del self.tokens[cached_key]
+
+    def clear(self) -> None:
+        """Drop all tokens."""
+        with self.lock:
+            self.tokens.clear()
+
+
 class RestClient:
     """
         This is the class for rest calls
     """
 
+    _sessions = dict()
+    _sessions_lock = threading.Lock()
+    token_cache = TokenCache()
+
     def __init__(self, config):
         """
         This function will initialize this class
@@ -40,15 +106,48 @@ class RestClient:
         requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
         self.log = logging.getLogger(__name__)
         self._config = config
-        self._request = {"get": requests.get, "post": requests.post,
-                         "patch": requests.patch, "delete": requests.delete,
-                         "put": requests.put}
         self._base_url = "{}:{}".format(
             self._config["mgmt_vip"], str(self._config["port"]))
+        self.session = self.get_session(self._base_url)
+        self._request = {"get": self.session.get, "post": self.session.post,
+                         "patch": self.session.patch, "delete": self.session.delete,
+                         "put": self.session.put}
         self._json_file_path = self._config[
             "jsonfile"] if 'jsonfile' in self._config else const.JOSN_FILE
         self.secure_connection = self._config["secure"]
 
+    @classmethod
+    def get_session(cls, base_url: str) -> requests.Session:
+        """Pooled session shared by all clients of base_url in this process."""
+        key = (os.getpid(), base_url)
+        with cls._sessions_lock:
+            session = cls._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                cls._sessions[key] = session
+            return session
+
+    def request_url(self, endpoint=None):
+        """Full url of endpoint on the configured CSM."""
+        set_secure = const.SSL_CERTIFIED if self.secure_connection else const.NON_SSL
+        if endpoint is None:
+            return "{}{}".format(set_secure, self._base_url)
+        return "{}{}{}".format(set_secure, self._base_url, endpoint)
+
+    def token_key(self, username, password):
+        """Token cache key of a user on this CSM."""
+        return self._base_url, username, password
+
+    def _track_token(self, endpoint, headers, status_code):
+        """Forget a token rejected by the server or logged out."""
+        token = (headers or {}).get("Authorization")
+        if token and (status_code == HTTPStatus.UNAUTHORIZED or
+                      (endpoint and endpoint == self._config.get("rest_logout_endpoint"))):
+            self.token_cache.invalidate(token=token)
+
     # pylint: disable=too-many-arguments
     def rest_call(self, request_type, endpoint=None,
                   data=None, headers=None, params=None, json_dict=None,
@@ -65,11 +164,7 @@ class RestClient:
         :return: response of the request
         """
         # Building final endpoint request url
-        set_secure = const.SSL_CERTIFIED if self.secure_connection else const.NON_SSL
-        if endpoint is None:
-            request_url = "{}{}".format(set_secure, self._base_url)
-        else:
-            request_url = "{}{}{}".format(set_secure, self._base_url, endpoint)
+        request_url = self.request_url(endpoint)
         self.log.debug("Request URL : %s", request_url)
         self.log.debug("Request type : %s", request_type.upper())
         self.log.debug("Header : %s", headers)
@@ -86,6 +181,7 @@ class RestClient:
             request_url, headers=headers,
             data=data, params=params, verify=False, json=json_dict)
         self.log.debug("Response Object: %s", response_object)
+        self._track_token(endpoint, headers, response_object.status_code)
         try:
             self.log.debug("Response JSON: %s", response_object.json())
         except BaseException:
@@ -134,3 +230,73 @@ class RestClient:
                 json_file.write(json.dumps(response_object.json(), indent=4))
 
         return response_object
+
+
+class AsyncRestResponse:
+    """Subset of requests.Response returned by AsyncRestClient."""
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        """Body decoded as utf-8."""
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        """Body parsed as json."""
+        return json.loads(self.content)
+
+    def __repr__(self):
+        return f"<AsyncRestResponse [{self.status_code}]>"
+
+
+class AsyncRestClient(RestClient):
+    """asyncio variant of RestClient for issuing many calls concurrently.
+    Usage:
+    async with AsyncRestClient(CSM_REST_CFG) as client:
+        responses = await client.gather([dict(request_type="get", endpoint=ep,
+                                              headers=headers)] * 100)
+    """
+
+    def __init__(self, config, concurrency: int = ASYNC_CONCURRENCY):
+        if aiohttp is None:
+            raise ModuleNotFoundError("aiohttp is required for AsyncRestClient")
+        super().__init__(config)
+        self.concurrency = concurrency
+        self.async_session = None
+        self.semaphore = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=False)
+        self.async_session = aiohttp.ClientSession(connector=connector)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.async_session.close()
+        self.async_session = None
+
+    # pylint: disable=invalid-overridden-method, arguments-differ, too-many-arguments
+    async def rest_call(self, request_type, endpoint=None, data=None, headers=None,
+                        params=None, json_dict=None):
+        """Async REST call, see RestClient.rest_call."""
+        if CMN_CFG.get("product_family") == constants.PROD_FAMILY_LC:
+            data = json.dumps(data) if isinstance(data, dict) else data
+        if params:
+            params = {key: str(value) for key, value in params.items() if value is not None}
+        async with self.semaphore:
+            async with self.async_session.request(
+                    request_type.upper(), self.request_url(endpoint), headers=headers,
+                    data=data, params=params, json=json_dict) as resp:
+                response = AsyncRestResponse(resp.status, resp.headers.copy(),
+                                             await resp.read())
+        self.log.debug("%s %s: %s", request_type.upper(), endpoint, response)
+        self._track_token(endpoint, headers, response.status_code)
+        return response
+
+    async def gather(self, calls):
+        """Run rest_call(**call) for every call concurrently, responses keep call order."""
+        return await asyncio.gather(*[self.rest_call(**call) for call in calls])
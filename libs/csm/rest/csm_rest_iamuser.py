@@ -585,6 +585,33 @@ class RestIamUser(RestTestLib):
         self.log.info("Delete IAM user request successfully sent...")
         return response
 
+    def create_iam_users_rgw(self, payloads: list, login_as="csm_admin_user"):
+        """
+        Creates IAM users for given payloads concurrently.
+        :param payloads: list of payloads for user creation
+        :param login_as: user type to authenticate as
+        :return: list of responses in payload order
+        """
+        self.log.info("Creating %s IAM users....", len(payloads))
+        endpoint = self.config["s3_iam_user_endpoint"]
+        return self.async_rest_calls(
+            [dict(request_type="post", endpoint=endpoint, json_dict=payload)
+             for payload in payloads], login_as=login_as)
+
+    def delete_iam_users_rgw(self, uids: list, purge_data=None, login_as="csm_admin_user"):
+        """
+        Delete IAM users concurrently.
+        :param uids: list of userids
+        :param purge_data: If true, delete users data
+        :param login_as: user type to authenticate as
+        :return: list of responses in uid order
+        """
+        self.log.info("Deleting %s IAM users....", len(uids))
+        payload = {"purge_data": purge_data} if purge_data is not None else None
+        return self.async_rest_calls(
+            [dict(request_type="delete", endpoint=self.config["s3_iam_user_endpoint"] + "/" + uid,
+                  json_dict=payload) for uid in uids], login_as=login_as)
+
     @RestTestLib.authenticate_and_login
     def get_iam_user_rgw(self, uid, header):
         """
@@ -77,6 +77,20 @@ class SystemStats(RestTestLib):
             raise CTException(
                 err.CSM_REST_VERIFICATION_FAILED, error) from error
 
+    def get_stats_many(self, queries, login_as="csm_admin_user"):
+        """Get stats for many queries concurrently
+
+        :param list queries: dicts of get_stats keyword arguments
+        :param str login_as: user type to authenticate as
+        :return [list]: responses in query order
+        """
+        self.log.info("Reading stats for %s queries...", len(queries))
+        return self.async_rest_calls(
+            [dict(request_type="get",
+                  endpoint=self._add_parameters(self.config["stats_endpoint"],
+                                                **dict(dict(metrics=None), **query)))
+             for query in queries], login_as=login_as)
+
     def verify_list(self, expected_list, actual_list):
         """Verifies if the given list is the sub set of the actual list
 
@@ -18,10 +18,13 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 """ REST API Alert operation Library. """
+import asyncio
 import logging
 import time
+from http import HTTPStatus
 from random import Random
 from string import Template
+import requests
 from commons.helpers.health_helper import Health
 from commons.helpers.pods_helper import LogicalNode
 import commons.errorcodes as err
@@ -29,6 +32,8 @@ from commons.constants import Rest as const
 from commons.exceptions import CTException
 from config import CSM_REST_CFG
 from config import CMN_CFG
+from libs.csm.rest.csm_rest_core_lib import AsyncRestClient
+from libs.csm.rest.csm_rest_core_lib import ASYNC_CONCURRENCY
 from libs.csm.rest.csm_rest_core_lib import RestClient
 
 
@@ -177,11 +182,56 @@ class RestTestLib:
                 err.CSM_REST_AUTHENTICATION_ERROR, error) from error
         return response
 
+    def _login_credentials(self, login_as):
+        """(username, password) of a config user type or credentials dict."""
+        creds = login_as if isinstance(login_as, dict) else self.config[login_as]
+        return creds.get("username"), creds.get("password")
+
+    def get_login_token(self, login_as="csm_admin_user"):
+        """
+        Bearer token of login_as from the token cache, logging in on a miss.
+        :param login_as: config user type or dict with username and password
+        :return: Authorization header value
+        """
+        key = self.restapi.token_key(*self._login_credentials(login_as))
+        token = self.restapi.token_cache.get(key)
+        if token is None:
+            response = self.rest_login(login_as=login_as)
+            if response.status_code != const.SUCCESS_STATUS:
+                self.log.error("Authentication request failed in %s.\nResponse code : %s",
+                               RestTestLib.get_login_token.__name__, response.status_code)
+                self.log.error("Response content: %s", response.content)
+                self.log.error("Request headers : %s\nRequest body : %s",
+                               response.request.headers, response.request.body)
+                raise CTException(err.CSM_REST_AUTHENTICATION_ERROR)
+            token = response.headers['Authorization']
+            self.restapi.token_cache.put(key, token)
+        return token
+
+    def async_rest_calls(self, calls, login_as="csm_admin_user",
+                         concurrency=ASYNC_CONCURRENCY):
+        """
+        Issue REST calls concurrently with the cached token of login_as.
+        :param calls: list of RestClient.rest_call keyword dicts, headers are added
+        :param login_as: config user type or dict with username and password
+        :param concurrency: maximum calls in flight
+        :return: list of AsyncRestResponse in call order
+        """
+        headers = {'Authorization': self.get_login_token(login_as)}
+
+        async def run():
+            async with AsyncRestClient(self.config, concurrency) as client:
+                return await client.gather(
+                    [dict(call, headers=dict(call.get("headers") or {}, **headers))
+                     for call in calls])
+        return asyncio.run(run())
+
     @staticmethod
     def authenticate_and_login(func):
         """
         :type: Decorator
-        :functionality: Authorize the user before any rest calls
+        :functionality: Authorize the user before any rest calls, with reuse_token=True the
+            cached token is reused across calls until it expires or the server answers 401
         """
 
         def create_authenticate_header(self, *args, **kwargs):
@@ -192,6 +242,7 @@ class RestTestLib:
             :param kwargs: keyword arguments of the executable function
             :keyword login_as : type of user making the REST call (string)
             :keyword authorized : to verify unauthorized scenarios (boolean)
+            :keyword reuse_token : use the cached login token instead of a fresh login (boolean)
             :return: function executables
             """
             self.headers = {}  # Initiate headers
@@ -200,8 +251,19 @@ class RestTestLib:
             login_type = kwargs.pop("login_as") if "login_as" in kwargs else "csm_admin_user"
             # Checking the requirements to authorize
             authorized = kwargs.pop("authorized") if "authorized" in kwargs else True
-            # Fetching the login response
+            reuse_token = kwargs.pop("reuse_token") if "reuse_token" in kwargs else False
             self.log.debug("user will be logged in as %s", login_type)
+            if authorized and reuse_token:
+                # Fetching the cached login token
+                self.headers = {'Authorization': self.get_login_token(login_type)}
+                response = func(self, *args, **kwargs)
+                if isinstance(response, requests.Response) and \
+                        response.status_code == HTTPStatus.UNAUTHORIZED:
+                    self.log.debug("Token rejected, logging in again as %s", login_type)
+                    self.headers = {'Authorization': self.get_login_token(login_type)}
+                    response = func(self, *args, **kwargs)
+                return response
+            # Fetching the login response
             response = self.rest_login(login_as=login_type)
             if authorized and response.status_code == const.SUCCESS_STATUS:
                 self.headers = {'Authorization': response.headers['Authorization']}
@@ -294,6 +356,8 @@ class RestTestLib:
                                response.request.headers, response.request.body)
                 raise CTException(err.CSM_REST_AUTHENTICATION_ERROR)
             token = response.headers['Authorization']
+            # Always a fresh session, the new token replaces the cached one
+            self.restapi.token_cache.put(self.restapi.token_key(user_name, user_password), token)
             headers = {'Authorization': token}
             conf_headers = self.config["Login_headers"]
             headers.update(conf_headers)
@@ -20,16 +20,18 @@
 """Generate test data for S3 I/O with desired compression, duplication and formats.
 Size could be as small as 1 byte to 1 GB.
 """
+import io
 import os
 import logging
-import array
 import random
+import struct
 import zlib
 import hashlib
 import string
 from typing import Union
 from typing import Tuple
 from typing import Any
+from typing import Iterator
 from Crypto.Cipher import AES
 from pathlib import Path
 from commons import params
@@ -45,6 +47,10 @@ U_LIMIT = 10 ** 6
 CMPR_RATIOS = (1, 2, 3, 4, 5, 6, 7, 8)
 SMALL_BLOCK_SIZES = [4 * KB, 8 * KB, 16 * KB, 32 * KB, 64 * KB, 128 * KB]
 MEDIUM_BLOCK_SIZES = [4 * MB, 8 * MB, 16 * MB, 21 * MB, 32 * MB, 64 * MB, 128 * MB]
+PAYLOAD_BLOCK_SIZE = 64 * KB
+PAYLOAD_FILL_BYTE = b'i'
+PAYLOAD_KEY_FMT = '<8sqQ'
+PAYLOAD_KEY_TAG = b'cortx-di'
 
 LOGGER = logging.getLogger(__name__)
 
@@ -59,6 +65,191 @@ def decompress(buf):
     return zlib.decompress(buf)
 
 
+def allocate_buffer(size: int) -> memoryview:
+    """Allocate a writable byte buffer.
+
+    The returned memoryview is of format 'B' and can be handed to
+    SeededPayload.fill, file writes or boto3 without further copies.
+    """
+    return memoryview(bytearray(size))
+
+
+class SeededPayload:
+    """Deterministic, range addressable payload of an object.
+
+    The object is laid out in fixed blocks of PAYLOAD_BLOCK_SIZE. Every block starts with
+    ``block_len // c_ratio`` incompressible bytes drawn from SHAKE-128 keyed by
+    (seed, block number) and is padded with PAYLOAD_FILL_BYTE, so the object compresses
+    roughly by ``c_ratio`` and any byte range ``[off, off + len)`` can be regenerated from
+    (seed, size, c_ratio) alone without producing the bytes before it.
+    Usage:
+    p = SeededPayload(seed=10, size=128 * MB, c_ratio=2)
+    md5sum = p.checksum('md5')
+    part = p.read_range(5 * MB, 5 * MB)
+    """
+
+    def __init__(self,
+                 seed: int,
+                 size: int,
+                 c_ratio: int = 1,
+                 block_size: int = PAYLOAD_BLOCK_SIZE) -> None:
+        if size < 0:
+            raise ValueError(f"Invalid payload size {size}")
+        if c_ratio < 1:
+            raise ValueError(f"Invalid compression ratio {c_ratio}")
+        self.seed = seed
+        self.size = size
+        self.c_ratio = c_ratio
+        self.block_size = block_size
+        self._fill = memoryview(PAYLOAD_FILL_BYTE * block_size)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _block(self, index: int) -> bytes:
+        """Return the incompressible head of block ``index``."""
+        block_len = min(self.block_size, self.size - index * self.block_size)
+        key = struct.pack(PAYLOAD_KEY_FMT, PAYLOAD_KEY_TAG, self.seed, index)
+        return hashlib.shake_128(key).digest(max(block_len // self.c_ratio, 1))
+
+    def fill(self, buf: Any, offset: int = 0) -> int:
+        """
+        Write payload bytes starting at ``offset`` into the writable buffer ``buf``.
+
+        :param buf: bytearray, memoryview, numpy array or any writable buffer.
+        :param offset: object offset of buf[0].
+        :return: number of bytes written, less than len(buf) only at end of object.
+        """
+        out = memoryview(buf).cast('B')
+        end = min(offset + len(out), self.size)
+        pos = offset
+        while pos < end:
+            index, boff = divmod(pos, self.block_size)
+            bend = min(self.block_size - boff, end - pos)
+            head = self._block(index)
+            dst = pos - offset
+            if boff < len(head):
+                hlen = min(len(head) - boff, bend)
+                out[dst:dst + hlen] = head[boff:boff + hlen]
+                dst += hlen
+                bend -= hlen
+                pos += hlen
+            if bend:
+                out[dst:dst + bend] = self._fill[:bend]
+                pos += bend
+        return max(end - offset, 0)
+
+    def read_range(self, offset: int, length: int) -> memoryview:
+        """Return bytes ``[offset, offset + length)`` of the object in a new buffer."""
+        length = max(min(length, self.size - offset), 0)
+        buf = allocate_buffer(length)
+        self.fill(buf, offset)
+        return buf
+
+    def buffer(self) -> memoryview:
+        """Return the whole object in a single preallocated buffer."""
+        return self.read_range(0, self.size)
+
+    def iter_chunks(self,
+                    chunk_size: int = 8 * MB,
+                    offset: int = 0,
+                    length: int = None) -> Iterator[memoryview]:
+        """
+        Yield the range ``[offset, offset + length)`` in chunks of at most chunk_size.
+
+        A single buffer is reused, consumers must copy a chunk if they keep it
+        beyond the next iteration.
+        """
+        end = self.size if length is None else min(offset + length, self.size)
+        buf = allocate_buffer(min(chunk_size, max(end - offset, 0)))
+        while offset < end:
+            count = self.fill(buf[:min(chunk_size, end - offset)], offset)
+            yield buf[:count]
+            offset += count
+
+    def checksum(self, algo: str = 'md5', chunk_size: int = 8 * MB) -> str:
+        """Hex digest of the whole object computed without materializing it."""
+        csum = hashlib.new(algo)
+        for chunk in self.iter_chunks(chunk_size):
+            csum.update(chunk)
+        return csum.hexdigest()
+
+
+class SeededPayloadReader(io.RawIOBase):
+    """Read only, seekable file object over a SeededPayload.
+
+    It can be handed to boto3 upload_fileobj so that data is generated while it is sent
+    and never touches local disk. Checksums are computed incrementally on the same pass;
+    bytes re-read after a seek back (retries, part re-sends) are not hashed twice and any
+    gap left by a forward seek is regenerated when the digest is requested.
+    Usage:
+    reader = SeededPayloadReader(SeededPayload(seed=10, size=32 * MB, c_ratio=2))
+    s3.meta.client.upload_fileobj(reader, bucket, key)
+    md5sum = reader.hexdigest()
+    """
+
+    def __init__(self,
+                 payload: SeededPayload,
+                 algos: Tuple[str, ...] = ('md5',)) -> None:
+        super().__init__()
+        self.payload = payload
+        self.pos = 0
+        self.hashed = 0
+        self.hashers = {algo: hashlib.new(algo) for algo in algos}
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self.pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.payload.size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self.pos = pos
+        return self.pos
+
+    def readinto(self, buf: Any) -> int:
+        view = memoryview(buf).cast('B')
+        count = self.payload.fill(view, self.pos)
+        self._update(view[:count], self.pos)
+        self.pos += count
+        return count
+
+    def _update(self, view: memoryview, offset: int) -> None:
+        """Feed hashers with the part of view beyond what is already hashed."""
+        if offset > self.hashed:
+            self._hash_upto(offset)
+        end = offset + len(view)
+        if end > self.hashed:
+            for hasher in self.hashers.values():
+                hasher.update(view[self.hashed - offset:])
+            self.hashed = end
+
+    def _hash_upto(self, end: int) -> None:
+        for chunk in self.payload.iter_chunks(offset=self.hashed, length=end - self.hashed):
+            for hasher in self.hashers.values():
+                hasher.update(chunk)
+        self.hashed = max(self.hashed, min(end, self.payload.size))
+
+    def hexdigest(self, algo: str = 'md5') -> str:
+        """Digest of the whole object, hashing whatever was not read yet."""
+        if self.hashed < self.payload.size:
+            self._hash_upto(self.payload.size)
+        return self.hashers[algo].hexdigest()
+
+
 class DataGenerator:
     """Data generator for I/O testing.
     Usage:
@@ -85,56 +276,47 @@ class DataGenerator:
 
         """Assume size is less than 5GB.
         Keeping de-dupe and compression ratio separate for avoiding complexity in buffer
-        stream.
+        stream. Data is produced by SeededPayload straight into a preallocated buffer,
+        the same seed always reproduces the same bytes.
 
             compressibility (in %) = 100 - (1.0/compression_ratio * 100)
 
         """
         csum = hashlib.sha1()
         if size == 0:
-            buf = ''
+            buf = b''
             csum.update(buf)
             chksum = csum.hexdigest()
             return buf, chksum
 
-        if datatype == DEFAULT_DATA_TYPE:
+        if seed is None:
+            seed = self.get_random_seed()
+        if datatype == ZEROED_DATA_TYPE:
+            buf = bytearray(size)
+        else:
             # Ignoring de-dupe ratio for blobs.
-            if self.compression_ratio >= 1:
-                compressibility = int(100 - (1 / self.compression_ratio * 100))
-                buf = self.__get_data(size, compressibility, seed)
-        buf = buf.encode('utf-8')[:size]  # hack until better solution is found.
+            buf = self.get_payload(seed, size).buffer()
         csum.update(buf)
         chksum = csum.hexdigest()
         return buf, chksum
 
+    def get_payload(self, seed: int, size: int) -> SeededPayload:
+        """Return range addressable payload for an object with this generator's ratio."""
+        return SeededPayload(seed, size, max(int(self.compression_ratio), 1))
+
+    def generate_range(self,
+                       seed: int,
+                       size: int,
+                       offset: int,
+                       length: int) -> memoryview:
+        """Regenerate bytes [offset, offset + length) of an object from its seed and size."""
+        return self.get_payload(seed, size).read_range(offset, length)
+
     @staticmethod
     def get_random_seed(lower: int = 0,
                         upper: int = U_LIMIT) -> int:
         return random.randint(lower, upper)
 
-    def __get_data(self, size, compressibility, seed=None):
-        buf = self.__get_uncompressible_buffer(compressibility, size, seed)
-        return str(buf) + self.__get_buf(size - len(buf))  # todo can be improved
-
-    def __get_buf(self, size):
-        if size <= 0:
-            return ''
-
-        if size > len(CMN_BUF):
-            return CMN_BUF + self.__get_buf(size - MB)
-        else:
-            return CMN_BUF[:size]
-
-    def __get_uncompressible_buffer(self, compressibility, size, seed=None):
-        if not seed:
-            unc_buf = os.urandom(size)
-            return unc_buf[0: int((size * (1.0 - compressibility / 100.0)))]
-        else:
-            buf = array.array('l', [seed] * size).tobytes()
-            buf = self.encrypt_buf(buf)
-            buf = buf[0: int((size * (1.0 - compressibility / 100.0)))]
-            return buf
-
     def encrypt_buf(self, buf):
         blksz = 16
         sz = len(buf)
@@ -149,6 +331,27 @@ class DataGenerator:
             buf = buf[:sz]
         return buf
 
+    def get_object_name(self,
+                        csum: str = None,
+                        min_sz: int = 5,
+                        max_sz: int = 10) -> str:
+        """Random object name with a known extension, checksum embedded when enabled."""
+        name = ''
+        ext = random.choice(tuple(all_extensions))
+        for i in range(random.randrange(min_sz, max_sz)):
+            name += random.choice(string.ascii_letters + string.digits + '_-')
+        if self.append_csum_file_name and csum:
+            name += '_' + csum
+        name += '_' + 'cx' + ext
+        return name
+
+    def get_stream(self,
+                   seed: int,
+                   size: int,
+                   algos: Tuple[str, ...] = ('md5',)) -> SeededPayloadReader:
+        """File like object generating the seeded payload while it is read."""
+        return SeededPayloadReader(self.get_payload(seed, size), algos=algos)
+
     def save_buf_to_file(self,
                          fbuf: Any,
                          csum: str,
@@ -156,13 +359,7 @@ class DataGenerator:
                          data_folder_prefix: str,
                          min_sz: int = 5,
                          max_sz: int = 10) -> str:
-        name = ''
-        ext = random.sample(all_extensions, 1)[0]
-        for i in range(random.randrange(min_sz, max_sz)):
-            name += random.choice(string.ascii_letters + string.digits + '_-')
-        if self.append_csum_file_name:
-            name += '_' + csum
-        name += '_' + 'cx' + ext
+        name = self.get_object_name(csum, min_sz, max_sz)
         if size < 1024:
             iosize = 1024
         elif (size >= 1024) & (size < 1024 * 1024):
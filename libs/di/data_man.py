@@ -26,7 +26,9 @@ It never talks to server to get any state from server.
 It should be used for validation when data is stored with the cortx-test
 framework. It acts as a hash cache storing the server state on client side.
 
- The structure of the client hash cache is as shown below
+ Entries are persisted in the indexed ObjectMetaStore keyed by
+ (user, bucket, key, version). Bucket containers returned to callers have the
+ structure shown below
 {
  user1={ user=user1,
         email=user1@seagate.com,
@@ -44,15 +46,11 @@ framework. It acts as a hash cache storing the server state on client side.
         }
 }
 """
-import os
 import logging
 import threading
 import random
-import multiprocessing
-from commons import params
-from commons.utils import system_utils
-from commons.utils import config_utils
-from commons.exceptions import CortxTestException
+import time
+from libs.di.meta_store import ObjectMetaStore
 
 # Container level
 C_LEVEL_TOP = 1
@@ -65,56 +63,29 @@ LOGGER = logging.getLogger(__name__)
 class DataManager(object):
     """ Save objects meta data that went to storage for each test."""
 
-    def __init__(self):
+    def __init__(self, store=None):
         self.buckets = list()
         self.change_tracker = dict()
         self.state = dict()
-        self.rlock = threading.Lock()
-        self.wlock = threading.Lock()
-        self.plock = multiprocessing.Lock()
+        self.store = store if store else ObjectMetaStore()
 
-    def prepare_file_data(self, user):
-        """Read data before saving."""
-        p_home = params.META_DATA_HOME
-        if not os.path.exists(p_home):
-            try:
-                system_utils.mkdirs(p_home)
-            except (OSError, Exception) as fault:
-                LOGGER.exception(str(fault), exc_info=fault.__traceback__)
-                raise
-
-        fpath = os.path.join(p_home, user + params.USER_META_JSON)
-
-        if not os.path.exists(fpath):
-            fpath = config_utils.create_content_json(fpath, {}, ensure_ascii=True)
-            LOGGER.info(f'Created metadata file for user {user}')
-        return fpath
-
-    def store_file_data(self, data, user):
-        """Store data in user meta json file.
-        The data needs to comply with the json structure.
-        """
-        p_home = params.META_DATA_HOME
-        fpath = os.path.join(p_home, user + params.USER_META_JSON)
-        if not os.path.exists(fpath):
-            raise CortxTestException('It is expected that the json path should be created by now')
-        config_utils.create_content_json(fpath, data, ensure_ascii=True)
+    @staticmethod
+    def _file_entry(entry):
+        """Convert a store entry to the bucket container file format."""
+        return dict(name=entry['key'], checksum=entry['checksum'], sz=entry['size'],
+                    seed=entry['seed'], mtime=entry['mtime'])
 
     def get_all_buckets_data_for_user(self, user):
         if user is None:
             raise ValueError('user is mandatory')
-
-        fpath = self.prepare_file_data(user)
-        # improve with ijson lib
-        data = config_utils.read_content_json(fpath=fpath)
-        if data:
-            if user != data['name']:
-                return None
-            if not data['buckets']:
-                return None
-            return data['buckets']
-        else:
-            return None
+        buckets = list()
+        for entry in self.store.iter_prefix(user):
+            if not buckets or buckets[-1]['name'] != entry['bucket']:
+                bkt_container = self.get_container(level=C_LEVEL_BUCKET)
+                bkt_container['name'] = entry['bucket']
+                buckets.append(bkt_container)
+            buckets[-1]['files'].append(self._file_entry(entry))
+        return buckets if buckets else None
 
     def get_files_within_bucket(self, bkt_container, bucket):
         if bucket is not None and bkt_container:
@@ -123,11 +94,17 @@ class DataManager(object):
             return bkt_container['files']
         return None
 
-    def get_file_within_bucket(self, name, bkt_container, bucket):
+    def get_file_within_bucket(self, name, bkt_container, bucket, user=None):
         """Find file within a bucket and return None if not.
-        Returns the same dict object within bucket container.
+        With user the entry is looked up in the store index, otherwise the
+        bucket container is searched and the same dict object is returned.
         """
-        if bucket is not None and bkt_container:
+        if bucket is None:
+            return None
+        if user is not None:
+            entry = self.store.get(user, bucket, name)
+            return self._file_entry(entry) if entry else None
+        if bkt_container:
             for _file_dict in bkt_container['files']:
                 if _file_dict['name'] == name:
                     return _file_dict
@@ -151,54 +128,28 @@ class DataManager(object):
         """Protected API."""
         return True if bucket in self.buckets else False
 
-    def _get_bucket_container_from_buckets(self, data, bucket, user):
-        """Protected get bucket container API."""
-        if user is None:
-            raise ValueError('user is mandatory')
-        if data:
-            if user != data['name'] or not data['buckets']:
-                container = self.get_container(level=C_LEVEL_BUCKET)
-                container['name'] = bucket
-                return container, False
-            for bkt in data['buckets']:
-                if bkt['name'] == bucket:
-                    return bkt, True
-        # means create a container for caller
-        container = self.get_container(level=C_LEVEL_BUCKET)
-        container['name'] = bucket
-        return container, False  # anyway return an empty container
-
     def add_file_to_bucket(self, user, bucket, file_dict):
-        """The updates within process will be in-memory and then persisted to json."""
-        file_obj, checksum = file_dict['name'], file_dict['checksum']
-        size, seed, mtime = file_dict['size'], file_dict['seed'], file_dict['mtime']
-        data = dict()
+        """Persist meta data of a single uploaded object."""
         if bucket is not None:
-            with self.wlock:
-                fpath = self.prepare_file_data(user)
-                data = config_utils.read_content_json(fpath=fpath)
-                if not data or user != data['name']:
-                    data = self.get_container(level=C_LEVEL_USER)
-                    data['name'] = user
-                bkt_container, flag = self._get_bucket_container_from_buckets(data, bucket, user)
-
-                # usage files = self.get_files_within_bucket(bkt_container, user, bucket)
-                fdict = self.get_file_within_bucket(file_obj, bkt_container, bucket)
-                if not fdict:
-                    # format of fdict is name=a.txt, chksum=abcd, seed=1, size=1024
-                    fdict = dict(name=file_obj, checksum=checksum,
-                                 sz=size, seed=seed, mtime=mtime)
-                    bkt_container['files'].append(fdict)
-                else:
-                    fdict['checksum'] = checksum
-                    fdict['sz'] = size
-                    fdict['seed'] = seed
-                    fdict['mtime'] = mtime
-
-                if not flag:
-                    data['buckets'].append(bkt_container)
-
-                self.store_file_data(data, user)
+            self.add_files_to_bucket(user, bucket, [file_dict])
+
+    def add_files_to_bucket(self, user, bucket, file_dicts):
+        """Persist meta data of many uploaded objects in one batch."""
+        if bucket is None:
+            return 0
+        return self.store.put_many(
+            dict(user=user, bucket=bucket, key=fdict['name'], checksum=fdict['checksum'],
+                 seed=fdict['seed'], size=fdict['size'], mtime=fdict['mtime'],
+                 version=fdict.get('version', 0)) for fdict in file_dicts)
+
+    def add_uploaded_objects(self, rows):
+        """Persist [user, bucket, key, checksum, seed, size] rows in one batch, stamped
+        with the current time as mtime."""
+        mtime = time.time()
+        return self.store.put_many(
+            dict(user=row[0], bucket=row[1], key=row[2], checksum=row[3],
+                 seed=row[4] if len(row) > 4 else None,
+                 size=row[5] if len(row) > 5 else None, mtime=mtime) for row in rows)
 
     def delete_file_from_bucket(self):
         raise NotImplementedError('coming soon')
@@ -20,7 +20,6 @@
 """ Data Integrity framework base file.
 """
 import logging
-import boto3
 from botocore.exceptions import ClientError
 from logging.handlers import SysLogHandler
 from config import DATA_PATH_CFG
@@ -28,6 +27,8 @@ from config import CMN_CFG
 from commons.utils import assert_utils
 from commons.utils.system_utils import run_local_cmd
 from commons.params import S3_ENDPOINT
+from commons.constants import S3_ENGINE_RGW
+from libs.di.s3_pool import S3ConnectionPool
 
 LOGGER = logging.getLogger(__name__)
 
@@ -64,30 +65,57 @@ def init_s3_connections(users):
 
 
 def init_s3_conn(user_name, keys, nworkers):
-    """Init s3 connections pool for a single user"""
+    """Init s3 connections pool for a single user.
+    All entries share one pooled resource whose client is thread safe, the list is
+    kept for callers picking a connection per worker."""
     access_key = keys[0]
     secret_key = keys[1]
-    pool = list()
-    for ix in range(nworkers + 1):
-        pool.append(_init_s3_conn(access_key, secret_key, user_name))
-        LOGGER.info('Initialized s3 connection %s', str(ix))
-    return pool
+    s3 = _init_s3_conn(access_key, secret_key, user_name)
+    LOGGER.info('Initialized s3 connection for %s workers', nworkers)
+    return [s3]
 
 
 def _init_s3_conn(access_key, secret_key, user_name):
-    """Protected function to create a single s3 resource."""
+    """Protected function to get a single s3 resource from the process connection pool."""
     s3 = None
     try:
-        s3 = boto3.resource('s3', aws_access_key_id=access_key, aws_secret_access_key=secret_key,
-                            endpoint_url=CMN_CFG.get('s3_url', S3_ENDPOINT))
-        LOGGER.info(f's3 resource created for user {user_name}')
+        s3 = S3ConnectionPool.get_instance().get_resource(
+            access_key, secret_key, CMN_CFG.get('s3_url', S3_ENDPOINT))
+        LOGGER.info(f's3 resource acquired for user {user_name}')
     except (ClientError, Exception) as exc:
         LOGGER.error(
             f'could not create s3 object for user {user_name} with '
-            f'access key {access_key} secret key {secret_key} exception:{exc}')
+            f'access key {access_key} exception:{exc}')
     return s3
 
 
+def init_async_engine(keys, **kwargs):
+    """Return AsyncS3Engine for a user on the configured endpoint.
+    kwargs are passed to the engine e.g. max_concurrency, rate_limit.
+    The engine needs aiohttp, it is imported on first use only."""
+    # pylint: disable=import-outside-toplevel
+    from libs.s3.s3_async_engine import AsyncS3Engine
+    from libs.s3.s3_async_engine import DEFAULT_REGION
+    region = "default" if CMN_CFG.get("s3_engine") == S3_ENGINE_RGW else DEFAULT_REGION
+    return AsyncS3Engine(keys[0], keys[1], CMN_CFG.get('s3_url', S3_ENDPOINT),
+                         region=kwargs.pop('region', region), **kwargs)
+
+
+def release_s3_conns(s3_objects):
+    """Release pooled s3 resources of init_s3_conn or init_s3_connections once the
+    caller is done with them, released resources become evictable when idle."""
+    resources = s3_objects.values() if isinstance(s3_objects, dict) else s3_objects
+    pool = S3ConnectionPool.get_instance()
+    for s3 in resources:
+        if s3 is not None:
+            pool.release(s3)
+
+
+def get_s3_pool_stats():
+    """Return hits, creates, evictions and in use counts of the s3 connection pool."""
+    return S3ConnectionPool.get_instance().stats()
+
+
 def run_s3bench(test_conf, bucket, keys):
     """
     concurrent users operations using S3bench
@@ -20,7 +20,6 @@
 The data can be verified after interleaved executions as well.
 """
 import os
-import queue
 import logging
 import csv
 import hashlib
@@ -28,6 +27,7 @@ import re
 import base64
 from pathlib import Path
 from libs.di.di_base import _init_s3_conn
+from libs.di.di_base import release_s3_conns
 from commons.params import DOWNLOAD_HOME
 from commons.worker import Workers
 from commons.constants import NWORKERS
@@ -35,7 +35,6 @@ from typing import List
 
 LOGGER = logging.getLogger(__name__)
 
-pool = list()
 FailedFiles = list()
 FailedFilesCSV = "FailedFiles.csv"
 
@@ -56,43 +55,44 @@ def compare_checksum_after_download(user_name: str,
     access_key = keys[0]
     secret_key = keys[1]
     s3 = _init_s3_conn(access_key, secret_key, user_name)
-    test_bucket = s3.Bucket(bucket)
-    for ix in range(nworkers):
-        try:
-            if not os.path.exists(os.path.join(DOWNLOAD_HOME, "ps", str(ix))):
-                _path = os.mkdirs(os.path.join(DOWNLOAD_HOME, "ps", str(ix)))
-        except (OSError, Exception) as fault:
-            LOGGER.error(str(fault))
-            LOGGER.error(f"Error while creating directory for process {ix}")
+    try:
+        test_bucket = s3.Bucket(bucket)
+        for ix in range(nworkers):
+            try:
+                if not os.path.exists(os.path.join(DOWNLOAD_HOME, "ps", str(ix))):
+                    _path = os.mkdirs(os.path.join(DOWNLOAD_HOME, "ps", str(ix)))
+            except (OSError, Exception) as fault:
+                LOGGER.error(str(fault))
+                LOGGER.error(f"Error while creating directory for process {ix}")
 
-    workers = Workers()
-    workers.start_workers(nworkers=nworkers)
-    counter = 0
-    for my_bucket_object in test_bucket.objects.all():
-        workQ = queue.Queue()
-        workQ.func = download_and_compare
-        kwargs = dict()
-        kwargs['key'] = key = my_bucket_object.key
+        workers = Workers(nworkers=nworkers)
+        workers.start_workers()
+        counter = 0
         pat = re.compile('^.*_([A-Z2-7]+)_[0-9]+$')
-        match = re.search(pat, key)
-        if match:
-            checksum = match.group(1)
-        kwargs['s3'] = pool[counter % nworkers]
-        kwargs['bucket'] = 'test-bucket1'
-        kwargs['objcsum'] = checksum
-        kwargs['accesskey'] = keys[0]
-        kwargs['secret'] = keys[1]
-        kwargs['pid'] = counter % nworkers
-        workQ.put(kwargs)
-        workers.wenque(workQ)
-        counter += 1
+        for my_bucket_object in test_bucket.objects.all():
+            kwargs = dict()
+            kwargs['key'] = key = my_bucket_object.key
+            match = re.search(pat, key)
+            if not match:
+                LOGGER.error(f'Skipped object {key} without checksum in name')
+                continue
+            kwargs['s3'] = s3
+            kwargs['bucket'] = bucket
+            kwargs['objcsum'] = match.group(1)
+            kwargs['accesskey'] = keys[0]
+            kwargs['secret'] = keys[1]
+            kwargs['pid'] = counter % nworkers
+            workers.submit(download_and_compare, kwargs)
+            counter += 1
+        workers.end_workers()
+    finally:
+        release_s3_conns([s3])
 
     if len(FailedFiles) > 0:
         keys = FailedFiles[0].keys()
         with open(FailedFilesCSV, 'w', newline='') as fp:
             wr = csv.DictWriter(fp, keys)
             wr.writerows(FailedFiles)
-    workers.end_workers()
     LOGGER.info('Workers shutdown completed successfully')
 
 
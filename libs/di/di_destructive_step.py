@@ -29,11 +29,10 @@ import random
 import time
 from multiprocessing import Manager
 
-import boto3
-
 from config.s3 import S3_CFG
 from libs.di import di_lib
 from libs.di import di_params
+from libs.di.s3_pool import S3ConnectionPool
 
 logger = logging.getLogger(__name__)
 
@@ -72,114 +71,121 @@ def destructive_step():
         access_key = keys[0]
         secret_key = keys[1]
 
+        s3 = None
         try:
-            s3 = boto3.resource('s3', aws_access_key_id=access_key, aws_secret_access_key=secret_key,
-                                endpoint_url=S3_CFG["s3_url"])
+            s3 = S3ConnectionPool.get_instance().get_resource(access_key, secret_key,
+                                                              S3_CFG["s3_url"])
         except Exception as e:
             logger.info(
-                f'could not create s3 object for user {user_name} with access key {access_key} secret key {secret_key} exception:{e}')
+                f'could not create s3 object for user {user_name} with access key {access_key} exception:{e}')
 
         s3ObjectList[user_name] = s3
 
-    # For loop to trigger destructive test, read & delete data.
-    for curDestructiveTest in destructiveTestList:
-        # Get upload file
-        uploadedData = []
-        attempts = 0
-        while attempts < 3:
-            try:
-                with open(di_params.uploadDoneFile, newline='') as f:
-                    reader = csv.reader(f)
-                    uploadedData = list(reader)
-                break
-            except Exception as e:
-                attempts = attempts + 1
-                time.sleep(20)
-
-        if len(uploadedData) == 0:
-            # print("uploaded data not found, existing script")
-            logger.info("uploaded data not found, existing script")
-            exit(1)
-        if os.path.exists(di_params.deleteOpFileName):
-            with open(di_params.deleteOpFileName, newline='') as f:
-                reader = csv.reader(f)
-                deletedObjectList = list(reader)
-
-        # Remove Destruction Result file
-        if os.path.exists(di_params.destructiveTestResult):
-            os.remove(di_params.destructiveTestResult)
-
-        # read object, check for checksum value.. then delete objects and update csv
-        logger.info(f'Total uploaded items {len(uploadedData)}')
-        k = (len(uploadedData) - len(deletedObjectList)) * deletePercentage // 100
-        indicies = random.sample(range(len(uploadedData)), k)
-        deleteList = [uploadedData[i] for i in indicies]
-        newListLen = len(deleteList)
-        logger.info(f'Total items to be deleted {newListLen}')
-        jobs = []
-        perProcessObj = int(newListLen / numProcess)
-        logger.info(f'Per process object operations {perProcessObj}')
-
-        with Manager() as manager:
-            combinedDelList = manager.list()
-            for i in range(numProcess):
-                pList = deleteList[perProcessObj * i:perProcessObj * (i + 1)]
-                p = mp.Process(target=destructionCheck, args=(pList, deletedObjectList, s3ObjectList, combinedDelList))
-                jobs.append(p)
-            p = mp.Process(target=destructionTrigger, args=(curDestructiveTest,))
-            jobs.append(p)
-
-            for p in jobs:
-                p.start()
-            for p in jobs:
-                p.join()
-
-            # Dump combined delete list to csv
-            with open(di_params.comDeleteOpFileName, 'a', newline='') as myfile:
-                wr = csv.writer(myfile, quoting=csv.QUOTE_ALL)
-                wr.writerows(combinedDelList)
-
-        if os.path.exists(di_params.destructiveTestResult):
-            destructiveTestRes = []
-            with open(di_params.destructiveTestResult, newline='') as f:
-                reader = csv.reader(f)
-                destructiveTestRes = list(reader)
-            for item in destructiveTestRes:
+    try:
+        # For loop to trigger destructive test, read & delete data.
+        for curDestructiveTest in destructiveTestList:
+            # Get upload file
+            uploadedData = []
+            attempts = 0
+            while attempts < 3:
                 try:
-                    testName = item[0]
-                    # comp = item[0]
-                    status = item[1]
-                    if status.strip() == 'Pass':
-                        logger.info(f'Destructive Test {curDestructiveTest} Passed')
-                    else:
-                        logger.error(f'Destructive Test {curDestructiveTest} Failed')
+                    with open(di_params.uploadDoneFile, newline='') as f:
+                        reader = csv.reader(f)
+                        uploadedData = list(reader)
+                    break
                 except Exception as e:
-                    logger.error(f'Error in parsing destructive test result csv')
-        else:
-            logger.error(f'Result summary csv file not found after running destructive test {curDestructiveTest}')
-
-        # check if upload done or not, if not sleep & continue
-        if os.path.exists(di_params.uploadFinishedFileName):
-            logger.info("Existing script as upload script have finished uploading all objects")
-            break
-        else:
-            logger.info("In between Sleep Start : {}".format(time.ctime()))
-            logger.info("Sleeping for {} hrs".format(sleepTimeInHrsInBet))
-            time.sleep(sleepTimeInHrsInBet * 60 * 60)
-            logger.info("In between Sleep End : {}".format(time.ctime()))
-            logger.info("Continuing with next destruction test")
-
-    logger.info("Destructive operations completed, check if upload done completely")
-    uploadFileFound = 1
-    while (uploadFileFound):
-        if os.path.exists(di_params.uploadFinishedFileName):
-            uploadFileFound = 0
-            os.remove(di_params.uploadFinishedFileName)
-            logger.info("Upload done completely")
-            break
-        else:
-            logger.info("Upload not yet done, waiting for 2 mins")
-            time.sleep(2 * 60)
+                    attempts = attempts + 1
+                    time.sleep(20)
+
+            if len(uploadedData) == 0:
+                # print("uploaded data not found, existing script")
+                logger.info("uploaded data not found, existing script")
+                exit(1)
+            if os.path.exists(di_params.deleteOpFileName):
+                with open(di_params.deleteOpFileName, newline='') as f:
+                    reader = csv.reader(f)
+                    deletedObjectList = list(reader)
+
+            # Remove Destruction Result file
+            if os.path.exists(di_params.destructiveTestResult):
+                os.remove(di_params.destructiveTestResult)
+
+            # read object, check for checksum value.. then delete objects and update csv
+            logger.info(f'Total uploaded items {len(uploadedData)}')
+            k = (len(uploadedData) - len(deletedObjectList)) * deletePercentage // 100
+            indicies = random.sample(range(len(uploadedData)), k)
+            deleteList = [uploadedData[i] for i in indicies]
+            newListLen = len(deleteList)
+            logger.info(f'Total items to be deleted {newListLen}')
+            jobs = []
+            perProcessObj = int(newListLen / numProcess)
+            logger.info(f'Per process object operations {perProcessObj}')
+
+            with Manager() as manager:
+                combinedDelList = manager.list()
+                for i in range(numProcess):
+                    pList = deleteList[perProcessObj * i:perProcessObj * (i + 1)]
+                    p = mp.Process(target=destructionCheck, args=(pList, deletedObjectList, s3ObjectList, combinedDelList))
+                    jobs.append(p)
+                p = mp.Process(target=destructionTrigger, args=(curDestructiveTest,))
+                jobs.append(p)
+
+                for p in jobs:
+                    p.start()
+                for p in jobs:
+                    p.join()
+
+                # Dump combined delete list to csv
+                with open(di_params.comDeleteOpFileName, 'a', newline='') as myfile:
+                    wr = csv.writer(myfile, quoting=csv.QUOTE_ALL)
+                    wr.writerows(combinedDelList)
+
+            if os.path.exists(di_params.destructiveTestResult):
+                destructiveTestRes = []
+                with open(di_params.destructiveTestResult, newline='') as f:
+                    reader = csv.reader(f)
+                    destructiveTestRes = list(reader)
+                for item in destructiveTestRes:
+                    try:
+                        testName = item[0]
+                        # comp = item[0]
+                        status = item[1]
+                        if status.strip() == 'Pass':
+                            logger.info(f'Destructive Test {curDestructiveTest} Passed')
+                        else:
+                            logger.error(f'Destructive Test {curDestructiveTest} Failed')
+                    except Exception as e:
+                        logger.error(f'Error in parsing destructive test result csv')
+            else:
+                logger.error(f'Result summary csv file not found after running destructive test {curDestructiveTest}')
+
+            # check if upload done or not, if not sleep & continue
+            if os.path.exists(di_params.uploadFinishedFileName):
+                logger.info("Existing script as upload script have finished uploading all objects")
+                break
+            else:
+                logger.info("In between Sleep Start : {}".format(time.ctime()))
+                logger.info("Sleeping for {} hrs".format(sleepTimeInHrsInBet))
+                time.sleep(sleepTimeInHrsInBet * 60 * 60)
+                logger.info("In between Sleep End : {}".format(time.ctime()))
+                logger.info("Continuing with next destruction test")
+
+        logger.info("Destructive operations completed, check if upload done completely")
+        uploadFileFound = 1
+        while (uploadFileFound):
+            if os.path.exists(di_params.uploadFinishedFileName):
+                uploadFileFound = 0
+                os.remove(di_params.uploadFinishedFileName)
+                logger.info("Upload done completely")
+                break
+            else:
+                logger.info("Upload not yet done, waiting for 2 mins")
+                time.sleep(2 * 60)
+    finally:
+        # Hand the pooled resources back, forked destruction checks are done with them
+        for s3 in s3ObjectList.values():
+            if s3 is not None:
+                S3ConnectionPool.get_instance().release(s3)
 
     # trigger readScript
     logger.info("Triggering read script")
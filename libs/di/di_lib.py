@@ -44,6 +44,7 @@ from commons.helpers.node_helper import Node
 from config import cmn_cfg
 from libs.di.di_mgmt_ops import ManagementOPs
 from libs.di.di_base import _init_s3_conn
+from libs.di.di_base import release_s3_conns
 from libs.di.file_formats import all_extensions
 
 IAM_UTYPE = 1
@@ -85,14 +86,17 @@ def create_buckets(user_dict, s3_prefix, nbuckets):
                                    user_name=user_name)
         if not s3:
             raise CortxTestException('S3 resource could not be created')
-        for bucket in buckets:
-            try:
-
-                s3.create_bucket(Bucket=bucket)
-            except Exception as e:
-                LOGGER.info(f'could not create create bucket {bucket} exception:{e}')
-            else:
-                LOGGER.info(f'create bucket {bucket} Done with {s3_prefix}')
+        try:
+            for bucket in buckets:
+                try:
+
+                    s3.create_bucket(Bucket=bucket)
+                except Exception as e:
+                    LOGGER.info(f'could not create create bucket {bucket} exception:{e}')
+                else:
+                    LOGGER.info(f'create bucket {bucket} Done with {s3_prefix}')
+        finally:
+            release_s3_conns([s3])
 
     except Exception as fault:
         LOGGER.error(f"An error {fault} occurred in creating buckets.")
@@ -32,6 +32,7 @@ from libs.csm.rest.csm_rest_s3user import RestS3user
 from libs.s3.s3_restapi_test_lib import S3AccountOperationsRestAPI
 from libs.s3.iam_test_lib import IamTestLib
 from libs.di.di_base import _init_s3_conn
+from libs.di.di_base import release_s3_conns
 
 LOGGER = logging.getLogger(__name__)
 
@@ -176,10 +177,13 @@ class ManagementOPs:
                 access_key = users[k].get("accesskey")
                 secret_key = users[k].get("secretkey")
                 s3_obj = _init_s3_conn(access_key, secret_key, k)
-                bkts_lst = [
-                    s3_obj.create_bucket(Bucket='{}bucket{}'.format(
-                        k.replace('_', '-'), i)).name for i in range(
-                        1, nbuckets + 1)]
+                try:
+                    bkts_lst = [
+                        s3_obj.create_bucket(Bucket='{}bucket{}'.format(
+                            k.replace('_', '-'), i)).name for i in range(
+                            1, nbuckets + 1)]
+                finally:
+                    release_s3_conns([s3_obj])
             users[k]["buckets"] = bkts_lst
         return users
 
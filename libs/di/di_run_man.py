@@ -17,13 +17,11 @@
 # For any questions about this software or licensing,
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
-import os
-import csv
 import logging
 import threading
 from multiprocessing import Value
-from commons import params
 from libs.di import uploader
+from libs.di.meta_store import ObjectMetaStore
 from libs.di.downloader import DataIntegrityValidator
 
 LOGGER = logging.getLogger(__name__)
@@ -70,20 +68,10 @@ class RunDataCheckManager(ASyncIO):
 
     def __check_upload(self):
         """
-        read upload file uploadInfo.csv
-        check users name in upload file response
+        check users have uploaded objects in meta data store
         :return:
         """
-        upload_file = params.UPLOADED_FILES
-        if os.path.exists(upload_file):
-            with open(params.UPLOADED_FILES, newline='') as f:
-                reader = csv.reader(f)
-                uploaded_file_lst = [el for el in list(reader) if el[0] in self.users.keys()]
-            result = len(uploaded_file_lst) > 1
-        else:
-            result = False
-
-        return result
+        return ObjectMetaStore().count(self.users.keys()) > 1
 
     def start_io_async(self, users, buckets, files_count, prefs, event=None):
         """
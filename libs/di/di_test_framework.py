@@ -20,7 +20,6 @@
 
 import os
 import sys
-import queue
 import logging
 import csv
 import hashlib
@@ -299,8 +298,6 @@ class DIChecker(object):
         for ix, ent in enumerate(uploadedFiles, 1):
             if (ent[0], ent[1], ent[2]) in deletedDict:
                 continue
-            workQ = queue.Queue()
-            workQ.func = cls.download_and_compare_chksum
             kwargs = dict()
             kwargs['user'] = ent[0]
             kwargs['objectpath'] = ent[2]
@@ -308,12 +305,8 @@ class DIChecker(object):
             kwargs['objcsum'] = ent[3]
             kwargs['accesskey'] = users.get(ent[0])[0]
             kwargs['secret'] = users.get(ent[0])[1]
-            workQ.put(kwargs)
-            workers.wenque(workQ)
+            workers.submit(cls.download_and_compare_chksum, kwargs)
             LOGGER.info(f"Enqueued item {ix} for download and checksum compare")
-            # if workQ is not None:
-            #    workQ.join()
-            # workQ = None
         LOGGER.info(f"processed items {ix} for data integrity check")
 
         summary['failed_files'] = len(cls.failedFiles) + len(cls.failedFilesServerError)
@@ -23,120 +23,208 @@ Simulates parallel downloads.
 import os
 import logging
 import csv
-import queue
 import hashlib
-from pathlib import Path
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
 from commons import params
 from commons import worker
-from commons.utils import system_utils
 from libs.di import di_base
+from libs.di.meta_store import ObjectMetaStore
 from libs.di.di_mgmt_ops import ManagementOPs
 from libs.di import uploader
 
 LOGGER = logging.getLogger(__name__)
 
+KB = 1024
+MB = KB * KB
+GB = MB * KB
+READ_CHUNK_SIZE = 8 * MB
+RANGE_SIZE = 16 * MB
+RANGE_WORKERS = 16
+RANGE_WINDOW = 4
 
-class DataIntegrityValidator:
-    s3_objects = dict()
-    failed_files = list()
-    failed_files_server_error = list()
-
-    @staticmethod
-    def download_and_compare_chksum(kwargs):
-        """ Download file with s3cmd "s3://bucket/ObjectPath" test_output_file
-            compare downloaded file's md5sum with prior stored
+
+class VerifyStats:
+    """Result accumulator owned by a single verifier worker, merged at the end."""
+
+    def __init__(self):
+        self.objects = 0
+        self.nbytes = 0
+        self.failed_files = list()
+        self.failed_files_server_error = list()
+
+    def merge(self, other):
+        """Fold other accumulator into this one."""
+        self.objects += other.objects
+        self.nbytes += other.nbytes
+        self.failed_files.extend(other.failed_files)
+        self.failed_files_server_error.extend(other.failed_files_server_error)
+        return self
+
+
+class ObjectVerifier:
+    """Stream get_object bodies straight into hashers and compare stored checksums.
+
+    Objects larger than range_size are fetched with parallel ranged GETs which are hashed
+    in order as they arrive, at most window ranges ahead of the hasher. Nothing is written
+    to local disk. Each worker thread owns a VerifyStats which are merged by verify().
+    Usage:
+    verifier = ObjectVerifier(di_base.init_s3_connections(users))
+    summary = verifier.verify([dict(user=u, bucket=b, objectpath=k, objcsum=md5), ...])
+    """
+
+    def __init__(self, s3_objects, nworkers=params.NWORKERS, chunk_size=READ_CHUNK_SIZE,
+                 range_size=RANGE_SIZE, range_workers=RANGE_WORKERS, window=RANGE_WINDOW):
+        self.s3_objects = s3_objects
+        self.nworkers = nworkers
+        self.chunk_size = chunk_size
+        self.range_size = range_size
+        self.range_workers = range_workers
+        self.window = window
+        self.local = threading.local()
+        self.all_stats = list()
+        self.stats_lock = threading.Lock()
+        self.range_pool = None
+
+    def _stats(self):
+        """Return accumulator of the calling worker thread."""
+        stats = getattr(self.local, 'stats', None)
+        if stats is None:
+            stats = self.local.stats = VerifyStats()
+            with self.stats_lock:
+                self.all_stats.append(stats)
+        return stats
+
+    def _get_range(self, client, bucket, key, start, end):
+        """Fetch bytes [start, end] of an object into memory."""
+        resp = client.get_object(Bucket=bucket, Key=key, Range=f'bytes={start}-{end}')
+        return resp['Body'].read()
+
+    def _hash_body(self, body, hasher):
+        """Feed a streaming body into hasher, return bytes read."""
+        nbytes = 0
+        for chunk in body.iter_chunks(self.chunk_size):
+            hasher.update(chunk)
+            nbytes += len(chunk)
+        return nbytes
+
+    def checksum_object(self, client, bucket, key):
         """
+        Return (md5 hexdigest, size) of an object read over S3.
+
+        The first range GET also reveals object size, remaining ranges are fetched in
+        parallel and hashed in order.
+        """
+        hasher = hashlib.md5()  # nosec
         try:
-            user = kwargs.get('user')
-            objectpath = kwargs.get('objectpath')
-            bucket = kwargs.get('bucket')
-            objcsum = kwargs.get('objcsum')
-            cwd = params.DOWNLOAD_HOME
-            basepath = os.path.join(cwd, user)
-            objpth = os.path.join(cwd, user, objectpath)
-            try:
-                if not os.path.exists(basepath):
-                    system_utils.mkdirs(basepath)
-            except (OSError, Exception) as fault:
-                LOGGER.error(f"Error {fault} while creating directory for user {user}")
-
-            try:
-                s3 = DataIntegrityValidator.s3_objects[user]
-            except Exception as fault:
-                print(fault)
-                LOGGER.error(f'No S3 Connection for user {kwargs} in S3 sessions list {fault}')
-                LOGGER.error(f"Won't be able to download object {kwargs} without connection")
-                return
-            try:
-                s3.meta.client.download_file(bucket, objectpath, objpth)
-                LOGGER.info(f'downloaded object : {kwargs}')
-            except Exception as e:
-                print(e)
-                LOGGER.error(f'Final object download failed for {kwargs} with exception {e}')
-                DataIntegrityValidator.failed_files_server_error.append(kwargs)
-            else:
-                print("Downloaded file '{}' from '{}'".format(objectpath, bucket))
-                filepath = objpth
-                sz = Path(filepath).stat().st_size
-                read_sz = 8192
-                csum = None
-                with open(filepath, 'rb') as fp:
-                    file_hash = hashlib.md5()
-                    if sz < read_sz:
-                        buf = fp.read(sz)
-                    else:
-                        buf = fp.read(read_sz)
-                    while buf:
-                        file_hash.update(buf)
-                        buf = fp.read(read_sz)
-                    csum = file_hash.hexdigest()
-                    try:
-                        os.unlink(filepath)
-                    except (OSError, Exception) as fault:
-                        LOGGER.error('Fault %s occurred duing unlink. Trying rm command', fault)
-                        rmLocalObject = "rm -rf " + str(filepath)
-                        os.system(rmLocalObject)
-
-                if objcsum == csum.strip():
-                    LOGGER.info(
-                        "download object checksum {} matches provided checksum {} for file {}".format(csum, objcsum,
-                                                                                                      objectpath))
-                else:
-                    LOGGER.error(
-                        "download object checksum {} does not matches provided checksum {} for file {}".format(csum,
-                                                                                                               objcsum,
-                                                                                                               objectpath))
-                    DataIntegrityValidator.failed_files.append(kwargs)
-                    if os.path.exists(filepath):
-                        os.remove(filepath)
+            resp = client.get_object(Bucket=bucket, Key=key,
+                                     Range=f'bytes=0-{self.range_size - 1}')
+        except ClientError as error:
+            if error.response.get('Error', {}).get('Code') != 'InvalidRange':
+                raise
+            resp = client.get_object(Bucket=bucket, Key=key)
+            return hashlib.md5(resp['Body'].read()).hexdigest(), 0  # nosec
+        content_range = resp.get('ContentRange')
+        total = int(content_range.split('/')[-1]) if content_range else resp['ContentLength']
+        nbytes = self._hash_body(resp['Body'], hasher)
+        pending = list()
+        offsets = iter(range(nbytes, total, self.range_size))
+        for start in offsets:
+            pending.append(self.range_pool.submit(
+                self._get_range, client, bucket, key, start,
+                min(start + self.range_size, total) - 1))
+            if len(pending) >= self.window:
+                break
+        while pending:
+            data = pending.pop(0).result()
+            hasher.update(data)
+            nbytes += len(data)
+            start = next(offsets, None)
+            if start is not None:
+                pending.append(self.range_pool.submit(
+                    self._get_range, client, bucket, key, start,
+                    min(start + self.range_size, total) - 1))
+        return hasher.hexdigest(), nbytes
+
+    def verify_object(self, kwargs):
+        """Compare checksum of one object with the stored one and account the result."""
+        stats = self._stats()
+        user, bucket = kwargs.get('user'), kwargs.get('bucket')
+        objectpath, objcsum = kwargs.get('objectpath'), kwargs.get('objcsum')
+        s3 = self.s3_objects.get(user)
+        if s3 is None:
+            LOGGER.error(f"Won't be able to download object {kwargs} without connection")
+            stats.failed_files_server_error.append(kwargs)
+            return
+        try:
+            csum, nbytes = self.checksum_object(s3.meta.client, bucket, objectpath)
         except Exception as fault:
-            LOGGER.exception(fault)
-            LOGGER.error(f'Exception occurred for item {kwargs} with exception {fault}')
+            LOGGER.error(f'Object download failed for {kwargs} with exception {fault}')
+            stats.failed_files_server_error.append(kwargs)
+            return
+        stats.objects += 1
+        stats.nbytes += nbytes
+        if objcsum == csum:
+            LOGGER.debug("download object checksum %s matches provided checksum for file %s",
+                         csum, objectpath)
+        else:
+            LOGGER.error("download object checksum %s does not matches provided checksum %s "
+                         "for file %s", csum, objcsum, objectpath)
+            stats.failed_files.append(kwargs)
+
+    def verify(self, entries):
+        """
+        Verify all entries and return merged summary with throughput.
+
+        :param entries: iterable of dicts with user, bucket, objectpath and objcsum.
+        :return: dict with VerifyStats lists and objects/s, GB/s figures.
+        """
+        self.all_stats = list()
+        self.local = threading.local()
+        start = time.perf_counter()
+        workers = worker.Workers()
+        with ThreadPoolExecutor(max_workers=self.range_workers,
+                                thread_name_prefix='di-range') as self.range_pool:
+            workers.start_workers(nworkers=self.nworkers)
+            for kwargs in entries:
+                workers.submit(self.verify_object, kwargs)
+            workers.end_workers()
+        duration = time.perf_counter() - start
+        stats = VerifyStats()
+        for part in self.all_stats:
+            stats.merge(part)
+        summary = dict(objects_verified=stats.objects, bytes_verified=stats.nbytes,
+                       duration=duration,
+                       objects_per_sec=stats.objects / duration if duration else 0,
+                       gb_per_sec=stats.nbytes / GB / duration if duration else 0,
+                       latency=workers.stats()['latency'],
+                       failed_files=stats.failed_files,
+                       failed_files_server_error=stats.failed_files_server_error)
+        LOGGER.info("Verified %s objects, %s bytes in %.2f s: %.1f objects/s %.3f GB/s",
+                    stats.objects, stats.nbytes, duration, summary['objects_per_sec'],
+                    summary['gb_per_sec'])
+        return summary
+
+
+class DataIntegrityValidator:
 
     @classmethod
     def verify_data_integrity(cls, users):
         """
-        UploadInfo File format supported is
-        #user7,user7-8844buckets0,naPcn6qP47SkUPkxbP_PtJUVF1iv.json,7e2db9e2f7621db0ddfde4d294e92eca
-        Downloads the file and compare checksum.
+        Uploaded objects of users are read from ObjectMetaStore, deleted ones are
+        skipped. Streams each object and compare checksum.
         :return:
         """
-        workers = worker.Workers()
-        workers.start_workers()
-        cls.s3_objects = di_base.init_s3_connections(users=users)
         deletedFiles = list()
-        uploadedFiles = list()
         deletedDict = dict()
         summary = dict()
-        with open(params.UPLOADED_FILES, newline='') as f:
-            reader = csv.reader(f)
-            # uploadedFiles = list(reader)
-            uploadedFiles = [el for el in list(reader) if el[0] in users.keys()]
+        uploadedFiles = list(ObjectMetaStore().iter_users(users.keys()))
 
         if len(uploadedFiles) == 0:
             print("uploaded data not found, exiting script")
             LOGGER.info("uploaded data not found, exiting script")
-            workers.end_workers()
             return
 
         if os.path.exists(params.DELETE_OP_FILE_NAME):
@@ -151,65 +239,49 @@ class DataIntegrityValidator:
             else:
                 LOGGER.error("Skipped considering deleted file {}".format(f))
 
-        for i in range(1, params.NUSERS + 1):
-            try:
-                if not os.path.exists(os.path.join(params.DOWNLOAD_HOME,
-                                                   ManagementOPs.user_prefix + str(i))):
-                    system_utils.mkdirs(os.path.join(params.DOWNLOAD_HOME,
-                                                     ManagementOPs.user_prefix + str(i)))
-            except (OSError, Exception) as exe:
-                LOGGER.error(f"Error {exe} while creating directory for user {i}")
-
-        for ix, ent in enumerate(uploadedFiles, 1):
-            if (ent[0], ent[1], ent[2]) in deletedDict:
-                continue
-            workQ = queue.Queue()
-            workQ.func = cls.download_and_compare_chksum
-            kwargs = dict()
-            kwargs['user'] = ent[0]
-            kwargs['objectpath'] = ent[2]
-            kwargs['bucket'] = ent[1]
-            kwargs['objcsum'] = ent[3]
-            kwargs['accesskey'] = users.get(ent[0])['accesskey']
-            kwargs['secret'] = users.get(ent[0])['secretkey']
-            workQ.put(kwargs)
-            workers.wenque(workQ)
-            LOGGER.info(f"Enqueued item {ix} for download and checksum compare")
-            # if workQ is not None:
-            #    workQ.join()
-            # workQ = None
-        LOGGER.info(f"processed items {ix} for data integrity check")
-
-        summary['failed_files'] = len(cls.failed_files) + len(cls.failed_files_server_error)
-        summary['uploaded_files'] = ix
+        entries = [dict(user=ent['user'], bucket=ent['bucket'], objectpath=ent['key'],
+                        objcsum=ent['checksum']) for ent in uploadedFiles
+                   if (ent['user'], ent['bucket'], ent['key']) not in deletedDict]
+        s3_objects = di_base.init_s3_connections(users=users)
+        verifier = ObjectVerifier(s3_objects)
+        result = verifier.verify(entries)
+        di_base.release_s3_conns(s3_objects)
+        failed_files = result['failed_files']
+        failed_files_server_error = result['failed_files_server_error']
+
+        summary['failed_files'] = len(failed_files) + len(failed_files_server_error)
+        summary['uploaded_files'] = len(uploadedFiles)
         summary['checksum_verified'] = summary['uploaded_files'] - summary['deleted_files']
+        for key in ('objects_per_sec', 'gb_per_sec', 'bytes_verified', 'duration'):
+            summary[key] = result[key]
 
-        if len(cls.failed_files) > 0:
-            keys = cls.failed_files[0].keys()
+        if len(failed_files) > 0:
+            keys = failed_files[0].keys()
             with open(params.FAILED_FILES, 'w', newline='') as fp:
                 wr = csv.DictWriter(fp, keys)
-                wr.writerows(cls.failed_files)
+                wr.writerows(failed_files)
 
-        for item in cls.failed_files:
+        for item in failed_files:
             LOGGER.error(f'checksum mismatch for {item}')
 
-        for item in cls.failed_files_server_error:
+        for item in failed_files_server_error:
             LOGGER.error(f'Server Error for {item}')
 
-        if len(cls.failed_files_server_error) > 0:
-            keys = cls.failed_files_server_error[0].keys()
+        if len(failed_files_server_error) > 0:
+            keys = failed_files_server_error[0].keys()
             with open(params.FAILED_FILES_SERVER_ERROR, 'w', newline='') as fp:
                 wr = csv.DictWriter(fp, keys)
-                wr.writerows(cls.failed_files_server_error)
+                wr.writerows(failed_files_server_error)
 
-        workers.end_workers()
-        LOGGER.info('Workers shutdown completed successfully')
         LOGGER.info("Test run summary Uploaded files {}  "
                     "Deleted Files {} ".format(summary['uploaded_files'],
                                                summary['deleted_files']))
         LOGGER.info("Failed files were {}  and "
                     "Checksum verified for Files {} ".format(summary['failed_files'],
                                                              summary['checksum_verified']))
+        LOGGER.info("Verification throughput {:.1f} objects/s {:.3f} GB/s".format(
+            summary['objects_per_sec'], summary['gb_per_sec']))
+        LOGGER.info('S3 connection pool stats %s', di_base.get_s3_pool_stats())
         return summary
 
 
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Indexed object meta data store for the DI framework.
+
+Objects are keyed by (user, bucket, key, version) in a single SQLite file in WAL mode,
+which makes inserts crash safe and lets many uploader processes and threads write while
+downloaders read. Lookups use the primary key index and prefix iteration is a range scan
+over it, so recording N objects is O(N log N) instead of rewriting a json file per object.
+"""
+import os
+import logging
+import sqlite3
+import threading
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from commons import params
+from commons.utils import system_utils
+
+LOGGER = logging.getLogger(__name__)
+
+BUSY_TIMEOUT_MS = 60 * 1000
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    user TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    key TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0,
+    checksum TEXT,
+    seed INTEGER,
+    size INTEGER,
+    mtime REAL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user, bucket, key, version)
+) WITHOUT ROWID
+"""
+COLUMNS = ('user', 'bucket', 'key', 'version', 'checksum', 'seed', 'size', 'mtime', 'deleted')
+UPSERT = ("INSERT OR REPLACE INTO objects (user, bucket, key, version, checksum, seed, size, "
+          "mtime, deleted) VALUES (:user, :bucket, :key, :version, :checksum, :seed, :size, "
+          ":mtime, 0)")
+
+
+class ObjectMetaStore:
+    """Crash safe (user, bucket, key, version) -> object meta data store.
+    Usage:
+    store = ObjectMetaStore()
+    store.put_many([dict(user='u1', bucket='b1', key='a.txt', checksum='abcd', seed=1,
+                         size=1024, mtime=0)])
+    store.get('u1', 'b1', 'a.txt')
+    for entry in store.iter_prefix('u1', 'b1', prefix='a'):
+        print(entry)
+    """
+
+    def __init__(self, path: str = None) -> None:
+        self.path = path or params.META_DATA_STORE
+        self.local = threading.local()
+        p_home = os.path.dirname(self.path)
+        if p_home and not os.path.exists(p_home):
+            system_utils.mkdirs(p_home)
+        self._conn().execute(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Connection owned by calling thread, reopened after fork."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000,
+                                   isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def close(self) -> None:
+        """Close connection of calling thread."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> dict:
+        return dict(zip(COLUMNS, row))
+
+    def put(self, user: str, bucket: str, key: str, checksum: str, seed: int = None,
+            size: int = None, mtime: float = None, version: int = 0) -> None:
+        """Insert or replace meta data of a single object version."""
+        self.put_many([dict(user=user, bucket=bucket, key=key, version=version,
+                            checksum=checksum, seed=seed, size=size, mtime=mtime)])
+
+    def put_many(self, entries: Iterable[dict]) -> int:
+        """Insert or replace many objects in one transaction, return count."""
+        entries = [dict(dict(version=0, seed=None, size=None, mtime=None), **entry)
+                   for entry in entries]
+        if not entries:
+            return 0
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(UPSERT, entries)
+        return len(entries)
+
+    def get(self, user: str, bucket: str, key: str, version: int = None) -> Optional[dict]:
+        """Return entry of given or latest version, None when not stored or deleted."""
+        conn = self._conn()
+        if version is None:
+            row = conn.execute(
+                'SELECT * FROM objects WHERE user=? AND bucket=? AND key=? '
+                'ORDER BY version DESC LIMIT 1', (user, bucket, key)).fetchone()
+        else:
+            row = conn.execute(
+                'SELECT * FROM objects WHERE user=? AND bucket=? AND key=? AND version=?',
+                (user, bucket, key, version)).fetchone()
+        if row is None or row['deleted']:
+            return None
+        return self._row(row)
+
+    def mark_deleted(self, user: str, bucket: str, key: str) -> int:
+        """Mark all versions of an object deleted, return number of versions touched."""
+        conn = self._conn()
+        with conn:
+            cur = conn.execute('UPDATE objects SET deleted=1 WHERE user=? AND bucket=? AND key=?',
+                               (user, bucket, key))
+        return cur.rowcount
+
+    def iter_prefix(self, user: str, bucket: str = None, prefix: str = '',
+                    include_deleted: bool = False) -> Iterator[dict]:
+        """Yield entries of a user, optionally limited to a bucket and key prefix,
+        in (bucket, key, version) order using the primary key index."""
+        query = 'SELECT * FROM objects WHERE user=?'
+        args = [user]
+        if bucket is not None:
+            query += ' AND bucket=?'
+            args.append(bucket)
+            if prefix:
+                query += ' AND key>=? AND key<?'
+                args.extend([prefix, prefix + '\U0010ffff'])
+        if not include_deleted:
+            query += ' AND deleted=0'
+        query += ' ORDER BY bucket, key, version'
+        for row in self._conn().execute(query, args):
+            yield self._row(row)
+
+    def iter_users(self, users: Iterable[str] = None) -> Iterator[dict]:
+        """Yield live entries of all or given users."""
+        if users is None:
+            users = [row[0] for row in self._conn().execute(
+                'SELECT DISTINCT user FROM objects ORDER BY user')]
+        for user in users:
+            yield from self.iter_prefix(user)
+
+    def buckets(self, user: str) -> list:
+        """Names of buckets having live objects of a user."""
+        return [row[0] for row in self._conn().execute(
+            'SELECT DISTINCT bucket FROM objects WHERE user=? AND deleted=0 ORDER BY bucket',
+            (user,))]
+
+    def count(self, users: Iterable[str] = None) -> int:
+        """Number of live object versions for all or given users."""
+        if users is None:
+            return self._conn().execute(
+                'SELECT COUNT(*) FROM objects WHERE deleted=0').fetchone()[0]
+        total = 0
+        for user in users:
+            total += self._conn().execute(
+                'SELECT COUNT(*) FROM objects WHERE user=? AND deleted=0', (user,)).fetchone()[0]
+        return total
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Per process S3 connection pool for the DI framework.
+
+One boto3 session is shared by the process so botocore service models are loaded once.
+S3 resources are cached per (endpoint, access key); their clients are thread safe and
+keep their own urllib3 connection pool of max_pool_connections sockets. get_resource and
+get_client lease the entry until release() is called, the client() block holds a lease for
+its duration. Entries without leases not used for max_idle seconds are evicted on the next
+acquire. Clients once handed out are only dropped from the cache, never closed, as callers
+may still use them. The pool is re-created after fork.
+"""
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+import boto3
+from botocore.config import Config
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_POOL_CONNECTIONS = 64
+MAX_IDLE_SECS = 15 * 60
+CONNECT_TIMEOUT = 60
+READ_TIMEOUT = 120
+MAX_ATTEMPTS = 5
+
+
+class S3ConnectionPool:
+    """Thread safe cache of S3 resources keyed by (endpoint, access_key).
+    Usage:
+    pool = S3ConnectionPool.get_instance()
+    s3 = pool.get_resource(access_key, secret_key, endpoint_url)
+    pool.release(s3)
+    with pool.client(access_key, secret_key, endpoint_url) as client:
+        client.head_bucket(Bucket='test-bucket')
+    print(pool.stats())
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self,
+                 max_pool_connections: int = MAX_POOL_CONNECTIONS,
+                 max_idle: float = MAX_IDLE_SECS,
+                 keepalive: bool = True,
+                 verify=None) -> None:
+        self.max_pool_connections = max_pool_connections
+        self.max_idle = max_idle
+        self.keepalive = keepalive
+        self.verify = verify
+        self.pid = os.getpid()
+        self.session = boto3.session.Session()
+        self.entries = dict()
+        self.lock = threading.Lock()
+        self.counters = dict(hits=0, creates=0, evictions=0, in_use=0)
+
+    @classmethod
+    def get_instance(cls, **kwargs) -> 'S3ConnectionPool':
+        """Return pool of the calling process, creating it on first use or after fork."""
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance.pid != os.getpid():
+                cls._instance = cls(**kwargs)
+            return cls._instance
+
+    def _config(self) -> Config:
+        options = dict(max_pool_connections=self.max_pool_connections,
+                       connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                       retries={'max_attempts': MAX_ATTEMPTS})
+        if self.keepalive and 'tcp_keepalive' in Config.OPTION_DEFAULTS:
+            options['tcp_keepalive'] = True
+        return Config(**options)
+
+    def _evict_idle(self, now: float) -> None:
+        """Drop entries idle for longer than max_idle, caller holds the lock."""
+        for key, entry in list(self.entries.items()):
+            if entry['in_use'] == 0 and now - entry['last_used'] > self.max_idle:
+                del self.entries[key]
+                self.counters['evictions'] += 1
+                close = getattr(entry['resource'].meta.client, 'close', None)
+                if close and not entry['shared']:
+                    close()
+                LOGGER.debug('Evicted idle s3 connection for %s at %s', key[1], key[0])
+
+    def _entry(self, access_key: str, secret_key: str, endpoint_url: str,
+               lease: bool = False) -> dict:
+        now = time.monotonic()
+        key = (endpoint_url, access_key)
+        with self.lock:
+            self._evict_idle(now)
+            entry = self.entries.get(key)
+            if entry is not None and entry['secret_key'] == secret_key:
+                self.counters['hits'] += 1
+            else:
+                resource = self.session.resource('s3', aws_access_key_id=access_key,
+                                                 aws_secret_access_key=secret_key,
+                                                 endpoint_url=endpoint_url, verify=self.verify,
+                                                 config=self._config())
+                entry = dict(resource=resource, secret_key=secret_key, in_use=0,
+                             shared=False)
+                self.entries[key] = entry
+                self.counters['creates'] += 1
+                LOGGER.info('s3 connection created for access key %s at %s',
+                            access_key, endpoint_url)
+            entry['last_used'] = now
+            if lease:
+                entry['in_use'] += 1
+                self.counters['in_use'] += 1
+        return entry
+
+    def get_resource(self, access_key: str, secret_key: str, endpoint_url: str = None):
+        """Return the shared S3 resource leased until release(), use its meta.client from
+        any thread."""
+        entry = self._entry(access_key, secret_key, endpoint_url, lease=True)
+        entry['shared'] = True
+        return entry['resource']
+
+    def get_client(self, access_key: str, secret_key: str, endpoint_url: str = None):
+        """Return the shared thread safe S3 client leased until release()."""
+        return self.get_resource(access_key, secret_key, endpoint_url).meta.client
+
+    def release(self, resource) -> None:
+        """End a lease of get_resource or get_client, the resource may still be used."""
+        with self.lock:
+            for entry in self.entries.values():
+                if resource is entry['resource'] or resource is entry['resource'].meta.client:
+                    if entry['in_use'] > 0:
+                        entry['in_use'] -= 1
+                        self.counters['in_use'] -= 1
+                    entry['last_used'] = time.monotonic()
+                    return
+
+    @contextmanager
+    def client(self, access_key: str, secret_key: str, endpoint_url: str = None):
+        """Client accounted as in use for the duration of the with block."""
+        entry = self._entry(access_key, secret_key, endpoint_url, lease=True)
+        try:
+            yield entry['resource'].meta.client
+        finally:
+            with self.lock:
+                entry['in_use'] -= 1
+                self.counters['in_use'] -= 1
+                entry['last_used'] = time.monotonic()
+
+    def stats(self) -> dict:
+        """Counters of hits, creates, evictions, in use clients and cached entries."""
+        with self.lock:
+            return dict(self.counters, entries=len(self.entries))
+
+    def clear(self) -> None:
+        """Drop all cached connections."""
+        with self.lock:
+            self.entries.clear()
+            self.counters['in_use'] = 0
@@ -22,11 +22,12 @@
 
 import os
 import sys
-import queue
 import random
+import asyncio
 import logging
 import csv
 import hashlib
+import threading
 import time
 import multiprocessing as mp
 from multiprocessing import Manager, Event
@@ -46,108 +47,249 @@ except ModuleNotFoundError as error:
     logging.error(error)
 
 uploadObjects = []
+upload_lock = threading.Lock()
+flush_lock = threading.Lock()
 LOGGER = logging.getLogger(__name__)
+IO_ENGINE_THREAD = 'thread'
+IO_ENGINE_ASYNC = 'async'
+ASYNC_CONCURRENCY = 512
+ASYNC_PART_SIZE = 16 * 1024 * 1024
+# Uploaded rows are stored every UPLOAD_FLUSH_ROWS rows or UPLOAD_FLUSH_SECS seconds
+UPLOAD_FLUSH_ROWS = 100
+UPLOAD_FLUSH_SECS = 5.0
 
 
 class Uploader:
-    """Simulates Uploads client upto 10k."""
+    """Simulates Uploads client upto 10k.
+
+    By default data is generated while it is uploaded via upload_fileobj and never
+    touches local disk; pass streaming=False to use the file based path which saves
+    every object under DATAGEN_HOME before upload. With io_engine='async' (or
+    prefs['io_engine']) each user process drives uploads from one asyncio loop.
+    Rows of uploaded objects are flushed to the meta data store in batches while
+    uploads run, a killed upload process loses at most the rows of one batch.
+    """
     tsfrConfig = TransferConfig(multipart_threshold=1024 * 1024 * 16,
                                 max_concurrency=320,
                                 multipart_chunksize=1024 * 1024 * 16,
                                 use_threads=True)
 
-    def __init__(self):
+    def __init__(self, streaming=True, io_engine=IO_ENGINE_THREAD):
         self.change_manager = data_man.DataManager()
+        self.streaming = streaming
+        self.io_engine = io_engine
+        self.flush_rows = UPLOAD_FLUSH_ROWS
+        self.flush_secs = UPLOAD_FLUSH_SECS
+        self.last_flush = time.monotonic()
 
     def upload(self, user, keys, buckets, files_count, prefs, stop_event, future_obj):
         user_name = user.replace('_', '-')
         timestamp = time.strftime(params.DT_PATTERN_PREFIX)
+        if prefs.get('io_engine', self.io_engine) == IO_ENGINE_ASYNC:
+            if future_obj:
+                future_obj.value = True
+            asyncio.run(self._upload_async(user, keys, buckets, files_count, prefs, stop_event))
+            self._save_uploads(user)
+            return
         s3connections = di_base.init_s3_conn(user_name=user_name,
                                              keys=keys,
                                              nworkers=params.NWORKERS)
         pool_len = len(s3connections)
 
-        workers = Workers()
-        workers.start_workers(func=self._upload)
+        workers = Workers(nworkers=params.NWORKERS, stop_event=stop_event)
+        workers.start_workers()
         if future_obj:
             future_obj.value = True
         for bucket in buckets:
             for ix in range(files_count):
-                if not stop_event.is_set():
-                    workQ = queue.Queue()
-                    workQ.func = self._upload
-                    kwargs = dict()
-                    kwargs['user'] = user
-                    kwargs['bucket'] = bucket
-                    kwargs['s3connections'] = s3connections
-                    kwargs['pool_len'] = pool_len
-                    kwargs['file_number'] = ix
-                    kwargs['prefs'] = prefs
-                    workQ.put(kwargs)
-                    workers.wenque(workQ)
-                else:
+                kwargs = dict()
+                kwargs['user'] = user
+                kwargs['bucket'] = bucket
+                kwargs['s3connections'] = s3connections
+                kwargs['pool_len'] = pool_len
+                kwargs['file_number'] = ix
+                kwargs['prefs'] = prefs
+                if workers.submit(self._upload, kwargs) is None:
                     LOGGER.debug(
                         "Stop event has been set, remaining objects will be "
                         "skipped.")
                     print("Stop event has been set, remaining objects will be"
                           " skipped.")
                     break
-                LOGGER.info(
-                    f"Enqueued item {ix} for download and checksum compare")
+                LOGGER.debug(f"Submitted item {ix} for upload")
             LOGGER.info(
                 f"processed items {ix} to upload for user {user}")
         workers.end_workers()
+        di_base.release_s3_conns(s3connections)
+        LOGGER.info('Upload workers stats %s', workers.stats())
         LOGGER.info('Upload Workers shutdown completed successfully')
-        if len(uploadObjects) > 0:
+        self._save_uploads(user)
+        LOGGER.info('S3 connection pool stats %s', di_base.get_s3_pool_stats())
+
+    def _save_uploads(self, user):
+        """Store remaining uploaded object rows in meta data store and uploadInfo.csv."""
+        self._flush_uploads()
+        LOGGER.info(f'Upload completed for user {user}')
+
+    def _flush_uploads(self):
+        """Move buffered rows to meta data store and uploadInfo.csv, return row count."""
+        with flush_lock:
+            with upload_lock:
+                rows = uploadObjects[:]
+                del uploadObjects[:]
+                self.last_flush = time.monotonic()
+            if not rows:
+                return 0
             with open(params.UPLOADED_FILES, 'a', newline='') as fp:
                 wr = csv.writer(
-                    fp, quoting=csv.QUOTE_NONE, delimiter=',', quotechar='',
+                    fp, quoting=csv.QUOTE_NONE, delimiter=',', quotechar=None,
                     escapechar='\\')
+                # uploadInfo.csv and the meta data store change under one file lock,
+                # holders of the lock see the rows in both or in neither
                 fcntl.flock(fp, fcntl.LOCK_EX)
-                wr.writerows(uploadObjects)
-                fcntl.flock(fp, fcntl.LOCK_UN)
-        LOGGER.info(f'Upload completed for user {user}')
+                try:
+                    wr.writerows(rows)
+                    fp.flush()
+                    self.change_manager.add_uploaded_objects(rows)
+                finally:
+                    fcntl.flock(fp, fcntl.LOCK_UN)
+        LOGGER.debug('Stored %s uploaded objects', len(rows))
+        return len(rows)
+
+    async def _upload_async(self, user, keys, buckets, files_count, prefs, stop_event):
+        """Upload files_count objects per bucket from a single event loop.
+
+        async_concurrency worker tasks take buckets from a queue bounded to the same size,
+        so tasks and buffered payloads do not grow with files_count. Payloads and their
+        md5 are generated and uploaded rows are flushed in the default executor to keep
+        the loop sending."""
+        concurrency = prefs.get('async_concurrency', ASYNC_CONCURRENCY)
+        gen = data_generator.DataGenerator(c_ratio=2)
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue(maxsize=concurrency)
+
+        def make_payload(seed, size):
+            buf = gen.get_payload(seed, size).buffer()
+            return buf, hashlib.md5(buf).hexdigest()
+
+        async def upload_one(engine, bucket):
+            seed = gen.get_random_seed()
+            size = random.sample(data_generator.SMALL_BLOCK_SIZES, 1)[0]
+            obj_name = gen.get_object_name()
+            try:
+                buf, md5sum = await loop.run_in_executor(None, make_payload, seed, size)
+                if size > ASYNC_PART_SIZE:
+                    parts = [buf[off:off + ASYNC_PART_SIZE]
+                             for off in range(0, size, ASYNC_PART_SIZE)]
+                    await engine.upload_multipart(bucket, obj_name, parts)
+                else:
+                    await engine.put_object(bucket, obj_name, buf)
+            except Exception as e:
+                LOGGER.info(f'{obj_name} in bucket {bucket} Upload caught exception: {e}')
+                return
+            if self._buffer_upload(user, bucket, obj_name, seed, size, md5sum):
+                await loop.run_in_executor(None, self._flush_uploads)
+
+        async def upload_worker(engine):
+            while True:
+                bucket = await pending.get()
+                try:
+                    if bucket is None:
+                        return
+                    if not stop_event.is_set():
+                        await upload_one(engine, bucket)
+                except Exception as e:
+                    LOGGER.error(f'Upload to bucket {bucket} failed: {e}')
+                finally:
+                    pending.task_done()
+
+        async with di_base.init_async_engine(keys, max_concurrency=concurrency,
+                                             rate_limit=prefs.get('rate_limit')) as engine:
+            workers = [asyncio.ensure_future(upload_worker(engine))
+                       for _ in range(concurrency)]
+            for bucket in buckets:
+                for _ in range(files_count):
+                    if stop_event.is_set():
+                        break
+                    await pending.put(bucket)
+            for _ in workers:
+                await pending.put(None)
+            await asyncio.gather(*workers)
+        LOGGER.info('Async upload stats for user %s: %s', user, engine.stats())
 
     def _upload(self, kwargs):
         bucket = kwargs['bucket']
-        m = kwargs['file_number']
         s3connections = kwargs['s3connections']
         pool_len = kwargs['pool_len']
         user_name = kwargs['user']
         prefs = kwargs['prefs']
-        prefix = prefs.get('prefix_dir', 'test-1')  # todo revisit
 
         # todo get random compression ratio and process prefs
         # get random size
         seed = data_generator.DataGenerator.get_random_seed()
         size = random.sample(data_generator.SMALL_BLOCK_SIZES, 1)[0]
         gen = data_generator.DataGenerator(c_ratio=2)
+        s3 = s3connections[random.randint(0, pool_len - 1)]
+        if prefs.get('streaming', self.streaming):
+            obj_name, md5sum = self._upload_stream(s3, gen, bucket, seed, size, user_name)
+        else:
+            obj_name, md5sum = self._upload_file(s3, gen, bucket, seed, size, user_name,
+                                                 prefs.get('prefix_dir', 'test-1'))
+        if obj_name:
+            self._record_upload(user_name, bucket, obj_name, seed, size, md5sum)
+
+    @staticmethod
+    def _upload_stream(s3, gen, bucket, seed, size, user_name):
+        """Generate and upload object in a single pass, md5 is computed while sending."""
+        obj_name = gen.get_object_name()
+        stream = gen.get_stream(seed, size)
+        try:
+            s3.meta.client.upload_fileobj(stream, bucket, obj_name,
+                                          Config=Uploader.tsfrConfig)
+        except Exception as e:
+            LOGGER.info(
+                f'{obj_name} in bucket {bucket} Upload caught exception: {e}')
+            return None, None
+        LOGGER.info(f'{obj_name} in bucket {bucket} Upload Done for user {user_name}')
+        return obj_name, stream.hexdigest('md5')
+
+    @staticmethod
+    def _upload_file(s3, gen, bucket, seed, size, user_name, prefix):
+        """Save generated buffer to DATAGEN_HOME, upload it and remove the file."""
         buf, csum = gen.generate(size, seed=seed)
         file_path = gen.save_buf_to_file(buf, csum, 1024 * 1024, prefix)
-        s3 = s3connections[random.randint(0, pool_len - 1)]
+        obj_name = os.path.basename(file_path)
+        md5sum = None
         try:
             s3.meta.client.upload_file(str(file_path),
                                        bucket,
-                                       os.path.basename(file_path),
+                                       obj_name,
                                        Config=Uploader.tsfrConfig)
             print(f'uploaded file {file_path} for user {user_name}')
         except Exception as e:
             LOGGER.info(
                 f'{file_path} in bucket {bucket} Upload caught exception: {e}')
+            obj_name = None
         else:
             LOGGER.info(f'{file_path} in bucket {bucket} Upload Done')
             with open(file_path, 'rb') as fp:
                 md5sum = hashlib.md5(fp.read()).hexdigest()
-            obj_name = os.path.basename(file_path)
-            stat_info = os.stat(file_path)
-            row_data = [user_name, bucket, obj_name, md5sum]
-            uploadObjects.append(row_data)
-            file_object = dict(name=obj_name, checksum=md5sum, seed=seed,
-                               size=size, mtime=stat_info.st_mtime)
-            self.change_manager.add_file_to_bucket(
-                user_name, bucket, file_object)
-            if os.path.exists(file_path):
-                os.remove(file_path)
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        return obj_name, md5sum
+
+    def _buffer_upload(self, user_name, bucket, obj_name, seed, size, md5sum):
+        """Buffer the row of an uploaded object, return True when a flush is due."""
+        with upload_lock:
+            uploadObjects.append([user_name, bucket, obj_name, md5sum, seed, size])
+            return len(uploadObjects) >= self.flush_rows or \
+                time.monotonic() - self.last_flush >= self.flush_secs
+
+    def _record_upload(self, user_name, bucket, obj_name, seed, size, md5sum):
+        """Remember (user, bucket, key, seed, size, checksum) of an uploaded object.
+        Rows are stored once flush_rows rows are buffered or flush_secs passed."""
+        if self._buffer_upload(user_name, bucket, obj_name, seed, size, md5sum):
+            self._flush_uploads()
 
     def start(self, users, buckets, files_count, prefs, stop_event, future_obj=None):
         LOGGER.info(f'Starting uploads for users {users}')
@@ -22,17 +22,23 @@
 
 import logging
 import os.path
+import sqlite3
 from datetime import datetime
 from multiprocessing import Process
 
 from commons.constants import PID_WATCH_LIST, REQUIRED_MODULES
+from commons.helpers.parallel_exec import map_parallel
+from commons.helpers.parallel_exec import run_on_nodes
 from commons.helpers.pods_helper import LogicalNode
+from commons.utils.resource_stats import ResourceStatsStore
 from commons.params import LOG_DIR_NAME, LATEST_LOG_FOLDER
 from commons.commands import PROC_CMD
 
 
 # check and set pytest logging level as Globals.LOG_LEVEL
 LOGGER = logging.getLogger(__name__)
+#: pgrep exit status when no process matched
+PGREP_NO_MATCH = 1
 
 
 class EnableProcPathStatsCollection:
@@ -70,12 +76,19 @@ class EnableProcPathStatsCollection:
         """function to get pids
         :param worker: Logical node object
         :param watch_list: list of string to be used in grepping command
+        :raises IOError: when pgrep fails, no matching process is not a failure
         """
         pid_dict = {}
-        for proc in watch_list:
-            res = worker.execute_cmd("echo $(pgrep {})".format(proc))
-            LOGGER.info(f'{proc} PIDs {res}')
-            pid_dict[proc] = res
+        results = run_on_nodes([worker], ["pgrep {}".format(proc) for proc in watch_list])
+        for proc, result in zip(watch_list, results):
+            if result.error is not None:
+                raise result.error
+            if result.exit_status not in (0, PGREP_NO_MATCH):
+                raise IOError(f"pgrep {proc} failed on {result.hostname} with "
+                              f"{result.exit_status}: {result.stderr}")
+            pids = b" ".join(result.stdout.split()) + b"\n"
+            LOGGER.info(f'{proc} PIDs {pids}')
+            pid_dict[proc] = pids
         return pid_dict
 
     def collect_pids(self, worker_stat_files_dict: dict):
@@ -83,34 +96,41 @@ class EnableProcPathStatsCollection:
         function to collect pids and write them to a file
         :param worker_stat_files_dict: dictionary containing filename and worker object
         """
-        for file_name, worker in worker_stat_files_dict.items():
-            pid_dict = self.get_pids(worker=worker, watch_list=PID_WATCH_LIST)
+        pid_dicts = map_parallel(lambda worker: self.get_pids(worker, PID_WATCH_LIST),
+                                 worker_stat_files_dict.values())
+        for (file_name, worker), pid_dict in zip(worker_stat_files_dict.items(), pid_dicts):
             file_path = os.path.join(self.log_path, worker.hostname)
             with open("{}".format(file_path), 'a') as fp:
                 fp.write(f"\npids : {pid_dict} file_name : {file_name}\n")
 
+    @staticmethod
+    def install_modules(worker_node: LogicalNode) -> bool:
+        """Install missing procpath modules on a worker node, False on failure."""
+        resp = worker_node.execute_cmd("pip list")
+        LOGGER.debug(resp)
+        for module in REQUIRED_MODULES:
+            if module in str(resp):
+                LOGGER.info("already installed module {}".format(module))
+            else:
+                retry = 0
+                while retry < 2:
+                    try:
+                        LOGGER.info("installing {}".format(module))
+                        worker_node.execute_cmd("pip install {}".format(module))
+                        break
+                    except IOError as err:
+                        LOGGER.info("facing error {} while installing {}".format(err, module))
+                        LOGGER.info("retrying installation of {}".format(module))
+                        retry += 1
+                if retry >= 2:
+                    return False
+        return True
+
     def setup_requirement(self):
         """Install required modules on worker nodes for procpath collection"""
         LOGGER.info("checking for installation required modules")
-        for worker_node in self.worker_node_list:
-            resp = worker_node.execute_cmd("pip list")
-            LOGGER.debug(resp)
-            for module in REQUIRED_MODULES:
-                if module in str(resp):
-                    LOGGER.info("already installed module {}".format(module))
-                else:
-                    retry = 0
-                    while retry < 2:
-                        try:
-                            LOGGER.info("installing {}".format(module))
-                            worker_node.execute_cmd("pip install {}".format(module))
-                            break
-                        except IOError as err:
-                            LOGGER.info("facing error {} while installing {}".format(err, module))
-                            LOGGER.info("retrying installation of {}".format(module))
-                            retry += 1
-                    if retry >= 2:
-                        return False, "Installation of Procpath required modules failed."
+        if not all(map_parallel(self.install_modules, self.worker_node_list)):
+            return False, "Installation of Procpath required modules failed."
         return True, "setup installation completed."
 
     def start_collection(self):
@@ -150,13 +170,36 @@ class EnableProcPathStatsCollection:
 
     def get_stat_files_to_local(self):
         """function to collect generated logs and copy them back to local"""
-        file_paths = dict()
-        for file_name, worker in self.worker_stat_files_dict.items():
+        def fetch(item):
+            file_name, worker = item
             if not worker.path_exists(file_name):
-                file_paths[worker] = "files are missing"
-            else:
-                file_path = os.path.join(self.log_path, file_name)
-                resp = worker.copy_file_to_local(remote_path=file_name, local_path=file_path)
-                LOGGER.info(resp)
-                file_paths[worker] = file_path
+                return "files are missing"
+            file_path = os.path.join(self.log_path, file_name)
+            resp = worker.copy_file_to_local(remote_path=file_name, local_path=file_path)
+            LOGGER.info(resp)
+            return file_path
+
+        items = list(self.worker_stat_files_dict.items())
+        file_paths = dict()
+        for (_, worker), file_path in zip(items, map_parallel(fetch, items)):
+            file_paths[worker] = file_path
         return True, file_paths
+
+    def load_stats(self, store: ResourceStatsStore, run: str) -> int:
+        """
+        Store the copied procpath databases of run, one node per worker.
+        :param store: Resource stats store
+        :param run: Run name, e.g. the test id
+        :return: Number of samples stored
+        """
+        count = 0
+        for file_name, worker in self.worker_stat_files_dict.items():
+            file_path = os.path.join(self.log_path, file_name)
+            if not os.path.exists(file_path):
+                LOGGER.warning("procpath file %s of %s is missing", file_path, worker.hostname)
+                continue
+            try:
+                count += store.import_procpath(run, worker.hostname, file_path)
+            except sqlite3.Error as error:
+                LOGGER.warning("procpath file %s is unreadable: %s", file_path, error)
+        return count
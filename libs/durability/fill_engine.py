@@ -0,0 +1,292 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+"""
+Closed loop fill of a cluster to a target capacity percentage.
+
+Data is written in batches and used capacity is measured after each batch. The raw bytes
+used per user byte written (SNS parity, metadata) and the write throughput are learned from
+the measurements, every batch writes a share of the remaining gap that takes at most
+sample_interval seconds, so large objects with many clients are used far from the target
+and small objects close to it. Written batches are kept in a manifest usable for later
+read, validate and delete phases. A capacity model gives the same plan without writing.
+"""
+
+import json
+import logging
+import math
+import time
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# Objects per client in a batch, fewer leave clients idle at the end of the batch
+OBJECTS_PER_CLIENT = 4
+# Share of the remaining gap written per batch, the rest is left for the next estimate
+APPROACH = 0.8
+# Share of the gap written before raw bytes per user byte was measured once
+PROBE_SHARE = 0.1
+# Weight of the newest measurement in the learned ratios
+SMOOTHING = 0.5
+MAX_STALLS = 3
+
+
+class FillManifest:
+    """Batches written by a fill, entries in the workload info format of NearFullStorage."""
+
+    def __init__(self, entries: List[dict] = None) -> None:
+        self.entries = list(entries or [])
+
+    def add(self, bucket: str, obj_name_pref: str, obj_size: int, num_sample: int,
+            num_clients: int) -> dict:
+        """Record a written batch."""
+        entry = {'bucket': bucket, 'obj_name_pref': obj_name_pref, 'num_clients': num_clients,
+                 'obj_size': obj_size, 'num_sample': num_sample}
+        self.entries.append(entry)
+        return entry
+
+    @property
+    def total_bytes(self) -> int:
+        """User bytes written."""
+        return sum(entry['obj_size'] * entry['num_sample'] for entry in self.entries)
+
+    def workload_info(self) -> List[dict]:
+        """Copy of the entries for perform_operations_on_pre_written_data / delete_workload."""
+        return [dict(entry) for entry in self.entries]
+
+    def save(self, path: str) -> None:
+        """Write the manifest as json."""
+        with open(path, "w") as fobj:
+            json.dump({"total_bytes": self.total_bytes, "entries": self.entries}, fobj,
+                      separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> 'FillManifest':
+        """Read a manifest written by save."""
+        with open(path) as fobj:
+            return cls(json.load(fobj)["entries"])
+
+
+class FillResult(NamedTuple):
+    """Outcome of a fill."""
+
+    ok: bool
+    reason: str
+    start_percent: float
+    final_percent: float
+    rounds: int
+    elapsed: float
+    manifest: FillManifest
+
+
+class CapacityModel:
+    """
+    Simulated cluster for dry runs, measure and write stand in for hctl and s3bench.
+    Writes take the time given by the per client and cluster throughput.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, total: int, used: int = 0, raw_per_user: float = 1.5,
+                 client_bps: float = 100e6, cluster_bps: float = 5e9) -> None:
+        """
+        :param total: Raw capacity in bytes
+        :param used: Raw bytes used
+        :param raw_per_user: Raw bytes used per user byte written
+        :param client_bps: Write throughput of one client
+        :param cluster_bps: Write throughput of the cluster
+        """
+        self.total = total
+        self.used = used
+        self.raw_per_user = raw_per_user
+        self.client_bps = client_bps
+        self.cluster_bps = cluster_bps
+        self.now = 0.0
+
+    def clock(self) -> float:
+        """Simulated seconds."""
+        return self.now
+
+    def measure(self) -> Tuple[int, int, int]:
+        """(total, available, used) like Health.get_sys_capacity."""
+        return self.total, self.total - self.used, self.used
+
+    # pylint: disable=too-many-arguments,unused-argument
+    def write(self, bucket: str, obj_name_pref: str, obj_size: int, num_sample: int,
+              num_clients: int) -> Tuple[bool, str]:
+        """Account a batch of writes."""
+        written = obj_size * num_sample
+        raw = math.ceil(written * self.raw_per_user)
+        if self.used + raw > self.total:
+            return False, "simulated cluster full"
+        self.used += raw
+        self.now += written / min(self.client_bps * num_clients, self.cluster_bps)
+        return True, "simulated"
+
+
+class FillEngine:
+    """
+    Fill a cluster to a target used capacity percentage.
+    Usage:
+    engine = FillEngine(health.get_sys_capacity, writer, [128 * MB, 1024 * MB],
+                        raw_per_user=sns_total / sns_data)
+    result = engine.fill(95)
+    """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(self, measure: Callable[[], tuple], writer: Callable[..., tuple],
+                 obj_sizes: Iterable[int], max_clients: int = 64, tolerance: float = 0.5,
+                 raw_per_user: float = 1.0, sample_interval: float = 300,
+                 max_rounds: int = None, bucket_prefix: str = "fill",
+                 bucket_list: List[str] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param measure: Returns (total, available, used) raw capacity in bytes
+        :param writer: writer(bucket, obj_name_pref, obj_size, num_sample, num_clients)
+        returns (ok, info)
+        :param obj_sizes: Object sizes in bytes to choose from
+        :param max_clients: Most parallel clients of a batch
+        :param tolerance: Accepted distance from the target in percent points
+        :param raw_per_user: First estimate of raw bytes used per user byte, e.g. from SNS
+        :param sample_interval: Longest time between capacity measurements in seconds
+        :param max_rounds: Most batches written, None for no limit
+        :param bucket_prefix: Prefix of the bucket created per batch
+        :param bucket_list: Existing buckets used in turn instead of new ones
+        :param clock: Time source
+        """
+        self.measure = measure
+        self.writer = writer
+        self.obj_sizes = sorted(set(int(size) for size in obj_sizes), reverse=True)
+        self.max_clients = max_clients
+        self.tolerance = tolerance
+        self.raw_per_user = raw_per_user
+        self.sample_interval = sample_interval
+        self.max_rounds = max_rounds
+        self.bucket_prefix = bucket_prefix
+        self.bucket_list = list(bucket_list or [])
+        self.clock = clock
+        self.throughput = None
+        self.calibrated = False
+
+    def _percent(self) -> Tuple[float, int, int]:
+        total, _, used = self.measure()
+        return used / total * 100, total, used
+
+    def plan_batch(self, gap_user: float) -> Optional[Tuple[int, int, int]]:
+        """
+        (object size, objects, clients) of the next batch for gap_user bytes left to write,
+        None when even one smallest object overshoots more than it helps.
+        """
+        batch = gap_user * (APPROACH if self.calibrated else PROBE_SHARE)
+        if self.throughput:
+            batch = min(batch, self.throughput * self.sample_interval)
+        else:
+            # Unknown throughput: one largest object per client to measure it
+            batch = min(batch, self.max_clients * self.obj_sizes[0])
+        for size in self.obj_sizes:
+            samples = int(batch // size)
+            if samples >= self.max_clients * OBJECTS_PER_CLIENT:
+                return size, samples, self.max_clients
+        size = self.obj_sizes[-1]
+        samples = int(batch // size)
+        if samples < 1:
+            if gap_user < size / 2:
+                return None
+            samples = 1
+        return size, samples, max(1, min(self.max_clients,
+                                         math.ceil(samples / OBJECTS_PER_CLIENT)))
+
+    def _bucket(self, rounds: int, size: int) -> str:
+        if self.bucket_list:
+            return self.bucket_list[rounds % len(self.bucket_list)]
+        return f"{self.bucket_prefix}-{size}b-{int(time.time())}-{rounds}"
+
+    # pylint: disable=too-many-locals
+    def fill(self, target_percent: float) -> FillResult:
+        """Write until used capacity is within tolerance of target_percent."""
+        began = self.clock()
+        manifest = FillManifest()
+        percent, total, used = self._percent()
+        start_percent = percent
+        rounds = stalls = 0
+        reason = ""
+        while True:
+            gap_pct = target_percent - percent
+            if abs(gap_pct) <= self.tolerance:
+                reason = "target reached"
+                break
+            if gap_pct < 0:
+                reason = f"used capacity {percent:.2f}% above target"
+                break
+            if self.max_rounds is not None and rounds >= self.max_rounds:
+                reason = f"target not reached in {rounds} batches"
+                break
+            gap_user = gap_pct / 100 * total / self.raw_per_user
+            plan = self.plan_batch(gap_user)
+            if plan is None:
+                reason = "remaining gap smaller than the smallest object"
+                break
+            size, samples, clients = plan
+            bucket = self._bucket(rounds, size)
+            obj_name = f"obj_{size}_{rounds}"
+            LOGGER.info("Fill batch %s: %s objects of %s bytes, %s clients, %.2f%% used, "
+                        "target %s%%", rounds, samples, size, clients, percent, target_percent)
+            batch_began = self.clock()
+            resp = self.writer(bucket, obj_name, size, samples, clients)
+            batch_secs = self.clock() - batch_began
+            rounds += 1
+            if not resp[0]:
+                reason = f"write failed: {resp[1]}"
+                break
+            manifest.add(bucket, obj_name, size, samples, clients)
+            written = size * samples
+            if batch_secs > 0:
+                rate = written / batch_secs
+                self.throughput = rate if self.throughput is None else \
+                    SMOOTHING * rate + (1 - SMOOTHING) * self.throughput
+            percent, total, new_used = self._percent()
+            if new_used > used:
+                self.raw_per_user = SMOOTHING * (new_used - used) / written + \
+                    (1 - SMOOTHING) * self.raw_per_user
+                if not self.calibrated:
+                    self.raw_per_user = (new_used - used) / written
+                    self.calibrated = True
+                stalls = 0
+            else:
+                stalls += 1
+                if stalls >= MAX_STALLS:
+                    reason = "used capacity does not change with writes"
+                    break
+            used = new_used
+        ok = abs(target_percent - percent) <= self.tolerance
+        LOGGER.info("Fill finished (%s): %.2f%% -> %.2f%% in %s batches, %s user bytes",
+                    reason, start_percent, percent, rounds, manifest.total_bytes)
+        return FillResult(ok, reason, start_percent, percent, rounds, self.clock() - began,
+                          manifest)
+
+
+def dry_run(model: CapacityModel, target_percent: float, obj_sizes: Iterable[int],
+            raw_per_user: float = 1.0, **kwargs) -> FillResult:
+    """Fill plan against a capacity model, kwargs as for FillEngine."""
+    engine = FillEngine(model.measure, model.write, obj_sizes, raw_per_user=raw_per_user,
+                        clock=model.clock, **kwargs)
+    return engine.fill(target_percent)
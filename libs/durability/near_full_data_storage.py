@@ -31,6 +31,8 @@ from config import CMN_CFG
 from config import DURABILITY_CFG
 from config.s3 import S3_CFG
 from libs.durability.disk_failure_recovery_libs import DiskFailureRecoveryLib
+from libs.durability.fill_engine import CapacityModel
+from libs.durability.fill_engine import FillEngine
 from scripts.s3_bench import s3bench
 
 LOGGER = logging.getLogger(__name__)
@@ -46,103 +48,90 @@ class NearFullStorage:
         self.http_client_timeout  = timeout
 
     @staticmethod
-    def get_user_data_space_in_bytes(master_obj: LogicalNode, memory_percent: int) -> tuple:
+    def get_raw_per_user_ratio(master_obj: LogicalNode) -> tuple:
         """
-        Retrieve the available user data space in bytes to attain the given memory percent
+        Raw capacity used per user byte written from the SNS configuration.
         :param master_obj: Logical node object of Master
-        :param memory_percent: Expected Memory Percentage to achieve.
-        :return : (boolean, int)
+        :return : (boolean, float)
         """
-        # Get available data disk space
-        health_obj = Health(master_obj.hostname, master_obj.username, master_obj.password)
-        total_cap, avail_cap, used_cap = health_obj.get_sys_capacity()
-        LOGGER.info("Total Capacity: %s Available Capacity: %s Used Capacity: %s", total_cap,
-                    avail_cap, used_cap)
-        current_usage_per = round(used_cap / total_cap * 100)
+        durability_values = DiskFailureRecoveryLib.retrieve_durability_values(master_obj, 'sns')
+        if not durability_values[0]:
+            LOGGER.error("Error in retrieving SNS values")
+            return durability_values
+        sns_values = {key: int(value) for key, value in durability_values[1].items()}
+        return True, sum(sns_values.values()) / sns_values['data']
 
-        if memory_percent > current_usage_per:
-            # Get SNS configuration to retrieve available user data space
-            durability_values = DiskFailureRecoveryLib.retrieve_durability_values(master_obj, 'sns')
-            if not durability_values[0]:
-                LOGGER.error("Error in retrieving SNS values")
-                return durability_values
-            sns_values = {key: int(value) for key, value in durability_values[1].items()}
-            LOGGER.debug("Durability Values (SNS) %s", sns_values)
-            data_sns = sns_values['data']
-            sum_sns = sum(sns_values.values())
-            LOGGER.debug("Current usage percent : %s Expected disk usage percent : %s",
-                         current_usage_per, memory_percent)
-            write_percent = memory_percent - current_usage_per
-            expected_writes = (write_percent * total_cap) / 100
-            user_data_writes = data_sns / sum_sns * expected_writes
-            LOGGER.info("User writes to be performed %s bytes to attain %s percent full disk space",
-                        user_data_writes, memory_percent)
-            return True, user_data_writes
-        LOGGER.info("Current Memory usage(%s) is already more than expected memory usage(%s)",
-                    current_usage_per, memory_percent)
-        return True, 0
+    @staticmethod
+    def get_workload_sizes() -> list:
+        """Object sizes in bytes used for near full writes on this setup type."""
+        workload = copy.deepcopy(DURABILITY_CFG['full_sys_writes']['vm_workload'])  # in mb
+        if CMN_CFG["setup_type"] == "HW":
+            workload.extend(DURABILITY_CFG['full_sys_writes']['extended_hw_workload'])
+        return [each * MB for each in workload]  # convert to bytes
 
-    # pylint: disable=too-many-locals
-    def perform_near_full_sys_writes(self, s3userinfo, user_data_writes, bucket_prefix: str,
-                                     **kwargs) -> tuple:
+    def s3bench_writer(self, s3userinfo: dict):
         """
-        Perform write operation till the memory is filled to given percentage
+        Writer for FillEngine running one s3bench write workload per batch.
         :param s3userinfo: S3user dictionary with access/secret key
-        :param user_data_writes: Write operation to be performed for specific bytes
-        :param bucket_prefix: Bucket prefix for the data written
-        :param client (Optional): Number of client sessions
-        :param bucket_list (Optional): List of pre-created buckets.
-        :return : boolean, list of dictionary
-                format : [{'bucket': bucket_name, 'obj_name_pref': obj_name, 'num_clients':
-                client, 'obj_size': obj_size, 'num_sample': sample}]
         """
-        client = kwargs.get("client", 10)
-        bucket_list = kwargs.get('bucket_list', None)
-        workload = copy.deepcopy(DURABILITY_CFG['full_sys_writes']['vm_workload'])  # in mb
-        if CMN_CFG["setup_type"] == "HW":
-            workload.extend(DURABILITY_CFG['full_sys_writes']['extended_hw_workload'])
+        def write(bucket, obj_name_pref, obj_size, num_sample, num_clients):
+            resp = s3bench.s3bench(s3userinfo['accesskey'],
+                                   s3userinfo['secretkey'],
+                                   bucket=bucket,
+                                   num_clients=num_clients,
+                                   num_sample=num_sample,
+                                   obj_name_pref=obj_name_pref, obj_size=f"{obj_size}b",
+                                   skip_cleanup=True, duration=None,
+                                   log_file_prefix=f"write_workload_{obj_size}b",
+                                   end_point=S3_CFG["s3_url"],
+                                   validate_certs=S3_CFG["validate_certs"],
+                                   max_retries=self.max_retries,
+                                   httpclientimeout=self.http_client_timeout
+                                   )
+            LOGGER.info("Log Path %s", resp[1])
+            if s3bench.check_log_file_error(resp[1]):
+                return False, f"S3bench workload for failed for {obj_size}." \
+                              f" Please read log file {resp[1]}"
+            return True, resp[1]
+        return write
 
-        workload = [each * MB for each in workload]  # convert to bytes
-        each_workload_byte = user_data_writes / len(workload)
-        return_list = []
-        if bucket_list:
-            bucket_iter = iter(bucket_list)
-        LOGGER.info("Perform Write operation for object size : %s", workload)
-        for obj_size in workload:
-            samples = int(each_workload_byte / obj_size)
-            if samples > 0:
-                temp_client = client
-                if temp_client > samples:
-                    temp_client = samples
-                bucket_name = f'{bucket_prefix}-{obj_size}b-{int(time.time())}'
-                if bucket_list:
-                    bucket_name = next(bucket_iter)
-                obj_name = f'obj_{obj_size}'
-                resp = s3bench.s3bench(s3userinfo['accesskey'],
-                                       s3userinfo['secretkey'],
-                                       bucket=bucket_name,
-                                       num_clients=temp_client,
-                                       num_sample=samples,
-                                       obj_name_pref=obj_name, obj_size=f"{obj_size}b",
-                                       skip_cleanup=True, duration=None,
-                                       log_file_prefix=f"write_workload_{obj_size}b",
-                                       end_point=S3_CFG["s3_url"],
-                                       validate_certs=S3_CFG["validate_certs"],
-                                       max_retries=self.max_retries,
-                                       httpclientimeout=self.http_client_timeout
-                                       )
-                LOGGER.info("Workload: %s objects of %s with %s parallel clients ", samples,
-                            obj_size, temp_client)
-                LOGGER.info("Log Path %s", resp[1])
-                if s3bench.check_log_file_error(resp[1]):
-                    return False, f"S3bench workload for failed for {obj_size}." \
-                                  f" Please read log file {resp[1]}"
-                return_list.append(
-                    {'bucket': bucket_name, 'obj_name_pref': obj_name, 'num_clients': temp_client,
-                     'obj_size': obj_size, 'num_sample': samples})
-            else:
-                continue
-        return True, return_list
+    # pylint: disable=too-many-arguments
+    def fill_to_percent(self, master_node: LogicalNode, write_per: float, s3userinfo: dict,
+                        bucket_prefix: str, clients: int = 64, bucket_list: list = None,
+                        dry_run: bool = False, manifest_path: str = None) -> tuple:
+        """
+        Write until the used capacity is within tolerance of write_per percent, measuring
+        the capacity between batches, see libs.durability.fill_engine.
+        :param master_node: Master node object
+        :param write_per: Percentage of used storage to be attained
+        :param s3userinfo: User info for IAM user
+        :param bucket_prefix: Bucket prefix to be used for IO operations
+        :param clients: Most parallel s3bench clients
+        :param bucket_list: List of created buckets, used in turn
+        :param dry_run: Plan against a capacity model starting at the current usage,
+        nothing is written
+        :param manifest_path: Save the manifest of written batches as json
+        :return : (boolean, FillResult) or (False, error)
+        """
+        fill_cfg = DURABILITY_CFG['fill_engine']
+        resp = self.get_raw_per_user_ratio(master_node)
+        if not resp[0]:
+            return resp
+        health_obj = Health(master_node.hostname, master_node.username, master_node.password)
+        measure, writer, clock = health_obj.get_sys_capacity, \
+            self.s3bench_writer(s3userinfo), time.monotonic
+        if dry_run:
+            total_cap, _, used_cap = health_obj.get_sys_capacity()
+            model = CapacityModel(total_cap, used_cap, raw_per_user=resp[1])
+            measure, writer, clock = model.measure, model.write, model.clock
+        engine = FillEngine(measure, writer, self.get_workload_sizes(), max_clients=clients,
+                            tolerance=fill_cfg['tolerance'], raw_per_user=resp[1],
+                            sample_interval=fill_cfg['sample_interval'],
+                            bucket_prefix=bucket_prefix, bucket_list=bucket_list, clock=clock)
+        result = engine.fill(write_per)
+        if manifest_path:
+            result.manifest.save(manifest_path)
+        return result.ok, result
 
     # pylint: disable=too-many-arguments
     def perform_operations_on_pre_written_data(self, s3userinfo: dict, workload_info: list,
@@ -228,23 +217,16 @@ class NearFullStorage:
         :return Tuple(boolean,Union(str,dict))
         """
         LOGGER.info("Perform Write operation to fill %s percent disk capacity", write_per)
-        resp = self.get_user_data_space_in_bytes(master_obj=master_node,
-                                                 memory_percent=write_per)
-        if not resp[0]:
+        resp = self.fill_to_percent(master_node, write_per, s3userinfo, bucket_prefix,
+                                    clients=clients, bucket_list=bucket_list)
+        if isinstance(resp[1], str):
             return resp
-
-        if resp[1] == 0:
+        result = resp[1]
+        if not result.ok and result.final_percent < write_per:
+            return False, result.reason
+        if not result.manifest.entries:
             LOGGER.warning("No bytes to be written to fill %s capacity", write_per)
             return True, None
-
-        resp = self.perform_near_full_sys_writes(
-            s3userinfo=s3userinfo,
-            user_data_writes=resp[1],
-            bucket_prefix=bucket_prefix,
-            clients=clients,
-            bucket_list=bucket_list)
-        if not resp[0]:
-            return resp
         LOGGER.info("Writes Completed.!!")
-        LOGGER.info("Written buckets : %s", resp[1])
-        return True, resp[1]
+        LOGGER.info("Written buckets : %s", result.manifest.entries)
+        return True, result.manifest.workload_info()
@@ -43,6 +43,7 @@ from commons.utils import config_utils
 from commons.utils import assert_utils
 from commons.helpers.pods_helper import LogicalNode
 from commons.helpers.health_helper import Health
+from commons.helpers.parallel_exec import map_parallel
 
 log = logging.getLogger(__name__)
 
@@ -132,8 +133,8 @@ class MotrCoreK8s():
             operation="get", pod="pods", namespace=namespace,
             command_suffix=f"{cmd}", decode=True)
         pod_list = [node.strip() for node in response.split('\n')]
-        for pod_name in pod_list:
-            node_name = self.get_node_name_from_pod_name(pod_name)
+        node_names = map_parallel(self.get_node_name_from_pod_name, pod_list)
+        for pod_name, node_name in zip(pod_list, node_names):
             node_pod_dict[node_name] = pod_name
         return node_pod_dict
 
@@ -0,0 +1,231 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""
+Event driven validation of alerts read from the message bus.
+
+The output of the message bus reader is tailed continuously and expected alert patterns
+are matched as lines arrive, so a validation returns as soon as the last alert shows up
+instead of after fixed sleeps sized for the slowest alert.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+
+LOGGER = logging.getLogger(__name__)
+
+CHUNK_SIZE = 65536
+
+
+class AlertMatch(NamedTuple):
+    """First line matching an expected pattern."""
+
+    pattern: str
+    latency: float
+    line: str
+
+
+class WatchResult(NamedTuple):
+    """Outcome of waiting for a set of alert patterns."""
+
+    matched: Dict[str, AlertMatch]
+    missing: List[str]
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        """All patterns matched."""
+        return not self.missing
+
+    def latencies(self) -> Dict[str, float]:
+        """Seconds from the watch mark to each alert."""
+        return {pattern: round(match.latency, 3) for pattern, match in self.matched.items()}
+
+
+class ChannelChunks:
+    """Output of a remote command as byte chunks, closing stops the command."""
+
+    def __init__(self, channel: Any) -> None:
+        self.channel = channel
+
+    def __iter__(self):
+        return iter(lambda: self.channel.recv(CHUNK_SIZE), b"")
+
+    def close(self) -> None:
+        """Close the channel, the remote command gets a hangup."""
+        self.channel.close()
+
+
+def wait_until(func: Callable[[], Any], timeout: float, step: float = 5,
+               until: Callable[[Any], bool] = bool) -> Any:
+    """
+    Call func every step seconds until until(result) holds or timeout expires.
+    :return: Last result of func
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        result = func()
+        if until(result) or time.monotonic() + step > deadline:
+            return result
+        time.sleep(step)
+
+
+class AlertWatcher:
+    """
+    Match expected alerts in a stream of reader output as it arrives.
+    Usage:
+    watcher = AlertWatcher(lambda: node.tail(screen_log)).start()
+    trigger_fault()
+    result = watcher.wait(["enclosure", "fault"], timeout=240)
+    watcher.stop()
+    """
+
+    def __init__(self, source: Callable[[], Iterable[bytes]],
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        :param source: Returns the byte chunks of the reader output, may have close()
+        :param clock: Time source
+        """
+        self.source = source
+        self.clock = clock
+        self.lines = []
+        self.arrivals = []
+        self.ended = False
+        self.error = None
+        self.marked = clock()
+        self.claimed = set()
+        self._stream = None
+        self._thread = None
+        self._cond = threading.Condition()
+
+    def start(self) -> 'AlertWatcher':
+        """Start reading the source in the background."""
+        self.marked = self.clock()
+        self._stream = self.source()
+        self._thread = threading.Thread(target=self._read, name="alert-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def mark(self) -> None:
+        """Measure latencies from now, call when the event raising the alerts happens."""
+        self.marked = self.clock()
+
+    def _add(self, line: str) -> None:
+        with self._cond:
+            self.lines.append(line)
+            self.arrivals.append(self.clock())
+            self._cond.notify_all()
+
+    def _read(self) -> None:
+        rest = b""
+        try:
+            for chunk in self._stream:
+                *complete, rest = (rest + chunk).split(b"\n")
+                for line in complete:
+                    self._add(line.decode("utf-8", "replace"))
+            if rest:
+                self._add(rest.decode("utf-8", "replace"))
+        except Exception as error:  # pylint: disable=broad-except
+            self.error = error
+        finally:
+            with self._cond:
+                self.ended = True
+                self._cond.notify_all()
+
+    def wait(self, patterns: List[str], timeout: float, anchor: str = None) -> WatchResult:
+        """
+        Wait until every pattern is found or timeout expires.
+        :param patterns: Substrings expected in alert lines, e.g. [resource_type, alert_type]
+        :param timeout: Seconds to wait
+        :param anchor: Only lines containing anchor are alerts, default the first pattern
+        """
+        anchor = patterns[0] if anchor is None and patterns else anchor
+        began = self.clock()
+        deadline = began + timeout
+        matched = {}
+        cursor = 0
+        with self._cond:
+            while True:
+                while cursor < len(self.lines):
+                    line, arrived = self.lines[cursor], self.arrivals[cursor]
+                    cursor += 1
+                    if anchor and anchor not in line:
+                        continue
+                    for pattern in patterns:
+                        if pattern not in matched and pattern in line:
+                            matched[pattern] = AlertMatch(
+                                pattern, max(arrived - self.marked, 0.0), line)
+                if len(matched) == len(patterns) or self.ended:
+                    break
+                left = deadline - self.clock()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+        missing = [pattern for pattern in patterns if pattern not in matched]
+        if missing and self.error is not None:
+            LOGGER.warning("Alert stream failed: %s", self.error)
+        return WatchResult(matched, missing, self.clock() - began)
+
+    def claim(self, patterns: List[str], timeout: float,
+              since: float = None) -> Optional[AlertMatch]:
+        """
+        Wait for the first unclaimed line containing all patterns which arrived at or
+        after since and claim it, so concurrent faults each correlate with their own alert.
+        :param patterns: Substrings all expected in the alert line
+        :param timeout: Seconds to wait
+        :param since: Clock time the fault was injected, default now
+        :return: Match with the latency from since, None at the deadline
+        """
+        since = self.clock() if since is None else since
+        deadline = self.clock() + timeout
+        with self._cond:
+            cursor = bisect_left(self.arrivals, since)
+            while True:
+                while cursor < len(self.lines):
+                    line = self.lines[cursor]
+                    if cursor not in self.claimed and all(
+                            pattern in line for pattern in patterns):
+                        self.claimed.add(cursor)
+                        return AlertMatch(patterns[0] if patterns else "",
+                                          self.arrivals[cursor] - since, line)
+                    cursor += 1
+                left = deadline - self.clock()
+                if self.ended or left <= 0:
+                    return None
+                self._cond.wait(left)
+
+    def stop(self) -> None:
+        """Stop reading the source."""
+        if self._stream is not None and hasattr(self._stream, "close"):
+            try:
+                self._stream.close()
+            except Exception as error:  # pylint: disable=broad-except
+                LOGGER.debug("Closing alert stream: %s", error)
+        if self._thread is not None:
+            self._thread.join(5)
@@ -31,9 +31,13 @@ from commons import constants as cmn_cons
 from commons.helpers import node_helper
 from commons.helpers.controller_helper import ControllerLib
 from commons.helpers.health_helper import Health
+from commons.helpers.ssh_pool import SSHConnectionManager
 from commons.utils.system_utils import run_remote_cmd
 from config import CMN_CFG
 from config import RAS_VAL
+from libs.ras.alert_watcher import AlertWatcher
+from libs.ras.alert_watcher import ChannelChunks
+from libs.ras.alert_watcher import wait_until
 from libs.s3 import S3H_OBJ
 
 LOGGER = logging.getLogger(__name__)
@@ -529,8 +533,10 @@ class RASCoreLib:
         :return: bool
         """
         LOGGER.info("Service to be restarted is: %s", service_name)
-        resp = self.health_obj.restart_pcs_resource(service_name)
-        time.sleep(60)
+        resp = self.health_obj.restart_pcs_resource(service_name, wait_time=0)
+        if resp[0]:
+            wait_until(lambda: self.health_obj.pcs_service_status(service_name), 60,
+                       RAS_VAL["ras_sspl_alert"]["poll_step"], until=lambda res: res[0])
         return resp
 
     def enable_disable_service(self, operation: str = None,
@@ -545,10 +551,98 @@ class RASCoreLib:
         command = common_commands.PCS_RESOURCE_DISABLE_ENABLE\
             .format(operation, service)
         self.node_utils.execute_cmd(cmd=command, read_lines=True)
-        time.sleep(30)
-        resp = self.health_obj.pcs_service_status(service)
+        running = operation != "disable"
+        resp = wait_until(lambda: self.health_obj.pcs_service_status(service), 30,
+                          RAS_VAL["ras_sspl_alert"]["poll_step"],
+                          until=lambda res: res[0] == running)
         return resp
 
+    def tail_file(self, path: str, timeout: float, from_start: bool = True) -> ChannelChunks:
+        """
+        Follow a remote file for up to timeout seconds.
+
+        :param str path: File to follow, may not exist yet
+        :param timeout: Seconds after which the remote tail exits
+        :param from_start: Include the existing content of the file
+        :return: Byte chunks of the file content
+        """
+        cmd = common_commands.TAIL_FOLLOW_CMD.format(
+            int(timeout) + 1, "+1" if from_start else 0, path)
+        _, stdout, _ = SSHConnectionManager.get_instance().exec_command(
+            self.host, self.username, self.pwd, cmd)
+        return ChannelChunks(stdout.channel)
+
+    def alert_watcher(self, timeout: float = None, from_start: bool = True) -> AlertWatcher:
+        """
+        Watcher of the message bus reader output, the screen log, not started.
+
+        :param timeout: Seconds the screen log is followed, default service and alert waits
+        :param from_start: Match alerts already in the screen log
+        :return: AlertWatcher
+        """
+        common_cfg = RAS_VAL["ras_sspl_alert"]
+        if timeout is None:
+            timeout = common_cfg["service_wait"] + common_cfg["alert_wait"]
+        return AlertWatcher(lambda: self.tail_file(
+            common_cfg["file"]["screen_log"], timeout, from_start))
+
+    def wait_for_services(self, services: list, timeout: float = None) -> Tuple[bool, Any]:
+        """
+        Poll until all services are running.
+
+        :param services: Service names
+        :param timeout: Seconds to wait for all of them, default service_wait
+        :return: Status of the first service not running, else of the last one
+        """
+        common_cfg = RAS_VAL["ras_sspl_alert"]
+        timeout = common_cfg["service_wait"] if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        resp = True, "No services"
+        for service in services:
+            resp = wait_until(
+                lambda svc=service: self.s3obj.get_s3server_service_status(
+                    service=svc, host=self.host, user=self.username, pwd=self.pwd),
+                max(deadline - time.monotonic(), 0), common_cfg["poll_step"],
+                until=lambda res: res[0])
+            if not resp[0]:
+                return resp
+        return resp
+
+    def wait_for_alerts(self, string_list: list, watcher: AlertWatcher = None,
+                        timeout: float = None) -> Tuple[bool, str]:
+        """
+        Wait until alert lines containing all strings are read from the message bus.
+
+        :param string_list: Expected strings [resource_type, alert_type, ...], only
+        lines containing the first one are alerts
+        :param watcher: Started watcher, by default one reading the whole screen log
+        :param timeout: Seconds to wait, default alert_wait
+        :return: (True, last string) or (False, first string not found)
+        """
+        common_cfg = RAS_VAL["ras_sspl_alert"]
+        timeout = common_cfg["alert_wait"] if timeout is None else timeout
+        own_watcher = watcher is None
+        if own_watcher:
+            watcher = self.alert_watcher(timeout).start()
+        try:
+            result = watcher.wait(string_list, timeout)
+        finally:
+            if own_watcher:
+                watcher.stop()
+        LOGGER.info("Alert latencies in seconds: %s", result.latencies())
+
+        # Keep the alert logs on the node for debugging, as before
+        self.cp_file(common_cfg["file"]["screen_log"], common_cfg["file"]["alert_log_file"])
+        cmd = common_commands.EXTRACT_LOG_CMD.format(
+            common_cfg["file"]["alert_log_file"], string_list[0])
+        self.node_utils.execute_cmd(cmd=cmd, read_nbytes=cmn_cons.BYTES_TO_READ)
+
+        if not result.ok:
+            LOGGER.info("Match not found : %s", result.missing[0])
+            return False, result.missing[0]
+        LOGGER.info("Match found : %s", string_list)
+        return True, string_list[-1]
+
     def alert_validation(self, string_list: list, restart: bool = True) -> \
             Tuple[bool, str]:
         """
@@ -563,59 +657,26 @@ class RASCoreLib:
         :rtype: Boolean, String
         """
         common_cfg = RAS_VAL["ras_sspl_alert"]
-        if restart:
-            LOGGER.info("Restarting sspl services and waiting some time")
-            self.health_obj.restart_pcs_resource(
-                common_cfg["sspl_resource_id"])
-
-            LOGGER.info("Sleeping for 120 seconds after restarting sspl "
-                        "services")
-            time.sleep(common_cfg["sleep_val"])
-
-        LOGGER.info("Checking status of sspl and kafka services")
-        resp = self.s3obj.get_s3server_service_status(
-            service=common_cfg["service"]["sspl_service"],
-            host=self.host, user=self.username, pwd=self.pwd)
-        if not resp[0]:
-            return resp
-        resp = self.s3obj.get_s3server_service_status(
-            service=common_cfg["service"]["kafka_service"],
-            host=self.host, user=self.username, pwd=self.pwd)
-        if not resp[0]:
-            return resp
-        LOGGER.info(
-            "Verified sspl and kafka services are in running state")
-        time.sleep(common_cfg["sleep_val"])
-
-        LOGGER.info("Fetching sspl alert response")
-        cmd = common_commands.COPY_FILE_CMD.format(
-            common_cfg["file"]["screen_log"],
-            common_cfg["file"]["alert_log_file"])
-
-        self.node_utils.execute_cmd(
-            cmd=cmd, read_nbytes=cmn_cons.BYTES_TO_READ)
-        LOGGER.info("Successfully fetched the alert response")
-
-        LOGGER.debug("Reading the alert log file")
-        read_resp = self.node_utils.read_file(
-            filename=common_cfg["file"]["alert_log_file"],
-            local_path=common_cfg["file"]["temp_txt_file"])
-        LOGGER.debug(
-            "======================================================")
-        LOGGER.debug(read_resp)
-        LOGGER.debug(
-            "======================================================")
-        LOGGER.info(
-            "Checking if alerts are generated on message bus")
-        cmd = common_commands.EXTRACT_LOG_CMD.format(
-            common_cfg["file"]["alert_log_file"], string_list[0],
-            common_cfg["file"]["extracted_alert_file"])
-        LOGGER.debug(cmd)
-        self.node_utils.execute_cmd(cmd=cmd, read_nbytes=cmn_cons.BYTES_TO_READ)
+        watcher = self.alert_watcher().start()
+        try:
+            if restart:
+                LOGGER.info("Restarting sspl services")
+                self.health_obj.restart_pcs_resource(
+                    common_cfg["sspl_resource_id"], wait_time=0)
+                watcher.mark()
+
+            LOGGER.info("Waiting for sspl and kafka services")
+            resp = self.wait_for_services([common_cfg["service"]["sspl_service"],
+                                           common_cfg["service"]["kafka_service"]])
+            if not resp[0]:
+                return resp
+            LOGGER.info(
+                "Verified sspl and kafka services are in running state")
 
-        resp = self.validate_alert_msg(
-            remote_file_path=common_cfg["file"]["extracted_alert_file"],
-            pattern_lst=string_list)
+            LOGGER.info("Checking if alerts are generated on message bus")
+            resp = self.wait_for_alerts(string_list, watcher)
+        finally:
+            watcher.stop()
         if not resp[0]:
             return resp
 
@@ -668,19 +729,19 @@ class RASCoreLib:
         LOGGER.info("Successfully killed %s service on %s host", service,
                     self.host)
         LOGGER.info("Verify if the services stops")
-        time.sleep(10)
-        resp = self.s3obj.get_s3server_service_status(service, host=self.host,
-                                                      user=self.username,
-                                                      pwd=self.pwd)
+        resp = wait_until(lambda: self.s3obj.get_s3server_service_status(
+            service, host=self.host, user=self.username, pwd=self.pwd), 10, 1,
+                          until=lambda res: not res[0])
         if not resp[0]:
             LOGGER.debug("Verified %s services stops", service)
         else:
             LOGGER.debug("Error: %s services did not stop", service)
 
-        # wait for some time for the service to come back
-        time.sleep(delay)
-        # verify service is restarted, we expect new PID for restarted service
-        new_pid = self.get_service_pid(service)
+        # wait up to delay for the service to come back, we expect new PID for
+        # restarted service
+        new_pid = wait_until(lambda: self.get_service_pid(service), delay,
+                             RAS_VAL["ras_sspl_alert"]["poll_step"],
+                             until=lambda pid: pid is not None and pid != old_pid)
 
         if old_pid != new_pid:
             LOGGER.info("Service %s recovery successful:Old PID:%s, New PID:%s", service, old_pid,
@@ -422,45 +422,16 @@ class RASTestLib(RASCoreLib):
         common_cfg = RAS_VAL["ras_sspl_alert"]
         try:
             LOGGER.info("Checking status of sspl and kafka services")
-            resp = self.s3obj.get_s3server_service_status(
-                common_cfg["service"]["sspl_service"], host=self.host,
-                user=self.username, pwd=self.pwd)
-            if not resp[0]:
-                return resp
-            resp = self.s3obj.get_s3server_service_status(
-                common_cfg["service"]["kafka_service"], host=self.host,
-                user=self.username, pwd=self.pwd)
+            resp = self.wait_for_services([common_cfg["service"]["sspl_service"],
+                                           common_cfg["service"]["kafka_service"]])
             if not resp[0]:
                 return resp
             LOGGER.info(
                 "Verified sspl and kafka services are in running state")
-            time.sleep(common_cfg["sleep_val"])
-
-            LOGGER.info("Fetching sspl alert response")
-            response = self.cp_file(common_cfg["file"]["screen_log"],
-                                    common_cfg["file"]["alert_log_file"])
-            if not response[0]:
-                return response
-            LOGGER.info("Successfully fetched the alert response")
-
-            LOGGER.debug("Reading the alert log file")
-            read_resp = self.node_utils.read_file(
-                common_cfg["file"]["alert_log_file"],
-                common_cfg["file"]["local_path"])
-            LOGGER.debug(
-                "======================================================")
-            LOGGER.debug(read_resp)
-            LOGGER.debug(
-                "======================================================")
 
             LOGGER.info(
                 "Checking if alerts are generated on message bus")
-            cmd = common_commands.EXTRACT_LOG_CMD.format(
-                common_cfg["file"]["alert_log_file"], string_list[0])
-            self.node_utils.execute_cmd(cmd=cmd,
-                                        read_nbytes=cmn_cons.BYTES_TO_READ)
-            resp = self.validate_alert_msg(
-                common_cfg["file"]["extracted_alert_file"], string_list)
+            resp = self.wait_for_alerts(string_list)
 
             LOGGER.info(resp)
             return resp
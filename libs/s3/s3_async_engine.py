@@ -0,0 +1,390 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""asyncio S3 I/O engine using aiohttp and SigV4 signed requests.
+
+It complements the thread based S3Lib for load generation: a single event loop keeps
+thousands of requests in flight over one pooled aiohttp connector. Request payloads are
+sent as UNSIGNED-PAYLOAD so bodies are never hashed for signing.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import quote
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
+
+from aiohttp import ClientSession
+from aiohttp import ClientTimeout
+from aiohttp import TCPConnector
+
+from commons.histogram import LatencyHistogram
+
+LOGGER = logging.getLogger(__name__)
+
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+DEFAULT_REGION = "us-east-1"
+MAX_CONCURRENCY = 1024
+READ_CHUNK_SIZE = 1024 * 1024
+REQUEST_TIMEOUT = 300
+
+
+class S3AsyncClientError(Exception):
+    """S3 error response or transport failure of the async engine."""
+
+    def __init__(self, status: int, code: str = None, message: str = None) -> None:
+        super().__init__(f"{status} {code}: {message}")
+        self.status = status
+        self.code = code
+        self.message = message
+
+
+class AsyncRateLimiter:
+    """Token bucket limiting operations per second across all coroutines of a loop."""
+
+    def __init__(self, rate: float, burst: int = None) -> None:
+        self.rate = rate
+        self.capacity = burst if burst else max(int(rate), 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def _strip_ns(tag: str) -> str:
+    return tag.split('}', 1)[-1]
+
+
+def _find(elem: ElementTree.Element, name: str) -> Optional[ElementTree.Element]:
+    for child in elem:
+        if _strip_ns(child.tag) == name:
+            return child
+    return None
+
+
+def _findall(elem: ElementTree.Element, name: str) -> List[ElementTree.Element]:
+    return [child for child in elem if _strip_ns(child.tag) == name]
+
+
+def _text(elem: ElementTree.Element, name: str, default: str = None) -> Optional[str]:
+    child = _find(elem, name)
+    return child.text if child is not None and child.text is not None else default
+
+
+class AsyncS3Engine:
+    """asyncio S3 client exposing core object and multipart operations.
+    Usage:
+    async with AsyncS3Engine(access_key, secret_key, endpoint_url, rate_limit=500) as s3:
+        await s3.put_object("bucket", "key", b"data")
+        data = await s3.get_object("bucket", "key", byte_range=(0, 1023))
+        results = await asyncio.gather(*[s3.head_object("bucket", k) for k in keys])
+    print(s3.stats())
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self,
+                 access_key: str,
+                 secret_key: str,
+                 endpoint_url: str,
+                 region: str = DEFAULT_REGION,
+                 max_concurrency: int = MAX_CONCURRENCY,
+                 rate_limit: float = None,
+                 timeout: int = REQUEST_TIMEOUT,
+                 verify_ssl: bool = False) -> None:
+        """
+        Initialize engine, connections are opened when entering the async context.
+
+        :param access_key: access key.
+        :param secret_key: secret key.
+        :param endpoint_url: endpoint url e.g. http://127.0.0.1:9000.
+        :param region: region used in signature scope.
+        :param max_concurrency: cap on requests in flight and pooled connections.
+        :param rate_limit: optional operations per second limit.
+        :param timeout: total timeout of a request in seconds.
+        :param verify_ssl: verify server certificate.
+        """
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.endpoint_url = endpoint_url.rstrip('/')
+        self.host = urlsplit(self.endpoint_url).netloc
+        self.region = region
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.verify_ssl = verify_ssl
+        self.limiter = AsyncRateLimiter(rate_limit) if rate_limit else None
+        self.session = None
+        self.semaphore = None
+        self.latency = dict()
+        self.errors = dict()
+        self.inflight = 0
+        self.peak_inflight = 0
+
+    async def __aenter__(self) -> 'AsyncS3Engine':
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        """Create the pooled aiohttp session."""
+        connector = TCPConnector(limit=self.max_concurrency, ssl=None if self.verify_ssl else False)
+        self.session = ClientSession(connector=connector,
+                                     timeout=ClientTimeout(total=self.timeout),
+                                     skip_auto_headers=('Content-Type',))
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self) -> None:
+        """Close session and its connections."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _sign(self, method: str, path: str, query: Dict[str, str],
+              headers: Dict[str, str]) -> Dict[str, str]:
+        """Add SigV4 authorization headers for an unsigned payload request."""
+        now = datetime.now(timezone.utc)
+        amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+        datestamp = now.strftime('%Y%m%d')
+        headers = dict(headers, host=self.host)
+        headers['x-amz-date'] = amz_date
+        headers['x-amz-content-sha256'] = UNSIGNED_PAYLOAD
+        signed = sorted(key.lower() for key in headers)
+        lower = {key.lower(): str(value).strip() for key, value in headers.items()}
+        canonical_query = '&'.join(
+            f"{quote(key, safe='-_.~')}={quote(str(value), safe='-_.~')}"
+            for key, value in sorted(query.items()))
+        canonical_request = '\n'.join([
+            method, quote(path, safe='/-_.~'), canonical_query,
+            ''.join(f'{key}:{lower[key]}\n' for key in signed), ';'.join(signed),
+            UNSIGNED_PAYLOAD])
+        scope = f'{datestamp}/{self.region}/s3/aws4_request'
+        string_to_sign = '\n'.join([
+            'AWS4-HMAC-SHA256', amz_date, scope,
+            hashlib.sha256(canonical_request.encode('utf-8')).hexdigest()])
+        key = ('AWS4' + self.secret_key).encode('utf-8')
+        for part in (datestamp, self.region, 's3', 'aws4_request'):
+            key = hmac.new(key, part.encode('utf-8'), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode('utf-8'), hashlib.sha256).hexdigest()
+        headers['Authorization'] = (
+            f'AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, '
+            f'SignedHeaders={";".join(signed)}, Signature={signature}')
+        del headers['host']
+        return headers
+
+    def _record(self, operation: str, start: float, failed: bool) -> None:
+        self.latency.setdefault(operation, LatencyHistogram()).record(
+            time.perf_counter() - start)
+        if failed:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+
+    # pylint: disable=too-many-arguments
+    async def _request(self, operation: str, method: str, bucket: str, key: str = '',
+                       query: Dict[str, str] = None, headers: Dict[str, str] = None,
+                       body: Any = None, sink: Callable = None,
+                       chunk_size: int = READ_CHUNK_SIZE) -> Tuple[int, Dict[str, str], Any]:
+        """
+        Send a signed request and return (status, case insensitive headers, body).
+
+        With sink the response body is fed to sink(chunk) as it arrives and the number
+        of bytes is returned in place of the body.
+        """
+        if self.session is None:
+            await self.open()
+        query = query or dict()
+        path = f'/{bucket}/{key}' if key else f'/{bucket}'
+        if self.limiter:
+            await self.limiter.acquire()
+        async with self.semaphore:
+            self.inflight += 1
+            self.peak_inflight = max(self.peak_inflight, self.inflight)
+            start = time.perf_counter()
+            failed = True
+            try:
+                req_headers = self._sign(method, path, query, headers or dict())
+                async with self.session.request(
+                        method, self.endpoint_url + quote(path, safe='/-_.~'), params=query,
+                        headers=req_headers, data=body) as resp:
+                    if sink is not None and resp.status < 300:
+                        payload = 0
+                        async for chunk in resp.content.iter_chunked(chunk_size):
+                            sink(chunk)
+                            payload += len(chunk)
+                    else:
+                        payload = await resp.read()
+                    if resp.status >= 300:
+                        code, message = None, None
+                        if payload:
+                            try:
+                                root = ElementTree.fromstring(payload)
+                                code, message = _text(root, 'Code'), _text(root, 'Message')
+                            except ElementTree.ParseError:
+                                message = payload[:256]
+                        raise S3AsyncClientError(resp.status, code, message)
+                    failed = False
+                    return resp.status, resp.headers.copy(), payload
+            finally:
+                self.inflight -= 1
+                self._record(operation, start, failed)
+
+    async def create_bucket(self, bucket: str) -> int:
+        """Create a bucket and return HTTP status."""
+        status, _, _ = await self._request('create_bucket', 'PUT', bucket)
+        return status
+
+    async def delete_bucket(self, bucket: str) -> int:
+        """Delete an empty bucket and return HTTP status."""
+        status, _, _ = await self._request('delete_bucket', 'DELETE', bucket)
+        return status
+
+    async def put_object(self, bucket: str, key: str, body: Any,
+                         headers: Dict[str, str] = None) -> str:
+        """Upload bytes like body and return ETag."""
+        _, resp_headers, _ = await self._request(
+            'put', 'PUT', bucket, key, headers=dict(headers or {}, **{
+                'Content-Length': str(len(body))}), body=body)
+        return resp_headers.get('ETag', '').strip('"')
+
+    async def get_object(self, bucket: str, key: str, byte_range: Tuple[int, int] = None,
+                         sink: Callable = None, chunk_size: int = READ_CHUNK_SIZE) -> Any:
+        """
+        Download an object or the inclusive byte_range (start, end) of it.
+
+        :param sink: optional callable fed with body chunks, e.g. hasher.update.
+        :return: body bytes, or number of bytes passed to sink.
+        """
+        headers = {'Range': f'bytes={byte_range[0]}-{byte_range[1]}'} if byte_range else None
+        _, _, payload = await self._request('get', 'GET', bucket, key, headers=headers,
+                                            sink=sink, chunk_size=chunk_size)
+        return payload
+
+    async def head_object(self, bucket: str, key: str) -> Dict[str, str]:
+        """Return object headers, ContentLength and ETag are normalised."""
+        _, resp_headers, _ = await self._request('head', 'HEAD', bucket, key)
+        return dict(resp_headers, ContentLength=int(resp_headers.get('Content-Length', 0)),
+                    ETag=resp_headers.get('ETag', '').strip('"'))
+
+    async def delete_object(self, bucket: str, key: str) -> int:
+        """Delete an object and return HTTP status."""
+        status, _, _ = await self._request('delete', 'DELETE', bucket, key)
+        return status
+
+    async def list_objects(self, bucket: str, prefix: str = '', max_keys: int = 1000,
+                           continuation_token: str = None) -> Tuple[List[dict], Optional[str]]:
+        """List one page with ListObjectsV2, return (contents, next continuation token)."""
+        query = {'list-type': '2', 'max-keys': str(max_keys)}
+        if prefix:
+            query['prefix'] = prefix
+        if continuation_token:
+            query['continuation-token'] = continuation_token
+        _, _, payload = await self._request('list', 'GET', bucket, query=query)
+        root = ElementTree.fromstring(payload)
+        contents = [dict(Key=_text(item, 'Key'), Size=int(_text(item, 'Size', '0')),
+                         ETag=_text(item, 'ETag', '').strip('"'))
+                    for item in _findall(root, 'Contents')]
+        token = None
+        if _text(root, 'IsTruncated', 'false') == 'true':
+            token = _text(root, 'NextContinuationToken')
+        return contents, token
+
+    async def iter_objects(self, bucket: str, prefix: str = '') -> AsyncIterator[dict]:
+        """Yield all objects of a bucket following continuation tokens."""
+        token = None
+        while True:
+            contents, token = await self.list_objects(bucket, prefix, continuation_token=token)
+            for item in contents:
+                yield item
+            if not token:
+                break
+
+    async def create_multipart_upload(self, bucket: str, key: str) -> str:
+        """Initiate multipart upload and return upload id."""
+        _, _, payload = await self._request('create_multipart', 'POST', bucket, key,
+                                            query={'uploads': ''})
+        return _text(ElementTree.fromstring(payload), 'UploadId')
+
+    async def upload_part(self, bucket: str, key: str, upload_id: str, part_number: int,
+                          body: Any) -> str:
+        """Upload one part and return its ETag."""
+        _, resp_headers, _ = await self._request(
+            'upload_part', 'PUT', bucket, key,
+            query={'partNumber': str(part_number), 'uploadId': upload_id},
+            headers={'Content-Length': str(len(body))}, body=body)
+        return resp_headers.get('ETag', '').strip('"')
+
+    async def complete_multipart_upload(self, bucket: str, key: str, upload_id: str,
+                                        parts: List[Tuple[int, str]]) -> str:
+        """Complete upload from (part number, ETag) pairs and return object ETag."""
+        body = ''.join(f'<Part><PartNumber>{number}</PartNumber><ETag>"{etag}"</ETag></Part>'
+                       for number, etag in sorted(parts))
+        body = f'<CompleteMultipartUpload>{body}</CompleteMultipartUpload>'.encode('utf-8')
+        _, _, payload = await self._request(
+            'complete_multipart', 'POST', bucket, key, query={'uploadId': upload_id},
+            headers={'Content-Type': 'application/xml'}, body=body)
+        return (_text(ElementTree.fromstring(payload), 'ETag') or '').strip('"')
+
+    async def abort_multipart_upload(self, bucket: str, key: str, upload_id: str) -> int:
+        """Abort multipart upload and return HTTP status."""
+        status, _, _ = await self._request('abort_multipart', 'DELETE', bucket, key,
+                                           query={'uploadId': upload_id})
+        return status
+
+    async def upload_multipart(self, bucket: str, key: str, parts: List[Any]) -> str:
+        """Upload parts concurrently and complete the upload, abort on failure."""
+        upload_id = await self.create_multipart_upload(bucket, key)
+        try:
+            etags = await asyncio.gather(*[
+                self.upload_part(bucket, key, upload_id, number, body)
+                for number, body in enumerate(parts, 1)])
+        except Exception:
+            await self.abort_multipart_upload(bucket, key, upload_id)
+            raise
+        return await self.complete_multipart_upload(bucket, key, upload_id,
+                                                    list(enumerate(etags, 1)))
+
+    def stats(self) -> dict:
+        """Per operation latency summary and error counts."""
+        return dict(peak_inflight=self.peak_inflight,
+                    operations={operation: dict(hist.summary(),
+                                                errors=self.errors.get(operation, 0))
+                                for operation, hist in self.latency.items()})
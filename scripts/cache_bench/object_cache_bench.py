@@ -0,0 +1,169 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Micro benchmark of the object cache used by Locust and IO workloads.
+
+The cache is filled with size objects, then threads run a store / pop random / lookup
+mix on it for duration seconds. The deque and dict FIFO previously used by
+core.runner.InMemoryDB is compared with core.object_cache.BoundedCache and ShardedCache.
+Usage:
+python scripts/cache_bench/object_cache_bench.py --size 1000000 --threads 8
+"""
+
+import argparse
+import json
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from collections import deque
+
+from commons.histogram import LatencyHistogram
+from core.object_cache import BoundedCache
+from core.object_cache import ShardedCache
+
+VARIANTS = ("legacy", "bounded", "sharded")
+
+
+class LegacyInMemoryDB:
+    """Previous core.runner InMemoryDB: FIFO eviction, O(n) random pop."""
+
+    def __init__(self, size: int) -> None:
+        self.maxsize = size
+        self.fifo = deque()
+        self.table = dict()
+        self._lock = threading.Lock()
+
+    def store(self, key, value) -> None:
+        with self._lock:
+            if key not in self.table:
+                self.fifo.append(key)
+            self.table[key] = value
+            if len(self.fifo) > self.maxsize:
+                self.table.pop(self.fifo.popleft(), None)
+
+    def lookup(self, key):
+        with self._lock:
+            return self.table[key]
+
+    def pop_random(self):
+        with self._lock:
+            keys = list(self.table.keys())
+            if not keys:
+                return None
+            key = secrets.choice(keys)
+            return key, self.table.pop(key)
+
+
+def make_cache(variant: str, size: int, shards: int = 16):
+    """Cache of variant holding up to size objects."""
+    if variant == "legacy":
+        return LegacyInMemoryDB(size)
+    if variant == "sharded":
+        return ShardedCache(size, shards=shards)
+    return BoundedCache(size)
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def run_bench(variant: str, size: int = 100000, threads: int = 4, duration: float = 2.0,
+              mix: tuple = (50, 40, 10), shards: int = 16) -> dict:
+    """
+    Fill a cache and run the operation mix, return throughput and latency.
+
+    :param mix: Percent of store, pop random and lookup operations
+    """
+    cache = make_cache(variant, size, shards)
+    begin = time.perf_counter()
+    for index in range(size):
+        cache.store(f"bucket/object-{index}", index)
+    fill_secs = time.perf_counter() - begin
+    latency = {name: LatencyHistogram() for name in ("store", "pop", "lookup")}
+    counters = Counter()
+    lock = threading.Lock()
+    end = time.monotonic() + duration
+
+    def worker(number):
+        rand = random.Random(number)
+        ops = Counter()
+        serial = 0
+        while time.monotonic() < end:
+            pick = rand.randrange(100)
+            start = time.perf_counter()
+            if pick < mix[0]:
+                serial += 1
+                cache.store(f"bucket/worker-{number}-{serial}", serial)
+                name = "store"
+            elif pick < mix[0] + mix[1]:
+                ops["empty"] += cache.pop_random() is None
+                name = "pop"
+            else:
+                try:
+                    cache.lookup(f"bucket/object-{rand.randrange(size)}")
+                except KeyError:
+                    ops["miss"] += 1
+                name = "lookup"
+            latency[name].record(time.perf_counter() - start)
+            ops[name] += 1
+        with lock:
+            counters.update(ops)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    began = time.monotonic()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.monotonic() - began
+    total = sum(counters[name] for name in latency)
+    return {"variant": variant, "size": size, "threads": threads,
+            "fill_ops_per_sec": round(size / fill_secs),
+            "ops": total, "ops_per_sec": round(total / elapsed),
+            "lookup_misses": counters["miss"], "empty_pops": counters["empty"],
+            "p50_us": {name: round(hist.percentile(50) * 1e6, 1)
+                       for name, hist in latency.items() if hist.count},
+            "p99_us": {name: round(hist.percentile(99) * 1e6, 1)
+                       for name, hist in latency.items() if hist.count}}
+
+
+def parse_args(argv=None):
+    """Command line options."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--size", type=int, default=100000, help="objects in the cache")
+    parser.add_argument("--threads", type=int, default=4, help="concurrent threads")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per variant")
+    parser.add_argument("--shards", type=int, default=16, help="shards of sharded variant")
+    parser.add_argument("--variant", choices=VARIANTS + ("all",), default="all")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Run benchmark and print JSON results."""
+    args = parse_args(argv)
+    variants = VARIANTS if args.variant == "all" else (args.variant,)
+    results = [run_bench(variant, args.size, args.threads, args.duration, shards=args.shards)
+               for variant in variants]
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
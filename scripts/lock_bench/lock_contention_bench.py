@@ -0,0 +1,213 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""
+Contention benchmark of target locking, N clients x M targets.
+
+Every client repeatedly locks any target of the pool, holds it and releases it. The
+atomic protocol of core.target_lock is compared with the legacy search, patch and
+confirm protocol. Runs against mongomock by default, where collection calls are
+serialized to give them the atomicity of a real server, or against MongoDB with --uri.
+Usage:
+python scripts/lock_bench/lock_contention_bench.py --clients 32 --targets 8 --rtt-ms 2
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from commons import constants as common_cnst
+from commons.histogram import LatencyHistogram
+from core.target_lock import TargetLockService
+
+PROTOCOLS = ("atomic", "legacy")
+
+
+class RoundTripCollection:
+    """Collection proxy counting calls, adding network delay and optionally serializing."""
+
+    def __init__(self, collection, rtt: float = 0.0, serialize: bool = False) -> None:
+        self.collection = collection
+        self.rtt = rtt
+        self.lock = threading.Lock() if serialize else None
+        self.round_trips = 0
+        self.count_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+
+        def call(*args, **kwargs):
+            with self.count_lock:
+                self.round_trips += 1
+            if self.rtt:
+                time.sleep(self.rtt)
+            if self.lock is None:
+                return method(*args, **kwargs)
+            with self.lock:
+                return method(*args, **kwargs)
+        return call
+
+
+def seed_targets(collection, targets: int) -> list:
+    """(Re)create target entries, return their names."""
+    names = [f"bench-target-{i:03d}" for i in range(targets)]
+    collection.delete_many({"setupname": {"$in": names}})
+    collection.insert_many([{"setupname": name, "is_setup_free": True,
+                             "is_setup_healthy": True, "setup_in_useby": "",
+                             "in_use_for_parallel": False, "parallel_client_cnt": 0}
+                            for name in names])
+    return names
+
+
+def legacy_acquire(collection, targets: list, client: str):
+    """Legacy LockingServer flow: serial search per target, patch, confirm."""
+    for target in targets:
+        if not collection.count_documents({"setupname": target}):
+            continue
+        if collection.find_one({"setupname": target, "is_setup_free": True,
+                                "is_setup_healthy": True}) is None:
+            continue
+        if collection.find_one({"setupname": target, "is_setup_free": True,
+                                "setup_in_useby": ""}) is None:
+            return None
+        collection.update_one({"setupname": target},
+                              {"$set": {"is_setup_free": False, "setup_in_useby": client}})
+        if collection.find_one({"setupname": target, "is_setup_free": False,
+                                "setup_in_useby": client}) is not None:
+            return target
+        return None
+    return None
+
+
+def legacy_release(collection, target: str, client: str) -> None:
+    collection.find_one({"setupname": target, "is_setup_free": False})
+    collection.update_one({"setupname": target, "setup_in_useby": client},
+                          {"$set": {"is_setup_free": True, "setup_in_useby": ""}})
+
+
+# pylint: disable=too-many-locals
+def run_bench(collection, protocol: str = "atomic", clients: int = 16, targets: int = 4,
+              duration: float = 5.0, hold: float = 0.005) -> dict:
+    """
+    Run clients threads for duration seconds and return statistics.
+
+    conflicts counts grants of a target another client already held, which must stay 0
+    for a correct protocol.
+    """
+    names = seed_targets(collection, targets)
+    service = TargetLockService(collection)
+    owners = dict()
+    owners_lock = threading.Lock()
+    latency = LatencyHistogram()
+    counters = Counter()
+    start_trips = collection.round_trips
+    end = time.monotonic() + duration
+
+    def worker(index):
+        client = f"bench-client-{index}"
+        rand = random.Random(index)
+        while time.monotonic() < end:
+            begin = time.perf_counter()
+            if protocol == "atomic":
+                lease = service.acquire_any(names, client, common_cnst.EXCLUSIVE_LOCK)
+                target = lease.target if lease else None
+            else:
+                target = legacy_acquire(collection, names, client)
+            latency.record(time.perf_counter() - begin)
+            if target is None:
+                counters["busy"] += 1
+                time.sleep(hold * rand.random())
+                continue
+            with owners_lock:
+                if owners.get(target):
+                    counters["conflicts"] += 1
+                owners[target] = client
+            counters["grants"] += 1
+            time.sleep(hold)
+            with owners_lock:
+                if owners.get(target) == client:
+                    owners[target] = None
+            if protocol == "atomic":
+                service.release(lease)
+            else:
+                legacy_release(collection, target, client)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    began = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - began
+    attempts = counters["grants"] + counters["busy"]
+    trips = collection.round_trips - start_trips
+    summary = {key: round(value * 1000, 3) for key, value in latency.summary().items()
+               if key != "count"}
+    return {"protocol": protocol, "clients": clients, "targets": targets,
+            "seconds": round(elapsed, 3), "grants": counters["grants"],
+            "busy": counters["busy"], "conflicts": counters["conflicts"],
+            "grants_per_sec": round(counters["grants"] / elapsed, 1),
+            "round_trips_per_attempt": round(trips / attempts, 2) if attempts else 0,
+            "acquire_latency_ms": summary}
+
+
+def get_collection(uri: str = None, rtt: float = 0.0) -> RoundTripCollection:
+    """Benchmark collection on MongoDB uri or mongomock."""
+    if uri:
+        from pymongo import MongoClient  # pylint: disable=import-outside-toplevel
+        return RoundTripCollection(MongoClient(uri)["lock_bench"]["targets"], rtt)
+    import mongomock  # pylint: disable=import-outside-toplevel
+    return RoundTripCollection(mongomock.MongoClient()["lock_bench"]["targets"], rtt,
+                               serialize=True)
+
+
+def parse_args(argv=None):
+    """Command line options."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--clients", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--targets", type=int, default=4, help="targets in the pool")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per protocol")
+    parser.add_argument("--hold-ms", type=float, default=5.0, help="lock hold time")
+    parser.add_argument("--rtt-ms", type=float, default=1.0,
+                        help="simulated round trip time added to every DB call")
+    parser.add_argument("--protocol", choices=PROTOCOLS + ("both",), default="both")
+    parser.add_argument("--uri", help="MongoDB uri, mongomock when omitted")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Run benchmark and print JSON results, non zero exit on lock conflicts."""
+    args = parse_args(argv)
+    protocols = PROTOCOLS if args.protocol == "both" else (args.protocol,)
+    results = []
+    for protocol in protocols:
+        collection = get_collection(args.uri, args.rtt_ms / 1000)
+        results.append(run_bench(collection, protocol, args.clients, args.targets,
+                                 args.duration, args.hold_ms / 1000))
+    print(json.dumps(results, indent=2))
+    return int(any(result["conflicts"] for result in results if
+                   result["protocol"] == "atomic"))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
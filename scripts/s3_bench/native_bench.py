@@ -0,0 +1,394 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+#
+
+"""
+In tree S3 benchmark driver covering the s3bench and hsbench knobs.
+
+Modes are run in the hsbench mode order, each letter being one phase:
+c clear objects, x delete buckets, i init buckets, p put, l list, g get, d delete.
+Every phase reports ops, errors, throughput, IOPS and HDR style latency and TTFB
+percentiles, and to_report_docs() turns them into performance DB documents read by
+tools/report/engg_report_csv.py.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import List
+
+from commons.histogram import LatencyHistogram
+from libs.s3.s3_async_engine import AsyncS3Engine
+from libs.s3.s3_async_engine import DEFAULT_REGION
+from libs.s3.s3_async_engine import S3AsyncClientError
+
+LOGGER = logging.getLogger(__name__)
+
+MODE_ORDER = "cxiplgdcx"
+MODES = {"c": "Clear", "x": "DelBucket", "i": "Init", "p": "Write", "l": "List",
+         "g": "Read", "d": "Delete"}
+PERCENTILES = (50, 90, 99, 99.9)
+SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024 ** 2, "mb": 1024 ** 2,
+              "g": 1024 ** 3, "gb": 1024 ** 3}
+MB = 1024 * 1024
+
+
+def parse_size(obj_size) -> int:
+    """Object size in bytes from int or strings like 4Kb, 128Mb, 1G."""
+    if isinstance(obj_size, int):
+        return obj_size
+    match = re.fullmatch(r"\s*(\d+)\s*([a-zA-Z]*)\s*", str(obj_size))
+    if not match or match.group(2).lower() not in SIZE_UNITS:
+        raise ValueError(f"Invalid object size {obj_size}")
+    return int(match.group(1)) * SIZE_UNITS[match.group(2).lower()]
+
+
+def size_label(size: int) -> str:
+    """Report label of a size in bytes e.g. 4096 -> 4Kb."""
+    for unit, factor in (("Gb", 1024 ** 3), ("Mb", MB), ("Kb", 1024)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return f"{size}b"
+
+
+def parse_duration(duration) -> float:
+    """Seconds from number or s3bench style duration like 1h24m10s, 0h22m."""
+    if duration is None or isinstance(duration, (int, float)):
+        return duration
+    match = re.fullmatch(r"(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?", duration.lower())
+    if not match or not any(match.groups()):
+        raise ValueError(f"Invalid duration {duration}")
+    hours, mins, secs = (int(val) if val else 0 for val in match.groups())
+    return hours * 3600 + mins * 60 + secs
+
+
+class OpStats:
+    """Counters and histograms of a single benchmark phase."""
+
+    def __init__(self, mode: str) -> None:
+        self.mode = mode
+        self.latency = LatencyHistogram()
+        self.ttfb = LatencyHistogram()
+        self.ops = 0
+        self.errors = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+        self.end = None
+
+    def record(self, latency: float, ttfb: float = None, nbytes: int = 0) -> None:
+        """Record one successful operation."""
+        self.ops += 1
+        self.bytes += nbytes
+        self.latency.record(latency)
+        self.ttfb.record(latency if ttfb is None else ttfb)
+
+    def result(self) -> dict:
+        """Structured result of the phase, latencies in seconds."""
+        seconds = (self.end or time.perf_counter()) - self.start
+
+        def hist(histogram):
+            summary = histogram.summary(PERCENTILES)
+            return dict(Min=summary.pop("min"), Avg=summary.pop("mean"),
+                        Max=summary.pop("max"), **{key: value for key, value in summary.items()
+                                                  if key != "count"})
+        return dict(Mode=self.mode, Operation=MODES[self.mode], Ops=self.ops,
+                    Errors=self.errors, Seconds=seconds, Total_Bytes=self.bytes,
+                    Throughput=self.bytes / MB / seconds if seconds else 0.0,
+                    IOPS=self.ops / seconds if seconds else 0.0,
+                    Latency=hist(self.latency), TTFB=hist(self.ttfb))
+
+
+class NativeS3Bench:
+    """asyncio S3 benchmark replacing the s3bench and hsbench binaries.
+    Usage:
+    bench = NativeS3Bench(access_key, secret_key, "http://127.0.0.1:9000", clients=40,
+                          samples=200, obj_size="4Kb", buckets=1)
+    results = bench.run()
+    write_json(bench.to_report_docs(results, build="2.0.0-100", branch="main"), path)
+    """
+
+    # pylint: disable=too-many-arguments, too-many-instance-attributes, too-many-locals
+    def __init__(self,
+                 access_key: str,
+                 secret_key: str,
+                 end_point: str,
+                 clients: int = 40,
+                 samples: int = 200,
+                 obj_size="4Kb",
+                 duration=None,
+                 buckets: int = 1,
+                 bucket_prefix: str = "hotsauce-bench",
+                 obj_name_pref: str = "loadgen_test_",
+                 mode_order: str = MODE_ORDER,
+                 skip_write: bool = False,
+                 skip_read: bool = False,
+                 skip_cleanup: bool = False,
+                 validate: bool = False,
+                 max_keys: int = 1000,
+                 region: str = DEFAULT_REGION,
+                 validate_certs: bool = False) -> None:
+        """
+        :param clients: number of concurrent requests in flight.
+        :param samples: number of objects written, read and deleted per phase.
+        :param obj_size: object size e.g. 4Kb, 2Mb or bytes.
+        :param duration: optional put/get phase run time, seconds or 1h24m10s, operations
+            cycle over the samples objects until it expires.
+        :param buckets: number of buckets objects are spread across.
+        :param mode_order: phases to run in order, see module doc.
+        :param skip_write: drop the put phase.
+        :param skip_read: drop the get phase.
+        :param skip_cleanup: drop clear, delete and bucket delete phases.
+        :param validate: compare md5 of read objects with the written payload.
+        """
+        unknown = set(mode_order) - set(MODES)
+        if unknown:
+            raise ValueError(f"Unknown modes {''.join(sorted(unknown))} in {mode_order}")
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.end_point = end_point
+        self.clients = clients
+        self.samples = samples
+        self.obj_size = parse_size(obj_size)
+        self.obj_size_label = obj_size if isinstance(obj_size, str) \
+            else size_label(self.obj_size)
+        self.duration = parse_duration(duration)
+        self.buckets = [f"{bucket_prefix}{idx:06d}" for idx in range(buckets)]
+        self.obj_name_pref = obj_name_pref
+        self.max_keys = max_keys
+        self.region = region
+        self.validate_certs = validate_certs
+        self.validate = validate
+        skipped = (("p" if skip_write else "") + ("g" if skip_read else "")
+                   + ("cdx" if skip_cleanup else ""))
+        self.mode_order = "".join(mode for mode in mode_order if mode not in skipped)
+        self.payload = os.urandom(self.obj_size)
+        self.payload_md5 = hashlib.md5(self.payload).hexdigest()
+
+    def _targets(self):
+        """(bucket, key) of every sample, spread round robin across buckets."""
+        return [(self.buckets[idx % len(self.buckets)], f"{self.obj_name_pref}{idx:08d}")
+                for idx in range(self.samples)]
+
+    async def _drive(self, stats: OpStats, items: list, operation, timed: bool) -> None:
+        """Run operation(item) for items with clients in flight, cycling until the
+        duration expires for timed phases."""
+        deadline = time.perf_counter() + self.duration if timed and self.duration else None
+        cursor = iter(range(len(items)))
+        total = len(items)
+
+        async def client():
+            nonlocal cursor
+            while True:
+                idx = next(cursor, None)
+                if idx is None:
+                    if deadline is None or not total or time.perf_counter() >= deadline:
+                        return
+                    cursor = iter(range(total))
+                    continue
+                try:
+                    await operation(items[idx], stats)
+                except (S3AsyncClientError, asyncio.TimeoutError, OSError) as error:
+                    stats.errors += 1
+                    LOGGER.debug("%s failed for %s: %s", stats.mode, items[idx], error)
+                if deadline is not None and time.perf_counter() >= deadline:
+                    return
+
+        await asyncio.gather(*[client() for _ in range(max(self.clients, 1))])
+        stats.end = time.perf_counter()
+
+    async def _put(self, engine, item, stats):
+        start = time.perf_counter()
+        await engine.put_object(*item, self.payload)
+        stats.record(time.perf_counter() - start, nbytes=self.obj_size)
+
+    async def _get(self, engine, item, stats):
+        start = time.perf_counter()
+        first = []
+        hasher = hashlib.md5() if self.validate else None
+
+        def sink(chunk):
+            if not first:
+                first.append(time.perf_counter())
+            if hasher:
+                hasher.update(chunk)
+        nbytes = await engine.get_object(*item, sink=sink)
+        end = time.perf_counter()
+        if hasher and hasher.hexdigest() != self.payload_md5:
+            raise S3AsyncClientError(200, "BadDigest", f"checksum mismatch for {item}")
+        stats.record(end - start, (first[0] if first else end) - start, nbytes)
+
+    async def _delete(self, engine, item, stats):
+        start = time.perf_counter()
+        await engine.delete_object(*item)
+        stats.record(time.perf_counter() - start)
+
+    async def _list(self, engine, bucket, stats):
+        token = None
+        while True:
+            start = time.perf_counter()
+            _, token = await engine.list_objects(bucket, self.obj_name_pref, self.max_keys,
+                                                 token)
+            stats.record(time.perf_counter() - start)
+            if not token:
+                return
+
+    async def _clear(self, engine, bucket, stats):
+        try:
+            keys = [item["Key"] async for item in engine.iter_objects(bucket,
+                                                                       self.obj_name_pref)]
+        except S3AsyncClientError as error:
+            if error.code == "NoSuchBucket":
+                return
+            raise
+        for key in keys:
+            await self._delete(engine, (bucket, key), stats)
+
+    async def _init_bucket(self, engine, bucket, stats):
+        start = time.perf_counter()
+        try:
+            await engine.create_bucket(bucket)
+        except S3AsyncClientError as error:
+            if error.code not in ("BucketAlreadyOwnedByYou", "BucketAlreadyExists"):
+                raise
+        stats.record(time.perf_counter() - start)
+
+    async def _delete_bucket(self, engine, bucket, stats):
+        start = time.perf_counter()
+        try:
+            await engine.delete_bucket(bucket)
+        except S3AsyncClientError as error:
+            if error.code != "NoSuchBucket":
+                raise
+        stats.record(time.perf_counter() - start)
+
+    async def run_async(self) -> List[dict]:
+        """Run all phases of mode_order and return their results."""
+        results = []
+        targets = self._targets()
+        async with AsyncS3Engine(self.access_key, self.secret_key, self.end_point,
+                                 region=self.region, max_concurrency=max(self.clients, 1),
+                                 verify_ssl=self.validate_certs) as engine:
+            phases = {
+                "c": (self.buckets, self._clear, False),
+                "x": (self.buckets, self._delete_bucket, False),
+                "i": (self.buckets, self._init_bucket, False),
+                "p": (targets, self._put, True),
+                "l": (self.buckets, self._list, False),
+                "g": (targets, self._get, True),
+                "d": (targets, self._delete, False),
+            }
+            for mode in self.mode_order:
+                items, func, timed = phases[mode]
+                stats = OpStats(mode)
+                LOGGER.info("Running %s phase on %s items", MODES[mode], len(items))
+                await self._drive(stats, items,
+                                  lambda item, op_stats, func=func: func(engine, item, op_stats),
+                                  timed)
+                result = stats.result()
+                LOGGER.info("%s: %s ops, %s errors, %.2f MBps, %.2f IOPS", result["Operation"],
+                            result["Ops"], result["Errors"], result["Throughput"],
+                            result["IOPS"])
+                results.append(result)
+        return results
+
+    def run(self) -> List[dict]:
+        """Blocking wrapper of run_async."""
+        return asyncio.run(self.run_async())
+
+    def to_report_docs(self, results: List[dict], build: str, branch: str,
+                       count_of_servers: int = 1) -> List[dict]:
+        """
+        Performance DB documents of put/get phases in the layout engg_report_csv reads.
+
+        Single bucket runs are reported as S3bench (Latency/TTFB Avg in seconds),
+        multi bucket runs as Hsbench (lower case operation, Latency in ms).
+        """
+        docs = []
+        for result in results:
+            if result["Operation"] not in ("Write", "Read"):
+                continue
+            doc = dict(result, Name="S3bench", Build=build, Branch=branch,
+                       Object_Size=self.obj_size_label, Buckets=len(self.buckets),
+                       Sessions=self.clients, Count_of_Servers=count_of_servers)
+            if len(self.buckets) > 1:
+                doc.update(Name="Hsbench", Operation=result["Operation"].lower(),
+                           Latency=result["Latency"]["Avg"] * 1000)
+            docs.append(doc)
+        return docs
+
+
+def write_json(docs: List[dict], json_path: str) -> str:
+    """Write results or report documents to json_path."""
+    with open(json_path, "w", encoding="utf-8") as fd_write:
+        json.dump(docs, fd_write, indent=2)
+    return json_path
+
+
+def has_errors(results: List[dict]) -> bool:
+    """True if any phase reported errors, replaces scraping tool logs."""
+    return any(result["Errors"] for result in results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run native S3 benchmark.")
+    parser.add_argument("--a", dest="access_key", required=True, help="the S3 access key")
+    parser.add_argument("--s", dest="secret_key", required=True, help="the S3 access secret")
+    parser.add_argument("--e", dest="end_point", default="https://s3.seagate.com",
+                        help="S3 endpoint (default: https://s3.seagate.com)")
+    parser.add_argument("--w", dest="clients", type=int, default=40,
+                        help="number of concurrent clients (default: 40)")
+    parser.add_argument("--ns", dest="samples", type=int, default=200,
+                        help="number of objects (default: 200)")
+    parser.add_argument("--os", dest="obj_size", default="4Kb",
+                        help="object size e.g. 4Kb, 1Mb (default: 4Kb)")
+    parser.add_argument("--t", dest="duration", default=None,
+                        help="run time of put/get phases, eg:1h30m (default: None)")
+    parser.add_argument("--b", dest="buckets", type=int, default=1,
+                        help="number of buckets (default: 1)")
+    parser.add_argument("--bp", dest="bucket_prefix", default="hotsauce-bench",
+                        help="prefix for buckets (default: hotsauce-bench)")
+    parser.add_argument("--m", dest="mode_order", default=MODE_ORDER,
+                        help=f"run modes in order (default: {MODE_ORDER})")
+    parser.add_argument("--sw", dest="skip_write", action="store_true", help="skip write")
+    parser.add_argument("--sr", dest="skip_read", action="store_true", help="skip read")
+    parser.add_argument("--sc", dest="skip_cleanup", action="store_true", help="skip cleanup")
+    parser.add_argument("--validate", action="store_true", help="validate read checksums")
+    parser.add_argument("--region", default=DEFAULT_REGION, help="signature region")
+    parser.add_argument("--j", dest="json_path", default="native_bench.json",
+                        help="write JSON results to this file")
+    parser.add_argument("--build", default=None, help="write report documents for build")
+    parser.add_argument("--branch", default="main", help="branch of report documents")
+    args = parser.parse_args()
+    bench = NativeS3Bench(args.access_key, args.secret_key, args.end_point,
+                          clients=args.clients, samples=args.samples, obj_size=args.obj_size,
+                          duration=args.duration, buckets=args.buckets,
+                          bucket_prefix=args.bucket_prefix, mode_order=args.mode_order,
+                          skip_write=args.skip_write, skip_read=args.skip_read,
+                          skip_cleanup=args.skip_cleanup, validate=args.validate,
+                          region=args.region)
+    bench_results = bench.run()
+    if args.build:
+        bench_results = bench.to_report_docs(bench_results, args.build, args.branch)
+    LOGGER.info("Results written to %s", write_json(bench_results, args.json_path))
@@ -27,6 +27,7 @@ import argparse
 import csv
 import json
 import logging
+import time
 import requests
 from datetime import datetime
 from multiprocessing import Process
@@ -45,6 +46,7 @@ from commons import cortxlogging
 from commons import constants as common_cnst
 
 LOGGER = logging.getLogger(__name__)
+TARGET_POLL_SECS = 30
 
 
 def parse_args():
@@ -387,15 +389,31 @@ def create_test_meta_data_file(args, test_list, jira_obj=None):
     return tp_meta
 
 
-def trigger_runner_process(args, kafka_msg, client):
+def trigger_runner_process(args, kafka_msg, client, lease=None):
     """
         Runner process to trigger tests in kafka msg on available target
     """
     lock_task = LockingServer()
-    trigger_tests_from_kafka_msg(args, kafka_msg)
-    # rerun unexecuted tests in case of parallel execution
-    if kafka_msg.parallel and args.force_serial_run != "True":
-        trigger_unexecuted_tests(args, kafka_msg.test_list)
+    keeper = None
+    if lease:
+        # pytest checks the file between tests and stops once the lease is lost.
+        lost_file = os.path.join(os.getcwd(), params.LOG_DIR_NAME, params.LEASE_LOST_FILE)
+        if os.path.exists(lost_file):
+            os.remove(lost_file)
+        os.environ[params.LEASE_LOST_ENV] = lost_file
+        keeper = lock_task.keep_alive(
+            lease, on_lost=lambda: open(lost_file, 'w').close()).start()
+    try:
+        trigger_tests_from_kafka_msg(args, kafka_msg)
+        if keeper and keeper.lost.is_set():
+            LOGGER.error("Lease on target %s lost, remaining tests aborted", args.target)
+        # rerun unexecuted tests in case of parallel execution
+        elif kafka_msg.parallel and args.force_serial_run != "True":
+            trigger_unexecuted_tests(args, kafka_msg.test_list)
+    finally:
+        if keeper:
+            keeper.stop()
+            os.environ.pop(params.LEASE_LOST_ENV, None)
     # Release lock on acquired target.
     lock_released = lock_task.unlock_target(args.target, client)
     if lock_released:
@@ -498,52 +516,23 @@ def trigger_tests_from_te(args):
             runner.stop_parallel_io(thread_io, event)
 
 
-def acquire_target(target, client, lock_type, convert_to_shared=False):
-    """
-    Check for target which will be used for sequential execution.
-    """
-    lock_task = LockingServer()
-    found_target = ""
-    if target != "":
-        LOGGER.debug("target found {}".format(target))
-        lock_success = lock_task.lock_target(target, client, lock_type, convert_to_shared)
-        if lock_success:
-            LOGGER.debug("lock acquired {}".format(target))
-            confirm_lock_success = lock_task.is_target_locked(target, client, lock_type)
-            if confirm_lock_success:
-                found_target = target
-                LOGGER.debug("lock confirmed {}".format(target))
-    return found_target
-
-
 def get_available_target(kafka_msg, client):
     """
     Check available target from target list
     Get lock on target if available
+    :return: Lease of acquired target
     """
     lock_task = LockingServer()
-    acquired_target = ""
     HealthCheck(runner.get_db_credential()).health_check(kafka_msg.target_list)
     LOGGER.info("Acquiring available target for test execution.")
-    while acquired_target == "":
-        if kafka_msg.parallel:
-            target = lock_task.find_free_target(kafka_msg.target_list, common_cnst.SHARED_LOCK)
-            if target == "":
-                seq_target = lock_task.find_free_target(kafka_msg.target_list,
-                                                        common_cnst.EXCLUSIVE_LOCK)
-                if seq_target != "":
-                    acquired_target = acquire_target(seq_target, client, common_cnst.SHARED_LOCK,
-                                                     True)
-            else:
-                acquired_target = acquire_target(target, client, common_cnst.SHARED_LOCK)
-        else:
-            seq_target = lock_task.find_free_target(kafka_msg.target_list,
-                                                    common_cnst.EXCLUSIVE_LOCK)
-            if seq_target != "":
-                acquired_target = acquire_target(seq_target, client,
-                                                 common_cnst.EXCLUSIVE_LOCK)
-    LOGGER.info("Acquired available target %s for test execution.", str(acquired_target))
-    return acquired_target
+    # Parallel runs share a target already in parallel use or lock a free one.
+    lock_type = common_cnst.SHARED_LOCK if kafka_msg.parallel else common_cnst.EXCLUSIVE_LOCK
+    lease = lock_task.acquire_free_target(kafka_msg.target_list, client, lock_type)
+    while lease is None:
+        time.sleep(TARGET_POLL_SECS)
+        lease = lock_task.acquire_free_target(kafka_msg.target_list, client, lock_type)
+    LOGGER.info("Acquired available target %s for test execution.", lease.target)
+    return lease
 
 
 def check_kafka_msg_trigger_test(args):
@@ -576,7 +565,8 @@ def check_kafka_msg_trigger_test(args):
             else:
                 current_time_ms = datetime.utcnow().strftime('%Y-%m-%d_%H:%M:%S.%f')
                 client = system_utils.get_host_name() + "_" + current_time_ms
-                acquired_target = get_available_target(kafka_msg, client)
+                lease = get_available_target(kafka_msg, client)
+                acquired_target = lease.target
                 ClientConfig(runner.get_db_credential()).client_configure_for_given_target(acquired_target)
                 args.te_ticket = kafka_msg.te_ticket
                 args.parallel_exe = kafka_msg.parallel
@@ -586,7 +576,7 @@ def check_kafka_msg_trigger_test(args):
                 args.target = acquired_target
                 # force serial run within testrunner till xdist issue is fixed
                 args.force_serial_run = "True"
-                p = Process(target=trigger_runner_process, args=(args, kafka_msg, client))
+                p = Process(target=trigger_runner_process, args=(args, kafka_msg, client, lease))
                 p.start()
                 p.join()
         except KeyboardInterrupt:
@@ -543,21 +543,14 @@ class TestDiskFailureRecovery:
 
         LOGGER.info("Step 1: Perform Write operations till overall disk space is filled %s",
                     self.near_full_percent)
-        resp = self.near_full_storage_obj.get_user_data_space_in_bytes(
-            self.node_master_list[0],
-            self.near_full_percent)
+        resp = self.near_full_storage_obj.perform_write_to_fill_system_percent(
+            self.node_master_list[0], self.near_full_percent, s3userinfo,
+            self.test_prefix[-1], 10)
         assert_utils.assert_true(resp[0], resp[1])
-
         if not resp[1]:
             LOGGER.info("Current Memory usage is already more than expected memory usage,"
-                        " skipping write operation")
-        else:
-            resp = self.near_full_storage_obj.perform_near_full_sys_writes(
-                s3userinfo=s3userinfo,
-                user_data_writes=resp[1],
-                bucket_prefix=self.test_prefix[-1])
-            assert_utils.assert_true(resp[0], resp[1])
-            workload_info = resp[1]
+                        " skipped write operation")
+        workload_info = resp[1]
 
         LOGGER.info("Step 2: Do IOs(Write and Read)")
         self.test_prefix.append('test-36396')
@@ -670,20 +663,14 @@ class TestDiskFailureRecovery:
 
         LOGGER.info("Step 1: Perform Write operations till overall disk space is filled %s",
                     self.near_full_percent)
-        resp = self.near_full_storage_obj.get_user_data_space_in_bytes(
-            self.node_master_list[0],
-            self.near_full_percent)
+        resp = self.near_full_storage_obj.perform_write_to_fill_system_percent(
+            self.node_master_list[0], self.near_full_percent, s3userinfo,
+            self.test_prefix[-1], 10)
         assert_utils.assert_true(resp[0], resp[1])
-
         if not resp[1]:
             LOGGER.info("Current Memory usage is already more than expected memory usage,"
-                        " skipping write operation")
-        else:
-            resp = self.near_full_storage_obj.perform_near_full_sys_writes(s3userinfo=s3userinfo,
-                                                                user_data_writes=resp[1],
-                                                                bucket_prefix=self.test_prefix[-1])
-            assert_utils.assert_true(resp[0], resp[1])
-            workload_info = resp[1]
+                        " skipped write operation")
+        workload_info = resp[1]
 
         LOGGER.info("Step 2: Do IOs(Write and Read)")
         self.test_prefix.append('test-36397')
@@ -890,21 +877,14 @@ class TestDiskFailureRecovery:
 
         LOGGER.info("Step 1: PerformWrite operations till overall disk space is filled %s",
                     self.near_full_percent)
-        resp = self.near_full_storage_obj.get_user_data_space_in_bytes(
-            self.node_master_list[0],
-            self.near_full_percent)
+        resp = self.near_full_storage_obj.perform_write_to_fill_system_percent(
+            self.node_master_list[0], self.near_full_percent, s3userinfo,
+            self.test_prefix[-1], 10)
         assert_utils.assert_true(resp[0], resp[1])
-
         if not resp[1]:
             LOGGER.info("Current Memory usage is already more than expected memory usage,"
-                        " skipping write operation")
-        else:
-            resp = self.near_full_storage_obj.perform_near_full_sys_writes(
-                s3userinfo=s3userinfo,
-                user_data_writes=resp[1],
-                bucket_prefix=self.test_prefix[-1])
-            assert_utils.assert_true(resp[0], resp[1])
-            workload_info = resp[1]
+                        " skipped write operation")
+        workload_info = resp[1]
 
         LOGGER.info("Step 2: Do IOs(Write and Read)")
         self.test_prefix.append('test-36399')
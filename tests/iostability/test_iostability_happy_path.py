@@ -32,6 +32,8 @@ from commons.helpers.health_helper import Health
 from commons.helpers.pods_helper import LogicalNode
 from commons.params import LATEST_LOG_FOLDER
 from commons.utils import support_bundle_utils, assert_utils
+from commons.utils.resource_stats import RESOURCE_STATS_DB
+from commons.utils.resource_stats import ResourceStatsStore
 from commons.utils.top_stats_collection_utils import TopStatsCollection
 from config import CMN_CFG
 from conftest import LOG_DIR
@@ -96,6 +98,7 @@ class TestIOWorkload:
     def setup_method(self):
         """Setup Method"""
         self.log.info("Setup Method Started")
+        self.stats_run = f"{type(self).__name__}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         self.log.info("Start Procpath collection")
         self.proc_path = EnableProcPathStatsCollection(CMN_CFG)
         self.log_collect = ServerOSLogsCollectLib(CMN_CFG)
@@ -136,6 +139,12 @@ class TestIOWorkload:
         assert_utils.assert_true(resp)
         resp = self.top_stats.copy_remove_files_from_remote(self.remote_dir_path, path)
         assert_utils.assert_true(resp)
+        self.log.info("Store resource stats of run %s", self.stats_run)
+        store = ResourceStatsStore(os.path.join(path, RESOURCE_STATS_DB))
+        self.proc_path.load_stats(store, self.stats_run)
+        self.top_stats.load_stats(store, self.stats_run, path)
+        store.report(self.stats_run, os.path.join(path, f"{self.stats_run}_resource_stats.json"))
+        store.close()
         self.log.info("Teardown method ended.")
 
     @pytest.mark.lc
@@ -182,19 +191,12 @@ class TestIOWorkload:
         client = len(self.worker_node_list) * self.clients
         percentage = self.test_cfg['nearfull_storage_percentage']
 
-        self.log.info("Step 1: Calculating byte count for required percentage")
-        resp = self.near_full_storage_obj.get_user_data_space_in_bytes(
-            master_obj=self.master_node_list[0],
-            memory_percent=percentage)
-        assert_utils.assert_true(resp[0], resp[1])
-        self.log.info("Need to add %s bytes for required percentage", resp[1])
-
+        self.log.info("Step 1: Skipped, writes measure the used capacity between batches")
         self.log.info("Step 2: Performing writes till we reach required percentage")
-        ret = self.near_full_storage_obj.perform_near_full_sys_writes(s3userinfo=self.s3userinfo,
-                                                                      user_data_writes=int(resp[1]),
-                                                                      bucket_prefix=bucket_prefix,
-                                                                      client=client)
+        ret = self.near_full_storage_obj.perform_write_to_fill_system_percent(
+            self.master_node_list[0], percentage, self.s3userinfo, bucket_prefix, client)
         assert_utils.assert_true(ret[0], ret[1])
+        ret = ret[0], ret[1] or []
         self.log.debug("Write operation data: %s", ret)
 
         self.log.info("Step 3: Performing read operations.")
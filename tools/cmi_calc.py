@@ -22,11 +22,11 @@ import argparse
 import configparser
 import json
 import sys
+from collections import Counter
 from collections import defaultdict
 from http import HTTPStatus
 
 import requests
-from jira import JIRA
 
 from report import jira_api
 
@@ -65,44 +65,29 @@ bug_priority_weights = {
 }
 
 
-def get_selective_tests_for_feature(tp_id: str, feature: str, status: str, username: str,
-                                    password: str):
-    """Search tests in given test plan, feature and test status"""
-    jira_url = "https://jts.seagate.com/"
-    options = {'server': jira_url}
-    jira = JIRA(options, basic_auth=(username, password))
-    if status:
-        query = f'issue in testPlanTests(\'{tp_id}\',\'{status}\') AND "Test Domain" = "{feature}"'
-    else:
-        query = f'issue in testPlanTests(\'{tp_id}\') AND "Test Domain" = "{feature}"'
-    issues = jira.search_issues(query, maxResults=300)
-    return issues
-
-
 def get_failed_tests_details(tp_id: str, username: str, password: str):
     """Return all failed tests with/without mapped Bug ID"""
     test_executions = jira_api.get_test_executions_from_test_plan(tp_id, username, password)
-    tests = []
-    for test_execution in test_executions:
-        tests.extend(jira_api.get_test_from_test_execution(test_execution["key"],
-                                                           username, password))
-    tests = [test for test in tests if test["status"] == "FAIL"]
+    te_tests = jira_api.get_tests_from_test_executions([te["key"] for te in test_executions],
+                                                       username, password)
+    tests = [test for tests in te_tests.values() for test in tests if test["status"] == "FAIL"]
     return tests
 
 
 def get_bug_priority_count(total_failed_tests, feature_tests, username, password) -> defaultdict:
     """Return count of Blocker/Critical/Major.. and not mapped failures in given feature"""
-    feature_tests = [str(test) for test in feature_tests]
     count = defaultdict(int)
     count["Unmapped"] = 0
-    for failed_test in total_failed_tests:
-        if failed_test["key"] in feature_tests and "defects" not in failed_test:
+    failed_tests = [test for test in total_failed_tests if test["key"] in feature_tests]
+    details = jira_api.get_issues_details(
+        [defect["key"] for test in failed_tests for defect in test.get("defects", [])],
+        username, password)
+    for failed_test in failed_tests:
+        if "defects" not in failed_test:
             count["unmapped"] += 1
-        elif failed_test["key"] in feature_tests and "defects" in failed_test:
-            defects = [jira_api.get_issue_details(defect["key"], username, password)
-                       for defect in failed_test["defects"]]
-            for defect in defects:
-                count[defect.fields.priority.name] += 1
+        else:
+            for defect in failed_test["defects"]:
+                count[details[defect["key"]].fields.priority.name] += 1
     return count
 
 
@@ -120,14 +105,14 @@ def calculate_cmi(tp_id: str, username, password) -> float:
     """
     # Total failed test for given build
     total_failed_tests = get_failed_tests_details(tp_id, username, password)
+    feature_tests = jira_api.get_feature_tests(tp_id, username, password)
+    # One batched lookup of all defects, per feature counts reuse the client's issues
+    jira_api.get_issues_details([defect["key"] for test in total_failed_tests
+                                 for defect in test.get("defects", [])], username, password)
     features_cmi = 0
     for feature, feature_weight in features_weights.items():
-        total_tests = get_selective_tests_for_feature(tp_id, feature, "", username, password)
-        pass_tests = get_selective_tests_for_feature(tp_id, feature, "PASS", username, password)
-        blocked_tests = get_selective_tests_for_feature(tp_id, feature, "BLOCKED", username,
-                                                        password)
-        aborted_tests = get_selective_tests_for_feature(tp_id, feature, "ABORTED", username,
-                                                        password)
+        total_tests = feature_tests.get(feature, {})
+        status = Counter(total_tests.values())
         count = get_bug_priority_count(total_failed_tests, total_tests, username, password)
         scaled_failures = + (
                 count["Blocker"] * bug_priority_weights["Blocker"] +
@@ -137,7 +122,7 @@ def calculate_cmi(tp_id: str, username, password) -> float:
                 count["Trivial"] * bug_priority_weights["Trivial"]
         )
         failed_tests = count["Unmapped"] + scaled_failures
-        scaled_tests = len(pass_tests) - failed_tests - len(blocked_tests) - len(aborted_tests)
+        scaled_tests = status["PASS"] - failed_tests - status["BLOCKED"] - status["ABORTED"]
         if total_tests:
             features_cmi += (feature_weight / len(total_tests)) * scaled_tests
     return features_cmi
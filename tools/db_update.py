@@ -205,6 +205,8 @@ def main():
         test_executions = jira_api.get_test_executions_from_test_plan(tp_key,
                                                                       username, password)
         test_plan_issue = jira_api.get_issue_details(tp_key, username, password)
+        # Look test execution issues up in batches, later lookups hit the client cache
+        jira_api.get_issues_details([te["key"] for te in test_executions], username, password)
         test_plan_label = test_plan_issue.fields.labels[0] if \
             test_plan_issue.fields.labels else "None"
 
@@ -220,6 +222,8 @@ def main():
 
             tests = jira_api.get_test_from_test_execution(test_execution["key"],
                                                           username, password)
+            jira_api.get_issues_details([test["key"] for test in tests if test["status"] != "TODO"],
+                                        username, password)
             # for each Test in TE:
             for test in tests:
                 logger.info("-Test Key %s", test["key"])
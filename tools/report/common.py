@@ -76,6 +76,10 @@ def get_perf_db_details():
         print("Could not get performance DB information. Please verify config.ini file")
         sys.exit(1)
 
+    bench_json = config["PerfDB"].get("bench_json")
+    if bench_json:
+        return f"file://{bench_json}", db_name, db_collection
+
     if not db_username or not db_password:
         print("Please set username and password for performance DB in config.ini file")
         sys.exit(1)
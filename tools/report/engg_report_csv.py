@@ -24,7 +24,7 @@ from copy import deepcopy
 
 import common
 import jira_api
-import mongodb_api
+import report_data
 
 OPERATIONS = ["write", "read"]
 STATS = ["Throughput", "Latency", "IOPS"]
@@ -41,14 +41,14 @@ def get_component_issue_summary_from_testplan(test_plan: str, username: str, pas
     te_keys = jira_api.get_test_executions_from_test_plan(test_plan, username, password)
     te_keys = [te_key["key"] for te_key in te_keys]
     component_defects = {component: 0 for component in common.COMPONENT_LIST}
-    for test_execution in te_keys:
-        tests = jira_api.get_test_from_test_execution(test_execution, username, password)
-        defects = [defect["key"] for test in tests for defect in test["defects"]]
-        for defect in defects:
-            defect_details = jira_api.get_issue_details(defect, username, password)
-            for component in defect_details.fields.components:
-                if component.name in component_defects:
-                    component_defects[component.name] += 1
+    te_tests = jira_api.get_tests_from_test_executions(te_keys, username, password)
+    defects = [defect["key"] for tests in te_tests.values() for test in tests
+               for defect in test["defects"]]
+    details = jira_api.get_issues_details(defects, username, password)
+    for defect in defects:
+        for component in details[defect].fields.components:
+            if component.name in component_defects:
+                component_defects[component.name] += 1
     return component_defects
 
 
@@ -81,6 +81,7 @@ def get_component_issue_summary(test_plans: list, username: str, password: str):
 # pylint: disable-msg=too-many-locals
 def get_single_bucket_perf_stats(build, branch, uri, db_name, db_collection):
     """Get single bucket performance data for engineering report"""
+    table = report_data.get_perf_table(build, uri, db_name, db_collection)
     row_2 = deepcopy(OBJECTS_SIZES)
     row_2.insert(0, "Statistics")
     data = [["Single Bucket Performance Statistics (Average) using S3Bench"], row_2]
@@ -95,22 +96,15 @@ def get_single_bucket_perf_stats(build, branch, uri, db_name, db_collection):
             else:
                 temp_data = [f"{operation} {stat}"]
             for obj_size in OBJECTS_SIZES:
-                query = {'Branch': branch, 'Build': build, 'Operation': operation,
-                         'Object_Size': obj_size}
-                count = mongodb_api.count_documents(query=query, uri=uri, db_name=db_name,
-                                                    collection=db_collection)
-                db_data = mongodb_api.find_documents(query=query, uri=uri, db_name=db_name,
-                                                     collection=db_collection)
+                row = table.lookup(Branch=branch, Operation=operation, Object_Size=obj_size)
                 if stat in ["Latency", "TTFB"]:
-                    if count > 0 and common.keys_exists(db_data[0], stat, "Avg"):
-                        temp_data.append(common.round_off(db_data[0][stat]["Avg"] * 1000))
+                    if row and common.keys_exists(row, stat, "Avg"):
+                        temp_data.append(common.round_off(row[stat]["Avg"] * 1000))
                     else:
                         temp_data.append("-")
                 else:
-                    if count > 0 and common.keys_exists(db_data[0], stat) \
-                            and "Count_of_Servers" in db_data[0]:
-                        temp_data.append(
-                            common.round_off(db_data[0][stat] / db_data[0]["Count_of_Servers"]))
+                    if row and common.keys_exists(row, stat) and "Count_of_Servers" in row:
+                        temp_data.append(common.round_off(row[stat] / row["Count_of_Servers"]))
                     else:
                         temp_data.append("-")
             data.extend([temp_data])
@@ -118,8 +112,10 @@ def get_single_bucket_perf_stats(build, branch, uri, db_name, db_collection):
 
 
 def get_tool_data(build, db_data, tool):
-    """Get data for given tool."""
-    temp_data = []
+    """Get data rows for given tool."""
+    table = report_data.get_perf_table(build, db_data['uri'], db_data['db_name'],
+                                       db_data['db_collection'])
+    data = []
     for configs in CONFIG:
         row_num = 0
         for operation in OPERATIONS:
@@ -134,25 +130,18 @@ def get_tool_data(build, db_data, tool):
                     head = f"{configs[1]} Sessions"
                 temp_data = [head, f"{operation.capitalize()} {stat}"]
                 for obj_size in OBJECTS_SIZES:
-                    query = {'Build': build, 'Name': tool, 'Operation': operation,
-                             'Object_Size': obj_size, 'Buckets': configs[0],
-                             'Sessions': configs[1], "Branch": db_data['branch']}
-                    count = mongodb_api.count_documents(query=query, uri=db_data['uri'],
-                                                        db_name=db_data['db_name'],
-                                                        collection=db_data['db_collection'])
-                    db_data = mongodb_api.find_documents(query=query, uri=db_data['uri'],
-                                                         db_name=db_data['db_name'],
-                                                         collection=db_data['db_collection'])
-
-                    if count > 0 and stat == "Throughput" and common.keys_exists(db_data[0],
-                                                                                 stat):
+                    row = table.lookup(Name=tool, Operation=operation, Object_Size=obj_size,
+                                       Buckets=configs[0], Sessions=configs[1],
+                                       Branch=db_data['branch'])
+                    if row and stat == "Throughput" and common.keys_exists(row, stat):
                         temp_data.append(
-                            common.round_off(db_data[0][stat] / db_data[0]["Count_of_Servers"]))
-                    elif count > 0 and common.keys_exists(db_data[0], stat):
-                        temp_data.append(common.round_off(db_data[0][stat]))
+                            common.round_off(row[stat] / row["Count_of_Servers"]))
+                    elif row and common.keys_exists(row, stat):
+                        temp_data.append(common.round_off(row[stat]))
                     else:
                         temp_data.append("-")
-    return temp_data
+                data.append(temp_data)
+    return data
 
 
 def get_bench_data(build, uri, db_name, db_collection, branch):
@@ -160,7 +149,7 @@ def get_bench_data(build, uri, db_name, db_collection, branch):
     data = []
     db_data = {'uri': uri, 'db_name': db_name, 'db_collection': db_collection, 'branch': branch}
     for tool in ["Hsbench", "Cosbench"]:
-        data.append(get_tool_data(build, db_data, tool))
+        data.extend(get_tool_data(build, db_data, tool))
     return data
 
 
@@ -178,18 +167,15 @@ def get_multiple_bucket_perf_stats(build, branch, uri, db_name, db_collection):
 
 def get_metadata_latencies(build, uri, db_name, db_collection):
     """Get metadata latency table data."""
+    table = report_data.get_perf_table(build, uri, db_name, db_collection)
     operations = ["PutObjTag", "GetObjTag", "HeadObj"]
     heading = ["Add / Edit Object Tags", "Read Object Tags", "Read Object Metadata"]
     data = [["Metadata Latencies (captured with 1KB object)"],
             ["Operation Latency (ms)", "Response Time"]]
     for ops, head in zip(operations, heading):
-        query = {'Name': 'S3bench', 'Build': build, 'Object_Size': '1Kb', 'Operation': ops}
-        count = mongodb_api.count_documents(query=query, uri=uri, db_name=db_name,
-                                            collection=db_collection)
-        db_data = mongodb_api.find_documents(query=query, uri=uri, db_name=db_name,
-                                             collection=db_collection)
-        if count > 0 and common.keys_exists(db_data[0], "Latency", "Avg"):
-            data.append([head, db_data[0]['Latency']['Avg'] * 1000])
+        row = table.lookup(Name='S3bench', Object_Size='1Kb', Operation=ops)
+        if row and common.keys_exists(row, "Latency", "Avg"):
+            data.append([head, row['Latency']['Avg'] * 1000])
         else:
             data.append([head, "-"])
     return data
@@ -220,8 +206,9 @@ def get_detailed_reported_bugs(test_plan: str, username: str, password: str):
     """
     test_executions = jira_api.get_test_executions_from_test_plan(test_plan, username, password)
     defects = defaultdict(list)
-    for te_issue in test_executions:
-        tests = jira_api.get_test_from_test_execution(te_issue["key"], username, password)
+    te_tests = jira_api.get_tests_from_test_executions([te["key"] for te in test_executions],
+                                                       username, password)
+    for tests in te_tests.values():
         for test in tests:
             if test["status"] == "FAIL" and test["defects"]:
                 for defect in test["defects"]:
@@ -230,9 +217,9 @@ def get_detailed_reported_bugs(test_plan: str, username: str, password: str):
         ["Detailed Reported Bugs"],
         ["Component", "Test ID", "Priority", "JIRA ID", "Status", "Description"],
     ]
+    details = jira_api.get_issues_details(defects, username, password)
     for defect, tests in defects.items():
-        defect_details = jira_api.get_issue_details(defect, username, password)
-        defect_details = defect_details.fields
+        defect_details = details[defect].fields
         component = ""
         if defect_details.components:
             component = defect_details.components[0].name
@@ -22,31 +22,20 @@ from collections import Counter
 
 import numpy as np
 import pandas as pd
-from jira import JIRA
 
 import common
 import jira_api
-import mongodb_api
+import report_data
 
 
 def get_feature_breakdown_summary_table_data(test_plan: str, username: str, password: str):
     """Get feature breakdown summary table data."""
     df_feature_data = pd.DataFrame(columns=["Pass", "Fail", "Total"])
-    jira_url = 'https://jts.seagate.com/'
-    options = {'server': jira_url}
-    jira = JIRA(options, basic_auth=(username, password))
+    feature_tests = jira_api.get_feature_tests(test_plan, username, password)
     for feature in jira_api.FEATURES:
-        df_feature_data.loc[feature.lstrip()] = [
-            jira.search_issues(
-                f'issue in testPlanTests("{test_plan}", "PASS") AND "Test Domain" = "{feature}"',
-                maxResults=500, json_result=True)["total"],
-            jira.search_issues(
-                f'issue in testPlanTests("{test_plan}", "FAIL") AND "Test Domain" = "{feature}"',
-                maxResults=500, json_result=True)["total"],
-            jira.search_issues(
-                f'issue in testPlanTests("{test_plan}") AND "Test Domain" = "{feature}"',
-                maxResults=500, json_result=True)["total"]
-        ]
+        count = Counter(feature_tests.get(feature.strip(), {}).values())
+        df_feature_data.loc[feature.lstrip()] = [count["PASS"], count["FAIL"],
+                                                 sum(count.values())]
     # Drop features with 0 data in all columns
     df_feature_data = df_feature_data[(df_feature_data > 0)].dropna(how="all")
 
@@ -101,6 +90,7 @@ def get_single_bucket_perf_data(build, uri, db_name, db_collection):
     operations = ["Write", "Read"]
     stats = ["Throughput", "Latency"]
     objects_sizes = ["4Kb", "256Mb"]
+    table = report_data.get_perf_table(build, uri, db_name, db_collection)
     for operation in operations:
         for stat in stats:
             if stat == "Latency":
@@ -108,20 +98,16 @@ def get_single_bucket_perf_data(build, uri, db_name, db_collection):
             else:
                 temp_data = [f"{operation} {stat} (ms)"]
             for objects_size in objects_sizes:
-                query = {'Build': build, 'Name': 'S3bench', 'Object_Size': objects_size,
-                         'Operation': operation}
-                count = mongodb_api.count_documents(query=query, uri=uri, db_name=db_name,
-                                                    collection=db_collection)
-                db_data = mongodb_api.find_documents(query=query, uri=uri, db_name=db_name,
-                                                     collection=db_collection)
+                row = table.lookup(Name='S3bench', Object_Size=objects_size,
+                                   Operation=operation)
                 if stat == "Latency":
-                    if count > 0 and common.keys_exists(db_data[0], stat, "Avg"):
-                        temp_data.append(common.round_off(db_data[0][stat]["Avg"] * 1000))
+                    if row and common.keys_exists(row, stat, "Avg"):
+                        temp_data.append(common.round_off(row[stat]["Avg"] * 1000))
                     else:
                         temp_data.append("-")
                 elif stat == "Throughput":
-                    if count > 0 and common.keys_exists(db_data[0], stat):
-                        temp_data.append(common.round_off(db_data[0][stat]))
+                    if row and common.keys_exists(row, stat):
+                        temp_data.append(common.round_off(row[stat]))
                     else:
                         temp_data.append("-")
                 else:
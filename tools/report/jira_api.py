@@ -18,15 +18,21 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 
 import getpass
+import json
 import os
 import re
 import sys
+import threading
 from collections import Counter
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from http import HTTPStatus
+from urllib.parse import urlsplit
 
 import requests
-from jira import JIRA
+from jira.resources import Issue
+from requests.adapters import HTTPAdapter
 
 BUGS_PRIORITY = ["Blocker", "Critical", "Major", "Minor", "Trivial"]
 TEST_STATUS = ["PASS", "FAIL", "ABORTED", "BLOCKED", "TODO"]
@@ -61,6 +67,273 @@ FEATURES = [
     "System Integration",
 ]
 
+JIRA_URL = "https://jts.seagate.com/"
+PAGE_SIZE = 100
+BATCH_SIZE = 100
+WORKERS = 8
+# Issues are cached on disk with their updated timestamp, JIRA_CACHE_DIR="" disables it
+CACHE_DIR = os.environ.get("JIRA_CACHE_DIR",
+                           os.path.join(os.path.expanduser("~"), ".cache", "jira_report"))
+# Replay recorded responses from JIRA_FIXTURES or record live responses to JIRA_RECORD
+FIXTURES_ENV = "JIRA_FIXTURES"
+RECORD_ENV = "JIRA_RECORD"
+
+_CLIENTS = {}
+
+
+class FixtureSession:
+    """
+    requests.Session stand-in replaying recorded JIRA responses.
+
+    When a live session is given every response is passed through and recorded to path,
+    which gives fixtures to run reports and unit tests offline.
+    """
+
+    def __init__(self, path: str, session: requests.Session = None):
+        self.path = path
+        self.session = session
+        self.auth = None
+        self.recorded = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as fixture:
+                for item in json.load(fixture):
+                    self.recorded[self.key(**item["request"])] = item
+
+    @staticmethod
+    def key(method: str, url: str, params: dict = None, body: dict = None) -> str:
+        """Request identity, independent of server and parameter order."""
+        params = {name: str(value) for name, value in (params or {}).items()}
+        return json.dumps([method.upper(), urlsplit(url).path, params, body], sort_keys=True)
+
+    def request(self, method: str, url: str, params: dict = None,
+                **kwargs) -> requests.Response:
+        """Recorded response of request, KeyError when it was never recorded."""
+        key = self.key(method, url, params, kwargs.get("json"))
+        if self.session is None:
+            if key not in self.recorded:
+                raise KeyError(f"No recorded JIRA response for {key}")
+            recorded = self.recorded[key]["response"]
+            response = requests.Response()
+            response.status_code = recorded["status"]
+            response._content = recorded["body"].encode()  # pylint: disable=protected-access
+            response.url = url
+            return response
+        response = self.session.request(method, url, params=params, auth=self.auth, **kwargs)
+        with self._lock:
+            self.recorded[key] = {
+                "request": {"method": method, "url": urlsplit(url).path, "params": params,
+                            "body": kwargs.get("json")},
+                "response": {"status": response.status_code, "body": response.text}}
+            with open(self.path, "w") as fixture:
+                json.dump(list(self.recorded.values()), fixture, indent=1)
+        return response
+
+
+class JiraDataClient:
+    """
+    JIRA and Xray data fetched over one pooled session.
+
+    Paged Xray endpoints and JQL searches fetch their pages in parallel, issues are looked
+    up in batches of JQL key in (...) queries. Issues are kept for the lifetime of the
+    client and on disk with their updated timestamp, so a later report only pulls issues
+    changed since.
+    Usage:
+    client = JiraDataClient(username, password)
+    issues = client.issues(["EOS-1", "EOS-2"])
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, username: str, password: str, server: str = JIRA_URL,
+                 cache_dir: str = CACHE_DIR, workers: int = WORKERS, session=None):
+        self.server = server.rstrip("/")
+        self.workers = workers
+        self.cache_dir = cache_dir
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self.session.auth = (username, password)
+        self._issues = {}
+        self._fields = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _request(self, method: str, path: str, params: dict = None, body: dict = None):
+        url = self.server + path
+        response = self.session.request(method, url, params=params, json=body)
+        if response.status_code == HTTPStatus.OK:
+            return response.json()
+        print(f'{method} on {url} failed')
+        print(f'RESPONSE={response.text}\n'
+              f'PARAMS={params}\n'
+              f'BODY={body}')
+        sys.exit(1)
+
+    def get(self, path: str, params: dict = None):
+        """JSON response of GET on path of server."""
+        return self._request("GET", path, params=params)
+
+    def map(self, func, items) -> list:
+        """func applied to every item on the worker threads, results in items order."""
+        items = list(items)
+        if len(items) < 2:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as executor:
+            return list(executor.map(func, items))
+
+    def paged(self, path: str, params: dict = None, page_size: int = PAGE_SIZE) -> list:
+        """
+        All items of an Xray endpoint paged with limit/page parameters.
+
+        Pages after the first one are requested workers at a time, until a page comes
+        back empty or shorter than the first one. A first page shorter than page_size is
+        the last one.
+        """
+        params = dict(params or {}, limit=page_size)
+        items = self.get(path, dict(params, page=1))
+        full = len(items)
+        page = 2
+        while full == page_size:
+            pages = self.map(lambda num: self.get(path, dict(params, page=num)),
+                             range(page, page + self.workers))
+            for result in pages:
+                items.extend(result)
+                if len(result) < full:
+                    return items
+            page += self.workers
+        return items
+
+    def search(self, jql: str, fields: list = None) -> list:
+        """Raw issues matching jql, pages after the first one are fetched in parallel."""
+        body = {"jql": jql, "startAt": 0, "maxResults": PAGE_SIZE,
+                "fields": fields or ["*all"], "validateQuery": False}
+        first = self._request("POST", "/rest/api/2/search", body=body)
+        issues = first["issues"]
+        step = first.get("maxResults") or PAGE_SIZE
+        starts = range(len(issues), first["total"], step) if issues else []
+        for result in self.map(
+                lambda start: self._request("POST", "/rest/api/2/search",
+                                            body=dict(body, startAt=start, maxResults=step)),
+                starts):
+            issues.extend(result["issues"])
+        return issues
+
+    def _search_keys(self, keys: list, fields: list = None) -> list:
+        """Raw issues of keys, in parallel batches of BATCH_SIZE keys."""
+        keys = sorted(keys)
+        batches = [keys[i:i + BATCH_SIZE] for i in range(0, len(keys), BATCH_SIZE)]
+        results = self.map(lambda batch: self.search(f"key in ({','.join(batch)})", fields),
+                           batches)
+        return [issue for result in results for issue in result]
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_cache(self, key: str):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(key)) as cached:
+                return json.load(cached)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, key: str, raw: dict) -> None:
+        if not self.cache_dir:
+            return
+        path = self._cache_path(key)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        with open(temp, "w") as cached:
+            json.dump(raw, cached)
+        os.replace(temp, path)
+
+    def issues(self, keys) -> dict:
+        """
+        Issues of keys as jira Issue resources.
+
+        Issues seen by this client are returned as they are. Disk cached issues cost a
+        batched updated-only search and are fetched again only when they changed.
+
+        Returns:
+            {key: Issue} for every key
+        """
+        keys = list(dict.fromkeys(keys))
+        missing = [key for key in keys if key not in self._issues]
+        cached = {}
+        for key in missing:
+            raw = self._read_cache(key)
+            if raw is not None:
+                cached[key] = raw
+        current = {issue["key"]: issue["fields"].get("updated")
+                   for issue in self._search_keys(list(cached), ["updated"])} if cached else {}
+        fetch = []
+        for key in missing:
+            raw = cached.get(key)
+            if raw is not None and key in current and \
+                    raw["fields"].get("updated") == current[key]:
+                self._issues[key] = self._issue(raw)
+            else:
+                fetch.append(key)
+        fetched = {issue["key"]: issue for issue in self._search_keys(fetch)}
+        # Moved or renamed issues are not returned under their old key by JQL
+        for key in fetch:
+            raw = fetched.get(key) or self.get(f"/rest/api/2/issue/{key}")
+            self._write_cache(key, raw)
+            self._issues[key] = self._issue(raw)
+        return {key: self._issues[key] for key in keys}
+
+    def issue(self, key: str) -> Issue:
+        """Issue of key as jira Issue resource."""
+        return self.issues([key])[key]
+
+    def _issue(self, raw: dict) -> Issue:
+        return Issue({"server": self.server}, None, raw=raw)
+
+    def field_id(self, name: str) -> str:
+        """Id of JIRA field name, e.g. customfield_21087 for Test Domain."""
+        if self._fields is None:
+            self._fields = {field["name"]: field["id"] for field in self.get("/rest/api/2/field")}
+        return self._fields[name]
+
+    def test_plan_executions(self, test_plan: str) -> list:
+        """Test executions of test_plan."""
+        return self.get(f"/rest/raven/1.0/api/testplan/{test_plan}/testexecution")
+
+    def test_plan_tests(self, test_plan: str) -> list:
+        """Tests of test_plan with latestStatus."""
+        return self.paged(f"/rest/raven/1.0/api/testplan/{test_plan}/test")
+
+    def test_execution_tests(self, test_execution: str) -> list:
+        """Tests of test_execution with status and defects."""
+        return self.paged(f"/rest/raven/1.0/api/testexec/{test_execution}/test",
+                          {"detailed": "true"})
+
+
+def get_client(username: str, password: str) -> JiraDataClient:
+    """
+    Shared JiraDataClient of username.
+
+    Replays the fixture file named by JIRA_FIXTURES instead of calling JIRA, or records
+    live responses to the file named by JIRA_RECORD.
+    """
+    key = (username, password, os.environ.get(FIXTURES_ENV), os.environ.get(RECORD_ENV))
+    if key not in _CLIENTS:
+        session = None
+        if key[2]:
+            session = FixtureSession(key[2])
+        elif key[3]:
+            session = FixtureSession(key[3], requests.Session())
+        _CLIENTS[key] = JiraDataClient(username, password, cache_dir=CACHE_DIR, session=session)
+    return _CLIENTS[key]
+
+
+def clear_clients():
+    """Drop shared clients and the issues they hold."""
+    _CLIENTS.clear()
+
 
 def get_test_executions_from_test_plan(test_plan: str, username: str, password: str) -> [dict]:
     """
@@ -83,15 +356,7 @@ def get_test_executions_from_test_plan(test_plan: str, username: str, password:
          "self": "https://jts.seagate.com/rest/api/2/issue/311992",
          "testEnvironments": ["515_full"]}]
     """
-    jira_url = f'https://jts.seagate.com/rest/raven/1.0/api/testplan/{test_plan}/testexecution'
-    response = requests.get(jira_url, auth=(username, password))
-    if response.status_code == HTTPStatus.OK:
-        return response.json()
-    print(f'get_test_executions GET on {jira_url} failed')
-    print(f'RESPONSE={response.text}\n'
-          f'HEADERS={response.request.headers}\n'
-          f'BODY={response.request.body}')
-    sys.exit(1)
+    return get_client(username, password).test_plan_executions(test_plan)
 
 
 def get_test_list_from_test_plan(test_plan: str, username: str, password: str) -> [dict]:
@@ -107,24 +372,7 @@ def get_test_list_from_test_plan(test_plan: str, username: str, password: str) -
         [{'id': 265766, 'key': 'TEST-4871', 'latestStatus': 'PASS'},
          {'id': 271956, 'key': 'TEST-6930', 'latestStatus': 'PASS'}]
     """
-    jira_url = f'https://jts.seagate.com/rest/raven/1.0/api/testplan/{test_plan}/test'
-    responses = []
-    i = 0
-    while True:
-        i = i + 1
-        query = {'limit': 100, 'page': i}
-        response = requests.get(jira_url, auth=(username, password), params=query)
-        if response.status_code == HTTPStatus.OK and response.json():
-            responses.extend(response.json())
-        elif response.status_code == HTTPStatus.OK and not response.json():
-            break
-        else:
-            print(f'get_test_list GET on {jira_url} failed')
-            print(f'RESPONSE={response.text}\n'
-                  f'HEADERS={response.request.headers}\n'
-                  f'BODY={response.request.body}')
-            sys.exit(1)
-    return responses
+    return get_client(username, password).test_plan_tests(test_plan)
 
 
 def get_test_from_test_execution(test_execution: str, username: str, password: str):
@@ -139,24 +387,18 @@ def get_test_from_test_execution(test_execution: str, username: str, password: s
         [{"key":"TEST-10963", "status":"FAIL", "defects": []}, {...}]
         "defects" = [{key:"EOS-123", "summary": "Bug Title", "status": "New/Started/Closed"},{}]
     """
-    responses = []
-    jira_url = f'https://jts.seagate.com/rest/raven/1.0/api/testexec/{test_execution}/test'
-    i = 0
-    while True:
-        i = i + 1
-        query = {'detailed': "true", 'limit': 100, 'page': i}
-        response = requests.get(jira_url, auth=(username, password), params=query)
-        if response.status_code == HTTPStatus.OK and response.json():
-            responses.extend(response.json())
-        elif response.status_code == HTTPStatus.OK and not response.json():
-            break
-        else:
-            print(f'get_test_from_test_execution GET on {jira_url} failed')
-            print(f'RESPONSE={response.text}\n'
-                  f'HEADERS={response.request.headers}\n'
-                  f'BODY={response.request.body}')
-            sys.exit(1)
-    return responses
+    return get_client(username, password).test_execution_tests(test_execution)
+
+
+def get_tests_from_test_executions(test_executions: list, username: str, password: str) -> dict:
+    """
+    Tests of several test executions fetched in parallel.
+
+    Returns:
+        {"TEST-16653": [{"key":"TEST-10963", "status":"FAIL", "defects": []}, {...}], ...}
+    """
+    client = get_client(username, password)
+    return dict(zip(test_executions, client.map(client.test_execution_tests, test_executions)))
 
 
 def get_issue_details(issue_id: str, username: str, password: str):
@@ -188,10 +430,36 @@ def get_issue_details(issue_id: str, username: str, password: str):
                 },
         }
     """
-    jira_url = "https://jts.seagate.com/"
-    options = {'server': jira_url}
-    auth_jira = JIRA(options, basic_auth=(username, password))
-    return auth_jira.issue(issue_id)
+    return get_client(username, password).issue(issue_id)
+
+
+def get_issues_details(issue_ids, username: str, password: str) -> dict:
+    """
+    Details of several issues looked up in batches, see get_issue_details.
+
+    Returns:
+        {issue_id: Issue}
+    """
+    return get_client(username, password).issues(issue_ids)
+
+
+def get_feature_tests(test_plan: str, username: str, password: str) -> dict:
+    """
+    Tests of test plan grouped by Test Domain.
+
+    Returns:
+        {"Data recovery": {"TEST-4871": "PASS", "TEST-6930": "FAIL"}, ...}
+    """
+    client = get_client(username, password)
+    domain = client.field_id("Test Domain")
+    statuses = {test["key"]: test["latestStatus"] for test in client.test_plan_tests(test_plan)}
+    features = defaultdict(dict)
+    for issue in client.search(f'issue in testPlanTests("{test_plan}")', [domain]):
+        values = issue["fields"].get(domain) or []
+        for value in values if isinstance(values, list) else [values]:
+            value = value.get("value") if isinstance(value, dict) else value
+            features[value.strip()][issue["key"]] = statuses.get(issue["key"], "TODO")
+    return features
 
 
 def get_defects_from_test_plan(test_plan: str, username: str, password: str) -> set:
@@ -203,7 +471,7 @@ def get_defects_from_test_plan(test_plan: str, username: str, password: str) ->
     te_keys = [te["key"] for te in test_executions]
 
     # Get test and defect details for each test execution
-    test_keys = {te: get_test_from_test_execution(te, username, password) for te in te_keys}
+    test_keys = get_tests_from_test_executions(te_keys, username, password)
 
     # Collect defects
     for _, tests in test_keys.items():
@@ -259,8 +527,7 @@ def get_reported_bug_table_data(test_plan: str, username: str, password: str):
     test_bugs = {x: 0 for x in BUGS_PRIORITY}
     cortx_bugs = {x: 0 for x in BUGS_PRIORITY}
     defects = get_defects_from_test_plan(test_plan, username, password)
-    for defect in defects:
-        defect = get_issue_details(defect, username, password)
+    for defect in get_issues_details(defects, username, password).values():
         components = [component.name for component in defect.fields.components]
         if "CFT" in components or "Automation" in components:
             test_bugs[defect.fields.priority.name] += 1
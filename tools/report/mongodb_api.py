@@ -17,12 +17,23 @@
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 #
 # -*- coding: utf-8 -*-
+import json
 import sys
 
 from pymongo import MongoClient
 from pymongo.errors import PyMongoError
 from pymongo.errors import ServerSelectionTimeoutError, OperationFailure
 
+FILE_URI_PREFIX = "file://"
+
+
+def load_json_documents(uri: str, query: dict) -> list:
+    """Documents of a JSON list file (file:// uri) matching all query fields."""
+    with open(uri[len(FILE_URI_PREFIX):], "r", encoding="utf-8") as json_file:
+        documents = json.load(json_file)
+    return [doc for doc in documents
+            if all(doc.get(key) == value for key, value in query.items())]
+
 
 def pymongo_exception(func):
     """Decorator for pymongo exceptions"""
@@ -61,13 +72,15 @@ def count_documents(query: dict,
 
     Args:
         query: Query to be searched in MongoDB
-        uri: URI of MongoDB database
+        uri: URI of MongoDB database or file:// path of a benchmark JSON file
         db_name: Database name
         collection: Collection name in database
 
     Returns:
         On success returns number of documents
     """
+    if uri.startswith(FILE_URI_PREFIX):
+        return len(load_json_documents(uri, query))
     with MongoClient(uri) as client:
         pymongo_db = client[db_name]
         tests = pymongo_db[collection]
@@ -86,15 +99,41 @@ def find_documents(query: dict,
 
     Args:
         query: Query to be searched in MongoDB
-        uri: URI of MongoDB database
+        uri: URI of MongoDB database or file:// path of a benchmark JSON file
         db_name: Database name
         collection: Collection name in database
 
     Returns:
         On success returns documents
     """
+    if uri.startswith(FILE_URI_PREFIX):
+        return load_json_documents(uri, query)
     with MongoClient(uri) as client:
         pymongo_db = client[db_name]
         tests = pymongo_db[collection]
         result = tests.find(query)
         return result
+
+
+@pymongo_exception
+def aggregate(pipeline: list,
+              uri: str,
+              db_name: str,
+              collection: str
+              ) -> list:
+    """
+    Run aggregation pipeline on MongoDB database
+
+    Args:
+        pipeline: Aggregation stages
+        uri: URI of MongoDB database
+        db_name: Database name
+        collection: Collection name in database
+
+    Returns:
+        On success returns result documents
+    """
+    with MongoClient(uri) as client:
+        pymongo_db = client[db_name]
+        tests = pymongo_db[collection]
+        return list(tests.aggregate(pipeline))
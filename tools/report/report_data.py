@@ -0,0 +1,121 @@
+"""Benchmark data of a build fetched with one aggregation for report tables."""
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+# -*- coding: utf-8 -*-
+from typing import Optional
+
+import mongodb_api
+
+# Fields identifying one cell of the benchmark matrix
+KEYS = ["Name", "Branch", "Operation", "Object_Size", "Buckets", "Sessions"]
+# Measurements reported per cell
+VALUES = ["Throughput", "Latency", "IOPS", "TTFB", "Count_of_Servers"]
+
+_CACHE = {}
+
+
+class PerfTable:
+    """
+    Tidy table of benchmark rows, one row per KEYS combination
+
+    Rows keep the order of their first document in the collection, so lookup returns
+    the same document a find(query)[0] would have returned.
+    """
+
+    def __init__(self, rows: list):
+        self.rows = rows
+        self._indexes = {}
+
+    def _index(self, fields: tuple) -> dict:
+        index = self._indexes.get(fields)
+        if index is None:
+            index = {}
+            for row in self.rows:
+                index.setdefault(tuple(row.get(field) for field in fields), row)
+            self._indexes[fields] = index
+        return index
+
+    def lookup(self, **query) -> Optional[dict]:
+        """
+        First row matching all query fields
+
+        Args:
+            query: Values of KEYS fields, e.g. Name="S3bench", Object_Size="4Kb"
+
+        Returns:
+            Row with KEYS and available VALUES fields or None
+        """
+        fields = tuple(sorted(query))
+        return self._index(fields).get(tuple(query[field] for field in fields))
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def _rows_from_documents(documents) -> list:
+    """Group documents in Python, used for file:// benchmark JSON."""
+    rows = {}
+    for doc in documents:
+        key = tuple(doc.get(field) for field in KEYS)
+        if key not in rows:
+            rows[key] = {field: doc[field] for field in KEYS + VALUES if field in doc}
+    return list(rows.values())
+
+
+def perf_pipeline(build: str) -> list:
+    """$match/$group pipeline collapsing a build to one row per KEYS combination."""
+    group = {"_id": {field: f"${field}" for field in KEYS}, "order": {"$min": "$_id"}}
+    group.update({field: {"$first": f"${field}"} for field in VALUES})
+    return [{"$match": {"Build": build}}, {"$group": group}, {"$sort": {"order": 1}}]
+
+
+def get_perf_table(build: str, uri: str, db_name: str, db_collection: str,
+                   refresh: bool = False) -> PerfTable:
+    """
+    Benchmark matrix of build, cached per process
+
+    Args:
+        build: Build number
+        uri: URI of MongoDB database or file:// path of a benchmark JSON file
+        db_name: Database name
+        db_collection: Collection name in database
+        refresh: Ignore the cached table
+
+    Returns:
+        PerfTable of all tools, branches and configurations of build
+    """
+    key = (uri, db_name, db_collection, build)
+    if not refresh and key in _CACHE:
+        return _CACHE[key]
+    if uri.startswith(mongodb_api.FILE_URI_PREFIX):
+        rows = _rows_from_documents(mongodb_api.load_json_documents(uri, {"Build": build}))
+    else:
+        rows = []
+        for group in mongodb_api.aggregate(perf_pipeline(build), uri=uri, db_name=db_name,
+                                           collection=db_collection):
+            row = dict(group["_id"])
+            row.update({field: group[field] for field in VALUES
+                        if group.get(field) is not None})
+            rows.append(row)
+    _CACHE[key] = PerfTable(rows)
+    return _CACHE[key]
+
+
+def clear_cache():
+    """Drop cached tables."""
+    _CACHE.clear()
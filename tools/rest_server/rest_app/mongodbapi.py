@@ -17,15 +17,74 @@
 # For any questions about this software or licensing,
 # please email opensource@seagate.com or cortx-questions@seagate.com.
 
+import inspect
+import os
+import threading
+from collections import OrderedDict
 from http import HTTPStatus
 
+from bson import ObjectId
 from pymongo import MongoClient
 from pymongo.errors import PyMongoError
 from pymongo.errors import ServerSelectionTimeoutError, OperationFailure
 
+# Client class used by the registry, tests swap in mongomock.MongoClient
+CLIENT_CLASS = MongoClient
+MAX_POOL_SIZE = 100
+MAX_CLIENTS = 32
+
+_CLIENTS = OrderedDict()
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(uri: str) -> MongoClient:
+    """
+    Return long lived MongoDB client for uri
+
+    Clients are shared by all requests of this process using the same credentials, so
+    the connection pool and server selection survive between requests. Least recently
+    used clients beyond MAX_CLIENTS are closed.
+
+    Args:
+        uri: URI of MongoDB database
+
+    Returns:
+        MongoClient of uri
+    """
+    key = (os.getpid(), uri)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is not None:
+            _CLIENTS.move_to_end(key)
+            return client
+        client = CLIENT_CLASS(uri, maxPoolSize=MAX_POOL_SIZE)
+        _CLIENTS[key] = client
+        while len(_CLIENTS) > MAX_CLIENTS:
+            _, evicted = _CLIENTS.popitem(last=False)
+            evicted.close()
+        return client
+
+
+def drop_client(uri: str) -> None:
+    """Close and forget the client of uri, e.g. after an authentication failure."""
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.pop((os.getpid(), uri), None)
+    if client is not None:
+        client.close()
+
+
+def close_clients() -> None:
+    """Close all clients of the registry."""
+    with _CLIENTS_LOCK:
+        clients = list(_CLIENTS.values())
+        _CLIENTS.clear()
+    for client in clients:
+        client.close()
+
 
 def pymongo_exception(func):
     """Decorator for pymongo exceptions"""
+    signature = inspect.signature(func)
 
     def new_func(*args, **kwargs):
         try:
@@ -36,6 +95,7 @@ def pymongo_exception(func):
                            "Unable to connect to mongoDB. Probably MongoDB server is down")
         except OperationFailure as ops_exception:
             if ops_exception.code == 18:
+                drop_client(signature.bind(*args, **kwargs).arguments["uri"])
                 return False, (HTTPStatus.UNAUTHORIZED, f"Wrong username/password. {ops_exception}")
             if ops_exception.code == 13:
                 return False, (HTTPStatus.FORBIDDEN,
@@ -68,11 +128,11 @@ def count_documents(query: dict,
         On failure returns http status code and message
         On success returns number of documents
     """
-    with MongoClient(uri) as client:
-        pymongo_db = client[db_name]
-        tests = pymongo_db[collection]
-        result = tests.count_documents(query)
-        return True, result
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.count_documents(query)
+    return True, result
 
 
 @pymongo_exception
@@ -96,11 +156,11 @@ def find_documents(query: dict,
         On failure returns http status code and message
         On success returns documents
     """
-    with MongoClient(uri) as client:
-        pymongo_db = client[db_name]
-        tests = pymongo_db[collection]
-        result = tests.find(query, projection)
-        return True, result
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.find(query, projection)
+    return True, result
 
 
 @pymongo_exception
@@ -122,11 +182,11 @@ def add_document(data: dict,
         On failure returns http status code and message
         On success returns created document ID
     """
-    with MongoClient(uri) as client:
-        pymongo_db = client[db_name]
-        tests = pymongo_db[collection]
-        result = tests.insert_one(data)
-        return True, result
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.insert_one(data)
+    return True, result
 
 
 @pymongo_exception
@@ -150,11 +210,11 @@ def update_documents(query: dict,
         On failure returns http status code and message
         On success returns created document ID
     """
-    with MongoClient(uri) as client:
-        pymongo_db = client[db_name]
-        tests = pymongo_db[collection]
-        result = tests.update_many(query, data)
-        return True, result
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.update_many(query, data)
+    return True, result
 
 
 # pylint: disable=too-many-arguments
@@ -181,11 +241,11 @@ def update_document(query: dict,
         On failure returns http status code and message
         On success returns created document ID
     """
-    with MongoClient(uri) as client:
-        database = client[db_name]
-        tests = database[collection]
-        result = tests.find_one_and_update(query, data, upsert=upsert)
-        return True, result
+    client = get_client(uri)
+    database = client[db_name]
+    tests = database[collection]
+    result = tests.find_one_and_update(query, data, upsert=upsert)
+    return True, result
 
 
 @pymongo_exception
@@ -209,11 +269,11 @@ def distinct_fields(field: str,
         On failure returns http status code and message
         On success returns number of documents
     """
-    with MongoClient(uri) as client:
-        pymongo_db = client[db_name]
-        tests = pymongo_db[collection]
-        result = tests.distinct(field, query)
-        return True, result
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.distinct(field, query)
+    return True, result
 
 
 @pymongo_exception
@@ -235,8 +295,89 @@ def aggregate(data: list,
         On failure returns http status code and message
         On success returns created document ID
     """
-    with MongoClient(uri) as client:
-        pymongo_db = client[db_name]
-        tests = pymongo_db[collection]
-        result = tests.aggregate(data)
-        return True, result
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    result = tests.aggregate(data)
+    return True, result
+
+
+# pylint: disable=too-many-arguments
+@pymongo_exception
+def search_documents(query: dict,
+                     projection: dict,
+                     uri: str,
+                     db_name: str,
+                     collection: str,
+                     page_size: int,
+                     cursor: str = None
+                     ) -> (bool, tuple):
+    """
+    Return one page of search results and total count in a single round trip
+
+    Pages are ordered by _id, cursor is the _id of the last document of previous page.
+
+    Args:
+        query: Query to be searched in MongoDB
+        projection: Fields to be returned
+        uri: URI of MongoDB database
+        db_name: Database name
+        collection: Collection name in database
+        page_size: Maximum documents to be returned
+        cursor: next_cursor of previous page
+
+    Returns:
+        On failure returns http status code and message
+        On success returns total count, documents and next_cursor (None on last page)
+    """
+    results = [{"$sort": {"_id": 1}}]
+    if cursor:
+        results.append({"$match": {"_id": {"$gt": ObjectId(cursor)}}})
+    results.append({"$limit": page_size})
+    # _id is always fetched for the next cursor and removed by the caller
+    projection = {key: value for key, value in (projection or {}).items() if key != "_id"}
+    if projection:
+        results.append({"$project": projection})
+    pipeline = [{"$match": query},
+                {"$facet": {"total": [{"$count": "count"}], "results": results}}]
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    facet = next(tests.aggregate(pipeline))
+    total = facet["total"][0]["count"] if facet["total"] else 0
+    documents = facet["results"]
+    next_cursor = None
+    if len(documents) == page_size:
+        next_cursor = str(documents[-1]["_id"])
+    return True, (total, documents, next_cursor)
+
+
+# pylint: disable=too-many-arguments
+@pymongo_exception
+def open_cursor(query: dict,
+                projection: dict,
+                uri: str,
+                db_name: str,
+                collection: str,
+                batch_size: int = 0
+                ) -> (bool, tuple):
+    """
+    Open cursor for query and fetch its first document in the same round trip
+
+    Args:
+        query: Query to be searched in MongoDB
+        projection: Fields to be returned
+        uri: URI of MongoDB database
+        db_name: Database name
+        collection: Collection name in database
+        batch_size: Documents per batch, 0 for server default
+
+    Returns:
+        On failure returns http status code and message
+        On success returns first document (None when no match) and cursor of the rest
+    """
+    client = get_client(uri)
+    pymongo_db = client[db_name]
+    tests = pymongo_db[collection]
+    cursor = tests.find(query, projection, batch_size=batch_size)
+    return True, (next(cursor, None), cursor)
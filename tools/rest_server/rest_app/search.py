@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Search response shared by the search endpoints."""
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+from http import HTTPStatus
+
+import flask
+
+from . import mongodbapi, read_config, validations
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+
+
+def _not_found(json_data: dict) -> flask.Response:
+    return flask.Response(status=HTTPStatus.NOT_FOUND,
+                          response=f"No results for query {json_data}")
+
+
+def _stream(first: dict, cursor) -> iter:
+    """Yield NDJSON lines of first document and rest of cursor."""
+    yield flask.json.dumps(first) + "\n"
+    for document in cursor:
+        document.pop("_id", None)
+        yield flask.json.dumps(document) + "\n"
+
+
+# pylint: disable=too-many-return-statements
+def search_response(json_data: dict, uri: str, collection: str) -> flask.Response:
+    """
+    Search collection with query of request and build flask response
+
+    Request may contain
+        page_size: return {"result", "total", "next_cursor"} of one page, results and
+            total count are fetched in one aggregation
+        cursor: next_cursor of previous page
+        stream: return all results as NDJSON streamed from a cursor, also selected by
+            Accept: application/x-ndjson
+    Otherwise all results are returned as {"result": [...]}.
+
+    Args:
+        json_data: Data from request without db_username/db_password
+        uri: URI of MongoDB database
+        collection: Collection name in database
+
+    Returns:
+        flask response
+    """
+    validate_field = validations.validate_page_fields(json_data)
+    if not validate_field[0]:
+        return flask.Response(status=validate_field[1][0], response=validate_field[1][1])
+
+    # Projection can be used to return certain fields from documents
+    projection = None
+    # Received request with projection field and projection is not empty dictionary
+    if "projection" in json_data and bool(json_data["projection"]):
+        projection = json_data["projection"]
+
+    if "page_size" in json_data:
+        page_results = mongodbapi.search_documents(json_data["query"], projection, uri,
+                                                   read_config.db_name, collection,
+                                                   json_data["page_size"],
+                                                   json_data.get("cursor"))
+        if not page_results[0]:
+            return flask.Response(status=page_results[1][0], response=page_results[1][1])
+        total, documents, next_cursor = page_results[1]
+        if total == 0:
+            return _not_found(json_data)
+        for document in documents:
+            document.pop("_id", None)
+        return flask.jsonify({'result': documents, 'total': total,
+                              'next_cursor': next_cursor})
+
+    stream = json_data.get("stream") or \
+        flask.request.accept_mimetypes.best == NDJSON_MIMETYPE
+    query_results = mongodbapi.open_cursor(json_data["query"], projection, uri,
+                                           read_config.db_name, collection,
+                                           STREAM_BATCH_SIZE if stream else 0)
+    if not query_results[0]:
+        return flask.Response(status=query_results[1][0], response=query_results[1][1])
+    first, cursor = query_results[1]
+    if first is None:
+        return _not_found(json_data)
+    first.pop("_id", None)
+    if stream:
+        return flask.Response(flask.stream_with_context(_stream(first, cursor)),
+                              mimetype=NDJSON_MIMETYPE)
+    output = [first]
+    for results in cursor:
+        results.pop("_id", None)
+        output.append(results)
+    return flask.jsonify({'result': output})
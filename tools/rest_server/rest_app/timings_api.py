@@ -23,7 +23,7 @@ from urllib.parse import quote_plus
 import flask
 from flask_restx import Resource, Namespace
 
-from . import mongodbapi, read_config, validations
+from . import mongodbapi, read_config, search, validations
 
 api = Namespace('Timings API', path="/", description='Timings related operations')
 
@@ -107,28 +107,4 @@ class Timings(Resource):
         del json_data["db_username"]
         del json_data["db_password"]
 
-        # Projection can be used to return certain fields from documents
-        projection = None
-        # Received request with projection field and projection is not empty dictionary
-        if "projection" in json_data and bool(json_data["projection"]):
-            projection = json_data["projection"]
-
-        count_results = mongodbapi.count_documents(json_data["query"], uri, read_config.db_name,
-                                                   read_config.timing_collection)
-        if not count_results[0]:
-            return flask.Response(status=count_results[1][0],
-                                  response=count_results[1][1])
-        if count_results[0] and count_results[1] == 0:
-            return flask.Response(status=HTTPStatus.NOT_FOUND,
-                                  response=f"No results for query {json_data}")
-
-        query_results = mongodbapi.find_documents(json_data["query"], projection, uri,
-                                                  read_config.db_name,
-                                                  read_config.timing_collection)
-        if query_results[0]:
-            output = []
-            for results in query_results[1]:
-                del results["_id"]
-                output.append(results)
-            return flask.jsonify({'result': output})
-        return flask.Response(status=query_results[1][0], response=query_results[1][1])
+        return search.search_response(json_data, uri, read_config.timing_collection)
@@ -21,6 +21,8 @@
 from datetime import datetime
 from http import HTTPStatus
 
+from bson import ObjectId
+
 db_keys_int = ["noOfNodes"]
 db_keys_float = ["testExecutionTime"]
 db_keys_array = ["nodesHostname", "testIDLabels", "testTags", "drID", "featureID"]
@@ -111,6 +113,30 @@ def validate_search_fields(json_data: dict) -> (bool, tuple):
     return True, None
 
 
+def validate_page_fields(json_data: dict) -> (bool, tuple):
+    """Validate optional pagination and streaming fields of search requests"""
+    if "page_size" in json_data and (not isinstance(json_data["page_size"], int) or
+                                     isinstance(json_data["page_size"], bool) or
+                                     json_data["page_size"] <= 0):
+        return False, (HTTPStatus.BAD_REQUEST,
+                       "Please provide page_size as positive integer")
+    if "cursor" in json_data:
+        if "page_size" not in json_data:
+            return False, (HTTPStatus.BAD_REQUEST,
+                           "Please provide page_size with cursor")
+        if not isinstance(json_data["cursor"], str) or \
+                not ObjectId.is_valid(json_data["cursor"]):
+            return False, (HTTPStatus.BAD_REQUEST,
+                           "Please provide cursor as next_cursor of previous page")
+    if "stream" in json_data and not isinstance(json_data["stream"], bool):
+        return False, (HTTPStatus.BAD_REQUEST,
+                       "Please provide stream as boolean")
+    if json_data.get("stream") and "page_size" in json_data:
+        return False, (HTTPStatus.BAD_REQUEST,
+                       "Please provide either stream or page_size")
+    return True, None
+
+
 def validate_distinct_fields(json_data: dict) -> (bool, tuple):
     """Validate search fields"""
     if "query" in json_data and not isinstance(json_data["query"], dict):
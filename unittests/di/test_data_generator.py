@@ -0,0 +1,117 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for DI seeded payload engine."""
+
+import hashlib
+import zlib
+
+import pytest
+
+from libs.di.data_generator import DataGenerator
+from libs.di.data_generator import SeededPayload
+from libs.di.data_generator import SeededPayloadReader
+from libs.di.data_generator import KB
+from libs.di.data_generator import MB
+
+
+class TestSeededPayload:
+    """Test seeded payload generation and range regeneration."""
+
+    def test_same_seed_same_bytes(self):
+        """Same (seed, size, c_ratio) always reproduces the same object."""
+        first = SeededPayload(seed=10, size=MB + 7, c_ratio=2).buffer()
+        second = SeededPayload(seed=10, size=MB + 7, c_ratio=2).buffer()
+        assert bytes(first) == bytes(second)
+        assert bytes(first) != bytes(SeededPayload(seed=11, size=MB + 7, c_ratio=2).buffer())
+
+    @pytest.mark.parametrize("offset, length", [(0, 1), (1, 100), (64 * KB - 3, 10),
+                                                (300 * KB + 5, 700 * KB), (MB, 7), (MB + 6, 10)])
+    def test_range_matches_full_object(self, offset, length):
+        """Any range is produced without generating the bytes before it."""
+        payload = SeededPayload(seed=42, size=MB + 7, c_ratio=3)
+        full = bytes(payload.buffer())
+        assert bytes(payload.read_range(offset, length)) == full[offset:offset + length]
+
+    def test_iter_chunks_and_checksum(self):
+        """Chunked streaming yields the object and its checksum."""
+        payload = SeededPayload(seed=7, size=3 * MB + 11, c_ratio=1)
+        full = bytes(payload.buffer())
+        streamed = b''.join(bytes(chunk) for chunk in payload.iter_chunks(MB - 1))
+        assert streamed == full
+        assert payload.checksum('md5') == hashlib.md5(full).hexdigest()
+
+    @pytest.mark.parametrize("c_ratio", [1, 2, 4, 8])
+    def test_compression_ratio(self, c_ratio):
+        """Object compresses roughly by the requested ratio."""
+        buf = bytes(SeededPayload(seed=3, size=4 * MB, c_ratio=c_ratio).buffer())
+        ratio = len(buf) / len(zlib.compress(buf, 4))
+        assert c_ratio * 0.8 <= ratio <= c_ratio * 1.25
+
+    def test_generate_uses_payload(self):
+        """DataGenerator.generate returns the seeded payload and its sha1."""
+        gen = DataGenerator(c_ratio=2)
+        buf, csum = gen.generate(256 * KB + 1, seed=99)
+        assert len(buf) == 256 * KB + 1
+        assert csum == hashlib.sha1(buf).hexdigest()
+        assert bytes(gen.generate_range(99, 256 * KB + 1, 1000, 5000)) == bytes(buf[1000:6000])
+        assert gen.generate(0, seed=99) == (b'', hashlib.sha1(b'').hexdigest())
+
+
+class TestSeededPayloadReader:
+    """Test streaming reader used by the disk less upload path."""
+
+    def test_read_and_digest(self):
+        """Sequential reads hash each byte once."""
+        payload = SeededPayload(seed=5, size=2 * MB + 3, c_ratio=2)
+        reader = SeededPayloadReader(payload, algos=('md5', 'sha1'))
+        data = b''
+        chunk = reader.read(300 * KB)
+        while chunk:
+            data += chunk
+            chunk = reader.read(300 * KB)
+        assert data == bytes(payload.buffer())
+        assert reader.hexdigest('md5') == hashlib.md5(data).hexdigest()
+        assert reader.hexdigest('sha1') == hashlib.sha1(data).hexdigest()
+
+    def test_seek_back_and_skip_ahead(self):
+        """Re-reads are not hashed twice and skipped ranges are regenerated."""
+        payload = SeededPayload(seed=6, size=MB, c_ratio=1)
+        reader = SeededPayloadReader(payload)
+        reader.read(100 * KB)
+        reader.seek(10 * KB)
+        reader.read(200 * KB)
+        reader.seek(600 * KB)
+        reader.read(10 * KB)
+        assert reader.hexdigest() == payload.checksum('md5')
+
+    def test_upload_fileobj(self):
+        """boto3 multipart upload of the stream stores the generated object."""
+        boto3 = pytest.importorskip("boto3")
+        moto = pytest.importorskip("moto")
+        from boto3.s3.transfer import TransferConfig
+        with moto.mock_aws():
+            client = boto3.client("s3", region_name="us-east-1")
+            client.create_bucket(Bucket="di-bucket")
+            gen = DataGenerator(c_ratio=2)
+            stream = gen.get_stream(seed=8, size=12 * MB + 5)
+            client.upload_fileobj(stream, "di-bucket", "obj",
+                                  Config=TransferConfig(multipart_threshold=5 * MB,
+                                                        multipart_chunksize=5 * MB))
+            body = client.get_object(Bucket="di-bucket", Key="obj")["Body"].read()
+        assert hashlib.md5(body).hexdigest() == stream.hexdigest('md5')
+        assert body == bytes(gen.get_payload(8, 12 * MB + 5).buffer())
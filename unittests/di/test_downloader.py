@@ -0,0 +1,121 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+# -*- coding: utf-8 -*-
+
+"""UnitTest for the DI object verifier against a local moto server."""
+
+import hashlib
+import os
+
+import boto3
+import pytest
+
+from commons import params
+from libs.di import downloader
+from libs.di.downloader import DataIntegrityValidator
+from libs.di.downloader import ObjectVerifier
+from libs.di.meta_store import ObjectMetaStore
+
+BUCKET = "ut-verify-bkt"
+RANGE = 1000
+OBJECTS = {"multi": os.urandom(5 * RANGE + 500), "empty": b"", "small": b"0123456789",
+           "exact": os.urandom(2 * RANGE)}
+
+
+@pytest.fixture(scope="module")
+def s3_objects():
+    """Moto server with the test objects, user name to s3 resource."""
+    moto_server = pytest.importorskip("moto.server")
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    resource = boto3.resource("s3", endpoint_url=f"http://{host}:{port}",
+                              aws_access_key_id="AKIATEST", aws_secret_access_key="secret",
+                              region_name="us-east-1")
+    resource.create_bucket(Bucket=BUCKET)
+    for key, data in OBJECTS.items():
+        resource.Object(BUCKET, key).put(Body=data)
+    yield {"user1": resource}
+    server.stop()
+
+
+def entry(key, checksum=None, user="user1"):
+    """Verifier entry of a test object, checksum defaults to the correct md5."""
+    if checksum is None:
+        checksum = hashlib.md5(OBJECTS[key]).hexdigest()  # nosec
+    return dict(user=user, bucket=BUCKET, objectpath=key, objcsum=checksum)
+
+
+class TestObjectVerifier:
+    """Ranged, windowed hashing and result accounting."""
+
+    def test_checksums_match(self, s3_objects):
+        """Multi range, exact multiple, smaller than a range and empty objects verify."""
+        verifier = ObjectVerifier(s3_objects, nworkers=4, range_size=RANGE, range_workers=3,
+                                  window=2)
+        client = s3_objects["user1"].meta.client
+        ranges = []
+        get_range = verifier._get_range
+        verifier._get_range = lambda *args: ranges.append(args[3:]) or get_range(*args)
+        summary = verifier.verify([entry(key) for key in OBJECTS])
+        # Everything after the first range of multi and exact is fetched by range GETs
+        expected = [(RANGE * ix, RANGE * (ix + 1) - 1) for ix in (1, 2, 3, 4)]
+        expected += [(5 * RANGE, 5 * RANGE + 499), (RANGE, 2 * RANGE - 1)]
+        assert sorted(ranges) == sorted(expected)
+        assert summary["objects_verified"] == len(OBJECTS)
+        assert summary["bytes_verified"] == sum(len(data) for data in OBJECTS.values())
+        assert not summary["failed_files"] and not summary["failed_files_server_error"]
+        with downloader.ThreadPoolExecutor(2) as verifier.range_pool:
+            assert verifier.checksum_object(client, BUCKET, "multi") == (
+                hashlib.md5(OBJECTS["multi"]).hexdigest(), len(OBJECTS["multi"]))  # nosec
+
+    def test_mismatch_and_errors(self, s3_objects):
+        """Wrong checksums are corruption, GET errors and missing users are failures."""
+        verifier = ObjectVerifier(s3_objects, nworkers=2, range_size=RANGE)
+        summary = verifier.verify([
+            entry("multi", checksum="0" * 32), entry("small"),
+            dict(entry("small"), objectpath="missing"), entry("small", user="nouser")])
+        assert [item["objectpath"] for item in summary["failed_files"]] == ["multi"]
+        assert sorted((item["user"], item["objectpath"]) for item in
+                      summary["failed_files_server_error"]) == [("nouser", "small"),
+                                                                ("user1", "missing")]
+        assert summary["objects_verified"] == 2
+
+
+def test_validator_reads_meta_store(s3_objects, tmp_path, monkeypatch):
+    """Objects come from ObjectMetaStore, deleted ones are skipped."""
+    monkeypatch.setattr(params, "META_DATA_STORE", str(tmp_path / "meta.db"))
+    monkeypatch.setattr(params, "DELETE_OP_FILE_NAME", str(tmp_path / "deleted.csv"))
+    monkeypatch.setattr(params, "FAILED_FILES", str(tmp_path / "failed.csv"))
+    monkeypatch.setattr(params, "FAILED_FILES_SERVER_ERROR", str(tmp_path / "server.csv"))
+    monkeypatch.setattr(downloader.di_base, "init_s3_connections", lambda users: s3_objects)
+    store = ObjectMetaStore()
+    store.put_many([dict(user="user1", bucket=BUCKET, key=key,
+                         checksum=hashlib.md5(data).hexdigest()) for key, data  # nosec
+                    in OBJECTS.items()])
+    store.put("user1", BUCKET, "corrupt", "0" * 32)
+    store.put("user2", BUCKET, "multi", "0" * 32)
+    with open(params.DELETE_OP_FILE_NAME, "w") as fobj:
+        fobj.write(f"user1,{BUCKET},corrupt,0\n")
+    summary = DataIntegrityValidator.verify_data_integrity({"user1": {}})
+    assert summary["uploaded_files"] == len(OBJECTS) + 1
+    assert summary["deleted_files"] == 1 and summary["failed_files"] == 0
+    assert summary["bytes_verified"] == sum(len(data) for data in OBJECTS.values())
+    store.put("user1", BUCKET, "small", "0" * 32)
+    summary = DataIntegrityValidator.verify_data_integrity({"user1": {}})
+    assert summary["failed_files"] == 1 and os.path.exists(params.FAILED_FILES)
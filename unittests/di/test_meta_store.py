@@ -0,0 +1,84 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for DI object meta data store."""
+
+import multiprocessing
+import os
+
+from libs.di.data_man import DataManager
+from libs.di.meta_store import ObjectMetaStore
+
+
+def _writer(path, user, count):
+    """Insert objects from a separate process."""
+    store = ObjectMetaStore(path)
+    store.put_many(dict(user=user, bucket='bkt', key=f'obj-{ix}', checksum=str(ix), seed=ix,
+                        size=1024) for ix in range(count))
+
+
+class TestObjectMetaStore:
+    """Test store lookups, prefix iteration and multi process writes."""
+
+    def test_put_get_and_versions(self, tmp_path):
+        """Latest version is returned unless a version is asked for."""
+        store = ObjectMetaStore(os.path.join(tmp_path, 'objects.db'))
+        store.put('u1', 'b1', 'a.txt', 'v0sum', seed=1, size=10)
+        store.put('u1', 'b1', 'a.txt', 'v1sum', seed=2, size=20, version=1)
+        assert store.get('u1', 'b1', 'a.txt')['checksum'] == 'v1sum'
+        assert store.get('u1', 'b1', 'a.txt', version=0)['seed'] == 1
+        assert store.get('u1', 'b1', 'missing') is None
+        store.mark_deleted('u1', 'b1', 'a.txt')
+        assert store.get('u1', 'b1', 'a.txt') is None
+        assert store.count() == 0
+
+    def test_prefix_iteration(self, tmp_path):
+        """Prefix scan returns only matching keys in key order."""
+        store = ObjectMetaStore(os.path.join(tmp_path, 'objects.db'))
+        store.put_many(dict(user='u1', bucket='b1', key=key, checksum=key)
+                       for key in ('dir/b', 'dir/a', 'dira', 'other'))
+        store.put('u1', 'b2', 'dir/c', 'c')
+        keys = [entry['key'] for entry in store.iter_prefix('u1', 'b1', prefix='dir/')]
+        assert keys == ['dir/a', 'dir/b']
+        assert store.buckets('u1') == ['b1', 'b2']
+        assert store.count(['u1', 'u2']) == 5
+
+    def test_multi_process_writers(self, tmp_path):
+        """Concurrent processes can insert into the same store."""
+        path = os.path.join(tmp_path, 'objects.db')
+        ObjectMetaStore(path)
+        jobs = [multiprocessing.Process(target=_writer, args=(path, f'user{ix}', 200))
+                for ix in range(4)]
+        for job in jobs:
+            job.start()
+        for job in jobs:
+            job.join()
+        assert ObjectMetaStore(path).count() == 800
+
+    def test_data_manager_containers(self, tmp_path):
+        """DataManager builds bucket containers from the store."""
+        manager = DataManager(ObjectMetaStore(os.path.join(tmp_path, 'objects.db')))
+        manager.add_uploaded_objects([['u1', 'b1', 'k1', 'abcd', 5, 1024],
+                                      ['u1', 'b2', 'k2', 'efgh', 6, 2048]])
+        manager.add_file_to_bucket('u1', 'b1', dict(name='k3', checksum='ijkl', seed=7,
+                                                    size=4096, mtime=1))
+        buckets = manager.get_all_buckets_data_for_user('u1')
+        assert [bkt['name'] for bkt in buckets] == ['b1', 'b2']
+        assert [fdict['name'] for fdict in buckets[0]['files']] == ['k1', 'k3']
+        assert manager.get_file_within_bucket('k2', None, 'b2', user='u1')['seed'] == 6
+        assert manager.get_file_within_bucket('k3', buckets[0], 'b1')['checksum'] == 'ijkl'
+        assert manager.get_all_buckets_data_for_user('u2') is None
@@ -0,0 +1,73 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for DI S3 connection pool."""
+
+import time
+
+from libs.di.s3_pool import S3ConnectionPool
+
+ENDPOINT = "http://127.0.0.1:9000"
+
+
+class TestS3ConnectionPool:
+    """Test connection sharing, in use accounting and idle eviction."""
+
+    def test_shared_per_key(self):
+        """Same (endpoint, access key) returns the cached resource."""
+        pool = S3ConnectionPool()
+        first = pool.get_resource("AKIA1", "secret1", ENDPOINT)
+        assert pool.get_resource("AKIA1", "secret1", ENDPOINT) is first
+        assert pool.get_client("AKIA2", "secret2", ENDPOINT) is not first.meta.client
+        stats = pool.stats()
+        assert (stats["creates"], stats["hits"], stats["entries"]) == (2, 1, 2)
+
+    def test_in_use_and_eviction(self):
+        """Idle entries are evicted, in use ones are kept."""
+        pool = S3ConnectionPool(max_idle=0.05)
+        with pool.client("AKIA1", "secret1", ENDPOINT):
+            assert pool.stats()["in_use"] == 1
+            time.sleep(0.1)
+            pool.release(pool.get_resource("AKIA2", "secret2", ENDPOINT))
+            assert pool.stats()["evictions"] == 0
+        time.sleep(0.1)
+        pool.release(pool.get_resource("AKIA3", "secret3", ENDPOINT))
+        stats = pool.stats()
+        assert (stats["in_use"], stats["evictions"], stats["entries"]) == (0, 2, 1)
+
+    def test_held_resource_survives_eviction(self):
+        """A leased resource is not evicted, once released it is dropped but not closed."""
+        pool = S3ConnectionPool(max_idle=0.05)
+        held = pool.get_resource("AKIA1", "secret1", ENDPOINT)
+        closed = []
+        held.meta.client.close = lambda: closed.append(True)
+        assert pool.stats()["in_use"] == 1
+        time.sleep(0.1)
+        pool.get_resource("AKIA2", "secret2", ENDPOINT)
+        assert pool.get_resource("AKIA1", "secret1", ENDPOINT) is held
+        assert pool.stats()["evictions"] == 0 and pool.stats()["in_use"] == 3
+        pool.release(held)
+        pool.release(held.meta.client)
+        time.sleep(0.1)
+        pool.release(pool.get_resource("AKIA3", "secret3", ENDPOINT))
+        stats = pool.stats()
+        assert (stats["evictions"], stats["in_use"], stats["entries"]) == (1, 1, 2)
+        assert not closed
+
+    def test_process_instance(self):
+        """get_instance returns one pool per process."""
+        assert S3ConnectionPool.get_instance() is S3ConnectionPool.get_instance()
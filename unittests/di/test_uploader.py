@@ -0,0 +1,167 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+# -*- coding: utf-8 -*-
+
+"""UnitTest for batched, crash safe recording of uploaded objects."""
+
+import asyncio
+import csv
+import fcntl
+import hashlib
+import importlib
+import itertools
+import multiprocessing as mp
+import sys
+import threading
+import time
+
+import pytest
+
+from commons import params
+from libs.di import uploader
+from libs.di.meta_store import ObjectMetaStore
+
+KEYS = ["AKIATEST", "secret"]
+
+
+@pytest.fixture
+def fake_upload(tmp_path, monkeypatch):
+    """Uploads without S3, meta data store and uploadInfo.csv under tmp_path."""
+    monkeypatch.setattr(params, "META_DATA_STORE", str(tmp_path / "meta.db"))
+    monkeypatch.setattr(params, "UPLOADED_FILES", str(tmp_path / "uploadInfo.csv"))
+    monkeypatch.setattr(uploader.di_base, "init_s3_conn", lambda **kwargs: [None])
+    names = itertools.count()
+
+    def upload_stream(s3, gen, bucket, seed, size, user_name):
+        time.sleep(0.001)
+        name = f"obj-{next(names)}"
+        return name, hashlib.md5(name.encode()).hexdigest()  # nosec
+
+    monkeypatch.setattr(uploader.Uploader, "_upload_stream", staticmethod(upload_stream))
+    del uploader.uploadObjects[:]
+    yield tmp_path
+    del uploader.uploadObjects[:]
+
+
+def csv_rows(tmp_path):
+    """Rows of uploadInfo.csv."""
+    with open(str(tmp_path / "uploadInfo.csv"), newline="") as fobj:
+        return list(csv.reader(fobj))
+
+
+class TestUploadRecording:
+    """Rows reach the meta data store while uploads run."""
+
+    def test_killed_uploader_keeps_flushed_rows(self, fake_upload):
+        """Rows flushed before the upload process is killed stay in the store."""
+        upl = uploader.Uploader()
+        upl.flush_rows, upl.flush_secs = 10, 3600
+        proc = mp.get_context("fork").Process(
+            target=upl.upload, args=("user1", KEYS, ["bkt1"], 100000, {}, mp.Event(), None))
+        proc.start()
+        store = ObjectMetaStore()
+        deadline = time.monotonic() + 60
+        while store.count(["user1"]) < 30 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        # Kill outside of a flush, which holds the uploadInfo.csv lock
+        with open(str(fake_upload / "uploadInfo.csv"), "a") as fobj:
+            fcntl.flock(fobj, fcntl.LOCK_EX)
+            proc.kill()
+            proc.join()
+        stored = store.count(["user1"])
+        assert stored >= 30 and stored % 10 == 0
+        assert len(csv_rows(fake_upload)) == stored
+        assert all(entry["checksum"] and entry["mtime"] for entry in store.iter_prefix("user1"))
+
+    def test_repeated_uploads_store_rows_once(self, fake_upload):
+        """A second upload in the same process does not store rows of the first again."""
+        upl = uploader.Uploader()
+        upl.flush_rows = 4
+        for _ in range(2):
+            upl.upload("user1", KEYS, ["bkt1", "bkt2"], 5, {}, threading.Event(), None)
+        assert ObjectMetaStore().count(["user1"]) == 20
+        rows = csv_rows(fake_upload)
+        assert len(rows) == 20 and len({row[2] for row in rows}) == 20
+        assert not uploader.uploadObjects
+
+
+class FakeEngine:
+    """Async engine counting tasks and requests in flight."""
+
+    def __init__(self):
+        self.in_flight = self.peak_flight = self.peak_tasks = self.puts = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    async def put_object(self, bucket, key, data):
+        """Pretend to send data."""
+        self.in_flight += 1
+        self.peak_flight = max(self.peak_flight, self.in_flight)
+        self.peak_tasks = max(self.peak_tasks, len(asyncio.all_tasks()))
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        self.puts += 1
+
+    def stats(self):
+        """Request counts."""
+        return dict(puts=self.puts)
+
+
+def test_async_upload_bounded(fake_upload, monkeypatch):
+    """Async uploads use a fixed set of worker tasks, payloads are built off the loop."""
+    engine = FakeEngine()
+    monkeypatch.setattr(uploader.di_base, "init_async_engine", lambda keys, **kwargs: engine)
+    threads = set()
+    get_payload = uploader.data_generator.DataGenerator.get_payload
+
+    def payload(self, seed, size):
+        threads.add(threading.current_thread().name)
+        return get_payload(self, seed, size)
+
+    monkeypatch.setattr(uploader.data_generator.DataGenerator, "get_payload", payload)
+    flushes = []
+    flush_uploads = uploader.Uploader._flush_uploads
+
+    def flush(self):
+        flushes.append(threading.current_thread().name)
+        return flush_uploads(self)
+
+    monkeypatch.setattr(uploader.Uploader, "_flush_uploads", flush)
+    upl = uploader.Uploader()
+    upl.flush_rows = 100
+    upl.upload("user1", KEYS, ["bkt1", "bkt2"], 300,
+               {"io_engine": uploader.IO_ENGINE_ASYNC, "async_concurrency": 4},
+               threading.Event(), None)
+    assert engine.puts == 600 and ObjectMetaStore().count(["user1"]) == 600
+    assert engine.peak_flight <= 4 and engine.peak_tasks <= 4 + 1
+    assert threading.main_thread().name not in threads
+    # Flushes while uploading run in the executor, only the final one on the caller
+    assert len(flushes) >= 6 and threading.main_thread().name not in flushes[:-1]
+
+
+def test_di_base_without_aiohttp(monkeypatch):
+    """di_base imports without aiohttp, only the async engine needs it."""
+    monkeypatch.setitem(sys.modules, "aiohttp", None)
+    monkeypatch.delitem(sys.modules, "libs.s3.s3_async_engine", raising=False)
+    di_base = importlib.reload(uploader.di_base)
+    with pytest.raises(ImportError):
+        di_base.init_async_engine(KEYS)
@@ -0,0 +1,166 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""UnitTest module for the LogicalNode topology cache using recorded kubectl json."""
+
+import json
+import os
+import threading
+
+import pytest
+
+from commons import commands
+from commons.helpers import k8s_topology
+from commons.helpers import pods_helper
+from commons.helpers.host import Host
+from commons.helpers.pods_helper import LogicalNode
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+DATA_POD = "cortx-data-ssc-vm-g3-rhev4-1001-6d7b5c9f4-x2kq8"
+
+
+class FakeClock:
+    """Settable monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(name="node")
+def fixture_node(monkeypatch):
+    """LogicalNode whose commands are answered from the recorded snapshot."""
+    with open(os.path.join(FIXTURES, "k8s_topology.json"), "rb") as fin:
+        snapshot = fin.read()
+    calls = []
+
+    def execute_cmd(self, cmd, *args, **kwargs):  # pylint: disable=unused-argument
+        calls.append(cmd)
+        if cmd == commands.KUBECTL_GET_TOPOLOGY:
+            return snapshot
+        if "machine-id" in cmd:
+            return b"f3c4e2a1d0b94e6c8a7f5e3d2c1b0a99\n"
+        return [b""]
+
+    monkeypatch.setattr(Host, "execute_cmd", execute_cmd)
+    monkeypatch.setattr(pods_helper, "topology_map", {})
+    monkeypatch.delenv(k8s_topology.WATCH_ENV, raising=False)
+    node = LogicalNode(hostname="ssc-vm-g3-rhev4-1001", username="root", password="seagate")
+    node.calls = calls
+    return node
+
+
+class TestLogicalNodeTopology:
+    """Pod lookups answered from one snapshot."""
+
+    def test_lookups_one_fetch(self, node):
+        """All pod queries of a test cost a single kubectl call."""
+        data_pods = node.get_all_pods(pod_prefix="cortx-data")
+        assert len(data_pods) == 3 and data_pods[0] == DATA_POD
+        assert node.get_pod_name() == (True, DATA_POD)
+        assert node.get_pod_name("cortx-none")[0] is False
+        assert node.get_container_of_pod(DATA_POD, "cortx-motr-io") == [
+            "cortx-motr-io-001", "cortx-motr-io-002"]
+        assert node.get_all_pods_containers("cortx-server")["cortx-server-1"] == [
+            "cortx-rgw", "cortx-hax"]
+        assert node.get_all_pods_and_ips("cortx-server")["cortx-server-2"] == "192.168.2.31"
+        assert node.get_all_pods_and_ips("cortx-ha") == {"cortx-ha-5b8f7d9c6-hw4xk": "<none>"}
+        assert node.get_pods_node_fqdn("cortx-control") == {
+            "cortx-control-7c9f8b6d5-qz2lm": "ssc-vm-g3-rhev4-1001.colo.seagate.com"}
+        assert node.get_pod_hostname(DATA_POD) == "cortx-data-headless-svc-ssc-vm-g3-rhev4-1001"
+        assert node.get_set_type_name(DATA_POD) == ("ReplicaSet", DATA_POD[:-6])
+        assert node.get_set_type_name("cortx-server-0") == ("StatefulSet", "cortx-server")
+        assert node.get_deployment_name("cortx-data")[2] == "cortx-data-ssc-vm-g3-rhev4-1003"
+        assert node.get_recent_pod_name() == "cortx-ha-5b8f7d9c6-hw4xk"
+        assert node.get_recent_pod_name("cortx-data-ssc-vm-g3-rhev4-1002").endswith("b7mzl")
+        assert node.get_pod_ports(["cortx-server-0", DATA_POD]) == {"cortx-server-0": 23001}
+        assert node.calls == [commands.KUBECTL_GET_TOPOLOGY]
+        other = LogicalNode(hostname=node.hostname, username="root", password="seagate")
+        assert other.get_all_pods() and node.calls == [commands.KUBECTL_GET_TOPOLOGY]
+
+    def test_host_network_hostname(self, node):
+        """Pods on the host network still ask the container for its hostname."""
+        node.get_pod_hostname("cortx-ha-5b8f7d9c6-hw4xk")
+        assert node.calls[-1] == commands.KUBECTL_GET_POD_HOSTNAME.format(
+            "cortx-ha-5b8f7d9c6-hw4xk")
+
+    def test_invalidation(self, node):
+        """Topology changing commands and ttl expiry take a new snapshot."""
+        node.get_all_pods()
+        node.execute_cmd("kubectl get pods -o wide")
+        node.get_all_pods()
+        assert node.calls.count(commands.KUBECTL_GET_TOPOLOGY) == 1
+        node.delete_pod(DATA_POD)
+        node.get_all_pods()
+        node.execute_cmd(commands.KUBECTL_CREATE_REPLICA.format(1, "cortx-data"))
+        node.get_all_pods()
+        assert node.calls.count(commands.KUBECTL_GET_TOPOLOGY) == 3
+        topology = node.topology()
+        topology.clock = FakeClock()
+        topology.invalidate()
+        node.get_all_pods()
+        topology.clock.now = topology.ttl
+        node.get_all_pods()
+        assert topology.counters["fetches"] == 5
+
+    def test_machine_id_memo(self, node):
+        """Machine id is read once per pod instance."""
+        for _ in range(3):
+            assert node.get_machine_id_for_pod(DATA_POD) == "f3c4e2a1d0b94e6c8a7f5e3d2c1b0a99"
+        assert sum("machine-id" in cmd for cmd in node.calls) == 1
+
+
+def test_watch_mode():
+    """Pod events keep the snapshot current without new snapshots."""
+    with open(os.path.join(FIXTURES, "k8s_topology.json")) as fin:
+        doc = json.load(fin)
+    with open(os.path.join(FIXTURES, "k8s_pod_events.json"), "rb") as fin:
+        stream = fin.read()
+    release = threading.Event()
+    fetches = []
+
+    def watch():
+        # Split the stream in chunks crossing json document boundaries
+        for index in range(0, len(stream), 977):
+            yield stream[index:index + 977]
+        release.wait(5)
+
+    def fetch():
+        fetches.append(1)
+        return doc
+
+    clock = FakeClock()
+    topology = k8s_topology.K8sTopology(fetch, ttl=30, watch=watch, clock=clock)
+    topology.snapshot()
+    for _ in range(100):
+        if topology.counters["events"] == 12:
+            break
+        threading.Event().wait(0.02)
+    clock.now = 1000
+    snapshot = topology.snapshot()
+    pods = snapshot.pod_names("cortx-data")
+    assert DATA_POD not in pods and len(pods) == 3
+    assert snapshot.pod_ip(DATA_POD[:-5] + "n9fj2") == "192.168.0.99"
+    assert len(fetches) == 1
+    release.set()
+    topology._watcher.join(5)  # pylint: disable=protected-access
+    topology.snapshot()
+    assert len(fetches) == 2
@@ -0,0 +1,131 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""UnitTest module for time window extraction from log files."""
+
+import gzip
+import io
+import random
+from datetime import datetime
+from datetime import timedelta
+
+from commons.helpers import log_window
+from commons.helpers.log_window import LogTimeParser
+
+START = datetime(2022, 3, 4, 10, 0, 0)
+
+
+def make_log(lines: int, fmt: str = "%Y-%m-%d %H:%M:%S,%f", seed: int = 1) -> bytes:
+    """Time ordered log with repeated timestamps and multi line records."""
+    rand = random.Random(seed)
+    stamp = START
+    out = []
+    for number in range(lines):
+        stamp += timedelta(milliseconds=rand.choice((0, 0, 7, 900, 4000)))
+        out.append(f"{stamp.strftime(fmt)} INFO request {number} {'x' * rand.randrange(80)}\n")
+        if rand.random() < 0.05:
+            out.append("Traceback (most recent call last):\n  File \"x.py\", line 1\n")
+    return "".join(out).encode()
+
+
+def reference_window(data: bytes, start: datetime, end: datetime, parser) -> bytes:
+    """Line by line extraction the search result is compared with."""
+    keep, inside = [], False
+    for line in data.splitlines(keepends=True):
+        stamp = parser.parse(line)
+        if stamp is not None:
+            inside = start <= stamp <= end
+        if inside:
+            keep.append(line)
+    return b"".join(keep)
+
+
+class TestLogWindow:
+    """Binary searched windows match a full scan."""
+
+    def test_matches_full_scan(self):
+        """Random windows, including empty and whole file ones, equal the scanned lines."""
+        data = make_log(60000)
+        parser = LogTimeParser()
+        last = parser.parse(data.splitlines()[-1]) or START
+        rand = random.Random(3)
+        windows = [(START - timedelta(days=1), last + timedelta(days=1)),
+                   (last + timedelta(seconds=1), last + timedelta(days=1)),
+                   (START + timedelta(hours=2), START + timedelta(hours=1))]
+        for _ in range(40):
+            begin = START + timedelta(seconds=rand.uniform(-60, (last - START).total_seconds()))
+            windows.append((begin, begin + timedelta(seconds=rand.uniform(0, 600))))
+        for begin, end in windows:
+            out = io.BytesIO()
+            stats = log_window.extract_window(io.BytesIO(data), begin, end, out, parser=parser)
+            assert out.getvalue() == reference_window(data, begin, end, parser)
+            assert stats["probes"] <= 2 * (len(data) // log_window.BLOCK).bit_length() + 2
+
+    def test_index_narrows_search(self):
+        """A second window of the same file starts from offsets learned by the first."""
+        data = make_log(60000, seed=2)
+        key = ("node1", "/var/log/test_index.log")
+        log_window.INDEX_CACHE.delete(key)
+        begin = START + timedelta(hours=3)
+        window = (begin, begin + timedelta(minutes=5))
+        first = log_window.extract_window(io.BytesIO(data), *window, io.BytesIO(), key=key)
+        again = log_window.extract_window(io.BytesIO(data), *window, io.BytesIO(), key=key)
+        assert first["probes"] > 0 and again["probes"] < first["probes"]
+        # A rotated file at the same path gets a new index
+        log_window.extract_window(io.BytesIO(make_log(100, seed=9)), *window, io.BytesIO(),
+                                  key=key)
+        assert len(log_window.INDEX_CACHE.lookup(key).offsets) < 10
+
+    def test_syslog_across_new_year(self):
+        """Syslog timestamps without year stay ordered across the year boundary."""
+        parser = LogTimeParser(reference=datetime(2023, 1, 1, 0, 10))
+        stamps = [datetime(2022, 12, 31, 23, 50) + timedelta(minutes=i) for i in range(20)]
+        lines = [f"{stamp.strftime('%b %e %H:%M:%S')} node1 kernel: tick {i}\n"
+                 for i, stamp in enumerate(stamps)]
+        data = "".join(lines).encode()
+        out = io.BytesIO()
+        log_window.extract_window(io.BytesIO(data), "Dec 31 23:58:00", "Jan  1 00:02:00", out,
+                                  parser=parser)
+        assert out.getvalue() == "".join(lines[8:13]).encode()
+        assert parser.parse(b"[2022/03/04 10:11:12.5] x") == datetime(2022, 3, 4, 10, 11, 12,
+                                                                      500000)
+        assert parser.parse(b"no timestamp") is None
+
+    def test_gzip_rotation(self):
+        """Only rotated files overlapping the window are read, gzip ones streamed."""
+        data = make_log(3000, seed=4)
+        lines = data.splitlines(keepends=True)
+        files = {"motr.log.2.gz": gzip.compress(b"".join(lines[:1000])),
+                 "motr.log.1": b"".join(lines[1000:2000]),
+                 "motr.log": b"".join(lines[2000:])}
+        names = log_window.rotation_order("motr.log", list(files) + ["motr.logger", "s3.log"])
+        assert names == ["motr.log", "motr.log.1", "motr.log.2.gz"]
+        assert log_window.rotation_order("messages", ["messages-20220301.gz", "messages",
+                                                      "messages-20220304"]) == \
+            ["messages", "messages-20220304", "messages-20220301.gz"]
+        parser = LogTimeParser()
+        firsts = [(name, log_window.first_timestamp(io.BytesIO(files[name]), parser))
+                  for name in names]
+        begin, end = parser.parse(lines[900]), parser.parse(lines[1500])
+        selected = log_window.select_rotated(firsts, begin, end)
+        assert selected == ["motr.log.2.gz", "motr.log.1"]
+        out = io.BytesIO()
+        for name in selected:
+            log_window.extract_window(io.BytesIO(files[name]), begin, end, out, parser=parser)
+        assert out.getvalue() == reference_window(data, begin, end, parser)
@@ -0,0 +1,267 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""UnitTest module for the shared SSH connection manager and parallel node execution
+using a local paramiko server."""
+
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import paramiko
+import pytest
+
+from commons.helpers.host import Host
+from commons.helpers.parallel_exec import map_parallel
+from commons.helpers.parallel_exec import run_on_nodes
+from commons.helpers.ssh_pool import SSHConnectionManager
+from commons.utils import system_utils
+from libs.dtm.ProcPathStasCollection import EnableProcPathStatsCollection
+
+USER = "root"
+PASSWORD = "seagate"
+
+
+class _ExecServer(paramiko.ServerInterface):
+    """Accept password auth and run exec requests with the local shell."""
+
+    def __init__(self, server):
+        self.server = server
+
+    def check_auth_password(self, username, password):
+        if password == PASSWORD:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_exec_request(self, channel, command):
+        threading.Thread(target=self.server.run_command, args=(channel, command),
+                         daemon=True).start()
+        return True
+
+
+class LocalSSHServer:
+    """Minimal SSH server on localhost counting authenticated connections."""
+
+    def __init__(self):
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(64)
+        self.port = self.sock.getsockname()[1]
+        self.connections = 0
+        self.transports = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            transport = paramiko.Transport(conn)
+            transport.add_server_key(self.host_key)
+            transport.start_server(server=_ExecServer(self))
+            self.connections += 1
+            self.transports.append(transport)
+
+    @staticmethod
+    def run_command(channel, command):
+        proc = subprocess.run(command.decode(), shell=True, capture_output=True,
+                              check=False)  # nosec
+        channel.sendall(proc.stdout)
+        channel.sendall_stderr(proc.stderr)
+        channel.send_exit_status(proc.returncode)
+        channel.close()
+
+    def stop(self):
+        for transport in self.transports:
+            transport.close()
+        self.sock.close()
+
+
+@pytest.fixture(scope="module")
+def ssh_server():
+    """Local SSH server."""
+    server = LocalSSHServer()
+    yield server
+    server.stop()
+
+
+@pytest.fixture()
+def manager():
+    """Fresh process wide manager."""
+    SSHConnectionManager._instance = None
+    yield SSHConnectionManager.get_instance(max_channels=4)
+    SSHConnectionManager.get_instance().close_all()
+
+
+class TestSSHConnectionManager:
+    """Shared SSH connection manager tests."""
+
+    def test_hosts_share_transport(self, ssh_server, manager):
+        """Many commands from many Host objects authenticate once."""
+        before = ssh_server.connections
+        hosts = [Host("127.0.0.1", USER, PASSWORD) for _ in range(3)]
+        for host in hosts:
+            for _ in range(3):
+                assert host.execute_cmd("echo hello", port=ssh_server.port) == b"hello\n"
+            host.disconnect()
+        assert ssh_server.connections - before == 1
+        stats = manager.stats()
+        assert stats["connects"] == 1 and stats["commands"] == 9
+        assert stats["exec"]["count"] == 9 and stats["connect"]["count"] == 1
+
+    def test_exit_status_and_errors(self, ssh_server, manager):
+        """Failing command raises like before and run() returns exit status."""
+        host = Host("127.0.0.1", USER, PASSWORD)
+        with pytest.raises(IOError):
+            host.execute_cmd("echo oops >&2; exit 3", port=ssh_server.port)
+        status, out, err, duration = manager.run("127.0.0.1", USER, PASSWORD,
+                                                 "echo out; echo err >&2; exit 2",
+                                                 port=ssh_server.port)
+        assert (status, out, err) == (2, b"out\n", b"err\n") and duration > 0
+
+    def test_reconnect(self, ssh_server, manager):
+        """A dropped transport is re-established on the next command."""
+        host = Host("127.0.0.1", USER, PASSWORD)
+        assert host.execute_cmd("echo one", port=ssh_server.port) == b"one\n"
+        client = manager.get_client("127.0.0.1", USER, PASSWORD, port=ssh_server.port)
+        client.get_transport().close()
+        assert host.execute_cmd("echo two", port=ssh_server.port) == b"two\n"
+        assert manager.stats()["reconnects"] == 1
+
+    def test_channel_cap(self, ssh_server, manager):
+        """No more than max_channels commands run at once on a host."""
+        with ThreadPoolExecutor(12) as executor:
+            results = list(executor.map(
+                lambda _: manager.run("127.0.0.1", USER, PASSWORD, "sleep 0.2; echo ok",
+                                      port=ssh_server.port), range(12)))
+        assert all(result[:2] == (0, b"ok\n") for result in results)
+        assert manager.stats()["exec"]["min"] >= 0.2
+        assert max(result[3] for result in results) >= 0.6
+
+    def test_remote_cmd_reads_in_slot(self, ssh_server, manager, monkeypatch):
+        """run_remote_cmd reads the output before it gives back the channel slot."""
+        held, reads = [0], []
+        slot, exec_command = manager.slot, manager.exec_command
+
+        @contextmanager
+        def counted_slot(*args, **kwargs):
+            with slot(*args, **kwargs):
+                held[0] += 1
+                try:
+                    yield
+                finally:
+                    held[0] -= 1
+
+        def exec_on_port(*args, **kwargs):
+            stdin, stdout, stderr = exec_command(*args, port=ssh_server.port, **kwargs)
+            read = stdout.read
+            stdout.read = lambda *nbytes: reads.append(held[0]) or read(*nbytes)
+            return stdin, stdout, stderr
+
+        monkeypatch.setattr(manager, "slot", counted_slot)
+        monkeypatch.setattr(manager, "exec_command", exec_on_port)
+        assert system_utils.run_remote_cmd("echo ok", "127.0.0.1", USER, PASSWORD) == \
+            (True, b"ok\n")
+        assert system_utils.run_remote_cmd_wo_decision(
+            "echo bad >&2; exit 1", "127.0.0.1", USER, PASSWORD) == (b"", b"bad\n", 1)
+        assert reads == [1, 1]
+
+
+class TestRunOnNodes:
+    """Parallel fan-out over pooled connections."""
+
+    @staticmethod
+    def nodes(ssh_server, count):
+        """Node entries served by the local server, a distinct user stands in for each
+        node so every node gets its own connection."""
+        return [dict(hostname="127.0.0.1", username=f"node{idx}", password=PASSWORD,
+                     port=ssh_server.port) for idx in range(count)]
+
+    def test_fan_out(self, ssh_server, manager):
+        """Slow command on 6 nodes takes as long as one node."""
+        start = time.perf_counter()
+        results = run_on_nodes(self.nodes(ssh_server, 6), "sleep 0.5; echo $((1 + 1))")
+        assert time.perf_counter() - start < 2
+        assert len(results) == 6 and manager.stats()["connects"] == 6
+        assert all(result.ok and result.stdout == b"2\n" for result in results)
+        assert all(result.duration >= 0.5 for result in results)
+
+    def test_per_node_commands(self, ssh_server, manager):
+        """Per node command lists and failures are reported per result."""
+        nodes = [dict(node, hostname=hostname)
+                 for node, hostname in zip(self.nodes(ssh_server, 2), ("127.0.0.1", "localhost"))]
+        results = run_on_nodes(nodes, {"127.0.0.1": ["echo a", "echo b"],
+                                       "localhost": "echo bad >&2; exit 5"})
+        assert [(result.hostname, result.stdout) for result in results] == [
+            ("127.0.0.1", b"a\n"), ("127.0.0.1", b"b\n"), ("localhost", b"")]
+        assert not results[2].ok and results[2].exit_status == 5
+        assert results[2].stderr == b"bad\n"
+
+    def test_deadline(self, ssh_server, manager):
+        """Commands still running at the deadline are reported as timed out."""
+        start = time.perf_counter()
+        results = run_on_nodes(self.nodes(ssh_server, 2), ["echo fast", "sleep 5"],
+                               deadline=1)
+        assert time.perf_counter() - start < 3
+        assert results[0].ok and results[2].ok
+        assert not results[1].ok and results[1].error is not None
+
+    def test_map_parallel(self):
+        """Results keep item order, errors and deadline propagate."""
+        assert map_parallel(lambda val: val * 2, range(5)) == [0, 2, 4, 6, 8]
+        with pytest.raises(ZeroDivisionError):
+            map_parallel(lambda val: 1 / val, [1, 0, 2])
+        with pytest.raises(TimeoutError):
+            map_parallel(time.sleep, [0, 2], deadline=0.2)
+
+    def test_map_parallel_waits_on_error(self):
+        """Calls already running return before the first error is raised."""
+        finished = []
+
+        def task(val):
+            if val == 0:
+                raise ValueError(val)
+            time.sleep(0.3)
+            finished.append(val)
+        with pytest.raises(ValueError):
+            map_parallel(task, [0, 1, 2])
+        assert sorted(finished) == [1, 2]
+
+    def test_get_pids(self, ssh_server, manager):
+        """No matching process is empty, a failing pgrep raises."""
+        node = self.nodes(ssh_server, 1)[0]
+        pids = EnableProcPathStatsCollection.get_pids(node, ["nosuchproc_xyz"])
+        assert pids["nosuchproc_xyz"] == b"\n"
+        with pytest.raises(IOError):
+            EnableProcPathStatsCollection.get_pids(node, ["--bogus"])
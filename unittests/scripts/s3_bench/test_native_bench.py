@@ -0,0 +1,98 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Native S3 benchmark driver unit tests against a local moto server."""
+import os
+import sys
+
+import pytest
+
+from scripts.s3_bench import native_bench as nb
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "..", "tools", "report"))
+
+
+@pytest.fixture(scope="module")
+def endpoint():
+    """Start moto server on a free port."""
+    moto_server = pytest.importorskip("moto.server")
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    yield f"http://{host}:{port}"
+    server.stop()
+
+
+class TestNativeBench:
+    """Native benchmark driver suite."""
+
+    def test_parse_knobs(self):
+        """Sizes and durations accept s3bench style strings."""
+        assert nb.parse_size("4Kb") == 4096
+        assert nb.parse_size("128Mb") == 128 * 1024 * 1024
+        assert nb.parse_size(100) == 100
+        assert nb.size_label(256 * 1024) == "256Kb"
+        assert nb.parse_duration("1h24m10s") == 5050
+        assert nb.parse_duration("0h22m") == 1320
+        with pytest.raises(ValueError):
+            nb.parse_size("4Qb")
+        with pytest.raises(ValueError):
+            nb.NativeS3Bench("a", "s", "http://localhost", mode_order="pz")
+
+    def test_run_modes(self, endpoint):
+        """Default mode order runs every phase without errors."""
+        bench = nb.NativeS3Bench("AKIATEST", "secret", endpoint, clients=8, samples=20,
+                                 obj_size="4Kb", buckets=2, bucket_prefix="ut-native-",
+                                 validate=True)
+        results = bench.run()
+        ops = {result["Operation"]: result for result in results}
+        assert [result["Mode"] for result in results] == list("cxiplgdcx")
+        assert not nb.has_errors(results)
+        assert ops["Init"]["Ops"] == 2 and ops["List"]["Ops"] == 2
+        for operation in ("Write", "Read", "Delete"):
+            assert ops[operation]["Ops"] == 20
+        assert ops["Read"]["Total_Bytes"] == 20 * 4096
+        assert ops["Read"]["TTFB"]["Avg"] <= ops["Read"]["Latency"]["Avg"]
+        assert ops["Write"]["Latency"]["p99"] <= ops["Write"]["Latency"]["Max"]
+
+    def test_skip_and_duration(self, endpoint):
+        """Skip flags drop phases and duration cycles over the samples."""
+        bench = nb.NativeS3Bench("AKIATEST", "secret", endpoint, clients=4, samples=5,
+                                 obj_size=1024, duration=1, bucket_prefix="ut-native-dur-",
+                                 skip_read=True)
+        results = bench.run()
+        assert "g" not in bench.mode_order
+        write = [result for result in results if result["Operation"] == "Write"][0]
+        assert write["Ops"] > 5 and write["Seconds"] >= 1
+
+    def test_report_ingest(self, endpoint, tmp_path):
+        """engg_report_csv reads benchmark JSON through a file:// uri."""
+        engg_report_csv = pytest.importorskip("engg_report_csv")
+        bench = nb.NativeS3Bench("AKIATEST", "secret", endpoint, clients=4, samples=10,
+                                 obj_size="4Kb", bucket_prefix="ut-native-rep-")
+        docs = bench.to_report_docs(bench.run(), build="100", branch="main")
+        assert {doc["Operation"] for doc in docs} == {"Write", "Read"}
+        path = nb.write_json(docs, str(tmp_path / "bench.json"))
+        data = engg_report_csv.get_single_bucket_perf_stats("100", "main", f"file://{path}",
+                                                            "performance_db", "results")
+        rows = {row[0]: row[1] for row in data[2:]}
+        assert rows["Write Throughput (MBps)"] != "-"
+        assert rows["Read TTFB (ms)"] != "-"
+        assert rows["Read IOPS"] != "-"
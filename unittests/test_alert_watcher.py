@@ -0,0 +1,91 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for the message bus alert watcher."""
+
+import queue
+import threading
+import time
+
+from libs.ras.alert_watcher import AlertWatcher
+from libs.ras.alert_watcher import wait_until
+
+
+class FakeStream:
+    """Reader output fed by the test, closing ends it."""
+
+    def __init__(self):
+        self.chunks = queue.Queue()
+
+    def feed(self, data: bytes):
+        """Make data readable."""
+        self.chunks.put(data)
+
+    def __iter__(self):
+        return iter(self.chunks.get, b"")
+
+    def close(self):
+        """End the stream."""
+        self.chunks.put(b"")
+
+
+class TestAlertWatcher:
+    """Alerts are matched as they arrive."""
+
+    def test_returns_on_last_alert(self):
+        """Wait ends with the last alert, split chunks and other resources are ignored."""
+        stream = FakeStream()
+        watcher = AlertWatcher(lambda: stream).start()
+        stream.feed(b'{"resource_type": "node:fru:fan", "alert_type": "fault"}\n{"res')
+        stream.feed(b'ource_type": "enclosure:fru:psu", "alert_')
+
+        def late_alert():
+            time.sleep(0.2)
+            stream.feed(b'type": "missing"}\n')
+
+        threading.Thread(target=late_alert).start()
+        began = time.monotonic()
+        result = watcher.wait(["enclosure:fru:psu", "missing"], timeout=30)
+        watcher.stop()
+        assert result.ok and time.monotonic() - began < 5
+        assert 0.15 < result.matched["missing"].latency < 5
+        assert "fault" not in result.matched["missing"].line
+
+    def test_deadline_and_stream_end(self):
+        """Missing alerts are reported at the deadline or when the stream ends."""
+        stream = FakeStream()
+        watcher = AlertWatcher(lambda: stream).start()
+        stream.feed(b"node:fru:fan fault\n")
+        result = watcher.wait(["node:fru:fan", "fault_resolved"], timeout=0.2)
+        assert not result.ok and result.missing == ["fault_resolved"]
+        assert 0.2 <= result.elapsed < 2
+        stream.feed(b"node:fru:fan fault")
+        watcher.stop()
+        result = watcher.wait(["node:fru:fan", "fault_resolved"], timeout=30)
+        assert result.missing == ["fault_resolved"] and result.elapsed < 5
+        assert len(watcher.lines) == 2
+
+
+def test_wait_until():
+    """Polling stops at the first accepted result or at the timeout."""
+    calls = iter(range(100))
+    assert wait_until(lambda: next(calls), 5, step=0.01, until=lambda value: value == 3) == 3
+    began = time.monotonic()
+    assert wait_until(lambda: (False, "stopped"), 0.1, step=0.03) == (False, "stopped")
+    assert time.monotonic() - began < 1
@@ -0,0 +1,128 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for bulk alert scenarios with a recording executor."""
+
+import itertools
+import queue
+import threading
+import time
+
+import pytest
+
+from commons.alerts_simulator import bulk_alerts
+from commons.alerts_simulator.bulk_alerts import BulkAlertEngine
+from commons.alerts_simulator.bulk_alerts import RecordingExecutor
+from libs.ras.alert_watcher import AlertWatcher
+
+TARGETS = bulk_alerts.node_targets(
+    [{"hostname": f"node{i}", "username": "root", "password": "pwd"} for i in range(3)])
+
+
+class FakeBus:
+    """Message bus reader output, faults show up as alerts after a delay."""
+
+    def __init__(self, delay: float = 0.05, drop: str = None):
+        self.chunks = queue.Queue()
+        self.delay = delay
+        self.drop = drop
+        self.serial = itertools.count(1)
+
+    def __iter__(self):
+        return iter(self.chunks.get, b"")
+
+    def close(self):
+        """End the stream."""
+        self.chunks.put(b"")
+
+    def emit(self, alert_type: str, target: str):
+        """Alert line for an injected fault."""
+        if alert_type == self.drop:
+            return
+        state = "resolved" if alert_type.endswith(("_RESOLVED", "_ENABLE")) else "fault"
+        line = f'{{"host_id": "{target}", "type": "{alert_type}", "alert_type": "{state}", ' \
+               f'"alert_id": {next(self.serial)}}}\n'
+        threading.Timer(self.delay, self.chunks.put, (line.encode(),)).start()
+
+
+def scenario(count: int = 3) -> list:
+    """Psu cycles on every node and disk faults on one."""
+    steps = [dict(alert_type="PSU_FAULT", target=f"node{i}", action="cycle", count=count,
+                  expect=[f"node{i}", "PSU_FAULT", '"fault"'],
+                  expect_resolved=[f"node{i}", "PSU_FAULT_RESOLVED"]) for i in range(3)]
+    steps.append(dict(alert_type="DISK_DISABLE", target="node0", count=2,
+                      expect=["node0", "DISK_DISABLE"]))
+    return bulk_alerts.load_scenario(steps)
+
+
+class TestBulkAlerts:
+    """Concurrent injection, ordering, rate cap and correlation."""
+
+    def test_correlated_latencies(self):
+        """Every fault is matched with its own alert, raise before resolve per target."""
+        bus = FakeBus()
+        watcher = AlertWatcher(lambda: bus).start()
+        executor = RecordingExecutor(on_inject=bus.emit)
+        engine = BulkAlertEngine(TARGETS, executor, watcher, max_rate=None, alert_timeout=10)
+        report = engine.run(scenario())
+        watcher.stop()
+        summary = report.summary()
+        assert report.ok and summary["injections"] == 3 * 6 + 2 == summary["observed"]
+        assert 0.04 < summary["latency"]["p50"] < 2 and "PSU_FAULT_RESOLVED" in \
+            summary["per_alert"]
+        for node in ("node0", "node1", "node2"):
+            actions = [call[0] for call in executor.calls if call[1] == node and "PSU" in call[0]]
+            assert actions == ["PSU_FAULT", "PSU_FAULT_RESOLVED"] * 3
+        lines = {inj.alert for inj in report.injections}
+        assert len(lines) == len(report.injections)
+        # Lanes run concurrently, not one injection after the other
+        assert summary["wall_secs"] < 20 * 0.05
+
+    def test_rate_cap_and_failures(self):
+        """Injections are spaced by the rate cap, failed and unobserved faults are counted."""
+        bus = FakeBus(drop="DISK_DISABLE")
+        watcher = AlertWatcher(lambda: bus).start()
+
+        def executor(alert_type, target, details, input_parameters):
+            bus.emit(alert_type, target)
+            if target == "node2":
+                raise RuntimeError("controller unreachable")
+            return True, "injected"
+
+        engine = BulkAlertEngine(TARGETS, executor, watcher, max_rate=40, alert_timeout=0.3)
+        began = time.monotonic()
+        report = engine.run(scenario(count=1))
+        watcher.stop()
+        summary = report.summary()
+        assert time.monotonic() - began >= 7 / 40
+        assert summary["failed"] == 2 and summary["missed"] == 2 and not report.ok
+        assert {inj.response for inj in report.injections if not inj.ok} == \
+            {"controller unreachable"}
+
+    def test_dry_run_and_validation(self):
+        """Without watcher nothing is correlated, bad steps are rejected."""
+        executor = RecordingExecutor()
+        report = BulkAlertEngine(TARGETS, executor, max_rate=None).run(scenario(count=1))
+        assert len(executor.calls) == 8 and report.summary()["observed"] == 0 and report.ok
+        with pytest.raises(ValueError):
+            bulk_alerts.load_scenario([dict(alert_type="IEM_TEST_ERROR_ALERT", target="node0",
+                                            action="cycle")])
+        with pytest.raises(ValueError):
+            BulkAlertEngine(TARGETS, executor).run(
+                bulk_alerts.load_scenario([dict(alert_type="PSU_FAULT", target="node9")]))
@@ -0,0 +1,155 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for precompiled config snapshots."""
+
+import base64
+import os
+import sys
+import types
+
+import pytest
+import yaml
+
+from commons import config_snapshot
+from commons import pswdmanager
+
+
+@pytest.fixture(name="inputs")
+def fixture_inputs(tmp_path, monkeypatch):
+    """Two yaml inputs, a private snapshot dir and a counting build function."""
+    monkeypatch.setenv(config_snapshot.DIR_ENV, str(tmp_path / "snapshots"))
+    monkeypatch.delenv(config_snapshot.ENABLE_ENV, raising=False)
+    monkeypatch.setattr(pswdmanager, "encrypt",
+                        lambda secret: base64.b64encode(secret.encode()[::-1]).decode())
+    monkeypatch.setattr(pswdmanager, "decrypt",
+                        lambda secret: base64.b64decode(secret).decode()[::-1])
+    files = [str(tmp_path / "common.yaml"), str(tmp_path / "ha.yaml")]
+    with open(files[0], "w") as fout:
+        yaml.safe_dump({"nodes": [{"host": "srv1", "password": "nodesecret"}],
+                        "s3": {"region": "us"}}, fout)
+    with open(files[1], "w") as fout:
+        yaml.safe_dump({"timeout": 10}, fout)
+    builds = []
+
+    def build():
+        builds.append(1)
+        with open(files[0]) as common, open(files[1]) as ha_cfg:
+            cmn = yaml.safe_load(common)
+            return {"S3_CFG": cmn["s3"], "CMN_CFG": cmn, "HA_CFG": yaml.safe_load(ha_cfg)}
+
+    return types.SimpleNamespace(files=files, build=build, builds=builds)
+
+
+def _load(inputs, **kwargs):
+    return config_snapshot.load_or_compile("cfgtest", inputs.build, inputs.files,
+                                           groups=[("S3_CFG", "CMN_CFG")], **kwargs)
+
+
+class TestConfigSnapshot:
+    """Compile once, reload lazily, recompile on input changes."""
+
+    def test_compiled_once(self, inputs):
+        """Second load reads the snapshot, sections are unpickled on first use."""
+        first = _load(inputs)
+        second = _load(inputs)
+        assert len(inputs.builds) == 1
+        assert isinstance(second, config_snapshot.Snapshot)
+        assert sorted(second.names) == ["CMN_CFG", "HA_CFG", "S3_CFG"]
+        assert not second._groups  # pylint: disable=protected-access
+        assert second.section("HA_CFG") == {"timeout": 10}
+        assert first.section("CMN_CFG") == second.section("CMN_CFG")
+        assert oct(os.stat(second.path).st_mode & 0o777) == oct(0o600)
+
+    def test_groups_share_objects(self, inputs):
+        """Sections pickled as a group keep references between them."""
+        snapshot = _load(inputs)
+        assert snapshot.section("S3_CFG") is snapshot.section("CMN_CFG")["s3"]
+
+    def test_inputs_change_recompiles(self, inputs):
+        """Content of files and extra inputs are part of the snapshot key."""
+        _load(inputs)
+        with open(inputs.files[1], "w") as fout:
+            yaml.safe_dump({"timeout": 20}, fout)
+        assert _load(inputs).section("HA_CFG") == {"timeout": 20}
+        _load(inputs, extra={"target": "srv1"})
+        assert len(inputs.builds) == 3
+        _load(inputs, extra={"target": "srv1"})
+        assert len(inputs.builds) == 3
+
+    def test_ttl_and_disabled(self, inputs, monkeypatch):
+        """Expired snapshots are rebuilt, CONFIG_SNAPSHOT=0 always builds."""
+        _load(inputs, ttl=lambda: -1)
+        _load(inputs)
+        assert len(inputs.builds) == 2
+        monkeypatch.setenv(config_snapshot.ENABLE_ENV, "0")
+        assert _load(inputs)["HA_CFG"] == {"timeout": 10}
+        assert len(inputs.builds) == 3
+
+    def test_passwords_stored_encrypted(self, inputs, monkeypatch):
+        """Password fields are encrypted on disk and decrypted on load."""
+        path = _load(inputs).path
+        with open(path, "rb") as fin:
+            assert b"nodesecret" not in fin.read()
+        snapshot = config_snapshot.Snapshot(path)
+        assert snapshot.section("CMN_CFG")["nodes"][0]["password"] == "nodesecret"
+        assert snapshot.section("S3_CFG") is snapshot.section("CMN_CFG")["s3"]
+
+        def no_key(secret):
+            raise KeyError("KEY")
+        monkeypatch.setattr(pswdmanager, "encrypt", no_key)
+        sections = _load(inputs, extra={"target": "srv1"})
+        assert isinstance(sections, dict)
+        assert sections["CMN_CFG"]["nodes"][0]["password"] == "nodesecret"
+        assert sorted(os.listdir(os.path.dirname(path))) == sorted(
+            [os.path.basename(path), "cfgtest.lock"])
+
+    def test_old_versions_pruned(self, inputs):
+        """Snapshots of older versions are removed when a new one is written."""
+        directory = os.environ[config_snapshot.DIR_ENV]
+        os.makedirs(directory, mode=0o700)
+        old = os.path.join(directory, "cfgtest-old.snapshot")
+        with open(old, "wb") as fout:
+            fout.write(b"CFTCFG1\n")
+        _load(inputs)
+        assert not os.path.exists(old)
+
+    def test_shared_dir_refused(self, inputs, tmp_path, monkeypatch):
+        """A snapshot dir writable by others is not used."""
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        shared.chmod(0o777)
+        monkeypatch.setenv(config_snapshot.DIR_ENV, str(shared))
+        assert isinstance(_load(inputs), dict)
+        assert not os.listdir(shared)
+
+    def test_install_lazy_attributes(self, inputs, monkeypatch):
+        """Module attributes are loaded on first access and cached."""
+        module = types.ModuleType("cfgtest_module")
+        monkeypatch.setitem(sys.modules, module.__name__, module)
+        config_snapshot.install(module.__name__, _load(inputs),
+                                derived={"ha_timeout": ("HA_CFG", lambda cfg: cfg["timeout"])})
+        assert "HA_CFG" not in vars(module) and "HA_CFG" in dir(module)
+        assert module.ha_timeout == 10
+        assert module.HA_CFG is module.HA_CFG
+        # pylint: disable=no-member,import-outside-toplevel
+        from cfgtest_module import CMN_CFG
+        assert CMN_CFG["nodes"][0]["host"] == "srv1"
+        with pytest.raises(AttributeError):
+            module.MISSING_CFG  # pylint: disable=pointless-statement
@@ -0,0 +1,257 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for pooled CSM REST sessions, token cache and the async client
+against a local stand-in CSM server."""
+
+import asyncio
+import logging
+import threading
+import uuid
+from http import HTTPStatus
+
+import pytest
+from flask import Flask
+from flask import jsonify
+from flask import request
+from werkzeug.serving import make_server
+
+from libs.csm.rest.csm_rest_core_lib import AsyncRestClient
+from libs.csm.rest.csm_rest_bucket import RestS3Bucket
+from libs.csm.rest.csm_rest_core_lib import RestClient
+from libs.csm.rest.csm_rest_iamuser import RestIamUser
+from libs.csm.rest.csm_rest_stats import SystemStats
+from libs.csm.rest.csm_rest_test_lib import RestTestLib
+
+
+class StandInCSM:
+    """Flask app with login, logout and an authorized users endpoint."""
+
+    def __init__(self):
+        self.logins = 0
+        self.tokens = set()
+        self.lock = threading.Lock()
+        app = Flask(__name__)
+        app.add_url_rule("/api/v2/login", "login", self.login, methods=["POST"])
+        app.add_url_rule("/api/v2/logout", "logout", self.logout, methods=["POST"])
+        app.add_url_rule("/api/v2/users", "users", self.users, methods=["GET", "POST"])
+        app.add_url_rule("/api/v2/users/<uid>", "user", self.user, methods=["DELETE"])
+        app.add_url_rule("/api/v2/stats", "stats", self.stats, methods=["GET"])
+        app.add_url_rule("/api/v2/buckets", "buckets", self.buckets, methods=["POST"])
+        app.add_url_rule("/api/v2/buckets/<name>", "bucket", self.bucket, methods=["DELETE"])
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.port = self.server.server_port
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def _authorized(self):
+        with self.lock:
+            return request.headers.get("Authorization") in self.tokens
+
+    def login(self):
+        token = f"Bearer {uuid.uuid4().hex}"
+        with self.lock:
+            self.logins += 1
+            self.tokens.add(token)
+        return jsonify({}), HTTPStatus.OK, {"Authorization": token}
+
+    def logout(self):
+        if not self._authorized():
+            return jsonify({}), HTTPStatus.UNAUTHORIZED
+        with self.lock:
+            self.tokens.discard(request.headers["Authorization"])
+        return jsonify({}), HTTPStatus.OK
+
+    def users(self):
+        if not self._authorized():
+            return jsonify({}), HTTPStatus.UNAUTHORIZED
+        return jsonify({"user": request.args.get("user")}), HTTPStatus.OK
+
+    def user(self, uid):
+        if not self._authorized():
+            return jsonify({}), HTTPStatus.UNAUTHORIZED
+        return jsonify({"deleted": uid}), HTTPStatus.OK
+
+    def stats(self):
+        if not self._authorized():
+            return jsonify({}), HTTPStatus.UNAUTHORIZED
+        return jsonify({"metric": request.args.getlist("metric"),
+                        "panel": request.args.get("panel")}), HTTPStatus.OK
+
+    def buckets(self):
+        if not self._authorized():
+            return jsonify({}), HTTPStatus.UNAUTHORIZED
+        return jsonify({"created": request.get_json(force=True)["bucket_name"]}), HTTPStatus.OK
+
+    def bucket(self, name):
+        if not self._authorized():
+            return jsonify({}), HTTPStatus.UNAUTHORIZED
+        return jsonify({"deleted": name}), HTTPStatus.OK
+
+    def expire_tokens(self):
+        with self.lock:
+            self.tokens.clear()
+
+    def close(self):
+        self.server.shutdown()
+
+
+class _UsersLib(RestTestLib):
+    """RestTestLib with a decorated call against the stand-in users endpoint."""
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, config):
+        self.log = logging.getLogger(__name__)
+        self.config = config
+        self.restapi = RestClient(config)
+        self.headers = {}
+
+    @RestTestLib.authenticate_and_login
+    def get_user(self, user):
+        return self.restapi.rest_call("get", endpoint="/api/v2/users", headers=self.headers,
+                                      params={"user": user})
+
+    @RestTestLib.rest_logout
+    def logout_user(self):
+        return None
+
+
+@pytest.fixture(name="csm")
+def fixture_csm():
+    server = StandInCSM()
+    RestClient.token_cache.clear()
+    yield server
+    RestClient.token_cache.clear()
+    server.close()
+
+
+@pytest.fixture(name="config")
+def fixture_config(csm):
+    return {"mgmt_vip": "127.0.0.1", "port": csm.port, "secure": False,
+            "rest_login_endpoint": "/api/v2/login", "rest_logout_endpoint": "/api/v2/logout",
+            "Login_headers": {"Content-Type": "application/json"},
+            "csm_admin_user": {"username": "admin", "password": "Seagate@1"},
+            "s3account_user": {"username": "s3acc", "password": "Seagate@2"},
+            "s3_iam_user_endpoint": "/api/v2/users", "stats_endpoint": "/api/v2/stats",
+            "s3_bucket_endpoint": "/api/v2/buckets"}
+
+
+def bare_lib(cls, config):
+    """Test lib instance on config without the setup of its __init__."""
+    lib = cls.__new__(cls)
+    _UsersLib.__init__(lib, config)
+    return lib
+
+
+def test_session_shared_per_base_url(config):
+    """Clients of the same CSM reuse one pooled session."""
+    first, second = RestClient(config), RestClient(config)
+    assert first.session is second.session
+    other = RestClient(dict(config, port=config["port"] + 1))
+    assert other.session is not first.session
+
+
+def test_decorated_calls_fresh_login(csm, config):
+    """Decorated calls log in every time unless reuse_token is given."""
+    lib = _UsersLib(config)
+    for i in range(3):
+        assert lib.get_user(f"user{i}").status_code == HTTPStatus.OK
+    assert csm.logins == 3
+
+
+def test_decorated_calls_login_once(csm, config):
+    """With reuse_token the token is cached across decorated calls."""
+    lib = _UsersLib(config)
+    for i in range(50):
+        response = lib.get_user(f"user{i}", reuse_token=True)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["user"] == f"user{i}"
+    assert csm.logins == 1
+
+
+def test_unauthorized_relogin(csm, config):
+    """A 401 drops the cached token and the call is retried after one new login."""
+    lib = _UsersLib(config)
+    assert lib.get_user("a", reuse_token=True).status_code == HTTPStatus.OK
+    csm.expire_tokens()
+    assert lib.get_user("b", reuse_token=True).status_code == HTTPStatus.OK
+    assert csm.logins == 2
+    assert lib.get_user("c", reuse_token=True).status_code == HTTPStatus.OK
+    assert csm.logins == 2
+
+
+def test_logout_invalidates_token(csm, config):
+    """Logging out forgets the token so the next call logs in again."""
+    lib = _UsersLib(config)
+    lib.get_user("a", reuse_token=True)
+    lib.logout_user()
+    assert lib.get_user("b", reuse_token=True).status_code == HTTPStatus.OK
+    assert csm.logins == 2
+
+
+def test_get_headers_fresh_login(csm, config):
+    """get_headers always logs in again, the new token replaces the cached one."""
+    lib = _UsersLib(config)
+    headers = lib.get_headers("admin", "Seagate@1")
+    fresh = lib.get_headers("admin", "Seagate@1")
+    assert fresh["Authorization"] != headers["Authorization"]
+    assert fresh["Content-Type"] == "application/json"
+    assert csm.logins == 2
+    key = lib.restapi.token_key("admin", "Seagate@1")
+    assert RestClient.token_cache.get(key) == fresh["Authorization"]
+
+
+def test_async_client_gather(csm, config):
+    """Hundreds of concurrent calls share one token and keep call order."""
+    lib = _UsersLib(config)
+    responses = lib.async_rest_calls(
+        [dict(request_type="get", endpoint="/api/v2/users", params={"user": f"u{i}"})
+         for i in range(200)], concurrency=20)
+    assert [resp.json()["user"] for resp in responses] == [f"u{i}" for i in range(200)]
+    assert all(resp.status_code == HTTPStatus.OK for resp in responses)
+    assert csm.logins == 1
+
+
+def test_async_client_unauthorized(csm, config):
+    """Async 401 responses drop the rejected token from the cache."""
+    token = "Bearer stale"
+    key = RestClient(config).token_key("admin", "Seagate@1")
+    RestClient.token_cache.put(key, token)
+
+    async def run():
+        async with AsyncRestClient(config) as client:
+            return await client.rest_call("get", endpoint="/api/v2/users",
+                                          headers={"Authorization": token})
+    assert asyncio.run(run()).status_code == HTTPStatus.UNAUTHORIZED
+    assert RestClient.token_cache.get(key) is None
+    assert csm.logins == 0
+
+
+def test_async_fan_out_helpers(csm, config):
+    """IAM user, stats and bucket libs issue their bulk calls on the configured CSM."""
+    iam = bare_lib(RestIamUser, config)
+    assert [resp.json()["deleted"] for resp in iam.delete_iam_users_rgw(["u1", "u2"])] == \
+        ["u1", "u2"]
+    stats = bare_lib(SystemStats, config)
+    responses = stats.get_stats_many([dict(panel="Throughput"), dict(metrics=["a", "b"])])
+    assert [resp.json() for resp in responses] == [{"metric": [], "panel": "throughput"},
+                                                   {"metric": ["a", "b"], "panel": None}]
+    buckets = bare_lib(RestS3Bucket, config)
+    names = [f"bkt{i}" for i in range(20)]
+    assert [resp.json()["created"] for resp in buckets.create_s3_buckets(names)] == names
+    assert [resp.json()["deleted"] for resp in buckets.delete_s3_buckets(names)] == names
+    assert csm.logins == 2
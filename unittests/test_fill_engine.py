@@ -0,0 +1,91 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for the closed loop capacity fill engine."""
+
+import pytest
+
+from libs.durability import fill_engine
+from libs.durability.fill_engine import CapacityModel
+from libs.durability.fill_engine import FillEngine
+from libs.durability.fill_engine import FillManifest
+
+MB = 1024 ** 2
+TB = 1024 ** 4
+SIZES = [size * MB for size in (1, 16, 128, 1024)]
+
+
+class TestFillEngine:
+    """Dry runs against a capacity model reach the target within tolerance."""
+
+    @pytest.mark.parametrize("total, used, actual, estimate", [
+        (100 * TB, 10 * TB, 1.5, 1.5),
+        (2 * TB, 0, 2.0, 1.0),
+        (1000 * TB, 500 * TB, 1.25, 1.5),
+    ])
+    def test_reaches_target(self, total, used, actual, estimate):
+        """Wrong raw per user estimates are corrected from the measurements."""
+        model = CapacityModel(total, used, raw_per_user=actual)
+        result = fill_engine.dry_run(model, 95, SIZES, raw_per_user=estimate)
+        assert result.ok and abs(result.final_percent - 95) <= 0.5
+        assert result.manifest.total_bytes * actual == pytest.approx(model.used - used, rel=1e-3)
+        # Batches are bounded by the measured throughput times the sample interval
+        assert result.rounds < 300 and result.elapsed / result.rounds < 2 * 300
+
+    def test_manifest_round_trip(self, tmp_path):
+        """The manifest is saved compactly and reloads as workload info."""
+        model = CapacityModel(10 * TB, raw_per_user=1.5)
+        result = fill_engine.dry_run(model, 50, SIZES, raw_per_user=1.5,
+                                     bucket_list=["bkt-1", "bkt-2"])
+        path = str(tmp_path / "fill.json")
+        result.manifest.save(path)
+        loaded = FillManifest.load(path)
+        assert loaded.workload_info() == result.manifest.workload_info()
+        assert loaded.total_bytes == result.manifest.total_bytes
+        assert {entry["bucket"] for entry in loaded.entries} <= {"bkt-1", "bkt-2"}
+        # Large objects far from the target, small ones close to it
+        sizes = [entry["obj_size"] for entry in loaded.entries]
+        assert max(sizes) > sizes[-1]
+
+    def test_above_target_and_stall(self):
+        """Nothing is written above the target, writes not using capacity stop the fill."""
+        model = CapacityModel(10 * TB, 9 * TB)
+        result = fill_engine.dry_run(model, 50, SIZES)
+        assert not result.ok and result.rounds == 0 and "above target" in result.reason
+
+        engine = FillEngine(lambda: (10 * TB, 10 * TB, 0), lambda *args: (True, "ok"), SIZES)
+        result = engine.fill(50)
+        assert not result.ok and result.rounds == fill_engine.MAX_STALLS
+        assert "does not change" in result.reason
+
+    def test_write_failure(self):
+        """A failing writer ends the fill with its error, written batches are kept."""
+        model = CapacityModel(10 * TB, raw_per_user=1.5)
+        calls = []
+
+        def writer(*args):
+            calls.append(args)
+            if len(calls) > 2:
+                return False, "s3bench failed"
+            return model.write(*args)
+
+        engine = FillEngine(model.measure, writer, SIZES, raw_per_user=1.5, clock=model.clock)
+        result = engine.fill(90)
+        assert not result.ok and result.reason == "write failed: s3bench failed"
+        assert result.rounds == 3 and len(result.manifest.entries) == 2
@@ -0,0 +1,134 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for bounded object caches."""
+"""UnitTest module for the TTL cached cluster health gate."""
+
+import threading
+import time
+
+from commons.health_gate import HealthGate
+from commons.health_gate import Probe
+
+
+class FakeClock:
+    """Settable monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeNode:
+    """Node whose probes sleep and report the configured state."""
+
+    def __init__(self, hostname, healthy=True, used=50.0):
+        self.hostname = hostname
+        self.healthy = healthy
+        self.used = used
+        self.calls = 0
+        self.disconnected = 0
+
+    def check_node_health(self):
+        self.calls += 1
+        time.sleep(0.05)
+        if self.healthy is None:
+            raise ConnectionError(f"ssh to {self.hostname} failed")
+        return self.healthy, "services"
+
+    def disconnect(self):
+        self.disconnected += 1
+
+
+def _gate(nodes, clock, ttl=300):
+    probes = [Probe("node_health", lambda node: node.check_node_health()),
+              Probe("node_storage", lambda node: (node.used < 98.0, node.used), fatal=False)]
+    return HealthGate(lambda: nodes, probes, ttl=ttl, clock=clock,
+                      cleanup=lambda node: node.disconnect())
+
+
+class TestHealthGate:
+    """Verdict caching, invalidation and probe timings."""
+
+    def test_parallel_and_cached(self):
+        """Nodes are probed concurrently, a healthy verdict is reused until ttl."""
+        clock = FakeClock()
+        nodes = [FakeNode(f"srv{i}") for i in range(8)]
+        gate = _gate(nodes, clock)
+        begin = time.perf_counter()
+        verdict = gate.check()
+        assert time.perf_counter() - begin < 0.05 * 4
+        assert verdict.healthy and not verdict.cached and len(verdict.results) == 16
+        clock.now = 299
+        assert gate.check().cached
+        clock.now = 300
+        assert not gate.check().cached
+        assert all(node.calls == 2 and node.disconnected == 2 for node in nodes)
+        assert gate.counters == {"checks": 3, "probe_rounds": 2, "cache_hits": 1,
+                                 "invalidations": 0}
+
+    def test_invalidate(self):
+        """Invalidated and unhealthy verdicts are probed again."""
+        clock = FakeClock()
+        nodes = [FakeNode("srv1"), FakeNode("srv2")]
+        gate = _gate(nodes, clock)
+        gate.check()
+        gate.invalidate("test failed")
+        nodes[1].healthy = False
+        verdict = gate.check()
+        assert not verdict.healthy and "srv2" in verdict.reason and verdict.error is None
+        nodes[1].healthy = True
+        assert gate.check().healthy
+        assert nodes[0].calls == 3 and gate.counters["invalidations"] == 1
+
+    def test_zero_ttl(self):
+        """ttl 0 probes on every check."""
+        nodes = [FakeNode("srv1")]
+        gate = _gate(nodes, FakeClock(), ttl=0)
+        for _ in range(3):
+            assert not gate.check().cached
+        assert nodes[0].calls == 3
+
+    def test_probe_errors(self):
+        """Exceptions of fatal probes are kept, non fatal failures only warn."""
+        nodes = [FakeNode("srv1", used=99.0), FakeNode("srv2")]
+        gate = _gate(nodes, FakeClock())
+        assert gate.check().healthy
+        nodes[1].healthy = None
+        verdict = gate.check(force=True)
+        assert not verdict.healthy and isinstance(verdict.error, ConnectionError)
+        assert all(node.disconnected == 2 for node in nodes)
+
+    def test_summary(self):
+        """Probe timings and share of the run are reported."""
+        clock = FakeClock()
+        gate = _gate([FakeNode("srv1"), FakeNode("srv2")], clock)
+        threads = [threading.Thread(target=gate.check) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        clock.now = 100
+        summary = gate.summary()
+        assert summary["probe_rounds"] == 1 and summary["cache_hits"] == 3
+        assert summary["probes"]["node_health"]["count"] == 2
+        assert summary["probes"]["node_health"]["min"] >= 0.05
+        assert 0 < summary["share_of_run"] < 0.01
@@ -0,0 +1,155 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for bounded object caches."""
+
+import random
+import threading
+from collections import Counter
+
+import pytest
+
+from core.object_cache import BoundedCache
+from core.object_cache import ShardedCache
+from scripts.cache_bench import object_cache_bench as bench
+
+
+class FakeClock:
+    """Settable monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBoundedCache:
+    """LRU, TTL and random sampling."""
+
+    def test_lru_eviction(self):
+        """Least recently used entry goes first, lookups refresh entries."""
+        cache = BoundedCache(3)
+        for key in "abc":
+            cache.store(key, key.upper())
+        assert cache.lookup("a") == "A"
+        cache.store("d", "D")
+        assert "b" not in cache and list(cache.table) == ["c", "a", "d"]
+        cache.store("c", "C2")
+        cache.store("e", "E")
+        assert list(cache.table.items()) == [("d", "D"), ("c", "C2"), ("e", "E")]
+        with pytest.raises(KeyError):
+            cache.lookup("a")
+        cache.delete("a")
+        cache.delete("c")
+        assert len(cache) == 2 and cache.get("c", 0) == 0
+
+    def test_ttl(self):
+        """Entries expire ttl seconds after they were last stored."""
+        clock = FakeClock()
+        cache = BoundedCache(10, ttl=10, clock=clock)
+        cache.store("a", 1)
+        clock.now = 5
+        cache.store("b", 2)
+        cache.lookup("a")
+        clock.now = 10
+        assert "a" not in cache and cache.lookup("b") == 2
+        cache.store("b", 3)
+        clock.now = 19
+        assert cache.pop_random() == ("b", 3)
+        assert cache.pop_random() is None and cache.sample() is None
+
+    def test_matches_dict_model(self):
+        """Random operation sequences keep all internal indexes consistent."""
+        rand = random.Random(7)
+        cache = BoundedCache(50, seed=1)
+        model = {}
+        for _ in range(5000):
+            key = rand.randrange(80)
+            action = rand.random()
+            if action < 0.5:
+                cache.store(key, key * 2)
+                model[key] = key * 2
+                model = {k: model[k] for k in cache.table}
+            elif action < 0.7:
+                cache.delete(key)
+                model.pop(key, None)
+            else:
+                entry = cache.pop_random()
+                if entry is None:
+                    assert not model
+                else:
+                    assert model.pop(entry[0]) == entry[1]
+            assert dict(cache.table) == model and len(cache) <= 50
+            keys = cache._keys  # pylint: disable=protected-access
+            assert sorted(keys) == sorted(model)
+            assert all(cache._index[k] == i for i, k in enumerate(keys))  # pylint: disable=W0212
+
+    def test_pop_random_uniform(self):
+        """Every entry is equally likely to be popped."""
+        picks = Counter()
+        cache = BoundedCache(10, seed=3)
+        for _ in range(2000):
+            for key in range(10):
+                cache.store(key, key)
+            picks[cache.pop_random()[0]] += 1
+        assert min(picks.values()) > 140 and max(picks.values()) < 260
+
+
+class TestShardedCache:
+    """Sharded cache behaves as one cache."""
+
+    def test_sharded(self):
+        """Entries spread over shards, pops drain all of them."""
+        # The size bound applies per shard, 16 entries each. Int keys hash to themselves
+        # so the 40 keys land 10 per shard and nothing is evicted on any hash seed.
+        cache = ShardedCache(64, shards=4, seed=5)
+        for key in range(40):
+            cache.store(key, key)
+        assert len(cache) == 40 and cache.lookup(7) == 7
+        assert all(len(shard) for shard in cache.shards)
+        popped = {cache.pop_random()[0] for _ in range(40)}
+        assert len(popped) == 40 and cache.pop_random() is None
+
+    def test_threads(self):
+        """Concurrent store and pop never lose or duplicate entries."""
+        cache = ShardedCache(100000, shards=8)
+        popped = [[] for _ in range(4)]
+
+        def worker(number):
+            for index in range(2000):
+                cache.store((number, index), index)
+                if index % 2:
+                    popped[number].append(cache.pop_random()[0])
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        removed = [key for keys in popped for key in keys]
+        assert len(removed) == len(set(removed)) == 4000
+        assert len(cache) == 4000 and not set(removed) & set(cache.shards[0].table)
+
+
+def test_cache_bench():
+    """Benchmark runs every variant."""
+    for variant in bench.VARIANTS:
+        result = bench.run_bench(variant, size=1000, threads=2, duration=0.1)
+        assert result["ops"] > 0 and result["lookup_misses"] <= result["ops"]
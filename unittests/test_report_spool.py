@@ -0,0 +1,175 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for the background report spool against local Jira and DB stand-ins."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+from socketserver import ThreadingMixIn
+
+import pytest
+
+from commons import report_client
+from commons import report_spool
+from commons.utils.jira_utils import JiraTask
+
+PAYLOAD = dict(testPlanLabel="S3", testExecutionLabel="CFT", test_exec_id="TEST-10",
+               test_id_labels=[], test_name="test_put", test_plan_id="TEST-9",
+               start_time="2022-01-01 10:00:00", feature="S3", latest=True, dr_id="DR-1",
+               feature_id="F-1", platform_type="VM", server_type="HPE",
+               enclosure_type="5U84")
+
+
+class StandIn(ThreadingMixIn, HTTPServer):
+    """Records requests of Jira import/comment and reports DB create endpoints."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        self.requests = []
+        self.fail = []
+        super().__init__(("127.0.0.1", 0), Handler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}/"
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Answers with the next queued failure status or 200."""
+
+    def _handle(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+        self.server.requests.append((self.command, self.path, body))
+        status = self.server.fail.pop(0) if self.server.fail else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    do_POST = do_PUT = _handle
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture(name="endpoint")
+def fixture_endpoint(monkeypatch):
+    """Jira and reports DB stand-in on a free local port."""
+    server = StandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("JIRA_URL", server.url)
+    monkeypatch.setattr(report_client, "REPORT_SRV_CREATE", server.url + "reportsdb/create")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _spool(path, **kwargs):
+    task = JiraTask("user", "secret")
+    client = report_client.ReportClient()
+    senders = {report_spool.JIRA_STATUS: report_spool.jira_status_sender(task),
+               report_spool.JIRA_COMMENT: report_spool.jira_comment_sender(task),
+               report_spool.REPORT_DB: report_spool.report_db_sender(
+                   client, lambda: ("dbuser", "dbpass"))}
+    return report_spool.ReportSpool(str(path), senders, **kwargs)
+
+
+def _status(spool, test_id, status):
+    spool.enqueue(report_spool.JIRA_STATUS, f"TEST-10:{test_id}",
+                  dict(JiraTask.test_status_entry(test_id, status), te="TEST-10"))
+
+
+class TestReportSpool:
+    """Batching, coalescing, retries and durability."""
+
+    def test_batched_and_coalesced(self, endpoint, tmp_path):
+        """Statuses of a test merge, statuses of a test execution go in one import."""
+        spool = _spool(tmp_path / "spool.db", interval=60)
+        for test in ("TEST-1", "TEST-2", "TEST-3"):
+            _status(spool, test, "Executing")
+        _status(spool, "TEST-1", "PASS")
+        spool.enqueue(report_spool.REPORT_DB, "TEST-1", dict(PAYLOAD, test_id="TEST-1",
+                                                               test_result="PASS"))
+        status = spool.close(timeout=5)
+        assert status["backlog"] == 0 and status["delivered"] == 4
+        assert status["coalesced"] == 1 and status["batches"] == 2
+        imports = [json.loads(body) for _, path, body in endpoint.requests if "import" in path]
+        assert len(imports) == 1 and len(imports[0]["tests"]) == 3
+        first = imports[0]["tests"][0]
+        assert first["status"] == "PASS" and "start" in first and "finish" in first
+        created = [json.loads(body) for _, path, body in endpoint.requests if "create" in path]
+        assert created[0]["db_username"] == "dbuser" and created[0]["testResult"] == "PASS"
+        assert "dbpass" not in (tmp_path / "spool.db").read_bytes().decode(errors="ignore")
+
+    def test_retry_and_dead(self, endpoint, tmp_path):
+        """Server errors are retried with backoff, client errors are kept as dead."""
+        endpoint.fail.extend([503, 500])
+        spool = _spool(tmp_path / "spool.db", interval=0.05, backoff=0.05).start()
+        _status(spool, "TEST-1", "FAIL")
+        assert spool.flush(timeout=5)
+        assert spool.counters["retries"] == 2 and spool.counters["delivered"] == 1
+        endpoint.fail.append(400)
+        spool.enqueue(report_spool.JIRA_COMMENT, "run-1",
+                      dict(test_run_id="run-1", test_id="TEST-1", comment="log"))
+        status = spool.close(timeout=5)
+        assert status["dead_total"] == 0 and status["backlog"] == 0
+        endpoint.fail.append(404)
+        spool.enqueue(report_spool.REPORT_DB, "TEST-2", dict(PAYLOAD, test_id="TEST-2",
+                                                               test_result="FAIL"))
+        status = spool.close(timeout=5)
+        assert status["dead_total"] == 1 and "404" in status["last_error"]
+
+    def test_partial_batch(self, endpoint, tmp_path):
+        """Entries sent before a failure in a batch are not sent again."""
+        endpoint.fail.extend([200, 502])
+        spool = _spool(tmp_path / "spool.db", backoff=0.01)
+        for test in ("TEST-1", "TEST-2", "TEST-3"):
+            spool.enqueue(report_spool.REPORT_DB, test, dict(PAYLOAD, test_id=test,
+                                                             test_result="PASS"))
+        assert spool.flush(timeout=5)
+        created = [json.loads(body)["testID"] for _, path, body in endpoint.requests]
+        assert created[:2] == ["TEST-1", "TEST-2"] and sorted(created[2:]) == ["TEST-2", "TEST-3"]
+
+    def test_partial_jira_import(self, endpoint, tmp_path):
+        """Only statuses of the test execution whose import failed are sent again."""
+        endpoint.fail.extend([200, 502])
+        spool = _spool(tmp_path / "spool.db", backoff=0.01)
+        for te_id in ("TEST-10", "TEST-20"):
+            spool.enqueue(report_spool.JIRA_STATUS, f"{te_id}:TEST-1",
+                          dict(JiraTask.test_status_entry("TEST-1", "PASS"), te=te_id))
+        assert spool.flush(timeout=5)
+        imports = [json.loads(body)["testExecutionKey"] for _, _, body in endpoint.requests]
+        assert imports == ["TEST-10", "TEST-20", "TEST-20"]
+        assert spool.counters["delivered"] == 2 and spool.counters["retries"] == 1
+
+    def test_durable(self, endpoint, tmp_path):
+        """Updates left by an interrupted session are delivered by the next one."""
+        endpoint.fail.append(503)
+        spool = _spool(tmp_path / "spool.db", backoff=30)
+        _status(spool, "TEST-1", "PASS")
+        assert not spool.flush(timeout=0.2) and spool.status()["backlog"] == 1
+        begin = time.monotonic()
+        status = _spool(tmp_path / "spool.db", interval=0.05).start().close(timeout=5)
+        assert status["delivered"] == 1 and time.monotonic() - begin < 5
+        assert json.loads(endpoint.requests[-1][2])["tests"][0]["testKey"] == "TEST-1"
@@ -0,0 +1,127 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for the resource stats store."""
+
+import json
+import sqlite3
+
+import pytest
+
+from commons.utils import resource_stats
+from commons.utils.resource_stats import ResourceStatsStore
+from commons.utils.resource_stats import Sample
+
+POD = "cortx-data-ssc-vm-1-5f7b"
+MI = 1024 ** 2
+
+
+def write_top_logs(dir_path, minutes: int = 10, spike: int = 6):
+    """top_stats_log and top_nodes_stats_log as written by collect-k8s-stats.sh."""
+    pods, nodes = ["\n\n############## Process Info. #############\n\n"], []
+    for minute in range(minutes):
+        marker = f"\n=====2022-05-01T10:{minute:02d}:00=========\n"
+        cpu = 900 if minute == spike else 100
+        pods += [marker, "NAMESPACE   POD   NAME   CPU(cores)   MEMORY(bytes)\n",
+                 f"default   {POD}   cortx-motr-io-001   {cpu}m   {512 + minute}Mi\n",
+                 f"default   {POD}   cortx-hax   5m   64Mi\n"]
+        nodes += [marker, "NAME   CPU(cores)   CPU%   MEMORY(bytes)   MEMORY%\n",
+                  f"ssc-vm-1   {cpu * 2}m   20%   8Gi   40%\n",
+                  "ssc-vm-2   <unknown>   <unknown>   <unknown>   <unknown>\n"]
+    (dir_path / resource_stats.TOP_PODS_FILE).write_text("".join(pods))
+    (dir_path / resource_stats.TOP_NODES_FILE).write_text("".join(nodes))
+
+
+def write_procpath(path, pid: int = 42):
+    """procpath record database, m0d using one core then two."""
+    conn = sqlite3.connect(str(path))
+    conn.execute("CREATE TABLE record (record_id INTEGER PRIMARY KEY, ts REAL, stat_pid INT, "
+                 "stat_comm TEXT, stat_utime INT, stat_stime INT, stat_rss INT)")
+    ticks = 0
+    for step in range(5):
+        conn.execute("INSERT INTO record (ts, stat_pid, stat_comm, stat_utime, stat_stime, "
+                     "stat_rss) VALUES (?, ?, 'm0d', ?, ?, ?)",
+                     (1000.0 + 45 * step, pid, ticks, ticks // 2, 1000 + step))
+        ticks += 45 * 100 * (1 if step < 2 else 2) * 2 // 3
+    conn.commit()
+    conn.close()
+
+
+class TestResourceStats:
+    """Import, summaries, peaks and comparison of runs."""
+
+    def test_import_and_summary(self, tmp_path):
+        """Top and procpath samples land in one store keyed by node, pod and process."""
+        write_top_logs(tmp_path)
+        write_procpath(tmp_path / "ssc-vm-1.sqlite")
+        store = ResourceStatsStore(str(tmp_path / resource_stats.RESOURCE_STATS_DB))
+        assert store.import_top_dir("run1", str(tmp_path), {POD: "ssc-vm-1"}) == 30
+        assert store.import_procpath("run1", "ssc-vm-1", str(tmp_path / "ssc-vm-1.sqlite")) == 5
+        summary = store.summary("run1")
+        motr = summary[("ssc-vm-1", POD, "cortx-motr-io-001")]
+        assert motr["cpu"]["count"] == 10 and motr["cpu"]["max"] == pytest.approx(0.9)
+        assert motr["cpu"]["p50"] == pytest.approx(0.1) and motr["rss"]["max"] == 521 * MI
+        m0d = store.series("run1", ("ssc-vm-1", "", "m0d:42"))
+        assert m0d[0][1] is None and [round(row[1], 2) for row in m0d[1:]] == [1, 1, 2, 2]
+        assert m0d[-1][2] == 1004 * resource_stats.PAGE_SIZE
+        assert ("ssc-vm-1", "", "") in summary and store.runs() == ["run1"]
+        rows = store.downsample("run1", 300)
+        assert [row[3:6] for row in rows if row[2] == "cortx-motr-io-001"] == \
+            [(rows[0][3], pytest.approx(0.1), pytest.approx(0.1)),
+             (rows[0][3] + 300, pytest.approx(0.26), pytest.approx(0.9))]
+        store.close()
+
+    def test_peaks_and_compare(self, tmp_path):
+        """The cpu spike is a peak, the comparison ranks the largest change first."""
+        write_top_logs(tmp_path)
+        store = ResourceStatsStore()
+        store.import_top_dir("base", str(tmp_path))
+        peaks = store.peaks("base", floors={"cpu": 0.05})
+        assert [(peak.key[2], peak.metric) for peak in peaks] == \
+            [("cortx-motr-io-001", "cpu"), ("", "cpu")]
+        assert peaks[0].start == peaks[0].end and peaks[0].value == pytest.approx(0.9)
+        store.add("run2", [Sample("", POD, "cortx-hax", 1.0, 0.01, 128 * MI),
+                           Sample("", "new-pod", "", 1.0, 0.5, MI)])
+        rows = store.compare("base", "run2", stat="max")
+        assert (rows[0]["process"], rows[0]["metric"]) == ("cortx-hax", "cpu")
+        assert rows[0]["change_pct"] == pytest.approx(100)
+        assert any(row["pod"] == "new-pod" and row["base"] is None for row in rows)
+
+    def test_report_and_cli(self, tmp_path, capsys):
+        """The report json and command line summary cover every series."""
+        write_top_logs(tmp_path)
+        db_path = str(tmp_path / "stats.db")
+        store = ResourceStatsStore(db_path)
+        store.import_top_dir("run1", str(tmp_path))
+        report = store.report("run1", str(tmp_path / "report.json"))
+        store.close()
+        assert json.loads((tmp_path / "report.json").read_text()) == report
+        assert len(report["summary"]) == 3 and report["peaks"]
+        assert resource_stats.main([db_path, "run1"]) == 0
+        assert len(json.loads(capsys.readouterr().out)) == 3
+
+
+def test_quantities():
+    """kubectl cpu and memory quantities."""
+    assert resource_stats.parse_cpu("250m") == 0.25
+    assert resource_stats.parse_cpu("2") == 2.0
+    assert resource_stats.parse_memory("512Mi") == 512 * MI
+    assert resource_stats.parse_memory("1G") == 10 ** 9
+    with pytest.raises(ValueError):
+        resource_stats.parse_cpu("<unknown>")
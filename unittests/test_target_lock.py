@@ -0,0 +1,204 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for target lock leases using mongomock."""
+
+import time
+from datetime import datetime
+from datetime import timedelta
+
+import pytest
+
+from commons.constants import EXCLUSIVE_LOCK
+from commons.constants import SHARED_LOCK
+from core import locking_server
+from core.locking_server import LockingServer
+from core.target_lock import LeaseKeeper
+from core.target_lock import TargetLockService
+from scripts.lock_bench import lock_contention_bench as bench
+
+mongomock = pytest.importorskip("mongomock")
+
+
+class FakeClock:
+    """Settable utc clock."""
+
+    def __init__(self):
+        self.now = datetime(2022, 1, 1)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture(name="collection")
+def fixture_collection():
+    collection = mongomock.MongoClient()["cft_test_results"]["r2_systems"]
+    collection.insert_many([{"setupname": f"t{i}", "is_setup_free": True,
+                             "is_setup_healthy": True, "setup_in_useby": "",
+                             "in_use_for_parallel": False, "parallel_client_cnt": 0}
+                            for i in range(3)])
+    return collection
+
+
+@pytest.fixture(name="clock")
+def fixture_clock():
+    return FakeClock()
+
+
+@pytest.fixture(name="service")
+def fixture_service(collection, clock):
+    return TargetLockService(collection, lease_secs=60, clock=clock)
+
+
+class TestTargetLock:
+    """Exclusive, shared, upgrade, expiry and fencing."""
+
+    def test_exclusive(self, service, collection):
+        """Exclusive lock excludes everyone until released, tokens increase."""
+        lease = service.acquire("t0", "a")
+        assert lease.mode == EXCLUSIVE_LOCK and lease.token == 1
+        assert service.acquire("t0", "b") is None
+        assert service.acquire("t0", "b", SHARED_LOCK) is None
+        assert service.holds("t0", "a", EXCLUSIVE_LOCK)
+        doc = collection.find_one({"setupname": "t0"})
+        assert not doc["is_setup_free"] and doc["setup_in_useby"] == "a"
+        assert service.release(lease)
+        assert not service.release(lease)
+        doc = collection.find_one({"setupname": "t0"})
+        assert doc["is_setup_free"] and doc["setup_in_useby"] == ""
+        assert service.acquire("t0", "b").token == 2
+
+    def test_shared_and_upgrade(self, service, collection):
+        """Shared holders coexist, upgrade needs to be the only live holder."""
+        first = service.acquire("t0", "a", SHARED_LOCK)
+        second = service.acquire("t0", "b", SHARED_LOCK)
+        assert first.token == second.token
+        assert service.acquire("t0", "c") is None
+        assert collection.find_one({"setupname": "t0"})["parallel_client_cnt"] == 2
+        assert service.upgrade(first) is None
+        assert service.release(second)
+        upgraded = service.upgrade(first)
+        assert upgraded.mode == EXCLUSIVE_LOCK and upgraded.token > first.token
+        assert service.acquire("t0", "b", SHARED_LOCK) is None
+        assert service.release(upgraded)
+        assert collection.find_one({"setupname": "t0"})["parallel_client_cnt"] == 0
+
+    def test_upgrade_ignores_expired_holders(self, service, clock):
+        """A shared holder that stopped renewing does not block the upgrade."""
+        stale = service.acquire("t0", "a", SHARED_LOCK)
+        clock.advance(30)
+        live = service.acquire("t0", "b", SHARED_LOCK)
+        clock.advance(45)
+        assert service.renew(stale) is None
+        assert service.upgrade(live).mode == EXCLUSIVE_LOCK
+
+    def test_lease_expiry_and_fencing(self, service, clock):
+        """Expired lease is taken over and the old holder is fenced off."""
+        old = service.acquire("t0", "a")
+        clock.advance(30)
+        old = service.renew(old)
+        clock.advance(55)
+        assert service.acquire("t0", "b") is None
+        clock.advance(10)
+        new = service.acquire("t0", "b")
+        assert new.token > old.token
+        assert service.renew(old) is None
+        assert not service.release(old)
+        assert service.holds("t0", "b")
+
+    def test_legacy_lock_respected(self, service, collection):
+        """Targets locked by the old protocol stay locked."""
+        collection.update_one({"setupname": "t0"},
+                              {"$set": {"is_setup_free": False, "setup_in_useby": "x"}})
+        assert service.acquire("t0", "a") is None
+
+    def test_acquire_any(self, service, collection):
+        """One call locks a free healthy target of the pool."""
+        collection.update_one({"setupname": "t0"}, {"$set": {"is_setup_healthy": False}})
+        targets = ["t0", "t1", "t2"]
+        leases = [service.acquire_any(targets, client) for client in "ab"]
+        assert sorted(lease.target for lease in leases) == ["t1", "t2"]
+        assert service.acquire_any(targets, "c") is None
+        assert service.free_target(targets) is None
+        service.release(leases[0])
+        assert service.free_target(targets) == leases[0].target
+        assert service.acquire_any(targets, "c").target == leases[0].target
+
+    def test_acquire_any_shared_joins(self, service):
+        """Shared requests prefer a target already shared."""
+        targets = ["t0", "t1", "t2"]
+        first = service.acquire_any(targets, "a", SHARED_LOCK)
+        second = service.acquire_any(targets, "b", SHARED_LOCK)
+        assert first.target == second.target
+        assert service.free_target(targets, SHARED_LOCK) == first.target
+
+    def test_lease_keeper(self, collection):
+        """Heartbeat keeps a short lease alive and reports when it is lost."""
+        service = TargetLockService(collection, lease_secs=0.3)
+        lease = service.acquire("t0", "a")
+        lost = []
+        with LeaseKeeper(service, lease, interval=0.05,
+                         on_lost=lambda: lost.append(1)) as keeper:
+            time.sleep(0.6)
+            assert service.acquire("t0", "b") is None
+            collection.update_one({"setupname": "t0"}, {"$inc": {"lock_fence": 1}})
+            assert keeper.lost.wait(1)
+        assert lost == [1]
+
+    def test_shared_legacy_holder(self, service, collection):
+        """Legacy readers see a holder of a shared lock until the last one leaves."""
+        first = service.acquire("t0", "a", SHARED_LOCK)
+        second = service.acquire("t0", "b", SHARED_LOCK)
+        assert collection.find_one({"setupname": "t0"})["setup_in_useby"] == "a"
+        assert service.release(first)
+        assert collection.find_one({"setupname": "t0"})["setup_in_useby"] == "b"
+        assert service.release(second)
+        assert collection.find_one({"setupname": "t0"})["setup_in_useby"] == ""
+
+
+def test_locking_server_shared_client(collection, monkeypatch):
+    """LockingServer instances share one MongoClient, lock_target returns a renewable lease."""
+    clients = []
+
+    def mongo_client(uri):
+        clients.append(uri)
+        return collection.database.client
+
+    monkeypatch.setattr(locking_server, "MongoClient", mongo_client)
+    monkeypatch.setattr(locking_server.runner, "get_db_credential", lambda: ("user", "pass"))
+    monkeypatch.setattr(locking_server.params, "DB_NAME", collection.database.name)
+    monkeypatch.setattr(locking_server.params, "SYS_INFO_COLLECTION", collection.name)
+    monkeypatch.setattr(locking_server, "_MONGO_CLIENTS", {})
+    lease = LockingServer().lock_target("t0", "a", EXCLUSIVE_LOCK)
+    assert LockingServer().lock_target("t0", "b", EXCLUSIVE_LOCK) is None
+    with LockingServer().keep_alive(lease, interval=0.05) as keeper:
+        time.sleep(0.1)
+        assert not keeper.lost.is_set()
+    assert len(clients) == 1
+
+
+def test_contention_bench():
+    """Benchmark grants targets without conflicts under contention."""
+    result = bench.run_bench(bench.get_collection(), "atomic", clients=8, targets=2,
+                             duration=0.5, hold=0.002)
+    assert result["grants"] > 0 and result["conflicts"] == 0
+    assert result["round_trips_per_attempt"] <= 2
@@ -0,0 +1,127 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""UnitTest module for worker pool and latency histogram."""
+
+import hashlib
+import threading
+import time
+
+import pytest
+
+from commons.histogram import LatencyHistogram
+from commons.worker import Workers
+
+
+def _square(value):
+    return value * value
+
+
+def _sha1(size):
+    return hashlib.sha1(b'x' * size).hexdigest()
+
+
+class TestWorkers:
+    """Test futures, backpressure, stop event, timing and process mode."""
+
+    def test_submit_returns_results_and_exceptions(self):
+        """Futures carry results and exceptions of tasks."""
+        workers = Workers(nworkers=4)
+        workers.start_workers()
+        ok = workers.submit(_square, 7)
+        bad = workers.submit(_square, None)
+        assert ok.result() == 49
+        with pytest.raises(TypeError):
+            bad.result()
+        workers.end_workers()
+        stats = workers.stats()
+        assert (stats['completed'], stats['failed']) == (1, 1)
+        assert stats['latency']['count'] == 2
+
+    def test_map_unordered(self):
+        """All results are returned in completion order."""
+        workers = Workers(nworkers=4, max_inflight=3)
+        workers.start_workers()
+        assert sorted(workers.map_unordered(_square, range(50))) == [i * i for i in range(50)]
+        workers.end_workers()
+
+    def test_backpressure(self):
+        """No more than max_inflight tasks are outstanding."""
+        gate = threading.Event()
+        workers = Workers(nworkers=2, max_inflight=3)
+        workers.start_workers()
+        submitter = threading.Thread(target=lambda: [workers.submit(gate.wait) for _ in range(6)])
+        submitter.start()
+        time.sleep(0.2)
+        assert workers.stats()['inflight'] == 3
+        gate.set()
+        submitter.join()
+        workers.end_workers()
+        assert workers.stats()['completed'] == 6
+
+    def test_stop_event_drains(self):
+        """Stop event refuses new tasks and cancels pending ones."""
+        stop = threading.Event()
+        workers = Workers(nworkers=1, max_inflight=10, stop_event=stop)
+        workers.start_workers()
+        futures = [workers.submit(time.sleep, 0.1) for _ in range(5)]
+        stop.set()
+        assert workers.submit(time.sleep, 0.1) is None
+        workers.end_workers()
+        assert futures[0].result() is None
+        assert any(future.cancelled() for future in futures)
+
+    def test_latency_excludes_queue_wait(self):
+        """Latency counts from when a worker starts the task, queue wait is separate."""
+        workers = Workers(nworkers=1, max_inflight=4)
+        workers.start_workers()
+        for _ in range(4):
+            workers.submit(time.sleep, 0.1)
+        workers.end_workers()
+        stats = workers.stats()
+        assert stats['latency']['max'] < 0.2
+        assert stats['queue_wait']['count'] == 4
+        assert stats['queue_wait']['max'] >= 0.25
+
+    def test_processes(self):
+        """Process mode runs module level functions and rejects unpicklable callables."""
+        workers = Workers(nworkers=2, use_processes=True)
+        workers.start_workers()
+        assert workers.submit(_sha1, 1024).result() == hashlib.sha1(b'x' * 1024).hexdigest()
+        with pytest.raises(TypeError, match='module level function'):
+            workers.submit(self.test_processes)
+        with pytest.raises(TypeError, match='module level function'):
+            workers.submit(lambda: None)
+        workers.end_workers()
+        assert workers.stats()['completed'] == 1
+
+
+class TestLatencyHistogram:
+    """Test histogram percentiles and merge."""
+
+    def test_percentiles(self):
+        """Percentiles are within bucket precision."""
+        hist = LatencyHistogram()
+        for ms in range(1, 1001):
+            hist.record(ms / 1000.0)
+        assert hist.count == 1000
+        assert hist.percentile(50) == pytest.approx(0.5, rel=0.07)
+        assert hist.percentile(99) == pytest.approx(0.99, rel=0.07)
+        assert hist.percentile(100) == 1.0
+        other = LatencyHistogram()
+        other.record(2.0)
+        assert hist.merge(other).summary()['max'] == 2.0
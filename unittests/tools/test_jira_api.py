@@ -0,0 +1,137 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""JIRA data client unit tests replaying recorded JIRA responses."""
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("jira")
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "tools", "report"))
+import jira_api  # pylint: disable=wrong-import-position,wrong-import-order
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "jira_responses.json")
+
+
+class CountingSession(jira_api.FixtureSession):
+    """Replaying session keeping the requests made."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.requests = []
+
+    def request(self, method, url, params=None, **kwargs):
+        self.requests.append((method, url, params, kwargs.get("json")))
+        return super().request(method, url, params=params, **kwargs)
+
+
+@pytest.fixture(name="session")
+def fixture_session():
+    return CountingSession(FIXTURES)
+
+
+def _client(session, cache_dir=None):
+    return jira_api.JiraDataClient("user", "pass", cache_dir=cache_dir, workers=4,
+                                   session=session)
+
+
+class TestJiraDataClient:
+    """Parallel paging, batched lookups and the issue cache."""
+
+    def test_paged_in_parallel(self, session):
+        """Pages after the first are fetched workers at a time until a short page."""
+        tests = _client(session).test_execution_tests("TE-1")
+        assert [test["key"] for test in tests] == [f"TEST-{1000 + i}" for i in range(250)]
+        assert sorted(params["page"] for _, _, params, _ in session.requests) == [1, 2, 3, 4, 5]
+
+    def test_short_first_page(self, session):
+        """A first page shorter than the page size is the only one requested."""
+        tests = _client(session).test_execution_tests("TE-9")
+        assert [test["key"] for test in tests] == ["TEST-2000", "TEST-2001", "TEST-2002"]
+        assert len(session.requests) == 1
+
+    def test_batched_lookup_and_cache(self, session, tmp_path):
+        """Issues come from one key in (...) search and are pulled again only when updated."""
+        keys = ["EOS-1", "EOS-2", "EOS-3"]
+        client = _client(session, str(tmp_path))
+        issues = client.issues(keys + ["EOS-1"])
+        assert list(issues) == keys
+        assert issues["EOS-2"].fields.priority.name == "Critical"
+        assert issues["EOS-3"].fields.components[0].name == "Motr"
+        # Server returns 2 issues per page, the rest is fetched in parallel
+        assert sorted((body["jql"], body["startAt"]) for _, _, _, body in session.requests) == \
+            [("key in (EOS-1,EOS-2,EOS-3)", 0), ("key in (EOS-1,EOS-2,EOS-3)", 2)]
+        client.issues(keys)
+        assert len(session.requests) == 2
+
+        # A new client checks updated timestamps of cached issues only
+        session.requests.clear()
+        issues = _client(session, str(tmp_path)).issues(keys)
+        assert issues["EOS-1"].fields.summary == "Bug EOS-1"
+        assert {str(body["fields"]) for _, _, _, body in session.requests} == {"['updated']"}
+
+        path = tmp_path / "EOS-2.json"
+        raw = json.loads(path.read_text())
+        raw["fields"]["updated"] = "2021-12-31T10:00:00.000+0530"
+        path.write_text(json.dumps(raw))
+        session.requests.clear()
+        assert _client(session, str(tmp_path)).issue("EOS-2").fields.status.name == "New"
+        assert [(body["jql"], body["fields"]) for _, _, _, body in session.requests] == \
+            [("key in (EOS-2)", ["updated"]), ("key in (EOS-2)", ["*all"])]
+        assert json.loads(path.read_text())["fields"]["updated"].startswith("2022-01-02")
+
+    def test_moved_issue(self, session):
+        """Keys missing from the search are fetched one by one."""
+        issue = _client(session).issue("OLD-9")
+        assert issue.key == "EOS-9" and issue.fields.status.name == "Closed"
+
+    def test_unrecorded_request(self, session):
+        """Replay fails loudly on requests that were never recorded."""
+        with pytest.raises(KeyError):
+            _client(session).test_execution_tests("TE-404")
+
+
+class TestReportFunctions:
+    """Report helpers served by the shared client."""
+
+    @pytest.fixture(autouse=True)
+    def replay(self, monkeypatch, tmp_path):
+        monkeypatch.setenv(jira_api.FIXTURES_ENV, FIXTURES)
+        monkeypatch.setattr(jira_api, "CACHE_DIR", str(tmp_path))
+        jira_api.clear_clients()
+        yield
+        jira_api.clear_clients()
+
+    def test_defects_and_bug_table(self):
+        """Defects of all test executions of a test plan."""
+        assert jira_api.get_defects_from_test_plan("TP-1", "user", "pass") == \
+            {"EOS-1", "EOS-2", "EOS-3"}
+        data = jira_api.get_reported_bug_table_data("TP-1", "user", "pass")
+        assert data[2] == ["Total", 1, 2]
+        assert jira_api.get_client("user", "pass") is jira_api.get_client("user", "pass")
+
+    def test_feature_tests(self):
+        """Tests grouped by Test Domain from one search and the test plan statuses."""
+        features = jira_api.get_feature_tests("TP-1", "user", "pass")
+        assert features == {"Data recovery": {"TEST-1": "PASS", "TEST-2": "FAIL"},
+                            "Performance": {"TEST-3": "FAIL", "TEST-4": "BLOCKED"},
+                            "Data Integrity": {"TEST-5": "PASS"}}
@@ -0,0 +1,174 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""REST server MongoDB client registry and search endpoint unit tests using mongomock."""
+import importlib
+import json
+import os
+import sys
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+pytest.importorskip("flask_restx")
+from flask import Flask  # pylint: disable=wrong-import-position
+from pymongo.errors import OperationFailure  # pylint: disable=wrong-import-position
+
+REST_SERVER = os.path.join(os.path.dirname(__file__), "..", "..", "tools", "rest_server")
+CREDS = {"db_username": "user", "db_password": "secret"}
+
+
+@pytest.fixture(name="rest_app", scope="module")
+def fixture_rest_app():
+    """Import rest_app with its config.ini."""
+    cwd = os.getcwd()
+    sys.path.insert(0, REST_SERVER)
+    os.chdir(REST_SERVER)
+    try:
+        module = importlib.import_module("rest_app")
+    finally:
+        os.chdir(cwd)
+    module.read_config.db_hostname = "localhost"
+    yield module
+    sys.path.remove(REST_SERVER)
+
+
+@pytest.fixture(name="mongo")
+def fixture_mongo(rest_app):
+    """Registry backed by one mongomock client, yields the client and constructed uris."""
+    client = mongomock.MongoClient()
+    uris = []
+
+    def factory(uri, **_kwargs):
+        uris.append(uri)
+        return client
+
+    mongodbapi = rest_app.mongodbapi
+    with mock.patch.object(mongodbapi, "CLIENT_CLASS", factory):
+        mongodbapi.close_clients()
+        yield client, uris
+        mongodbapi.close_clients()
+
+
+@pytest.fixture(name="http")
+def fixture_http(rest_app):
+    """Flask test client of the REST server."""
+    app = Flask(__name__)
+    rest_app.api.init_app(app)
+    return app.test_client()
+
+
+def _insert_timings(client, rest_app, count):
+    collection = client[rest_app.read_config.db_name][rest_app.read_config.timing_collection]
+    collection.insert_many([{"buildNo": "1", "testID": f"TEST-{i}", "logs": [],
+                             "nodeRebootTime": float(i)} for i in range(count)])
+
+
+class TestClientRegistry:
+    """Long lived MongoClient per credentials."""
+
+    def test_client_reused(self, rest_app, mongo):
+        """Repeated calls with the same uri construct one client."""
+        mongodbapi = rest_app.mongodbapi
+        _, uris = mongo
+        for _ in range(5):
+            assert mongodbapi.count_documents({}, "mongodb://a:b@host", "db", "col") == (True, 0)
+        mongodbapi.count_documents({}, "mongodb://c:d@host", "db", "col")
+        assert uris == ["mongodb://a:b@host", "mongodb://c:d@host"]
+
+    def test_client_lru_bound(self, rest_app, mongo):
+        """Least recently used clients are evicted beyond MAX_CLIENTS."""
+        mongodbapi = rest_app.mongodbapi
+        _, uris = mongo
+        with mock.patch.object(mongodbapi, "MAX_CLIENTS", 2):
+            for uri in ["u1", "u2", "u1", "u3", "u1", "u2"]:
+                mongodbapi.get_client(uri)
+        assert uris == ["u1", "u2", "u3", "u2"]
+
+    def test_auth_failure_drops_client(self, rest_app):
+        """Wrong credentials map to 401 and the client is not kept."""
+        mongodbapi = rest_app.mongodbapi
+        bad_client = mock.MagicMock()
+        bad_client.__getitem__.side_effect = OperationFailure("Authentication failed", 18)
+        with mock.patch.object(mongodbapi, "CLIENT_CLASS", return_value=bad_client) as factory:
+            mongodbapi.close_clients()
+            for _ in range(2):
+                status, (code, _) = mongodbapi.count_documents({}, "mongodb://x:y@h", "db", "c")
+                assert not status and code == HTTPStatus.UNAUTHORIZED
+            assert factory.call_count == 2
+            mongodbapi.close_clients()
+
+
+class TestSearch:
+    """Search endpoint modes."""
+
+    def test_search_all(self, rest_app, mongo, http):
+        """Default search returns every match without _id."""
+        _insert_timings(mongo[0], rest_app, 25)
+        resp = http.get("/timings", json=dict(CREDS, query={"buildNo": "1"}))
+        assert resp.status_code == HTTPStatus.OK
+        result = resp.get_json()["result"]
+        assert len(result) == 25 and "_id" not in result[0]
+        resp = http.get("/timings", json=dict(CREDS, query={"buildNo": "2"}))
+        assert resp.status_code == HTTPStatus.NOT_FOUND
+
+    def test_search_pages(self, rest_app, mongo, http):
+        """Pages carry total and walk all matches by cursor."""
+        _insert_timings(mongo[0], rest_app, 25)
+        seen, cursor = [], None
+        while True:
+            body = dict(CREDS, query={"buildNo": "1"}, page_size=10,
+                        projection={"testID": 1})
+            if cursor:
+                body["cursor"] = cursor
+            page = http.get("/timings", json=body).get_json()
+            assert page["total"] == 25
+            assert all(list(doc) == ["testID"] for doc in page["result"])
+            seen.extend(doc["testID"] for doc in page["result"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == [f"TEST-{i}" for i in range(25)]
+        resp = http.get("/timings", json=dict(CREDS, query={"buildNo": "2"}, page_size=10))
+        assert resp.status_code == HTTPStatus.NOT_FOUND
+
+    def test_search_stream(self, rest_app, mongo, http):
+        """stream flag or NDJSON accept header returns one document per line."""
+        _insert_timings(mongo[0], rest_app, 25)
+        resp = http.get("/timings", json=dict(CREDS, query={"buildNo": "1"}, stream=True))
+        assert resp.mimetype == "application/x-ndjson"
+        lines = resp.get_data(as_text=True).splitlines()
+        assert [json.loads(line)["testID"] for line in lines] == \
+            [f"TEST-{i}" for i in range(25)]
+        resp = http.get("/timings", json=dict(CREDS, query={"buildNo": "1"}),
+                        headers={"Accept": "application/x-ndjson"})
+        assert len(resp.get_data(as_text=True).splitlines()) == 25
+
+    @pytest.mark.parametrize("extra", [{"page_size": 0}, {"page_size": "10"},
+                                       {"cursor": "abc", "page_size": 5},
+                                       {"cursor": "0" * 24}, {"stream": "yes"},
+                                       {"stream": True, "page_size": 5}])
+    def test_search_bad_page_fields(self, mongo, http, extra):
+        """Invalid pagination fields are rejected."""
+        resp = http.get("/reportsdb/search", json=dict(CREDS, query={}, **extra))
+        assert resp.status_code == HTTPStatus.BAD_REQUEST
+        assert not mongo[1]